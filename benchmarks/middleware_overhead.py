@@ -0,0 +1,98 @@
+"""Measure the per-request cost of each middleware layer.
+
+Run with `poetry run python benchmarks/middleware_overhead.py`. Requests are driven through
+the ASGI app in-process, so the numbers exclude server and socket overhead.
+"""
+
+import asyncio
+import time
+
+import orjson
+
+from wibbley.api import App
+from wibbley.api.http_handler.event_handling import EventHandlingSettings
+from wibbley.api.http_handler.handler import HTTPHandler
+from wibbley.api.http_handler.request import HTTPRequestConstructor
+from wibbley.api.http_handler.request_handlers.default_request_handler import (
+    DefaultRequestHandler,
+)
+from wibbley.api.http_handler.request_handlers.head_request_handler import (
+    HeadRequestHandler,
+)
+from wibbley.api.http_handler.request_handlers.options_request_handler import (
+    OptionsRequestHandler,
+)
+from wibbley.api.http_handler.request_handlers.response_sender import ResponseSender
+from wibbley.api.http_handler.route_extractor import RouteExtractor
+from wibbley.api.http_handler.router import Router
+
+ITERATIONS = 20000
+MIDDLEWARE_COUNTS = [0, 1, 2, 4, 8]
+
+
+def build_app() -> App:
+    return App(
+        HTTPHandler(
+            router=Router(),
+            response_sender=ResponseSender(orjson),
+            options_request_handler=OptionsRequestHandler(
+                cors_settings=None, response_sender=ResponseSender(orjson)
+            ),
+            http_request_constructor=HTTPRequestConstructor(),
+            head_request_handler=HeadRequestHandler(ResponseSender(orjson)),
+            default_request_handler=DefaultRequestHandler(ResponseSender(orjson)),
+            event_handling_settings=EventHandlingSettings(),
+            route_extractor=RouteExtractor(),
+        )
+    )
+
+
+async def passthrough(request, call_next):
+    return await call_next(request)
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+async def run(middleware_count: int, path: str) -> float:
+    app = build_app()
+    for _ in range(middleware_count):
+        app.add_middleware(passthrough, exclude_paths=["/excluded"])
+
+    @app.get(path)
+    async def hello():
+        return {"message": "Hello, World!"}
+
+    scope = {
+        "type": "http",
+        "path": path,
+        "method": "GET",
+        "headers": [],
+        "query_string": b"",
+    }
+    await app(scope, receive, send)
+    start = time.perf_counter_ns()
+    for _ in range(ITERATIONS):
+        await app(scope, receive, send)
+    return (time.perf_counter_ns() - start) / ITERATIONS
+
+
+async def main():
+    baseline = await run(0, "/included")
+    print(f"{'middlewares':>12} {'ns/request':>12} {'ns/layer':>10} {'excluded':>10}")
+    for middleware_count in MIDDLEWARE_COUNTS:
+        included = await run(middleware_count, "/included")
+        excluded = await run(middleware_count, "/excluded")
+        per_layer = (included - baseline) / middleware_count if middleware_count else 0
+        print(
+            f"{middleware_count:>12} {included:>12.0f} {per_layer:>10.0f} {excluded:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+"""Compare the shared-socket and SO_REUSEPORT worker modes on loopback.
+
+Run with `poetry run python benchmarks/reuseport_accept.py`. Each mode starts the wibbley CLI
+with several workers. A client then opens a new connection for every request and records
+which worker pid answered. The report shows throughput and how evenly accepts were spread.
+"""
+
+import asyncio
+import collections
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HOST = "127.0.0.1"
+PORT = 8765
+WORKERS = 4
+REQUESTS = 20000
+CONCURRENCY = 64
+APP_SOURCE = """
+import os
+
+from wibbley.api import App
+
+app = App()
+PID = {"pid": os.getpid()}
+
+
+@app.get("/pid")
+async def pid():
+    PID["pid"] = os.getpid()
+    return PID
+"""
+REQUEST = f"GET /pid HTTP/1.1\r\nHost: {HOST}\r\nConnection: close\r\n\r\n".encode(
+    "latin-1"
+)
+
+
+async def fetch_pid() -> bytes:
+    reader, writer = await asyncio.open_connection(HOST, PORT)
+    writer.write(REQUEST)
+    response = await reader.read()
+    writer.close()
+    return response.rpartition(b'"pid":')[2].rstrip(b"}")
+
+
+async def wait_until_ready():
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            await fetch_pid()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("Server did not start")
+
+
+async def drive() -> tuple:
+    counts = collections.Counter()
+    remaining = REQUESTS
+
+    async def client():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            counts[await fetch_pid()] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(CONCURRENCY)))
+    return time.perf_counter() - start, counts
+
+
+def run_mode(app_dir: str, extra_args: list) -> tuple:
+    command = [
+        sys.executable,
+        "-c",
+        "from wibbley.main import main; main()",
+        "--app",
+        "bench_app:app",
+        "--port",
+        str(PORT),
+        "--workers",
+        str(WORKERS),
+        "--log-level",
+        "warning",
+    ] + extra_args
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([app_dir, os.getcwd()]))
+    server = subprocess.Popen(command, cwd=app_dir, env=env)
+    try:
+        asyncio.run(wait_until_ready())
+        return asyncio.run(drive())
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as app_dir:
+        with open(os.path.join(app_dir, "bench_app.py"), "w") as app_file:
+            app_file.write(APP_SOURCE)
+        print(f"{'mode':>10} {'req/s':>10} {'min':>7} {'max':>7} {'stdev':>7}")
+        for mode, extra_args in [("shared", []), ("reuseport", ["--reuse-port"])]:
+            elapsed, counts = run_mode(app_dir, extra_args)
+            per_worker = list(counts.values()) + [0] * (WORKERS - len(counts))
+            print(
+                f"{mode:>10} {REQUESTS / elapsed:>10.0f} {min(per_worker):>7}"
+                f" {max(per_worker):>7} {statistics.pstdev(per_worker):>7.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
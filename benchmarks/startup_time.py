@@ -0,0 +1,107 @@
+"""Measure how long the wibbley CLI takes to import and to serve its first request.
+
+Run with `poetry run python benchmarks/startup_time.py`. The import report comes from
+`python -X importtime` and lists the modules with the largest cumulative import time. The
+startup timing launches the CLI against a one-route app and polls until the first response.
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+HOST = "127.0.0.1"
+PORT = 8766
+RUNS = 5
+STARTUP_TIMEOUT = 30
+TOP_MODULES = 15
+APP_SOURCE = """
+from wibbley.api import App
+
+app = App()
+
+
+@app.get("/")
+async def index():
+    return "ok"
+"""
+REQUEST = f"GET / HTTP/1.1\r\nHost: {HOST}\r\nConnection: close\r\n\r\n".encode(
+    "latin-1"
+)
+
+
+def import_times(statement: str) -> list:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:") :].split("|")
+        times.append((int(cumulative_us), int(self_us), module.strip()))
+    return sorted(times, reverse=True)
+
+
+def first_response_seconds(app_dir: str) -> float:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([app_dir, os.getcwd()]))
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            "from wibbley.main import main; main()",
+            "--app",
+            "startup_app:app",
+            "--port",
+            str(PORT),
+            "--log-level",
+            "warning",
+        ],
+        cwd=app_dir,
+        env=env,
+    )
+    deadline = start + STARTUP_TIMEOUT
+    try:
+        while time.perf_counter() < deadline:
+            if server.poll() is not None:
+                raise RuntimeError(
+                    f"Server exited with code {server.returncode} before responding"
+                )
+            try:
+                with socket.create_connection((HOST, PORT), timeout=1) as connection:
+                    connection.sendall(REQUEST)
+                    if connection.recv(1024).startswith(b"HTTP/1.1 200"):
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.005)
+        raise RuntimeError(f"Server did not respond within {STARTUP_TIMEOUT} seconds")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    print(f"{'cumulative us':>14} {'self us':>9}  module")
+    for cumulative_us, self_us, module in import_times("import wibbley.main")[
+        :TOP_MODULES
+    ]:
+        print(f"{cumulative_us:>14} {self_us:>9}  {module}")
+
+    with tempfile.TemporaryDirectory() as app_dir:
+        with open(os.path.join(app_dir, "startup_app.py"), "w") as app_file:
+            app_file.write(APP_SOURCE)
+        timings = sorted(first_response_seconds(app_dir) for _ in range(RUNS))
+    print(
+        f"\ntime to first response over {RUNS} runs: "
+        f"min {timings[0] * 1000:.0f} ms, median {timings[RUNS // 2] * 1000:.0f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
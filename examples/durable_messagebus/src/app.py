@@ -9,5 +9,5 @@ map_orm_to_model()
 
 @app.post("/message")
 async def message_handler(request):
-    await messagebus.handle(CreateSquareCommand())
+    request.add_background_task(messagebus.handle, CreateSquareCommand())
     return {"message": "Message received"}
@@ -23,6 +23,7 @@ message_broker = MessageBroker(
     message_broker_settings=MessageBrokerSettings(
         event_handler_count=1, outbox_poller_count=1, fanout_poller_count=1
     ),
+    message_clients=[message_client],
 )
 
 
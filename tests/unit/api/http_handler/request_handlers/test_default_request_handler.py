@@ -1,8 +1,16 @@
+import orjson
 import pytest
 
 from wibbley.api.http_handler.request_handlers.default_request_handler import (
     DefaultRequestHandler,
     HTTPResponse,
+    StreamingHTTPResponse,
+)
+from wibbley.api.http_handler.request_handlers.response_sender import ResponseSender
+from wibbley.api.http_handler.serializers import (
+    RawSerializer,
+    Serializer,
+    SerializerRegistry,
 )
 
 
@@ -20,6 +28,16 @@ class FakeResponseSender:
             }
         )
 
+    async def send_streaming_response(self, send, status_code, headers, body_iterator):
+        self.calls.append(
+            {
+                "send": send,
+                "status_code": status_code,
+                "headers": headers,
+                "body_iterator": body_iterator,
+            }
+        )
+
 
 @pytest.mark.asyncio
 async def test__default_request_handler_handle__when_route_func_result_is_http_response__calls_response_sender_send_response():
@@ -63,6 +81,30 @@ async def test__default_request_handler_handle__when_route_func_result_is_not_ht
     }
 
 
+@pytest.mark.asyncio
+async def test__default_request_handler_handle__when_route_func_result_is_streaming_http_response__calls_response_sender_send_streaming_response():
+    # ARRANGE
+    response_sender = FakeResponseSender()
+    default_request_handler = DefaultRequestHandler(response_sender)
+    body_iterator = iter([b"chunk"])
+    result = StreamingHTTPResponse(
+        status_code=200,
+        headers=[(b"content-type", b"text/plain")],
+        body_iterator=body_iterator,
+    )
+
+    # ACT
+    await default_request_handler.handle(response_sender, result)
+
+    # ASSERT
+    assert response_sender.calls[0] == {
+        "send": response_sender,
+        "status_code": 200,
+        "headers": [(b"content-type", b"text/plain")],
+        "body_iterator": body_iterator,
+    }
+
+
 def test__default_request_handler_determine_content_type__when_result_is_str__returns_text_plain():
     # ARRANGE
     default_request_handler = DefaultRequestHandler(None)
@@ -109,3 +151,305 @@ def test__default_request_handler_determine_content_type__when_result_is_list__r
 
     # ASSERT
     assert content_type == b"application/json"
+
+
+class FakeSend:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, message):
+        self.calls.append(message)
+
+
+@pytest.mark.asyncio
+async def test__default_request_handler_handle__when_etags_enabled__adds_weak_etag():
+    # ARRANGE
+    send = FakeSend()
+    default_request_handler = DefaultRequestHandler(
+        ResponseSender(orjson), etags_enabled=True
+    )
+
+    # ACT
+    await default_request_handler.handle(
+        send, {"key": "value"}, request_headers=[], conditional=True
+    )
+
+    # ASSERT
+    headers = dict(send.calls[0]["headers"])
+    assert headers[b"etag"].startswith(b'W/"')
+    assert send.calls[1]["body"] == b'{"key":"value"}'
+
+
+@pytest.mark.asyncio
+async def test__default_request_handler_handle__when_if_none_match_matches_generated_etag__sends_304():
+    # ARRANGE
+    send = FakeSend()
+    default_request_handler = DefaultRequestHandler(
+        ResponseSender(orjson), etags_enabled=True
+    )
+    await default_request_handler.handle(
+        send, {"key": "value"}, request_headers=[], conditional=True
+    )
+    etag = dict(send.calls[0]["headers"])[b"etag"]
+    send.calls.clear()
+
+    # ACT
+    await default_request_handler.handle(
+        send,
+        {"key": "value"},
+        request_headers=[(b"if-none-match", b'"x", ' + etag)],
+        conditional=True,
+    )
+
+    # ASSERT
+    assert send.calls[0]["status"] == 304
+    assert send.calls[0]["headers"] == [(b"etag", etag)]
+    assert send.calls[1]["body"] == b""
+
+
+@pytest.mark.asyncio
+async def test__default_request_handler_handle__when_if_none_match_does_not_match__sends_200():
+    # ARRANGE
+    send = FakeSend()
+    default_request_handler = DefaultRequestHandler(
+        ResponseSender(orjson), etags_enabled=True
+    )
+
+    # ACT
+    await default_request_handler.handle(
+        send,
+        "value",
+        request_headers=[(b"If-None-Match", b'W/"stale"')],
+        conditional=True,
+    )
+
+    # ASSERT
+    assert send.calls[0]["status"] == 200
+    assert send.calls[1]["body"] == b"value"
+
+
+@pytest.mark.asyncio
+async def test__default_request_handler_handle__when_handler_provides_matching_etag__skips_serialization():
+    # ARRANGE
+    class UnserializableBody:
+        pass
+
+    send = FakeSend()
+    default_request_handler = DefaultRequestHandler(ResponseSender(orjson))
+    result = HTTPResponse(
+        status_code=200,
+        headers=[
+            (b"content-type", b"application/json"),
+            (b"ETag", b'"v1"'),
+            (b"cache-control", b"max-age=1"),
+        ],
+        body=UnserializableBody(),
+    )
+
+    # ACT
+    await default_request_handler.handle(
+        send,
+        result,
+        request_headers=[(b"if-none-match", b'W/"v1"')],
+        conditional=True,
+    )
+
+    # ASSERT
+    assert send.calls[0]["status"] == 304
+    assert send.calls[0]["headers"] == [
+        (b"ETag", b'"v1"'),
+        (b"cache-control", b"max-age=1"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test__default_request_handler_handle__when_if_none_match_is_wildcard__sends_304():
+    # ARRANGE
+    send = FakeSend()
+    default_request_handler = DefaultRequestHandler(
+        ResponseSender(orjson), etags_enabled=True
+    )
+
+    # ACT
+    await default_request_handler.handle(
+        send,
+        "value",
+        request_headers=[(b"if-none-match", b"*")],
+        conditional=True,
+    )
+
+    # ASSERT
+    assert send.calls[0]["status"] == 304
+
+
+@pytest.mark.asyncio
+async def test__default_request_handler_handle__when_not_modified_since_last_modified__sends_304():
+    # ARRANGE
+    send = FakeSend()
+    default_request_handler = DefaultRequestHandler(ResponseSender(orjson))
+    result = HTTPResponse(
+        status_code=200,
+        headers=[(b"last-modified", b"Wed, 21 Oct 2015 07:28:00 GMT")],
+        body=b"value",
+    )
+
+    # ACT
+    await default_request_handler.handle(
+        send,
+        result,
+        request_headers=[(b"if-modified-since", b"Wed, 21 Oct 2015 07:28:00 GMT")],
+        conditional=True,
+    )
+
+    # ASSERT
+    assert send.calls[0]["status"] == 304
+
+
+@pytest.mark.asyncio
+async def test__default_request_handler_handle__when_modified_since__sends_200():
+    # ARRANGE
+    send = FakeSend()
+    default_request_handler = DefaultRequestHandler(ResponseSender(orjson))
+    result = HTTPResponse(
+        status_code=200,
+        headers=[(b"last-modified", b"Thu, 22 Oct 2015 07:28:00 GMT")],
+        body=b"value",
+    )
+
+    # ACT
+    await default_request_handler.handle(
+        send,
+        result,
+        request_headers=[(b"if-modified-since", b"Wed, 21 Oct 2015 07:28:00 GMT")],
+        conditional=True,
+    )
+
+    # ASSERT
+    assert send.calls[0]["status"] == 200
+
+
+@pytest.mark.parametrize(
+    "if_modified_since, expected_status",
+    [
+        (b"Sun, 06 Nov 1994 08:49:37 -0000", 200),
+        (b"Thu, 22 Oct 2015 07:28:00 -0000", 304),
+    ],
+)
+@pytest.mark.asyncio
+async def test__default_request_handler_handle__when_if_modified_since_is_naive__compares_as_utc(
+    if_modified_since, expected_status
+):
+    # ARRANGE
+    send = FakeSend()
+    default_request_handler = DefaultRequestHandler(ResponseSender(orjson))
+    result = HTTPResponse(
+        status_code=200,
+        headers=[(b"last-modified", b"Wed, 21 Oct 2015 07:28:00 GMT")],
+        body=b"value",
+    )
+
+    # ACT
+    await default_request_handler.handle(
+        send,
+        result,
+        request_headers=[(b"if-modified-since", if_modified_since)],
+        conditional=True,
+    )
+
+    # ASSERT
+    assert send.calls[0]["status"] == expected_status
+
+
+@pytest.mark.asyncio
+async def test__default_request_handler_handle__when_if_modified_since_is_invalid_or_no_last_modified__sends_200():
+    # ARRANGE
+    send = FakeSend()
+    default_request_handler = DefaultRequestHandler(ResponseSender(orjson))
+    result = HTTPResponse(
+        status_code=200,
+        headers=[(b"last-modified", b"Wed, 21 Oct 2015 07:28:00 GMT")],
+        body=b"value",
+    )
+
+    # ACT
+    await default_request_handler.handle(
+        send,
+        result,
+        request_headers=[(b"if-modified-since", b"not a date")],
+        conditional=True,
+    )
+    await default_request_handler.handle(
+        send,
+        b"value",
+        request_headers=[(b"if-modified-since", b"Wed, 21 Oct 2015 07:28:00 GMT")],
+        conditional=True,
+    )
+
+    # ASSERT
+    assert send.calls[0]["status"] == 200
+    assert send.calls[2]["status"] == 200
+
+
+class FakeMsgpackSerializer(Serializer):
+    content_type = b"application/msgpack"
+
+    def dumps(self, obj):
+        return b"msgpack"
+
+
+@pytest.mark.asyncio
+async def test__default_request_handler_handle__when_accept_negotiates_serializer__uses_serializer():
+    # ARRANGE
+    send = FakeSend()
+    registry = SerializerRegistry(serializers=[FakeMsgpackSerializer()])
+    default_request_handler = DefaultRequestHandler(ResponseSender(orjson, registry))
+
+    # ACT
+    await default_request_handler.handle(
+        send, {"key": "value"}, request_headers=[(b"accept", b"application/msgpack")]
+    )
+
+    # ASSERT
+    assert send.calls[0]["headers"] == [
+        (b"content-type", b"application/msgpack"),
+        (b"vary", b"accept"),
+    ]
+    assert send.calls[1]["body"] == b"msgpack"
+
+
+@pytest.mark.asyncio
+async def test__default_request_handler_handle__when_no_serializer_registry__uses_json_serializer():
+    # ARRANGE
+    send = FakeSend()
+    default_request_handler = DefaultRequestHandler(ResponseSender(orjson))
+
+    # ACT
+    await default_request_handler.handle(
+        send, {"key": "value"}, request_headers=[(b"accept", b"application/msgpack")]
+    )
+
+    # ASSERT
+    assert send.calls[0]["headers"] == [(b"content-type", b"application/json")]
+    assert send.calls[1]["body"] == b'{"key":"value"}'
+
+
+@pytest.mark.asyncio
+async def test__default_request_handler_handle__when_raw_negotiated_for_dict__sends_json():
+    # ARRANGE
+    send = FakeSend()
+    registry = SerializerRegistry(serializers=[RawSerializer()])
+    default_request_handler = DefaultRequestHandler(ResponseSender(orjson, registry))
+
+    # ACT
+    await default_request_handler.handle(
+        send,
+        {"key": "value"},
+        request_headers=[(b"accept", b"application/octet-stream")],
+    )
+
+    # ASSERT
+    assert send.calls[0]["headers"] == [
+        (b"content-type", b"application/json"),
+        (b"vary", b"accept"),
+    ]
+    assert send.calls[1]["body"] == b'{"key":"value"}'
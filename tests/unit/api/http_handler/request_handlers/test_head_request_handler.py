@@ -1,8 +1,13 @@
+import orjson
 import pytest
 
 from wibbley.api.http_handler.request_handlers.head_request_handler import (
+    BodylessSend,
     HeadRequestHandler,
 )
+from wibbley.api.http_handler.request_handlers.response_sender import ResponseSender
+from wibbley.api.http_handler.response import HTTPResponse, StreamingHTTPResponse
+from wibbley.api.http_handler.serializers import Serializer, SerializerRegistry
 
 
 class FakeResponseSender:
@@ -19,6 +24,19 @@ class FakeResponseSender:
             }
         )
 
+    async def send_streaming_response(self, send, status_code, headers, body_iterator):
+        self.calls.append(
+            {
+                "send": send,
+                "status_code": status_code,
+                "headers": headers,
+                "body": [chunk async for chunk in body_iterator],
+            }
+        )
+
+    def serialize_body(self, response_body, serializer=None):
+        return ResponseSender(orjson).serialize_body(response_body, serializer)
+
 
 @pytest.mark.asyncio
 async def test__head_request_handler_handle__calls_response_sender_send_response():
@@ -38,10 +56,147 @@ async def test__head_request_handler_handle__calls_response_sender_send_response
             (b"content-type", b"text/plain"),
             (b"content-length", b"4"),
         ],
-        "response_body": b"",
+        "response_body": b"test",
+    }
+
+
+@pytest.mark.asyncio
+async def test__head_request_handler_handle__when_result_is_dict__sets_serialized_byte_length():
+    # ARRANGE
+    response_sender = FakeResponseSender()
+    head_request_handler = HeadRequestHandler(response_sender)
+    result = {"key": "value", "other": "value"}
+
+    # ACT
+    await head_request_handler.handle(response_sender, result)
+
+    # ASSERT
+    assert response_sender.calls[0]["headers"] == [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(orjson.dumps(result))).encode("utf-8")),
+    ]
+    assert response_sender.calls[0]["response_body"] == orjson.dumps(result)
+
+
+@pytest.mark.asyncio
+async def test__head_request_handler_handle__when_result_is_http_response__uses_response_status_and_headers():
+    # ARRANGE
+    response_sender = FakeResponseSender()
+    head_request_handler = HeadRequestHandler(response_sender)
+    result = HTTPResponse(
+        status_code=201,
+        headers=[(b"content-type", b"application/json")],
+        body=b'{"a":1}',
+    )
+
+    # ACT
+    await head_request_handler.handle(response_sender, result)
+
+    # ASSERT
+    assert response_sender.calls[0]["status_code"] == 201
+    assert response_sender.calls[0]["headers"] == [
+        (b"content-type", b"application/json"),
+        (b"content-length", b"7"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test__head_request_handler_handle__when_content_length_provided__does_not_serialize_body():
+    # ARRANGE
+    class UnserializableBody:
+        pass
+
+    response_sender = FakeResponseSender()
+    head_request_handler = HeadRequestHandler(response_sender)
+    result = HTTPResponse(
+        status_code=200,
+        headers=[(b"Content-Length", b"1024")],
+        body=UnserializableBody(),
+    )
+
+    # ACT
+    await head_request_handler.handle(response_sender, result)
+
+    # ASSERT
+    assert response_sender.calls[0]["headers"] == [(b"Content-Length", b"1024")]
+    assert response_sender.calls[0]["response_body"] == b""
+
+
+@pytest.mark.asyncio
+async def test__head_request_handler_handle__when_result_is_streaming__sends_empty_stream_without_content_length():
+    # ARRANGE
+    response_sender = FakeResponseSender()
+    head_request_handler = HeadRequestHandler(response_sender)
+    result = StreamingHTTPResponse(
+        status_code=200,
+        headers=[(b"content-type", b"text/plain")],
+        body_iterator=None,
+    )
+
+    # ACT
+    await head_request_handler.handle(response_sender, result)
+
+    # ASSERT
+    assert response_sender.calls[0] == {
+        "send": response_sender,
+        "status_code": 200,
+        "headers": [(b"content-type", b"text/plain")],
+        "body": [b""],
     }
 
 
+@pytest.mark.asyncio
+async def test__head_request_handler_handle__when_result_is_streaming__closes_body_iterator():
+    # ARRANGE
+    response_sender = FakeResponseSender()
+    head_request_handler = HeadRequestHandler(response_sender)
+    events = []
+
+    async def body_iterator():
+        try:
+            events.append("started")
+            yield b"chunk"
+        finally:
+            events.append("closed")
+
+    iterator = body_iterator()
+    await iterator.__anext__()
+    result = StreamingHTTPResponse(
+        status_code=200,
+        headers=[(b"content-type", b"text/plain")],
+        body_iterator=iterator,
+    )
+
+    # ACT
+    await head_request_handler.handle(response_sender, result)
+
+    # ASSERT
+    assert events == ["started", "closed"]
+    assert response_sender.calls[0]["body"] == [b""]
+
+
+@pytest.mark.asyncio
+async def test__bodyless_send__forwards_start_and_one_empty_final_body():
+    # ARRANGE
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    bodyless_send = BodylessSend(send)
+    start = {"type": "http.response.start", "status": 200, "headers": []}
+
+    # ACT
+    await bodyless_send(start)
+    await bodyless_send(
+        {"type": "http.response.body", "body": b"chunk", "more_body": True}
+    )
+    await bodyless_send({"type": "http.response.body", "body": b"end"})
+
+    # ASSERT
+    assert messages == [start, {"type": "http.response.body", "body": b""}]
+
+
 def test__head_request_handler_determine_content_type__when_result_is_str__returns_text_plain():
     # ARRANGE
     head_request_handler = HeadRequestHandler(FakeResponseSender())
@@ -88,3 +243,54 @@ def test__head_request_handler_determine_content_type__when_result_is_list__retu
 
     # ASSERT
     assert content_type == b"application/json"
+
+
+class FakeMsgpackSerializer(Serializer):
+    content_type = b"application/msgpack"
+
+    def dumps(self, obj):
+        return b"msgpack"
+
+
+@pytest.mark.asyncio
+async def test__head_request_handler_handle__when_accept_negotiates_serializer__measures_serialized_body():
+    # ARRANGE
+    response_sender = FakeResponseSender()
+    registry = SerializerRegistry(serializers=[FakeMsgpackSerializer()])
+    response_sender.select_serializer = ResponseSender(
+        orjson, registry
+    ).select_serializer
+    head_request_handler = HeadRequestHandler(response_sender)
+
+    # ACT
+    await head_request_handler.handle(
+        response_sender,
+        {"key": "value"},
+        request_headers=[(b"host", b"localhost"), (b"Accept", b"application/msgpack")],
+    )
+
+    # ASSERT
+    assert response_sender.calls[0]["headers"] == [
+        (b"content-type", b"application/msgpack"),
+        (b"vary", b"accept"),
+        (b"content-length", b"7"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test__head_request_handler_handle__when_no_accept_header__uses_default_content_type():
+    # ARRANGE
+    response_sender = FakeResponseSender()
+    response_sender.select_serializer = ResponseSender(orjson).select_serializer
+    head_request_handler = HeadRequestHandler(response_sender)
+
+    # ACT
+    await head_request_handler.handle(
+        response_sender, ["a"], request_headers=[(b"host", b"localhost")]
+    )
+
+    # ASSERT
+    assert response_sender.calls[0]["headers"] == [
+        (b"content-type", b"application/json"),
+        (b"content-length", b"5"),
+    ]
@@ -2,6 +2,7 @@ import orjson
 import pytest
 
 from wibbley.api.http_handler.request_handlers.response_sender import ResponseSender
+from wibbley.api.http_handler.serializers import RawSerializer, SerializerRegistry
 
 
 class FakeSend:
@@ -111,3 +112,71 @@ async def test__response_sender_send_response__sends_response_start_and_response
         "status": status_code,
         "body": response_body.encode("utf-8"),
     }
+
+
+@pytest.mark.asyncio
+async def test__response_sender_send_streaming_response__sends_chunks_with_more_body():
+    # ARRANGE
+    send = FakeSend()
+    response_sender = ResponseSender(orjson)
+    headers = [(b"content-type", b"text/plain")]
+
+    async def body_iterator():
+        yield b"hello "
+        yield "world"
+
+    # ACT
+    await response_sender.send_streaming_response(
+        send, headers, body_iterator(), status_code=200
+    )
+
+    # ASSERT
+    assert send.calls[0] == {
+        "type": "http.response.start",
+        "status": 200,
+        "headers": headers,
+    }
+    assert [call["body"] for call in send.calls[1:]] == [b"hello ", b"world", b""]
+    assert [call["more_body"] for call in send.calls[1:]] == [True, True, False]
+
+
+def test__response_sender_serialize_body__when_body_is_bytes__returns_body():
+    # ARRANGE
+    response_sender = ResponseSender(orjson)
+
+    # ACT
+    body = response_sender.serialize_body(b"value")
+
+    # ASSERT
+    assert body == b"value"
+
+
+def test__response_sender_select_serializer__when_raw_negotiated_for_dict__falls_back_to_default():
+    # ARRANGE
+    raw_serializer = RawSerializer()
+    registry = SerializerRegistry(serializers=[raw_serializer])
+    response_sender = ResponseSender(orjson, registry)
+
+    # ACT
+    dict_serializer = response_sender.select_serializer(
+        b"application/octet-stream", {"key": "value"}
+    )
+    bytes_serializer = response_sender.select_serializer(
+        b"application/octet-stream", b"value"
+    )
+
+    # ASSERT
+    assert dict_serializer is registry.default_serializer
+    assert bytes_serializer is raw_serializer
+
+
+def test__response_sender_select_serializer__when_default_cannot_serialize__returns_none():
+    # ARRANGE
+    registry = SerializerRegistry(default_serializer=RawSerializer())
+    response_sender = ResponseSender(orjson, registry)
+
+    # ACT
+    serializer = response_sender.select_serializer(None, {"key": "value"})
+
+    # ASSERT
+    assert serializer is None
@@ -0,0 +1,86 @@
+import pytest
+
+from wibbley.api.http_handler.admission import (
+    AdmissionController,
+    AdmissionSettings,
+)
+
+
+class FakeLoopLagMonitor:
+    def __init__(self, lag=0.0):
+        self.lag = lag
+
+
+def test__admission_controller_init__creates_lag_monitor_from_settings():
+    # ACT
+    admission_controller = AdmissionController(AdmissionSettings(sample_interval=0.2))
+
+    # ASSERT
+    assert admission_controller.lag_monitor.interval == 0.2
+
+
+@pytest.mark.parametrize(
+    "lag, expected_level",
+    [(0.05, 0), (0.1, 1), (0.2, 2), (0.4, 3)],
+)
+def test__admission_controller_overload_level__scales_with_lag(lag, expected_level):
+    # ARRANGE
+    admission_controller = AdmissionController(
+        AdmissionSettings(lag_threshold=0.1), lag_monitor=FakeLoopLagMonitor(lag)
+    )
+
+    # ACT
+    level = admission_controller.overload_level()
+
+    # ASSERT
+    assert level == expected_level
+
+
+@pytest.mark.parametrize(
+    "in_flight, expected_level",
+    [(9, 0), (10, 1), (20, 2)],
+)
+def test__admission_controller_overload_level__scales_with_in_flight(
+    in_flight, expected_level
+):
+    # ARRANGE
+    admission_controller = AdmissionController(
+        AdmissionSettings(max_in_flight=10), lag_monitor=FakeLoopLagMonitor()
+    )
+    admission_controller.in_flight = in_flight
+
+    # ACT
+    level = admission_controller.overload_level()
+
+    # ASSERT
+    assert level == expected_level
+
+
+def test__admission_controller_admit__sheds_priorities_at_or_below_overload_level():
+    # ARRANGE
+    admission_controller = AdmissionController(
+        AdmissionSettings(lag_threshold=0.1), lag_monitor=FakeLoopLagMonitor(0.2)
+    )
+
+    # ACT
+    results = {
+        priority: admission_controller.admit(priority)
+        for priority in ["low", "normal", "high", "critical"]
+    }
+
+    # ASSERT
+    assert results == {"low": False, "normal": False, "high": True, "critical": True}
+    assert admission_controller.shed_count == 2
+
+
+def test__admission_controller_admit__when_critical_and_fully_overloaded__admits():
+    # ARRANGE
+    admission_controller = AdmissionController(
+        AdmissionSettings(lag_threshold=0.1), lag_monitor=FakeLoopLagMonitor(10)
+    )
+
+    # ACT
+    result = admission_controller.admit("critical")
+
+    # ASSERT
+    assert result is True
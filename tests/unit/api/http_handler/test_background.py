@@ -0,0 +1,144 @@
+import asyncio
+
+import pytest
+
+from wibbley.api.http_handler.background import BackgroundTaskRunner
+from wibbley.utilities.deadline import get_remaining_time, run_with_timeout
+
+
+class FakeTaskFactory:
+    def __init__(self):
+        self.calls = []
+        self.running = 0
+        self.max_running = 0
+
+    async def task(self, *args, **kwargs):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        self.calls.append({"args": args, "kwargs": kwargs})
+
+    def sync_task(self, *args, **kwargs):
+        self.calls.append({"args": args, "kwargs": kwargs})
+
+    async def failing_task(self):
+        raise ValueError("Fake error")
+
+    async def slow_task(self):
+        await asyncio.sleep(10)
+
+
+@pytest.mark.asyncio
+async def test__background_task_runner_schedule__runs_tasks_with_arguments():
+    # ARRANGE
+    task_factory = FakeTaskFactory()
+    runner = BackgroundTaskRunner()
+
+    # ACT
+    runner.schedule(
+        [
+            (task_factory.task, (1,), {"a": 2}),
+            (task_factory.sync_task, (3,), {}),
+        ]
+    )
+    await runner.shutdown()
+
+    # ASSERT
+    assert {"args": (1,), "kwargs": {"a": 2}} in task_factory.calls
+    assert {"args": (3,), "kwargs": {}} in task_factory.calls
+    assert runner.tasks == set()
+
+
+@pytest.mark.asyncio
+async def test__background_task_runner_schedule__when_request_has_deadline__runs_without_it():
+    # ARRANGE
+    runner = BackgroundTaskRunner()
+    remaining_times = []
+
+    async def task():
+        await asyncio.sleep(0.02)
+        remaining_times.append(get_remaining_time())
+
+    async def handle_request():
+        runner.schedule([(task, (), {})])
+
+    # ACT
+    await run_with_timeout(handle_request(), 0.01)
+    await runner.shutdown()
+
+    # ASSERT
+    assert remaining_times == [None]
+
+
+@pytest.mark.asyncio
+async def test__background_task_runner_schedule__limits_concurrency():
+    # ARRANGE
+    task_factory = FakeTaskFactory()
+    runner = BackgroundTaskRunner(max_concurrency=2)
+
+    # ACT
+    runner.schedule([(task_factory.task, (), {}) for _ in range(5)])
+    await runner.shutdown()
+
+    # ASSERT
+    assert len(task_factory.calls) == 5
+    assert task_factory.max_running == 2
+
+
+@pytest.mark.asyncio
+async def test__background_task_runner_schedule__when_task_raises__logs_and_continues():
+    # ARRANGE
+    task_factory = FakeTaskFactory()
+    runner = BackgroundTaskRunner()
+
+    # ACT
+    runner.schedule(
+        [(task_factory.failing_task, (), {}), (task_factory.sync_task, (), {})]
+    )
+    await runner.shutdown()
+
+    # ASSERT
+    assert task_factory.calls == [{"args": (), "kwargs": {}}]
+
+
+@pytest.mark.asyncio
+async def test__background_task_runner_shutdown__when_timeout_expires__cancels_pending_tasks():
+    # ARRANGE
+    task_factory = FakeTaskFactory()
+    runner = BackgroundTaskRunner()
+    runner.schedule([(task_factory.slow_task, (), {})])
+    task = next(iter(runner.tasks))
+
+    # ACT
+    await runner.shutdown(timeout=0.01)
+
+    # ASSERT
+    assert task.cancelled()
+
+
+@pytest.mark.asyncio
+async def test__background_task_runner_shutdown__when_no_timeout__waits_for_drain_timeout():
+    # ARRANGE
+    task_factory = FakeTaskFactory()
+    runner = BackgroundTaskRunner(drain_timeout=0.01)
+    runner.schedule([(task_factory.slow_task, (), {})])
+    task = next(iter(runner.tasks))
+
+    # ACT
+    await runner.shutdown()
+
+    # ASSERT
+    assert task.cancelled()
+
+
+@pytest.mark.asyncio
+async def test__background_task_runner_shutdown__when_no_tasks__returns():
+    # ARRANGE
+    runner = BackgroundTaskRunner()
+
+    # ACT
+    await runner.shutdown()
+
+    # ASSERT
+    assert runner.tasks == set()
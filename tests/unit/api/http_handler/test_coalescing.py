@@ -0,0 +1,171 @@
+import asyncio
+
+import pytest
+
+from wibbley.api.http_handler.coalescing import RequestCoalescer, is_replayable
+from wibbley.api.http_handler.request import HTTPRequest
+from wibbley.api.http_handler.response import HTTPResponse, StreamingHTTPResponse
+
+
+def build_request(query_params=None, headers=None, method="GET"):
+    return HTTPRequest(
+        path="/path",
+        method=method,
+        query_params=query_params or {},
+        path_params={},
+        headers=headers or {},
+        body=b"",
+    )
+
+
+async def fake_body_iterator():
+    yield b"chunk"
+
+
+@pytest.mark.parametrize(
+    "result, expected",
+    [
+        ({"value": 1}, True),
+        (HTTPResponse(200, [], b"body"), True),
+        (StreamingHTTPResponse(200, [], fake_body_iterator()), False),
+        (HTTPResponse(200, [], iter([b"body"])), False),
+        (fake_body_iterator(), False),
+    ],
+)
+def test__is_replayable__when_result_is_consumed_by_sending__returns_false(
+    result, expected
+):
+    # ACT
+    replayable = is_replayable(result)
+
+    # ASSERT
+    assert replayable is expected
+
+
+def test__request_coalescer_build_key__uses_method_path_sorted_query_and_headers():
+    # ARRANGE
+    request_coalescer = RequestCoalescer()
+    request = build_request(
+        query_params={"b": "2", "a": "1"},
+        headers={"authorization": "token", "user-agent": "test"},
+    )
+
+    # ACT
+    key = request_coalescer.build_key(request, ("authorization",))
+
+    # ASSERT
+    assert key == ("GET", "/path", (("a", "1"), ("b", "2")), ("token",))
+
+
+@pytest.mark.asyncio
+async def test__request_coalescer_coalesced__when_identical_requests__runs_handler_once():
+    # ARRANGE
+    request_coalescer = RequestCoalescer()
+    calls = []
+    release = asyncio.Event()
+
+    @request_coalescer.coalesced(headers=["Authorization"])
+    async def handler(request):
+        calls.append(request)
+        await release.wait()
+        return {"value": 1}
+
+    # ACT
+    tasks = [
+        asyncio.create_task(
+            handler(request=build_request(headers={"authorization": "token"}))
+        )
+        for _ in range(3)
+    ]
+    other_task = asyncio.create_task(
+        handler(request=build_request(headers={"authorization": "other"}))
+    )
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks, other_task)
+
+    # ASSERT
+    assert len(calls) == 2
+    assert results == [{"value": 1}] * 4
+    assert request_coalescer.single_flight.calls == {}
+
+
+@pytest.mark.asyncio
+async def test__request_coalescer_coalesced__when_method_is_not_get_or_head__runs_handler_per_request():
+    # ARRANGE
+    request_coalescer = RequestCoalescer()
+    release = asyncio.Event()
+
+    @request_coalescer.coalesced()
+    async def handler(request):
+        await release.wait()
+        return request.body
+
+    def build_post(body):
+        request = build_request(method="POST")
+        request.body = body
+        return request
+
+    # ACT
+    tasks = [
+        asyncio.create_task(handler(request=build_post(body)))
+        for body in (b"first", b"second")
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    # ASSERT
+    assert results == [b"first", b"second"]
+    assert request_coalescer.single_flight.calls == {}
+
+
+@pytest.mark.asyncio
+async def test__request_coalescer_coalesced__when_handler_takes_no_request__calls_it_without_request():
+    # ARRANGE
+    request_coalescer = RequestCoalescer()
+
+    @request_coalescer.coalesced()
+    async def handler():
+        return "value"
+
+    # ACT
+    result = await handler(request=build_request())
+
+    # ASSERT
+    assert result == "value"
+
+
+@pytest.mark.asyncio
+async def test__request_coalescer_coalesced__when_streaming__runs_handler_per_request():
+    # ARRANGE
+    request_coalescer = RequestCoalescer()
+    calls = []
+    release = asyncio.Event()
+
+    @request_coalescer.coalesced()
+    async def handler(request):
+        calls.append(request)
+        await release.wait()
+
+        async def body_iterator():
+            yield b"first "
+            await asyncio.sleep(0)
+            yield b"second"
+
+        return StreamingHTTPResponse(200, [], body_iterator())
+
+    async def read_body(response):
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    # ACT
+    tasks = [asyncio.create_task(handler(request=build_request())) for _ in range(2)]
+    await asyncio.sleep(0)
+    release.set()
+    responses = await asyncio.gather(*tasks)
+    bodies = await asyncio.gather(*(read_body(response) for response in responses))
+
+    # ASSERT
+    assert len(calls) == 2
+    assert responses[0] is not responses[1]
+    assert bodies == [b"first second", b"first second"]
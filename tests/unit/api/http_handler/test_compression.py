@@ -0,0 +1,538 @@
+import gzip
+import zlib
+
+import pytest
+
+from wibbley.api.http_handler.compression import (
+    BrotliStream,
+    CompressingSend,
+    CompressionSettings,
+    GzipStream,
+    HeadCompressingSend,
+    ResponseCompressor,
+    add_vary,
+    weaken_etag,
+)
+
+
+class FakeSend:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, message):
+        self.calls.append(message)
+
+
+class FakeBrotliCompressor:
+    def __init__(self, quality):
+        self.quality = quality
+
+    def process(self, chunk):
+        return b"br:" + chunk
+
+    def flush(self):
+        return b"|flush"
+
+    def finish(self):
+        return b"|finish"
+
+
+class FakeBrotli:
+    Compressor = FakeBrotliCompressor
+
+    def compress(self, body, quality):
+        return b"br:" + body
+
+
+def start_message(headers):
+    return {"type": "http.response.start", "status": 200, "headers": headers}
+
+
+def body_message(body, more_body=False):
+    return {"type": "http.response.body", "body": body, "more_body": more_body}
+
+
+def test__add_vary__when_no_vary__adds_field():
+    # ACT
+    headers = add_vary([(b"content-type", b"text/plain")], b"accept-encoding")
+
+    # ASSERT
+    assert headers == [
+        (b"content-type", b"text/plain"),
+        (b"vary", b"accept-encoding"),
+    ]
+
+
+def test__add_vary__merges_field_into_existing_vary_headers_once():
+    # ACT
+    headers = add_vary(
+        [(b"Vary", b"Accept"), (b"vary", b"origin, Accept-Encoding")],
+        b"accept-encoding",
+    )
+
+    # ASSERT
+    assert headers == [(b"vary", b"Accept, origin, Accept-Encoding")]
+
+
+def test__weaken_etag__marks_strong_etags_weak_and_keeps_weak_ones():
+    # ARRANGE
+    headers = [(b"content-type", b"text/plain"), (b"ETag", b'"v42"')]
+
+    # ACT
+    weakened = weaken_etag(headers)
+    weakened_again = weaken_etag(weakened)
+
+    # ASSERT
+    assert weakened == [(b"content-type", b"text/plain"), (b"ETag", b'W/"v42"')]
+    assert weakened_again == weakened
+
+
+def test__response_compressor_select_encoding__when_no_accept_encoding__returns_none():
+    # ARRANGE
+    compressor = ResponseCompressor(CompressionSettings(), brotli=None)
+
+    # ACT
+    encoding = compressor.select_encoding(None)
+
+    # ASSERT
+    assert encoding is None
+
+
+def test__response_compressor_select_encoding__when_gzip_accepted__returns_gzip():
+    # ARRANGE
+    compressor = ResponseCompressor(CompressionSettings(), brotli=None)
+
+    # ACT
+    encoding = compressor.select_encoding(b"gzip, deflate, br")
+
+    # ASSERT
+    assert encoding == "gzip"
+
+
+def test__response_compressor_select_encoding__when_brotli_available__prefers_br():
+    # ARRANGE
+    compressor = ResponseCompressor(CompressionSettings(), brotli=FakeBrotli())
+
+    # ACT
+    encoding = compressor.select_encoding(b"gzip, br")
+
+    # ASSERT
+    assert encoding == "br"
+
+
+def test__response_compressor_select_encoding__when_higher_quality__picks_highest_quality():
+    # ARRANGE
+    compressor = ResponseCompressor(CompressionSettings(), brotli=FakeBrotli())
+
+    # ACT
+    encoding = compressor.select_encoding(b"br;q=0.5, gzip;q=0.9, ,")
+
+    # ASSERT
+    assert encoding == "gzip"
+
+
+def test__response_compressor_select_encoding__when_quality_is_zero_or_invalid__returns_none():
+    # ARRANGE
+    compressor = ResponseCompressor(CompressionSettings(), brotli=None)
+
+    # ACT
+    encoding = compressor.select_encoding(b"gzip;q=0, identity;q=abc")
+
+    # ASSERT
+    assert encoding is None
+
+
+def test__response_compressor_select_encoding__when_wildcard__returns_available_encoding():
+    # ARRANGE
+    compressor = ResponseCompressor(CompressionSettings(), brotli=None)
+
+    # ACT
+    encoding = compressor.select_encoding(b"*;level=1")
+
+    # ASSERT
+    assert encoding == "gzip"
+
+
+def test__response_compressor_is_compressible__when_json__returns_true():
+    # ARRANGE
+    compressor = ResponseCompressor(CompressionSettings(), brotli=None)
+
+    # ACT
+    result = compressor.is_compressible(b"application/json")
+
+    # ASSERT
+    assert result is True
+
+
+def test__response_compressor_is_compressible__when_content_type_missing_or_binary__returns_false():
+    # ARRANGE
+    compressor = ResponseCompressor(CompressionSettings(), brotli=None)
+
+    # ACT
+    results = [
+        compressor.is_compressible(None),
+        compressor.is_compressible(b"application/octet-stream"),
+    ]
+
+    # ASSERT
+    assert results == [False, False]
+
+
+def test__response_compressor_compress__when_gzip__returns_gzip_body():
+    # ARRANGE
+    compressor = ResponseCompressor(CompressionSettings(), brotli=None)
+
+    # ACT
+    body = compressor.compress(b"a" * 1000, "gzip")
+
+    # ASSERT
+    assert gzip.decompress(body) == b"a" * 1000
+
+
+def test__response_compressor_compress__when_br__uses_brotli():
+    # ARRANGE
+    compressor = ResponseCompressor(CompressionSettings(), brotli=FakeBrotli())
+
+    # ACT
+    body = compressor.compress(b"abc", "br")
+
+    # ASSERT
+    assert body == b"br:abc"
+
+
+@pytest.mark.asyncio
+async def test__response_compressor_compress_async__when_body_is_large__offloads_to_executor():
+    # ARRANGE
+    compressor = ResponseCompressor(CompressionSettings(offload_size=10), brotli=None)
+
+    # ACT
+    body = await compressor.compress_async(b"a" * 100, "gzip")
+
+    # ASSERT
+    assert gzip.decompress(body) == b"a" * 100
+
+
+def test__response_compressor_get_stream__returns_stream_for_encoding():
+    # ARRANGE
+    compressor = ResponseCompressor(CompressionSettings(), brotli=FakeBrotli())
+
+    # ACT
+    streams = [compressor.get_stream("br"), compressor.get_stream("gzip")]
+
+    # ASSERT
+    assert isinstance(streams[0], BrotliStream)
+    assert isinstance(streams[1], GzipStream)
+
+
+def test__gzip_stream_compress__produces_decompressable_chunks():
+    # ARRANGE
+    stream = GzipStream(6)
+
+    # ACT
+    body = stream.compress(b"hello ", True) + stream.compress(b"world", False)
+
+    # ASSERT
+    assert gzip.decompress(body) == b"hello world"
+
+
+def test__gzip_stream_compress__when_more_body__flushes_chunk():
+    # ARRANGE
+    stream = GzipStream(6)
+    decompressor = zlib.decompressobj(31)
+
+    # ACT
+    chunk = stream.compress(b"hello", True)
+
+    # ASSERT
+    assert decompressor.decompress(chunk) == b"hello"
+
+
+def test__brotli_stream_compress__flushes_and_finishes():
+    # ARRANGE
+    stream = BrotliStream(FakeBrotli(), 4)
+
+    # ACT
+    chunks = [stream.compress(b"a", True), stream.compress(b"b", False)]
+
+    # ASSERT
+    assert chunks == [b"br:a|flush", b"br:b|finish"]
+
+
+def test__response_compressor_wrap_send__when_encoding_not_accepted__returns_send():
+    # ARRANGE
+    compressor = ResponseCompressor(CompressionSettings(), brotli=None)
+    send = FakeSend()
+
+    # ACT
+    wrapped_send = compressor.wrap_send(send, [(b"host", b"localhost")])
+
+    # ASSERT
+    assert wrapped_send is send
+
+
+def test__response_compressor_wrap_send__when_encoding_accepted__returns_compressing_send():
+    # ARRANGE
+    compressor = ResponseCompressor(CompressionSettings(), brotli=None)
+    send = FakeSend()
+
+    # ACT
+    wrapped_send = compressor.wrap_send(
+        send, [(b"host", b"localhost"), (b"Accept-Encoding", b"gzip")]
+    )
+
+    # ASSERT
+    assert isinstance(wrapped_send, CompressingSend)
+    assert wrapped_send.encoding == "gzip"
+
+
+@pytest.mark.asyncio
+async def test__compressing_send__when_body_is_large__compresses_and_updates_headers():
+    # ARRANGE
+    send = FakeSend()
+    compressor = ResponseCompressor(CompressionSettings(minimum_size=10), brotli=None)
+    compressing_send = CompressingSend(send, compressor, "gzip")
+    body = b'{"key": "' + b"a" * 100 + b'"}'
+
+    # ACT
+    await compressing_send(
+        start_message(
+            [(b"content-type", b"application/json"), (b"content-length", b"111")]
+        )
+    )
+    await compressing_send(body_message(body))
+
+    # ASSERT
+    headers = send.calls[0]["headers"]
+    compressed_body = send.calls[1]["body"]
+    assert (b"content-encoding", b"gzip") in headers
+    assert (b"vary", b"accept-encoding") in headers
+    assert (b"content-length", str(len(compressed_body)).encode()) in headers
+    assert (b"content-length", b"111") not in headers
+    assert gzip.decompress(compressed_body) == body
+
+
+@pytest.mark.asyncio
+async def test__compressing_send__when_response_varies_on_accept__keeps_it():
+    # ARRANGE
+    send = FakeSend()
+    compressor = ResponseCompressor(CompressionSettings(minimum_size=10), brotli=None)
+    compressing_send = CompressingSend(send, compressor, "gzip")
+
+    # ACT
+    await compressing_send(
+        start_message([(b"content-type", b"application/json"), (b"vary", b"accept")])
+    )
+    await compressing_send(body_message(b"a" * 100))
+
+    # ASSERT
+    headers = send.calls[0]["headers"]
+    assert [value for key, value in headers if key == b"vary"] == [
+        b"accept, accept-encoding"
+    ]
+
+
+@pytest.mark.asyncio
+async def test__compressing_send__when_compressing__weakens_strong_etag():
+    # ARRANGE
+    send = FakeSend()
+    compressor = ResponseCompressor(CompressionSettings(minimum_size=10), brotli=None)
+    compressing_send = CompressingSend(send, compressor, "gzip")
+
+    # ACT
+    await compressing_send(
+        start_message([(b"content-type", b"application/json"), (b"etag", b'"v42"')])
+    )
+    await compressing_send(body_message(b"a" * 100))
+
+    # ASSERT
+    assert (b"etag", b'W/"v42"') in send.calls[0]["headers"]
+
+
+@pytest.mark.asyncio
+async def test__compressing_send__when_body_is_below_minimum_size__sends_unchanged():
+    # ARRANGE
+    send = FakeSend()
+    compressor = ResponseCompressor(CompressionSettings(minimum_size=500), brotli=None)
+    compressing_send = CompressingSend(send, compressor, "gzip")
+    start = start_message([(b"content-type", b"application/json")])
+
+    # ACT
+    await compressing_send(start)
+    await compressing_send(body_message(b"{}"))
+
+    # ASSERT
+    assert send.calls == [start, body_message(b"{}")]
+
+
+@pytest.mark.asyncio
+async def test__compressing_send__when_already_encoded__sends_unchanged():
+    # ARRANGE
+    send = FakeSend()
+    compressor = ResponseCompressor(CompressionSettings(minimum_size=0), brotli=None)
+    compressing_send = CompressingSend(send, compressor, "gzip")
+    start = start_message(
+        [(b"content-type", b"application/json"), (b"content-encoding", b"br")]
+    )
+
+    # ACT
+    await compressing_send(start)
+    await compressing_send(body_message(b"already compressed"))
+
+    # ASSERT
+    assert send.calls == [start, body_message(b"already compressed")]
+
+
+@pytest.mark.asyncio
+async def test__compressing_send__when_content_type_not_compressible__passes_through_stream():
+    # ARRANGE
+    send = FakeSend()
+    compressor = ResponseCompressor(CompressionSettings(minimum_size=0), brotli=None)
+    compressing_send = CompressingSend(send, compressor, "gzip")
+    start = start_message([(b"content-type", b"image/png")])
+
+    # ACT
+    await compressing_send(start)
+    await compressing_send(body_message(b"png", more_body=True))
+    await compressing_send(body_message(b"", more_body=False))
+
+    # ASSERT
+    assert send.calls == [
+        start,
+        body_message(b"png", more_body=True),
+        body_message(b"", more_body=False),
+    ]
+
+
+@pytest.mark.asyncio
+async def test__compressing_send__when_streaming__compresses_each_chunk():
+    # ARRANGE
+    send = FakeSend()
+    compressor = ResponseCompressor(CompressionSettings(), brotli=None)
+    compressing_send = CompressingSend(send, compressor, "gzip")
+
+    # ACT
+    await compressing_send(
+        start_message([(b"content-type", b"text/plain"), (b"content-length", b"11")])
+    )
+    await compressing_send(body_message(b"hello ", more_body=True))
+    await compressing_send(body_message(b"world", more_body=True))
+    await compressing_send(body_message(b"", more_body=False))
+
+    # ASSERT
+    headers = send.calls[0]["headers"]
+    body = b"".join(call["body"] for call in send.calls[1:])
+    assert (b"content-encoding", b"gzip") in headers
+    assert all(key != b"content-length" for key, _ in headers)
+    assert send.calls[-1]["more_body"] is False
+    assert gzip.decompress(body) == b"hello world"
+
+
+@pytest.mark.asyncio
+async def test__compressing_send__when_message_is_not_response__forwards_message():
+    # ARRANGE
+    send = FakeSend()
+    compressor = ResponseCompressor(CompressionSettings(), brotli=None)
+    compressing_send = CompressingSend(send, compressor, "gzip")
+    message = {"type": "http.response.trailers"}
+
+    # ACT
+    await compressing_send(message)
+
+    # ASSERT
+    assert send.calls == [message]
+
+
+class RaisingCompressor(ResponseCompressor):
+    def compress(self, body, encoding):
+        raise AssertionError("HEAD must not compress the body")
+
+    def get_stream(self, encoding):
+        raise AssertionError("HEAD must not compress the body")
+
+
+def test__response_compressor_wrap_head_send__returns_head_compressing_send_when_accepted():
+    # ARRANGE
+    compressor = ResponseCompressor(CompressionSettings(), brotli=None)
+    send = FakeSend()
+
+    # ACT
+    head_send = compressor.wrap_head_send(send, [(b"accept-encoding", b"gzip")])
+    plain_send = compressor.wrap_head_send(send, [(b"host", b"localhost")])
+
+    # ASSERT
+    assert isinstance(head_send, HeadCompressingSend)
+    assert head_send.encoding == "gzip"
+    assert plain_send is send
+
+
+@pytest.mark.parametrize("more_body", [False, True])
+@pytest.mark.asyncio
+async def test__head_compressing_send__reports_encoding_without_compressing(
+    more_body,
+):
+    # ARRANGE
+    send = FakeSend()
+    compressor = RaisingCompressor(CompressionSettings(minimum_size=10), brotli=None)
+    head_send = HeadCompressingSend(send, compressor, "gzip")
+
+    # ACT
+    await head_send(
+        start_message(
+            [(b"content-type", b"application/json"), (b"content-length", b"100")]
+        )
+    )
+    await head_send(body_message(b"a" * 100, more_body=more_body))
+    if more_body:
+        await head_send(body_message(b"a" * 100))
+
+    # ASSERT
+    headers = send.calls[0]["headers"]
+    assert (b"content-encoding", b"gzip") in headers
+    assert (b"vary", b"accept-encoding") in headers
+    assert all(key != b"content-length" for key, _ in headers)
+    assert all(call["body"] == b"" for call in send.calls[1:])
+    assert send.calls[-1]["more_body"] is False
+
+
+@pytest.mark.asyncio
+async def test__head_compressing_send__when_body_is_below_minimum_size__sends_unchanged():
+    # ARRANGE
+    send = FakeSend()
+    compressor = RaisingCompressor(CompressionSettings(minimum_size=500), brotli=None)
+    head_send = HeadCompressingSend(send, compressor, "gzip")
+    start = start_message(
+        [(b"content-type", b"application/json"), (b"content-length", b"2")]
+    )
+
+    # ACT
+    await head_send(start)
+    await head_send(body_message(b"{}"))
+    await head_send({"type": "http.response.trailers"})
+
+    # ASSERT
+    assert send.calls == [
+        start,
+        body_message(b"{}"),
+        {"type": "http.response.trailers"},
+    ]
+
+
+def test__compression_settings__stores_settings():
+    # ARRANGE
+    executor = object()
+
+    # ACT
+    settings = CompressionSettings(
+        minimum_size=1,
+        gzip_level=2,
+        brotli_quality=3,
+        offload_size=4,
+        executor=executor,
+    )
+
+    # ASSERT
+    assert settings.minimum_size == 1
+    assert settings.gzip_level == 2
+    assert settings.brotli_quality == 3
+    assert settings.offload_size == 4
+    assert settings.executor is executor
@@ -0,0 +1,153 @@
+import pytest
+
+from wibbley.api.http_handler.exceptions import (
+    ExceptionMapper,
+    ExceptionMapping,
+    HTTPException,
+)
+from wibbley.api.http_handler.response import HTTPResponse
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeLogger:
+    def __init__(self):
+        self.errors = []
+
+    def error(self, message, exc_info=None):
+        self.errors.append((str(message), exc_info))
+
+
+class DomainError(Exception):
+    pass
+
+
+class MissingRecordError(DomainError):
+    pass
+
+
+def test__http_exception__when_no_detail__uses_status_phrase():
+    # ACT
+    exception = HTTPException(404)
+
+    # ASSERT
+    assert exception.detail == "Not Found"
+    assert str(exception) == "Not Found"
+
+
+def test__exception_mapping__when_no_status_code_or_handler__raises_value_error():
+    # ACT/ASSERT
+    with pytest.raises(ValueError):
+        ExceptionMapping()
+
+
+@pytest.mark.asyncio
+async def test__exception_mapper_handle__when_http_exception__returns_its_response_without_logging():
+    # ARRANGE
+    logger = FakeLogger()
+    exception_mapper = ExceptionMapper(logger=logger)
+
+    # ACT
+    response = await exception_mapper.handle(
+        None, HTTPException(409, "Conflict!", headers=[(b"x-reason", b"dup")])
+    )
+
+    # ASSERT
+    assert response.status_code == 409
+    assert response.headers == [
+        (b"content-type", b"application/json"),
+        (b"x-reason", b"dup"),
+    ]
+    assert response.body == b'{"detail":"Conflict!"}'
+    assert logger.errors == []
+
+
+@pytest.mark.asyncio
+async def test__exception_mapper_handle__when_subclass_of_registered_type__uses_prebuilt_payload():
+    # ARRANGE
+    exception_mapper = ExceptionMapper()
+    exception_mapper.register(DomainError, status_code=422, detail="Invalid")
+
+    # ACT
+    response = await exception_mapper.handle(None, MissingRecordError())
+
+    # ASSERT
+    assert response.status_code == 422
+    assert response.body == b'{"detail":"Invalid"}'
+    assert exception_mapper.resolved[MissingRecordError].status_code == 422
+
+
+@pytest.mark.asyncio
+async def test__exception_mapper_handle__when_handler_registered__returns_handler_response():
+    # ARRANGE
+    exception_mapper = ExceptionMapper()
+
+    async def handler(request, exception):
+        return HTTPResponse(status_code=418, headers=[], body=request)
+
+    exception_mapper.register(DomainError, handler=handler)
+
+    # ACT
+    response = await exception_mapper.handle("request", DomainError())
+
+    # ASSERT
+    assert response.status_code == 418
+    assert response.body == "request"
+
+
+@pytest.mark.asyncio
+async def test__exception_mapper_handle__when_unmapped__returns_500_and_logs_traceback():
+    # ARRANGE
+    logger = FakeLogger()
+    exception_mapper = ExceptionMapper(logger=logger)
+    exception = RuntimeError("boom")
+
+    # ACT
+    response = await exception_mapper.handle(None, exception)
+
+    # ASSERT
+    assert response.status_code == 500
+    assert response.body == b'{"detail":"Internal Server Error"}'
+    assert logger.errors == [("boom", exception)]
+
+
+def test__exception_mapper_register__clears_resolved_cache():
+    # ARRANGE
+    exception_mapper = ExceptionMapper()
+    exception_mapper.resolve(MissingRecordError)
+
+    # ACT
+    exception_mapper.register(DomainError, status_code=400)
+
+    # ASSERT
+    assert exception_mapper.resolve(MissingRecordError).status_code == 400
+
+
+def test__exception_mapper_log_exception__limits_tracebacks_per_interval():
+    # ARRANGE
+    clock = FakeClock()
+    logger = FakeLogger()
+    exception_mapper = ExceptionMapper(
+        traceback_limit=2, traceback_interval=10, clock=clock, logger=logger
+    )
+
+    # ACT
+    for _ in range(5):
+        exception_mapper.log_exception(RuntimeError("boom"))
+    clock.now = 10
+    exception_mapper.log_exception(RuntimeError("boom"))
+
+    # ASSERT
+    messages = [message for message, _ in logger.errors]
+    assert messages == [
+        "boom",
+        "boom",
+        "Suppressed 3 tracebacks for RuntimeError",
+        "boom",
+    ]
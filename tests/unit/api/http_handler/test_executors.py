@@ -0,0 +1,145 @@
+import contextvars
+import os
+
+import pytest
+
+from wibbley.api.http_handler.executors import (
+    ExecutorSettings,
+    HandlerExecutor,
+    marshal_kwargs,
+)
+from wibbley.api.http_handler.request import HTTPRequest
+
+REQUEST_ID = contextvars.ContextVar("request_id", default=None)
+
+
+class FakePool:
+    def __init__(self, max_workers=None, thread_name_prefix=None):
+        self.max_workers = max_workers
+        self.shutdown_calls = []
+
+    def shutdown(self, wait=True):
+        self.shutdown_calls.append(wait)
+
+
+def get_request_id():
+    return REQUEST_ID.get()
+
+
+def get_process_id(request):
+    return os.getpid(), request.path
+
+
+def build_request():
+    request = HTTPRequest(
+        path="/path",
+        method="GET",
+        query_params={"a": "1"},
+        path_params={},
+        headers={},
+        body=b"body",
+        client=["127.0.0.1", 5000],
+    )
+    request.add_background_task(lambda: None)
+    return request
+
+
+def test__executor_settings__when_no_limits__uses_cpu_based_defaults():
+    # ACT
+    executor_settings = ExecutorSettings()
+
+    # ASSERT
+    assert executor_settings.max_threads == min(32, (os.cpu_count() or 1) + 4)
+    assert executor_settings.max_processes == (os.cpu_count() or 1)
+
+
+def test__marshal_kwargs__copies_requests_without_background_tasks():
+    # ARRANGE
+    request = build_request()
+
+    # ACT
+    result = marshal_kwargs({"request": request, "other": 1})
+
+    # ASSERT
+    assert result["other"] == 1
+    assert result["request"] is not request
+    assert result["request"].to_dict() == request.to_dict()
+    assert result["request"].client == ("127.0.0.1", 5000)
+    assert result["request"].background_tasks is None
+
+
+@pytest.mark.asyncio
+async def test__handler_executor_run__when_thread__runs_with_caller_context():
+    # ARRANGE
+    handler_executor = HandlerExecutor(ExecutorSettings(max_threads=2))
+    REQUEST_ID.set("abc")
+
+    # ACT
+    result = await handler_executor.run(get_request_id, {}, "thread")
+    handler_executor.shutdown()
+
+    # ASSERT
+    assert result == "abc"
+    assert handler_executor.in_flight["thread"] == 0
+
+
+@pytest.mark.asyncio
+async def test__handler_executor_run__when_process__runs_in_another_process():
+    # ARRANGE
+    handler_executor = HandlerExecutor(ExecutorSettings(max_processes=1))
+
+    # ACT
+    process_id, path = await handler_executor.run(
+        get_process_id, {"request": build_request()}, "process"
+    )
+    handler_executor.shutdown()
+
+    # ASSERT
+    assert process_id != os.getpid()
+    assert path == "/path"
+
+
+def test__handler_executor_get_pool__creates_pools_lazily_once():
+    # ARRANGE
+    handler_executor = HandlerExecutor(
+        ExecutorSettings(max_threads=3, max_processes=2),
+        thread_pool_factory=FakePool,
+        process_pool_factory=FakePool,
+    )
+
+    # ACT
+    thread_pool = handler_executor.get_pool("thread")
+    process_pool = handler_executor.get_pool("process")
+
+    # ASSERT
+    assert handler_executor.get_pool("thread") is thread_pool
+    assert thread_pool.max_workers == 3
+    assert process_pool.max_workers == 2
+
+
+def test__handler_executor_stats__reports_queue_depth():
+    # ARRANGE
+    handler_executor = HandlerExecutor(ExecutorSettings(max_threads=2, max_processes=1))
+    handler_executor.in_flight["thread"] = 5
+
+    # ACT
+    stats = handler_executor.stats()
+
+    # ASSERT
+    assert stats == {
+        "thread": {"max_workers": 2, "in_flight": 5, "queue_depth": 3},
+        "process": {"max_workers": 1, "in_flight": 0, "queue_depth": 0},
+    }
+
+
+def test__handler_executor_shutdown__shuts_down_pools_without_waiting():
+    # ARRANGE
+    handler_executor = HandlerExecutor(thread_pool_factory=FakePool)
+    pool = handler_executor.get_pool("thread")
+
+    # ACT
+    handler_executor.shutdown()
+
+    # ASSERT
+    assert pool.shutdown_calls == [False]
+    assert handler_executor.pools == {}
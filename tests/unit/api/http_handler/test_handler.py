@@ -1,12 +1,17 @@
+import asyncio
+
 import pytest
 
+from wibbley.api.http_handler.admission import AdmissionSettings
 from wibbley.api.http_handler.handler import HTTPHandler
+from wibbley.api.http_handler.middleware import Middleware
 from wibbley.api.http_handler.route_extractor import RouteExtractor
 
 
 class FakeRouter:
     def __init__(self, routes=None):
         self.routes = routes or {}
+        self.version = 0
 
     def get(self, path):
         pass
@@ -47,30 +52,47 @@ class FakeOptionsRequestHandler:
         self.calls.append({"send": send, "available_method": available_method})
 
 
+class FakeHTTPRequest:
+    def __init__(self):
+        self.background_tasks = None
+
+
+SOME_REQUEST = FakeHTTPRequest()
+
+
 class FakeHTTPRequestConstructor:
     def __init__(self):
         pass
 
     async def construct(
-        self, path, method, headers, query_string, receive, path_params
+        self, path, method, headers, query_string, receive, path_params, client=None
     ):
-        return "some_request"
+        return SOME_REQUEST
 
 
 class FakeHeadRequestHandler:
     def __init__(self, response_sender):
         self.calls = []
 
-    async def handle(self, send, result):
-        self.calls.append({"send": send, "result": result})
+    async def handle(self, send, result, request_headers=None):
+        self.calls.append(
+            {"send": send, "result": result, "request_headers": request_headers}
+        )
 
 
 class FakeDefaultRequestHandler:
     def __init__(self, response_sender):
         self.calls = []
 
-    async def handle(self, send, result):
-        self.calls.append({"send": send, "result": result})
+    async def handle(self, send, result, request_headers=None, conditional=False):
+        self.calls.append(
+            {
+                "send": send,
+                "result": result,
+                "request_headers": request_headers,
+                "conditional": conditional,
+            }
+        )
 
 
 class FakeEventHandlingSettings:
@@ -199,7 +221,7 @@ async def test__http_handler_handle__when_method_is_default__executes_route_func
     await http_handler.handle(scope, None, fake_send)
 
     # ASSERT
-    assert route_func_factory.calls[0]["request"] == "some_request"
+    assert route_func_factory.calls[0]["request"] == SOME_REQUEST
 
 
 @pytest.mark.asyncio
@@ -337,9 +359,10 @@ async def test__http_handler_handle__when_route_func_raises_exception__sends_500
     # ASSERT
     assert len(http_handler.response_sender.calls) == 1
     assert http_handler.response_sender.calls[0]["status_code"] == 500
-    assert http_handler.response_sender.calls[0]["response_body"] == {
-        "detail": "Internal Server Error"
-    }
+    assert (
+        http_handler.response_sender.calls[0]["response_body"]
+        == b'{"detail":"Internal Server Error"}'
+    )
 
 
 @pytest.mark.asyncio
@@ -368,3 +391,416 @@ async def test__http_handler_handle__when_method_is_head_and_no_get_route_func_i
     # ASSERT
     assert len(http_handler.response_sender.calls) == 1
     assert http_handler.response_sender.calls[0]["status_code"] == 405
+
+
+class FakeResponseCompressor:
+    def __init__(self):
+        self.calls = []
+
+    def wrap_send(self, send, headers):
+        self.calls.append({"send": send, "headers": headers})
+        return "compressing_send"
+
+
+@pytest.mark.asyncio
+async def test__http_handler_handle__when_response_compressor__wraps_send_for_default_request_handler():
+    # ARRANGE
+    route_func_factory = FakeRouteFuncFactory()
+    default_request_handler = FakeDefaultRequestHandler(FakeResponseSender())
+    response_compressor = FakeResponseCompressor()
+    http_handler = HTTPHandler(
+        router=FakeRouter(routes={"/path": {"GET": route_func_factory.route_func}}),
+        response_sender=FakeResponseSender(),
+        options_request_handler=FakeOptionsRequestHandler(),
+        http_request_constructor=FakeHTTPRequestConstructor(),
+        head_request_handler=FakeHeadRequestHandler(FakeResponseSender()),
+        default_request_handler=default_request_handler,
+        event_handling_settings=FakeEventHandlingSettings(),
+        route_extractor=RouteExtractor(),
+        response_compressor=response_compressor,
+    )
+    scope = {
+        "path": "/path",
+        "method": "GET",
+        "headers": [(b"accept-encoding", b"gzip")],
+        "query_string": b"",
+    }
+
+    # ACT
+    await http_handler.handle(scope, None, fake_send)
+
+    # ASSERT
+    assert response_compressor.calls[0]["headers"] == [(b"accept-encoding", b"gzip")]
+    assert default_request_handler.calls[0]["send"] == "compressing_send"
+
+
+@pytest.mark.asyncio
+async def test__http_handler_handle__when_method_is_get__marks_default_request_handler_call_conditional():
+    # ARRANGE
+    route_func_factory = FakeRouteFuncFactory()
+    default_request_handler = FakeDefaultRequestHandler(FakeResponseSender())
+    http_handler = HTTPHandler(
+        router=FakeRouter(
+            routes={
+                "/path": {
+                    "GET": route_func_factory.route_func,
+                    "POST": route_func_factory.route_func,
+                }
+            }
+        ),
+        response_sender=FakeResponseSender(),
+        options_request_handler=FakeOptionsRequestHandler(),
+        http_request_constructor=FakeHTTPRequestConstructor(),
+        head_request_handler=FakeHeadRequestHandler(FakeResponseSender()),
+        default_request_handler=default_request_handler,
+        event_handling_settings=FakeEventHandlingSettings(),
+        route_extractor=RouteExtractor(),
+    )
+    headers = [(b"if-none-match", b'"abc"')]
+
+    # ACT
+    for method in ["GET", "POST"]:
+        scope = {
+            "path": "/path",
+            "method": method,
+            "headers": headers,
+            "query_string": b"",
+        }
+        await http_handler.handle(scope, None, fake_send)
+
+    # ASSERT
+    assert default_request_handler.calls[0]["request_headers"] == headers
+    assert default_request_handler.calls[0]["conditional"] is True
+    assert default_request_handler.calls[1]["request_headers"] == headers
+    assert default_request_handler.calls[1]["conditional"] is False
+
+
+class FakeMiddlewareFactory:
+    def __init__(self):
+        self.calls = []
+
+    async def middleware(self, request, call_next):
+        self.calls.append({"request": request})
+        return await call_next(request)
+
+
+@pytest.mark.asyncio
+async def test__http_handler_handle__when_middlewares__runs_route_func_through_chain():
+    # ARRANGE
+    route_func_factory = FakeRouteFuncFactory()
+    middleware_factory = FakeMiddlewareFactory()
+    default_request_handler = FakeDefaultRequestHandler(FakeResponseSender())
+    router = FakeRouter(routes={"/path": {"GET": route_func_factory.route_func}})
+    router.version = 1
+    http_handler = HTTPHandler(
+        router=router,
+        response_sender=FakeResponseSender(),
+        options_request_handler=FakeOptionsRequestHandler(),
+        http_request_constructor=FakeHTTPRequestConstructor(),
+        head_request_handler=FakeHeadRequestHandler(FakeResponseSender()),
+        default_request_handler=default_request_handler,
+        event_handling_settings=FakeEventHandlingSettings(),
+        route_extractor=RouteExtractor(),
+    )
+    http_handler.add_middleware(Middleware(middleware_factory.middleware))
+    scope = {
+        "path": "/path",
+        "method": "GET",
+        "headers": [],
+        "query_string": b"",
+    }
+
+    # ACT
+    await http_handler.handle(scope, None, fake_send)
+
+    # ASSERT
+    assert middleware_factory.calls == [{"request": SOME_REQUEST}]
+    assert route_func_factory.calls == [{"request": SOME_REQUEST}]
+    assert default_request_handler.calls[0]["result"] == "test"
+
+
+def test__http_handler_get_routes__when_no_middlewares__returns_bare_route_funcs():
+    # ARRANGE
+    router = FakeRouter(routes={"/path": {"GET": "route_func"}})
+    http_handler = HTTPHandler(
+        router=router,
+        response_sender=FakeResponseSender(),
+        options_request_handler=FakeOptionsRequestHandler(),
+        http_request_constructor=FakeHTTPRequestConstructor(),
+        head_request_handler=FakeHeadRequestHandler(FakeResponseSender()),
+        default_request_handler=FakeDefaultRequestHandler(FakeResponseSender()),
+        event_handling_settings=FakeEventHandlingSettings(),
+        route_extractor=RouteExtractor(),
+    )
+
+    # ACT
+    result = http_handler.get_routes()
+
+    # ASSERT
+    assert result == router.routes
+
+
+def test__http_handler_get_routes__reuses_compiled_routes_until_router_changes():
+    # ARRANGE
+    route_func_factory = FakeRouteFuncFactory()
+    router = FakeRouter(routes={"/path": {"GET": route_func_factory.route_func}})
+    router.version = 1
+    http_handler = HTTPHandler(
+        router=router,
+        response_sender=FakeResponseSender(),
+        options_request_handler=FakeOptionsRequestHandler(),
+        http_request_constructor=FakeHTTPRequestConstructor(),
+        head_request_handler=FakeHeadRequestHandler(FakeResponseSender()),
+        default_request_handler=FakeDefaultRequestHandler(FakeResponseSender()),
+        event_handling_settings=FakeEventHandlingSettings(),
+        route_extractor=RouteExtractor(),
+        middlewares=[Middleware(FakeMiddlewareFactory().middleware)],
+    )
+
+    # ACT
+    first_routes = http_handler.get_routes()
+    second_routes = http_handler.get_routes()
+    router.routes["/other"] = {"GET": route_func_factory.route_func}
+    router.version = 2
+    third_routes = http_handler.get_routes()
+
+    # ASSERT
+    assert first_routes is second_routes
+    assert third_routes is not first_routes
+    assert "/other" in third_routes
+
+
+class FakeInstrumentation:
+    def instrument_routes(self, routes):
+        return {path: {"GET": "instrumented"} for path in routes}
+
+
+def test__http_handler_compile_routes__when_instrumentation__instruments_compiled_routes():
+    # ARRANGE
+    http_handler = HTTPHandler(
+        router=FakeRouter(routes={"/path": {"GET": "route_func"}}),
+        response_sender=FakeResponseSender(),
+        options_request_handler=FakeOptionsRequestHandler(),
+        http_request_constructor=FakeHTTPRequestConstructor(),
+        head_request_handler=FakeHeadRequestHandler(FakeResponseSender()),
+        default_request_handler=FakeDefaultRequestHandler(FakeResponseSender()),
+        event_handling_settings=FakeEventHandlingSettings(),
+        route_extractor=RouteExtractor(),
+        instrumentation=FakeInstrumentation(),
+    )
+
+    # ACT
+    http_handler.compile_routes()
+
+    # ASSERT
+    assert http_handler.compiled_routes == {"/path": {"GET": "instrumented"}}
+
+
+class FakeSlowRouteFuncFactory:
+    def __init__(self):
+        self.cancelled = False
+
+    async def route_func(self, request):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+@pytest.mark.asyncio
+async def test__http_handler_handle__when_request_timeout_exceeded__cancels_route_func_and_sends_504_response():
+    # ARRANGE
+    route_func_factory = FakeSlowRouteFuncFactory()
+    response_sender = FakeResponseSender()
+    http_handler = HTTPHandler(
+        router=FakeRouter(routes={"/path": {"GET": route_func_factory.route_func}}),
+        response_sender=response_sender,
+        options_request_handler=FakeOptionsRequestHandler(),
+        http_request_constructor=FakeHTTPRequestConstructor(),
+        head_request_handler=FakeHeadRequestHandler(FakeResponseSender()),
+        default_request_handler=FakeDefaultRequestHandler(FakeResponseSender()),
+        event_handling_settings=FakeEventHandlingSettings(),
+        route_extractor=RouteExtractor(),
+        request_timeout=0.01,
+    )
+    scope = {
+        "path": "/path",
+        "method": "GET",
+        "headers": [],
+        "query_string": b"",
+    }
+
+    # ACT
+    await http_handler.handle(scope, None, fake_send)
+
+    # ASSERT
+    assert route_func_factory.cancelled
+    assert response_sender.calls[0]["status_code"] == 504
+
+
+@pytest.mark.asyncio
+async def test__http_handler_handle__when_route_timeout__overrides_request_timeout():
+    # ARRANGE
+    route_func_factory = FakeRouteFuncFactory()
+    route_func = route_func_factory.route_func
+    default_request_handler = FakeDefaultRequestHandler(FakeResponseSender())
+
+    async def timed_route_func(request):
+        return await route_func(request=request)
+
+    timed_route_func.timeout = 10
+    http_handler = HTTPHandler(
+        router=FakeRouter(routes={"/path": {"GET": timed_route_func}}),
+        response_sender=FakeResponseSender(),
+        options_request_handler=FakeOptionsRequestHandler(),
+        http_request_constructor=FakeHTTPRequestConstructor(),
+        head_request_handler=FakeHeadRequestHandler(FakeResponseSender()),
+        default_request_handler=default_request_handler,
+        event_handling_settings=FakeEventHandlingSettings(),
+        route_extractor=RouteExtractor(),
+        request_timeout=0.0,
+    )
+    scope = {
+        "path": "/path",
+        "method": "GET",
+        "headers": [],
+        "query_string": b"",
+    }
+
+    # ACT
+    await http_handler.handle(scope, None, fake_send)
+
+    # ASSERT
+    assert default_request_handler.calls[0]["result"] == "test"
+
+
+class FakeAdmissionController:
+    def __init__(self, admitted):
+        self.admitted = admitted
+        self.settings = AdmissionSettings(retry_after=3)
+        self.in_flight = 0
+        self.admit_calls = []
+
+    def admit(self, priority):
+        self.admit_calls.append(priority)
+        return self.admitted
+
+
+@pytest.mark.asyncio
+async def test__http_handler_handle__when_admission_controller_sheds__sends_503_response():
+    # ARRANGE
+    route_func_factory = FakeRouteFuncFactory()
+    response_sender = FakeResponseSender()
+    admission_controller = FakeAdmissionController(admitted=False)
+    http_handler = HTTPHandler(
+        router=FakeRouter(routes={"/path": {"GET": route_func_factory.route_func}}),
+        response_sender=response_sender,
+        options_request_handler=FakeOptionsRequestHandler(),
+        http_request_constructor=FakeHTTPRequestConstructor(),
+        head_request_handler=FakeHeadRequestHandler(FakeResponseSender()),
+        default_request_handler=FakeDefaultRequestHandler(FakeResponseSender()),
+        event_handling_settings=FakeEventHandlingSettings(),
+        route_extractor=RouteExtractor(),
+        admission_controller=admission_controller,
+    )
+    scope = {
+        "path": "/path",
+        "method": "GET",
+        "headers": [],
+        "query_string": b"",
+    }
+
+    # ACT
+    await http_handler.handle(scope, None, fake_send)
+
+    # ASSERT
+    assert admission_controller.admit_calls == ["normal"]
+    assert route_func_factory.calls == []
+    assert response_sender.calls[0]["status_code"] == 503
+    assert (b"retry-after", b"3") in response_sender.calls[0]["headers"]
+
+
+@pytest.mark.asyncio
+async def test__http_handler_handle__when_admission_controller_admits__tracks_in_flight():
+    # ARRANGE
+    admission_controller = FakeAdmissionController(admitted=True)
+    in_flight_during_call = []
+
+    async def route_func(request):
+        in_flight_during_call.append(admission_controller.in_flight)
+        return "test"
+
+    http_handler = HTTPHandler(
+        router=FakeRouter(routes={"/path": {"GET": route_func}}),
+        response_sender=FakeResponseSender(),
+        options_request_handler=FakeOptionsRequestHandler(),
+        http_request_constructor=FakeHTTPRequestConstructor(),
+        head_request_handler=FakeHeadRequestHandler(FakeResponseSender()),
+        default_request_handler=FakeDefaultRequestHandler(FakeResponseSender()),
+        event_handling_settings=FakeEventHandlingSettings(),
+        route_extractor=RouteExtractor(),
+        admission_controller=admission_controller,
+    )
+    scope = {
+        "path": "/path",
+        "method": "GET",
+        "headers": [],
+        "query_string": b"",
+    }
+
+    # ACT
+    await http_handler.handle(scope, None, fake_send)
+
+    # ASSERT
+    assert in_flight_during_call == [1]
+    assert admission_controller.in_flight == 0
+
+
+class FakeBackgroundTaskRunner:
+    def __init__(self):
+        self.calls = []
+
+    def schedule(self, background_tasks):
+        self.calls.append(background_tasks)
+
+
+class FakeHTTPRequestWithBackgroundTasksConstructor:
+    async def construct(
+        self, path, method, headers, query_string, receive, path_params, client=None
+    ):
+        http_request = FakeHTTPRequest()
+        http_request.background_tasks = [("func", (), {})]
+        return http_request
+
+
+@pytest.mark.asyncio
+async def test__http_handler_handle__when_request_has_background_tasks__schedules_them_after_response():
+    # ARRANGE
+    route_func_factory = FakeRouteFuncFactory()
+    default_request_handler = FakeDefaultRequestHandler(FakeResponseSender())
+    background_task_runner = FakeBackgroundTaskRunner()
+    http_handler = HTTPHandler(
+        router=FakeRouter(routes={"/path": {"GET": route_func_factory.route_func}}),
+        response_sender=FakeResponseSender(),
+        options_request_handler=FakeOptionsRequestHandler(),
+        http_request_constructor=FakeHTTPRequestWithBackgroundTasksConstructor(),
+        head_request_handler=FakeHeadRequestHandler(FakeResponseSender()),
+        default_request_handler=default_request_handler,
+        event_handling_settings=FakeEventHandlingSettings(),
+        route_extractor=RouteExtractor(),
+        background_task_runner=background_task_runner,
+    )
+    scope = {
+        "path": "/path",
+        "method": "GET",
+        "headers": [],
+        "query_string": b"",
+    }
+
+    # ACT
+    await http_handler.handle(scope, None, fake_send)
+
+    # ASSERT
+    assert len(default_request_handler.calls) == 1
+    assert background_task_runner.calls == [[("func", (), {})]]
@@ -0,0 +1,230 @@
+import orjson
+import pytest
+
+from wibbley.api.http_handler.event_handling import EventHandlingSettings
+from wibbley.api.http_handler.handler import HTTPHandler
+from wibbley.api.http_handler.instrumentation import (
+    HANDLER,
+    PHASES,
+    REQUEST_CONSTRUCTION,
+    ROUTE_EXTRACTION,
+    SEND,
+    SERIALIZATION,
+    Instrumentation,
+    InstrumentedRequestConstructor,
+    InstrumentedResponseSender,
+    InstrumentedRouteExtractor,
+)
+from wibbley.api.http_handler.request import HTTPRequestConstructor
+from wibbley.api.http_handler.request_handlers.default_request_handler import (
+    DefaultRequestHandler,
+)
+from wibbley.api.http_handler.request_handlers.head_request_handler import (
+    HeadRequestHandler,
+)
+from wibbley.api.http_handler.request_handlers.options_request_handler import (
+    OptionsRequestHandler,
+)
+from wibbley.api.http_handler.request_handlers.response_sender import ResponseSender
+from wibbley.api.http_handler.route_extractor import RouteExtractor
+from wibbley.api.http_handler.router import Router
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 1.0
+        return self.now
+
+
+class FakeSink:
+    def __init__(self):
+        self.observations = []
+
+    def observe(self, name, seconds):
+        self.observations.append((name, seconds))
+
+
+class FakeSend:
+    def __init__(self):
+        self.messages = []
+
+    async def __call__(self, message):
+        self.messages.append(message)
+
+
+async def fake_receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+def test__instrumented_route_extractor_extract__observes_route_extraction():
+    # ARRANGE
+    sink = FakeSink()
+    route_extractor = InstrumentedRouteExtractor(RouteExtractor(), sink, FakeClock())
+
+    # ACT
+    route_info = route_extractor.extract(
+        routes={"/path": {"GET": "route_func"}},
+        request_path="/path",
+        request_method="GET",
+    )
+
+    # ASSERT
+    assert route_info.route_func == "route_func"
+    assert sink.observations == [(ROUTE_EXTRACTION, 1.0)]
+
+
+@pytest.mark.asyncio
+async def test__instrumented_request_constructor_construct__observes_request_construction():
+    # ARRANGE
+    sink = FakeSink()
+    http_request_constructor = InstrumentedRequestConstructor(
+        HTTPRequestConstructor(), sink, FakeClock()
+    )
+
+    # ACT
+    http_request = await http_request_constructor.construct(
+        path="/path",
+        path_params={},
+        method="GET",
+        query_string=b"",
+        headers=[],
+        receive=fake_receive,
+    )
+
+    # ASSERT
+    assert http_request.path == "/path"
+    assert sink.observations == [(REQUEST_CONSTRUCTION, 1.0)]
+
+
+@pytest.mark.asyncio
+async def test__instrumented_response_sender_send_response__observes_serialization_and_send():
+    # ARRANGE
+    sink = FakeSink()
+    response_sender = InstrumentedResponseSender(
+        ResponseSender(orjson), sink, FakeClock()
+    )
+    send = FakeSend()
+
+    # ACT
+    await response_sender.send_response(
+        send, headers=[], response_body={"a": 1}, status_code=200
+    )
+
+    # ASSERT
+    assert send.messages[1]["body"] == b'{"a":1}'
+    assert sink.observations == [(SERIALIZATION, 1.0), (SEND, 1.0)]
+
+
+def test__instrumented_response_sender_serialize_body__when_bytes__skips_observation():
+    # ARRANGE
+    sink = FakeSink()
+    response_sender = InstrumentedResponseSender(
+        ResponseSender(orjson), sink, FakeClock()
+    )
+
+    # ACT
+    result = response_sender.serialize_body(b"body")
+
+    # ASSERT
+    assert result == b"body"
+    assert sink.observations == []
+
+
+@pytest.mark.asyncio
+async def test__instrumented_response_sender_send_streaming_response__observes_send():
+    # ARRANGE
+    sink = FakeSink()
+    response_sender = InstrumentedResponseSender(
+        ResponseSender(orjson), sink, FakeClock()
+    )
+    send = FakeSend()
+
+    async def body_iterator():
+        yield "chunk"
+
+    # ACT
+    await response_sender.send_streaming_response(
+        send, headers=[], body_iterator=body_iterator(), status_code=200
+    )
+
+    # ASSERT
+    assert len(send.messages) == 3
+    assert sink.observations == [(SEND, 1.0)]
+
+
+@pytest.mark.asyncio
+async def test__instrumentation_instrument_route__when_route_raises__still_observes_handler():
+    # ARRANGE
+    sink = FakeSink()
+    instrumentation = Instrumentation(sink, clock=FakeClock())
+
+    async def route_func(request):
+        raise ValueError(request)
+
+    route_func.timeout = 5
+
+    # ACT
+    timed_route = instrumentation.instrument_route(route_func)
+    with pytest.raises(ValueError):
+        await timed_route(request="request")
+
+    # ASSERT
+    assert timed_route.timeout == 5
+    assert timed_route.__wrapped__ is route_func
+    assert sink.observations == [(HANDLER, 1.0)]
+
+
+@pytest.mark.asyncio
+async def test__instrumentation_install__observes_every_phase_of_a_request():
+    # ARRANGE
+    sink = FakeSink()
+    router = Router()
+    http_handler = HTTPHandler(
+        router=router,
+        response_sender=ResponseSender(orjson),
+        options_request_handler=OptionsRequestHandler(
+            cors_settings=None, response_sender=ResponseSender(orjson)
+        ),
+        http_request_constructor=HTTPRequestConstructor(),
+        head_request_handler=HeadRequestHandler(ResponseSender(orjson)),
+        default_request_handler=DefaultRequestHandler(ResponseSender(orjson)),
+        event_handling_settings=EventHandlingSettings(),
+        route_extractor=RouteExtractor(),
+    )
+
+    @router.get("/path")
+    async def route_func():
+        return {"ok": True}
+
+    send = FakeSend()
+    scope = {
+        "path": "/path",
+        "method": "GET",
+        "headers": [],
+        "query_string": b"",
+    }
+
+    # ACT
+    Instrumentation(sink).install(http_handler)
+    await http_handler.handle(scope, fake_receive, send)
+
+    # ASSERT
+    assert send.messages[1]["body"] == b'{"ok":true}'
+    assert [name for name, _ in sink.observations] == [
+        ROUTE_EXTRACTION,
+        REQUEST_CONSTRUCTION,
+        HANDLER,
+        SERIALIZATION,
+        SEND,
+    ]
+    assert set(PHASES) == {name for name, _ in sink.observations}
+    assert isinstance(
+        http_handler.head_request_handler.response_sender, InstrumentedResponseSender
+    )
+    assert isinstance(
+        http_handler.options_request_handler.response_sender,
+        InstrumentedResponseSender,
+    )
@@ -0,0 +1,172 @@
+import pytest
+
+from wibbley.api.http_handler.middleware import (
+    Middleware,
+    build_chain,
+    compile_routes,
+)
+from wibbley.api.http_handler.rate_limiting import InMemoryRateLimitBackend, RateLimit
+
+
+class FakeMiddlewareFactory:
+    def __init__(self, name, calls):
+        self.name = name
+        self.calls = calls
+
+    async def middleware(self, request, call_next):
+        self.calls.append(self.name)
+        return await call_next(request)
+
+
+async def fake_middleware(request, call_next):
+    pass
+
+
+async def fake_route_func(request):
+    return request
+
+
+def test__middleware_applies_to__when_no_filters__returns_true():
+    # ARRANGE
+    middleware = Middleware(fake_middleware)
+
+    # ACT
+    result = middleware.applies_to("/path", "GET")
+
+    # ASSERT
+    assert result is True
+
+
+def test__middleware_applies_to__when_method_not_included__returns_false():
+    # ARRANGE
+    middleware = Middleware(fake_middleware, methods=["POST"])
+
+    # ACT
+    result = middleware.applies_to("/path", "GET")
+
+    # ASSERT
+    assert result is False
+
+
+def test__middleware_applies_to__when_path_not_included__returns_false():
+    # ARRANGE
+    middleware = Middleware(fake_middleware, include_paths=["/admin"])
+
+    # ACT
+    result = middleware.applies_to("/path", "GET")
+
+    # ASSERT
+    assert result is False
+
+
+def test__middleware_applies_to__when_path_included__returns_true():
+    # ARRANGE
+    middleware = Middleware(fake_middleware, include_paths=["/admin"])
+
+    # ACT
+    result = middleware.applies_to("/admin/users", "GET")
+
+    # ASSERT
+    assert result is True
+
+
+def test__middleware_applies_to__when_path_excluded__returns_false():
+    # ARRANGE
+    middleware = Middleware(fake_middleware, exclude_paths=["/health"])
+
+    # ACT
+    result = middleware.applies_to("/health", "GET")
+
+    # ASSERT
+    assert result is False
+
+
+def test__build_chain__when_no_middlewares__returns_route_func():
+    # ACT
+    result = build_chain(fake_route_func, [])
+
+    # ASSERT
+    assert result is fake_route_func
+
+
+@pytest.mark.asyncio
+async def test__build_chain__when_middlewares__calls_them_in_order_then_route_func():
+    # ARRANGE
+    calls = []
+    middlewares = [
+        Middleware(FakeMiddlewareFactory("first", calls).middleware),
+        Middleware(FakeMiddlewareFactory("second", calls).middleware),
+    ]
+
+    # ACT
+    chain = build_chain(fake_route_func, middlewares)
+    result = await chain(request="some_request")
+
+    # ASSERT
+    assert calls == ["first", "second"]
+    assert result == "some_request"
+
+
+@pytest.mark.asyncio
+async def test__build_chain__when_middleware_short_circuits__skips_route_func():
+    # ARRANGE
+    async def short_circuit(request, call_next):
+        return "short_circuit"
+
+    # ACT
+    chain = build_chain(fake_route_func, [Middleware(short_circuit)])
+    result = await chain(request="some_request")
+
+    # ASSERT
+    assert result == "short_circuit"
+
+
+def test__compile_routes__only_wraps_routes_the_middleware_applies_to():
+    # ARRANGE
+    routes = {
+        "/path": {"GET": fake_route_func, "POST": fake_route_func},
+        "/health": {"GET": fake_route_func},
+    }
+    middlewares = [
+        Middleware(fake_middleware, exclude_paths=["/health"], methods=["GET"])
+    ]
+
+    # ACT
+    result = compile_routes(routes, middlewares)
+
+    # ASSERT
+    assert result["/path"]["GET"] is not fake_route_func
+    assert result["/path"]["POST"] is fake_route_func
+    assert result["/health"]["GET"] is fake_route_func
+
+
+def test__build_chain__copies_route_func_attributes_to_chain():
+    # ARRANGE
+    async def timed_route_func(request):
+        pass
+
+    timed_route_func.timeout = 5
+
+    # ACT
+    chain = build_chain(timed_route_func, [Middleware(fake_middleware)])
+
+    # ASSERT
+    assert chain.timeout == 5
+
+
+def test__compile_routes__when_route_has_rate_limit__adds_rate_limit_middleware():
+    # ARRANGE
+    async def limited_route_func(request):
+        pass
+
+    limited_route_func.rate_limit = RateLimit(1)
+    backend = InMemoryRateLimitBackend()
+    routes = {"/path": {"GET": limited_route_func, "POST": fake_route_func}}
+
+    # ACT
+    result = compile_routes(routes, [], backend)
+
+    # ASSERT
+    assert result["/path"]["GET"] is not limited_route_func
+    assert result["/path"]["GET"].rate_limit == limited_route_func.rate_limit
+    assert result["/path"]["POST"] is fake_route_func
@@ -0,0 +1,170 @@
+import threading
+
+import pytest
+
+from wibbley.api.http_handler.exceptions import HTTPException
+from wibbley.api.http_handler.profiling import ProfileEndpoint, ProfilerSettings
+from wibbley.api.http_handler.request import HTTPRequest
+
+
+ADMIN_TOKEN = "secret"
+AUTHORIZED_HEADERS = {"authorization": f"Bearer {ADMIN_TOKEN}"}
+
+
+class FakeProfiler:
+    def __init__(self, thread_id, interval, include_idle):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.include_idle = include_idle
+        self.sample_count = 3
+        self.calls = []
+
+    def start(self):
+        self.calls.append("start")
+
+    def stop(self):
+        self.calls.append("stop")
+
+    def render(self):
+        return b"app.handler 3\n"
+
+
+class FakeProfilerFactory:
+    def __init__(self):
+        self.profilers = []
+
+    def __call__(self, *args):
+        profiler = FakeProfiler(*args)
+        self.profilers.append(profiler)
+        return profiler
+
+
+def build_request(
+    client=("127.0.0.1", 5000),
+    headers=AUTHORIZED_HEADERS,
+    query_params=None,
+):
+    return HTTPRequest(
+        path="/_wibbley/profile",
+        method="GET",
+        query_params=query_params or {},
+        path_params={},
+        headers=headers,
+        body=b"",
+        client=client,
+    )
+
+
+@pytest.mark.parametrize("client", [("127.0.0.1", 5000), ("10.0.0.7", 5000), None])
+def test__profile_endpoint_authorize__when_no_token__raises_403_for_every_client(
+    client,
+):
+    # ARRANGE
+    endpoint = ProfileEndpoint(ProfilerSettings())
+
+    # ACT
+    with pytest.raises(HTTPException) as exc_info:
+        endpoint.authorize(build_request(client=client))
+
+    # ASSERT
+    assert exc_info.value.status_code == 403
+
+
+def test__profile_endpoint_authorize__when_token_matches__allows_remote_client():
+    # ARRANGE
+    endpoint = ProfileEndpoint(ProfilerSettings(admin_token=ADMIN_TOKEN))
+    request = build_request(client=("10.0.0.7", 5000))
+
+    # ACT
+    result = endpoint.authorize(request)
+
+    # ASSERT
+    assert result is None
+
+
+@pytest.mark.parametrize("headers", [{}, {"authorization": "Bearer wrong"}])
+def test__profile_endpoint_authorize__when_token_missing_or_wrong__raises_403(
+    headers,
+):
+    # ARRANGE
+    endpoint = ProfileEndpoint(ProfilerSettings(admin_token=ADMIN_TOKEN))
+
+    # ACT
+    with pytest.raises(HTTPException) as exc_info:
+        endpoint.authorize(build_request(headers=headers))
+
+    # ASSERT
+    assert exc_info.value.status_code == 403
+
+
+@pytest.mark.parametrize(
+    "query_params, expected", [({}, 10.0), ({"seconds": "2.5"}, 2.5)]
+)
+def test__profile_endpoint_parse_seconds__returns_requested_or_default(
+    query_params, expected
+):
+    # ARRANGE
+    endpoint = ProfileEndpoint(ProfilerSettings())
+
+    # ACT
+    result = endpoint.parse_seconds(build_request(query_params=query_params))
+
+    # ASSERT
+    assert result == expected
+
+
+@pytest.mark.parametrize("seconds", ["soon", "0", "-1", "61"])
+def test__profile_endpoint_parse_seconds__when_invalid__raises_400(seconds):
+    # ARRANGE
+    endpoint = ProfileEndpoint(ProfilerSettings())
+
+    # ACT
+    with pytest.raises(HTTPException) as exc_info:
+        endpoint.parse_seconds(build_request(query_params={"seconds": seconds}))
+
+    # ASSERT
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test__profile_endpoint_call__profiles_loop_thread_and_returns_stacks():
+    # ARRANGE
+    profiler_factory = FakeProfilerFactory()
+    endpoint = ProfileEndpoint(
+        ProfilerSettings(admin_token=ADMIN_TOKEN, interval=0.01),
+        profiler_factory=profiler_factory,
+    )
+    request = build_request(query_params={"seconds": "0.01", "idle": "1"})
+
+    # ACT
+    response = await endpoint(request)
+
+    # ASSERT
+    profiler = profiler_factory.profilers[0]
+    assert profiler.thread_id == threading.get_ident()
+    assert profiler.interval == 0.01
+    assert profiler.include_idle is True
+    assert profiler.calls == ["start", "stop"]
+    assert endpoint.is_profiling is False
+    assert response.status_code == 200
+    assert (b"content-type", b"text/plain; charset=utf-8") in response.headers
+    assert (b"x-wibbley-samples", b"3") in response.headers
+    assert response.body == b"app.handler 3\n"
+
+
+@pytest.mark.asyncio
+async def test__profile_endpoint_call__when_already_profiling__raises_409():
+    # ARRANGE
+    profiler_factory = FakeProfilerFactory()
+    endpoint = ProfileEndpoint(
+        ProfilerSettings(admin_token=ADMIN_TOKEN), profiler_factory=profiler_factory
+    )
+    endpoint.is_profiling = True
+
+    # ACT
+    with pytest.raises(HTTPException) as exc_info:
+        await endpoint(build_request(query_params={"seconds": "0.01"}))
+
+    # ASSERT
+    assert exc_info.value.status_code == 409
+    assert profiler_factory.profilers == []
@@ -0,0 +1,238 @@
+import pytest
+
+from wibbley.api.http_handler.rate_limiting import (
+    FileRateLimitBackend,
+    InMemoryRateLimitBackend,
+    RateLimit,
+    RateLimitMiddleware,
+    api_key,
+    client_ip,
+    consume_token,
+)
+from wibbley.api.http_handler.request import HTTPRequest
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRateLimitBackend:
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+        self.calls = []
+
+    async def acquire(self, key, rate, burst):
+        self.calls.append({"key": key, "rate": rate, "burst": burst})
+        return self.retry_after
+
+
+class FailingConnection:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, stmt, *args):
+        if stmt.startswith("SELECT"):
+            raise RuntimeError("database is locked")
+        return self.connection.execute(stmt, *args)
+
+
+def build_request(client=None, headers=None):
+    return HTTPRequest(
+        path="/path",
+        method="GET",
+        query_params={},
+        path_params={},
+        headers=headers or {},
+        body=b"",
+        client=client,
+    )
+
+
+async def fake_call_next(request):
+    return "route_result"
+
+
+def test__client_ip__returns_client_host():
+    # ACT
+    result = client_ip(build_request(client=("10.0.0.1", 5000)))
+
+    # ASSERT
+    assert result == "10.0.0.1"
+
+
+def test__client_ip__when_no_client__returns_unknown():
+    # ACT
+    result = client_ip(build_request())
+
+    # ASSERT
+    assert result == "unknown"
+
+
+def test__api_key__returns_header_value():
+    # ARRANGE
+    get_api_key = api_key("X-Token")
+
+    # ACT
+    result = get_api_key(build_request(headers={"x-token": "secret"}))
+
+    # ASSERT
+    assert result == "secret"
+
+
+def test__rate_limit__when_no_burst__defaults_burst_to_rate():
+    # ACT
+    rate_limit = RateLimit(2.5)
+
+    # ASSERT
+    assert rate_limit.burst == 3
+
+
+def test__consume_token__when_bucket_is_new__starts_full():
+    # ACT
+    bucket, retry_after = consume_token(None, rate=1, burst=5, now=10)
+
+    # ASSERT
+    assert bucket == (4.0, 10, 11.0)
+    assert retry_after == 0
+
+
+def test__consume_token__when_bucket_is_empty__returns_retry_after():
+    # ACT
+    bucket, retry_after = consume_token((0.5, 10, 14.5), rate=1, burst=5, now=10)
+
+    # ASSERT
+    assert bucket[0] == 0.5
+    assert retry_after == 0.5
+
+
+def test__consume_token__refills_up_to_burst():
+    # ACT
+    bucket, retry_after = consume_token((0.0, 0, 5), rate=1, burst=5, now=100)
+
+    # ASSERT
+    assert bucket[0] == 4.0
+    assert retry_after == 0
+
+
+@pytest.mark.asyncio
+async def test__in_memory_rate_limit_backend_acquire__limits_after_burst():
+    # ARRANGE
+    backend = InMemoryRateLimitBackend(clock=FakeClock())
+
+    # ACT
+    results = [await backend.acquire("key", rate=1, burst=2) for _ in range(3)]
+
+    # ASSERT
+    assert results == [0, 0, 1.0]
+
+
+@pytest.mark.asyncio
+async def test__in_memory_rate_limit_backend_acquire__sweeps_refilled_buckets():
+    # ARRANGE
+    clock = FakeClock()
+    backend = InMemoryRateLimitBackend(sweep_interval=10, clock=clock)
+    await backend.acquire("idle", rate=1, burst=2)
+    clock.now = 5
+    await backend.acquire("active", rate=0.1, burst=2)
+
+    # ACT
+    clock.now = 10
+    await backend.acquire("new", rate=1, burst=2)
+
+    # ASSERT
+    assert set(backend.buckets) == {"active", "new"}
+    assert backend.next_sweep == 20
+
+
+@pytest.mark.asyncio
+async def test__file_rate_limit_backend_acquire__shares_buckets_across_instances(
+    tmp_path,
+):
+    # ARRANGE
+    path = str(tmp_path / "rate_limits.db")
+    clock = FakeClock(100.0)
+    first_backend = FileRateLimitBackend(path, clock=clock)
+    second_backend = FileRateLimitBackend(path, clock=clock)
+
+    # ACT
+    first_result = await first_backend.acquire("key", rate=1, burst=1)
+    second_result = await second_backend.acquire("key", rate=1, burst=1)
+    first_backend.close()
+    second_backend.close()
+
+    # ASSERT
+    assert first_result == 0
+    assert second_result == 1.0
+
+
+@pytest.mark.asyncio
+async def test__file_rate_limit_backend_acquire__sweeps_refilled_buckets(tmp_path):
+    # ARRANGE
+    clock = FakeClock(0.0)
+    backend = FileRateLimitBackend(
+        str(tmp_path / "rate_limits.db"), sweep_interval=10, clock=clock
+    )
+    await backend.acquire("idle", rate=1, burst=2)
+
+    # ACT
+    clock.now = 10.0
+    await backend.acquire("new", rate=1, burst=2)
+    keys = [row[0] for row in backend.connection.execute("SELECT key FROM buckets")]
+    backend.close()
+    backend.close()
+
+    # ASSERT
+    assert keys == ["new"]
+
+
+@pytest.mark.asyncio
+async def test__file_rate_limit_backend_acquire__when_query_fails__rolls_back(
+    tmp_path,
+):
+    # ARRANGE
+    backend = FileRateLimitBackend(str(tmp_path / "rate_limits.db"))
+    connection = backend._get_connection()
+    backend.connection = FailingConnection(connection)
+
+    # ACT/ASSERT
+    with pytest.raises(RuntimeError):
+        await backend.acquire("key", rate=1, burst=1)
+    assert not connection.in_transaction
+    connection.close()
+
+
+@pytest.mark.asyncio
+async def test__rate_limit_middleware__when_token_available__calls_next():
+    # ARRANGE
+    backend = FakeRateLimitBackend(retry_after=0)
+    middleware = RateLimitMiddleware(RateLimit(5, burst=10), backend, "/path")
+
+    # ACT
+    result = await middleware(build_request(client=("10.0.0.1", 5000)), fake_call_next)
+
+    # ASSERT
+    assert result == "route_result"
+    assert backend.calls == [{"key": "/path:10.0.0.1", "rate": 5, "burst": 10}]
+
+
+@pytest.mark.asyncio
+async def test__rate_limit_middleware__when_limited__returns_429_with_retry_after():
+    # ARRANGE
+    backend = FakeRateLimitBackend(retry_after=1.2)
+    middleware = RateLimitMiddleware(
+        RateLimit(5, key=api_key(), name="shared"), backend, "/path"
+    )
+
+    # ACT
+    result = await middleware(
+        build_request(headers={"x-api-key": "abc"}), fake_call_next
+    )
+
+    # ASSERT
+    assert result.status_code == 429
+    assert (b"retry-after", b"2") in result.headers
+    assert backend.calls[0]["key"] == "shared:abc"
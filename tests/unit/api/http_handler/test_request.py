@@ -161,3 +161,48 @@ async def test__http_request_constructor_construct__returns_http_request():
     assert request.headers == {}
     assert request.body == b"test"
     assert request.path_params == {}
+
+
+@pytest.mark.asyncio
+async def test__http_request_constructor_construct__when_client__sets_request_client():
+    # ARRANGE
+    request_constructor = HTTPRequestConstructor()
+
+    # ACT
+    request = await request_constructor.construct(
+        path="/",
+        method="GET",
+        query_string=b"",
+        headers=[],
+        receive=FakeReceiveOnce(),
+        path_params={},
+        client=("127.0.0.1", 5000),
+    )
+
+    # ASSERT
+    assert request.client == ("127.0.0.1", 5000)
+
+
+def test__http_request_add_background_task__appends_task():
+    # ARRANGE
+    request = HTTPRequest(
+        path="/",
+        method="GET",
+        query_params={},
+        path_params={},
+        headers={},
+        body=b"",
+    )
+
+    async def fake_task(a, b=None):
+        pass
+
+    # ACT
+    request.add_background_task(fake_task, 1, b=2)
+    request.add_background_task(fake_task, 3)
+
+    # ASSERT
+    assert request.background_tasks == [
+        (fake_task, (1,), {"b": 2}),
+        (fake_task, (3,), {}),
+    ]
@@ -0,0 +1,482 @@
+import asyncio
+import gzip
+import threading
+
+import orjson
+import pytest
+
+from wibbley.api.http_handler.compression import (
+    CompressionSettings,
+    ResponseCompressor,
+)
+from wibbley.api.http_handler.request import HTTPRequest
+from wibbley.api.http_handler.request_handlers.response_sender import ResponseSender
+from wibbley.api.http_handler.response import HTTPResponse, StreamingHTTPResponse
+from wibbley.api.http_handler.response_cache import (
+    CachedResponse,
+    ResponseCache,
+    ResponseCacheSettings,
+)
+from wibbley.api.http_handler.router import Router
+from wibbley.api.http_handler.serializers import Serializer, SerializerRegistry
+
+
+class FakeMsgpackSerializer(Serializer):
+    content_type = b"application/msgpack"
+
+    def dumps(self, obj):
+        return b"msgpack"
+
+
+class ThreadRecordingCompressor(ResponseCompressor):
+    def __init__(self, compression_settings):
+        super().__init__(compression_settings, brotli=None)
+        self.thread_ids = []
+
+    def compress(self, body, encoding):
+        self.thread_ids.append(threading.get_ident())
+        return super().compress(body, encoding)
+
+
+class FakeHTTPHandler:
+    def __init__(self, response_compressor=None, serializer_registry=None):
+        self.response_sender = ResponseSender(orjson, serializer_registry)
+        self.response_compressor = response_compressor
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def build_request(path="/items", query_params=None, headers=None):
+    return HTTPRequest(
+        path=path,
+        method="GET",
+        query_params=query_params or {},
+        path_params={},
+        headers=headers or {},
+        body=b"",
+    )
+
+
+def build_entry(size, expires_at=100.0):
+    return CachedResponse(200, {None: ([], b"a" * size)}, expires_at)
+
+
+@pytest.mark.asyncio
+async def test__response_cache_cached__when_hit__skips_handler():
+    # ARRANGE
+    response_cache = ResponseCache(FakeHTTPHandler(), clock=FakeClock())
+    calls = []
+
+    @response_cache.cached(ttl=10)
+    async def handler():
+        calls.append(1)
+        return {"key": "value"}
+
+    # ACT
+    first = await handler(request=build_request())
+    second = await handler(request=build_request())
+
+    # ASSERT
+    assert len(calls) == 1
+    assert first.body == second.body == b'{"key":"value"}'
+    assert second.headers == [(b"content-type", b"application/json")]
+
+
+@pytest.mark.asyncio
+async def test__response_cache_cached__when_entry_expires__calls_handler_again():
+    # ARRANGE
+    clock = FakeClock()
+    response_cache = ResponseCache(FakeHTTPHandler(), clock=clock)
+    calls = []
+
+    @response_cache.cached(ttl=10)
+    async def handler(request):
+        calls.append(request)
+        return "value"
+
+    # ACT
+    await handler(request=build_request())
+    clock.now = 11
+    await handler(request=build_request())
+
+    # ASSERT
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test__response_cache_cached__keys_on_selected_query_params_and_headers():
+    # ARRANGE
+    response_cache = ResponseCache(FakeHTTPHandler(), clock=FakeClock())
+    calls = []
+
+    @response_cache.cached(ttl=10, query_params=["page"], headers=["Accept-Language"])
+    async def handler(request):
+        calls.append(request)
+        return "value"
+
+    # ACT
+    await handler(request=build_request(query_params={"page": "1", "other": "a"}))
+    await handler(request=build_request(query_params={"page": "1", "other": "b"}))
+    await handler(request=build_request(query_params={"page": "2"}))
+    await handler(
+        request=build_request(
+            query_params={"page": "1"}, headers={"accept-language": "fr"}
+        )
+    )
+
+    # ASSERT
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test__response_cache_cached__when_concurrent_misses__calls_handler_once():
+    # ARRANGE
+    response_cache = ResponseCache(FakeHTTPHandler(), clock=FakeClock())
+    calls = []
+    release = asyncio.Event()
+
+    @response_cache.cached(ttl=10)
+    async def handler():
+        calls.append(1)
+        await release.wait()
+        return "value"
+
+    # ACT
+    tasks = [asyncio.create_task(handler(request=build_request())) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    # ASSERT
+    assert len(calls) == 1
+    assert [result.body for result in results] == [b"value"] * 5
+    assert response_cache.single_flight.calls == {}
+
+
+@pytest.mark.asyncio
+async def test__response_cache_cached__when_compression_enabled__serves_precompressed_variant():
+    # ARRANGE
+    compressor = ResponseCompressor(CompressionSettings(minimum_size=10), brotli=None)
+    response_cache = ResponseCache(FakeHTTPHandler(compressor), clock=FakeClock())
+
+    @response_cache.cached(ttl=10)
+    async def handler():
+        return {"key": "a" * 100}
+
+    # ACT
+    compressed = await handler(
+        request=build_request(headers={"accept-encoding": "gzip"})
+    )
+    raw = await handler(request=build_request())
+
+    # ASSERT
+    assert (b"content-encoding", b"gzip") in compressed.headers
+    assert orjson.loads(gzip.decompress(compressed.body)) == {"key": "a" * 100}
+    assert raw.body == orjson.dumps({"key": "a" * 100})
+
+
+@pytest.mark.asyncio
+async def test__response_cache_cached__when_compressed_and_negotiated__every_variant_varies_on_accept_and_encoding():
+    # ARRANGE
+    compressor = ResponseCompressor(CompressionSettings(minimum_size=10), brotli=None)
+    registry = SerializerRegistry(serializers=[FakeMsgpackSerializer()])
+    response_cache = ResponseCache(
+        FakeHTTPHandler(compressor, serializer_registry=registry), clock=FakeClock()
+    )
+
+    @response_cache.cached(ttl=10)
+    async def handler():
+        return {"key": "a" * 100}
+
+    # ACT
+    compressed = await handler(
+        request=build_request(headers={"accept-encoding": "gzip"})
+    )
+    raw = await handler(request=build_request())
+
+    # ASSERT
+    for result in (compressed, raw):
+        assert [value for key, value in result.headers if key == b"vary"] == [
+            b"accept, accept-encoding"
+        ]
+    assert (b"content-encoding", b"gzip") in compressed.headers
+    assert all(key != b"content-encoding" for key, _ in raw.headers)
+
+
+@pytest.mark.asyncio
+async def test__response_cache_cached__when_compressed__weakens_strong_etag_on_encoded_variants():
+    # ARRANGE
+    compressor = ResponseCompressor(CompressionSettings(minimum_size=10), brotli=None)
+    response_cache = ResponseCache(FakeHTTPHandler(compressor), clock=FakeClock())
+
+    @response_cache.cached(ttl=10)
+    async def handler():
+        return HTTPResponse(
+            status_code=200,
+            headers=[(b"content-type", b"text/plain"), (b"etag", b'"v42"')],
+            body=b"a" * 100,
+        )
+
+    # ACT
+    compressed = await handler(
+        request=build_request(headers={"accept-encoding": "gzip"})
+    )
+    raw = await handler(request=build_request())
+
+    # ASSERT
+    assert (b"etag", b'W/"v42"') in compressed.headers
+    assert (b"etag", b'"v42"') in raw.headers
+
+
+@pytest.mark.parametrize("offload_size, offloaded", [(100, True), (1024, False)])
+@pytest.mark.asyncio
+async def test__response_cache_cached__when_body_reaches_offload_size__compresses_off_loop(
+    offload_size, offloaded
+):
+    # ARRANGE
+    compressor = ThreadRecordingCompressor(
+        CompressionSettings(minimum_size=10, offload_size=offload_size)
+    )
+    response_cache = ResponseCache(FakeHTTPHandler(compressor), clock=FakeClock())
+
+    @response_cache.cached(ttl=10)
+    async def handler():
+        return "a" * 100
+
+    # ACT
+    result = await handler(request=build_request(headers={"accept-encoding": "gzip"}))
+
+    # ASSERT
+    assert gzip.decompress(result.body) == b"a" * 100
+    assert (compressor.thread_ids[0] != threading.get_ident()) is offloaded
+
+
+@pytest.mark.asyncio
+async def test__response_cache_cached__when_compression_enabled_and_encoding_not_accepted__serves_raw_variant():
+    # ARRANGE
+    compressor = ResponseCompressor(CompressionSettings(minimum_size=10), brotli=None)
+    response_cache = ResponseCache(FakeHTTPHandler(compressor), clock=FakeClock())
+
+    @response_cache.cached(ttl=10)
+    async def handler():
+        return "a" * 100
+
+    # ACT
+    result = await handler(
+        request=build_request(headers={"accept-encoding": "identity"})
+    )
+
+    # ASSERT
+    assert result.body == b"a" * 100
+
+
+@pytest.mark.asyncio
+async def test__response_cache_cached__when_http_response_is_not_cacheable__returns_result_without_storing():
+    # ARRANGE
+    response_cache = ResponseCache(FakeHTTPHandler(), clock=FakeClock())
+    response = HTTPResponse(status_code=500, headers=[], body=b"error")
+
+    @response_cache.cached(ttl=10)
+    async def handler():
+        return response
+
+    # ACT
+    result = await handler(request=build_request())
+
+    # ASSERT
+    assert result is response
+    assert len(response_cache.entries) == 0
+
+
+@pytest.mark.asyncio
+async def test__response_cache_cached__when_http_response_is_cacheable__stores_serialized_body():
+    # ARRANGE
+    response_cache = ResponseCache(FakeHTTPHandler(), clock=FakeClock())
+
+    @response_cache.cached(ttl=10)
+    async def handler():
+        return HTTPResponse(
+            status_code=200,
+            headers=[(b"content-type", b"application/json")],
+            body={"key": "value"},
+        )
+
+    # ACT
+    result = await handler(request=build_request())
+
+    # ASSERT
+    assert result.body == b'{"key":"value"}'
+    assert len(response_cache.entries) == 1
+
+
+@pytest.mark.asyncio
+async def test__response_cache_cached__when_result_is_streaming__returns_result_without_storing():
+    # ARRANGE
+    response_cache = ResponseCache(FakeHTTPHandler(), clock=FakeClock())
+    response = StreamingHTTPResponse(status_code=200, headers=[], body_iterator=None)
+
+    @response_cache.cached(ttl=10)
+    async def handler():
+        return response
+
+    # ACT
+    result = await handler(request=build_request())
+
+    # ASSERT
+    assert result is response
+    assert len(response_cache.entries) == 0
+
+
+@pytest.mark.asyncio
+async def test__response_cache_cached__when_concurrent_misses_are_not_cacheable__calls_handler_per_request():
+    # ARRANGE
+    response_cache = ResponseCache(FakeHTTPHandler(), clock=FakeClock())
+    release = asyncio.Event()
+    calls = []
+
+    @response_cache.cached(ttl=10)
+    async def handler():
+        calls.append(1)
+        await release.wait()
+
+        async def body_iterator():
+            yield b"first "
+            await asyncio.sleep(0)
+            yield b"second"
+
+        return StreamingHTTPResponse(200, [], body_iterator())
+
+    async def read_body(response):
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    # ACT
+    tasks = [asyncio.create_task(handler(request=build_request())) for _ in range(2)]
+    await asyncio.sleep(0)
+    release.set()
+    responses = await asyncio.gather(*tasks)
+    bodies = await asyncio.gather(*(read_body(response) for response in responses))
+
+    # ASSERT
+    assert len(calls) == 2
+    assert responses[0] is not responses[1]
+    assert bodies == [b"first second", b"first second"]
+    assert len(response_cache.entries) == 0
+
+
+@pytest.mark.asyncio
+async def test__response_cache_cached__when_registered_on_router__receives_request():
+    # ARRANGE
+    response_cache = ResponseCache(FakeHTTPHandler(), clock=FakeClock())
+    router = Router()
+
+    @router.get("/items")
+    @response_cache.cached(ttl=10)
+    async def handler():
+        return "value"
+
+    # ACT
+    result = await router.routes["/items"]["GET"](request=build_request())
+
+    # ASSERT
+    assert result.body == b"value"
+
+
+@pytest.mark.asyncio
+async def test__response_cache_cached__when_serializer_negotiated__stores_entry_per_content_type():
+    # ARRANGE
+    registry = SerializerRegistry(serializers=[FakeMsgpackSerializer()])
+    response_cache = ResponseCache(
+        FakeHTTPHandler(serializer_registry=registry), clock=FakeClock()
+    )
+
+    @response_cache.cached(ttl=10)
+    async def handler():
+        return {"key": "value"}
+
+    # ACT
+    msgpack_result = await handler(
+        request=build_request(headers={"accept": "application/msgpack"})
+    )
+    json_result = await handler(request=build_request())
+
+    # ASSERT
+    assert msgpack_result.body == b"msgpack"
+    assert msgpack_result.headers == [
+        (b"content-type", b"application/msgpack"),
+        (b"vary", b"accept"),
+    ]
+    assert json_result.body == b'{"key":"value"}'
+    assert len(response_cache.entries) == 2
+
+
+def test__response_cache_set__when_over_max_bytes__evicts_least_recently_used():
+    # ARRANGE
+    response_cache = ResponseCache(
+        FakeHTTPHandler(), ResponseCacheSettings(max_bytes=25), clock=FakeClock()
+    )
+    response_cache.set("a", build_entry(10))
+    response_cache.set("b", build_entry(10))
+    response_cache.get("a")
+
+    # ACT
+    response_cache.set("c", build_entry(10))
+
+    # ASSERT
+    assert list(response_cache.entries.keys()) == ["a", "c"]
+    assert response_cache.current_bytes == 20
+
+
+def test__response_cache_set__when_entry_larger_than_max_bytes__does_not_store():
+    # ARRANGE
+    response_cache = ResponseCache(
+        FakeHTTPHandler(), ResponseCacheSettings(max_bytes=5), clock=FakeClock()
+    )
+
+    # ACT
+    response_cache.set("a", build_entry(10))
+
+    # ASSERT
+    assert len(response_cache.entries) == 0
+    assert response_cache.current_bytes == 0
+
+
+def test__response_cache_set__when_key_exists__replaces_entry():
+    # ARRANGE
+    response_cache = ResponseCache(FakeHTTPHandler(), clock=FakeClock())
+    response_cache.set("a", build_entry(10))
+
+    # ACT
+    response_cache.set("a", build_entry(5))
+
+    # ASSERT
+    assert response_cache.current_bytes == 5
+
+
+def test__response_cache_clear__removes_all_entries():
+    # ARRANGE
+    response_cache = ResponseCache(FakeHTTPHandler(), clock=FakeClock())
+    response_cache.set("a", build_entry(10))
+
+    # ACT
+    response_cache.clear()
+
+    # ASSERT
+    assert len(response_cache.entries) == 0
+    assert response_cache.current_bytes == 0
+
+
+def test__response_cache_get__when_missing__returns_none():
+    # ARRANGE
+    response_cache = ResponseCache(FakeHTTPHandler(), clock=FakeClock())
+
+    # ACT
+    entry = response_cache.get("missing")
+
+    # ASSERT
+    assert entry is None
@@ -1,5 +1,6 @@
 import pytest
 
+from wibbley.api.http_handler.rate_limiting import RateLimit
 from wibbley.api.http_handler.router import Router
 
 
@@ -50,6 +51,53 @@ async def test__router_get__adds_head_and_get_to_routes():
     assert result["HEAD"].__name__ == "test_func"
 
 
+@pytest.mark.asyncio
+async def test__router_head__adds_dedicated_head_to_routes():
+    # ARRANGE
+    router = Router()
+
+    @router.head("/")
+    async def head_func():
+        pass
+
+    @router.get("/")
+    async def get_func():
+        pass
+
+    @router.head("/other")
+    async def other_head_func():
+        pass
+
+    # ACT
+    result = router.routes["/"]
+
+    # ASSERT
+    assert result["GET"].__name__ == "get_func"
+    assert result["HEAD"].__name__ == "head_func"
+    assert router.routes["/other"]["HEAD"].__name__ == "other_head_func"
+
+
+@pytest.mark.asyncio
+async def test__router_head__when_get_already_registered__replaces_head():
+    # ARRANGE
+    router = Router()
+
+    @router.get("/")
+    async def get_func():
+        pass
+
+    @router.head("/")
+    async def head_func():
+        pass
+
+    # ACT
+    result = router.routes["/"]
+
+    # ASSERT
+    assert result["GET"].__name__ == "get_func"
+    assert result["HEAD"].__name__ == "head_func"
+
+
 @pytest.mark.asyncio
 async def test__router_post__adds_post_to_routes():
     # ARRANGE
@@ -198,3 +246,162 @@ async def test__router_patch__when_path_already_has_routes__adds_patch_to_routes
 
     # ASSERT
     assert result["PATCH"].__name__ == "test_func"
+
+
+def test__router_post__increments_version():
+    # ARRANGE
+    router = Router()
+
+    async def test_func():
+        pass
+
+    # ACT
+    router.post("/path")(test_func)
+    router.put("/path")(test_func)
+
+    # ASSERT
+    assert router.version == 2
+
+
+def test__router_get__sets_timeout_on_wrapper():
+    # ARRANGE
+    router = Router()
+
+    async def test_func():
+        pass
+
+    # ACT
+    wrapper = router.get("/path", timeout=2.5)(test_func)
+
+    # ASSERT
+    assert router.routes["/path"]["GET"].timeout == 2.5
+    assert wrapper.timeout == 2.5
+
+
+def test__router_get__sets_priority_on_wrapper():
+    # ARRANGE
+    router = Router()
+
+    async def test_func():
+        pass
+
+    # ACT
+    router.get("/path", priority="low")(test_func)
+
+    # ASSERT
+    assert router.routes["/path"]["GET"].priority == "low"
+
+
+def test__router_get__when_priority_is_unknown__raises_value_error():
+    # ARRANGE
+    router = Router()
+
+    async def test_func():
+        pass
+
+    # ACT/ASSERT
+    with pytest.raises(ValueError):
+        router.get("/path", priority="urgent")(test_func)
+
+
+def test__router_post__sets_rate_limit_on_wrapper():
+    # ARRANGE
+    router = Router()
+    rate_limit = RateLimit(10)
+
+    async def test_func():
+        pass
+
+    # ACT
+    router.post("/path", rate_limit=rate_limit)(test_func)
+
+    # ASSERT
+    assert router.routes["/path"]["POST"].rate_limit == rate_limit
+
+
+class FakeHandlerExecutor:
+    def __init__(self):
+        self.calls = []
+
+    async def run(self, func, kwargs, mode):
+        self.calls.append({"func": func, "kwargs": kwargs, "mode": mode})
+        return func(**kwargs)
+
+
+class FakeAsyncCallable:
+    async def __call__(self, request):
+        return request
+
+
+@pytest.mark.asyncio
+async def test__router_get_wrapper__when_sync_handler__runs_in_thread_executor():
+    # ARRANGE
+    handler_executor = FakeHandlerExecutor()
+    router = Router(handler_executor=handler_executor)
+
+    def test_func(a):
+        return a
+
+    # ACT
+    wrapper = router._get_wrapper(test_func)
+    result = await wrapper(a=1, b=2)
+
+    # ASSERT
+    assert result == 1
+    assert handler_executor.calls == [
+        {"func": test_func, "kwargs": {"a": 1}, "mode": "thread"}
+    ]
+
+
+@pytest.mark.asyncio
+async def test__router_get_wrapper__when_async_callable_object__awaits_it():
+    # ARRANGE
+    handler_executor = FakeHandlerExecutor()
+    router = Router(handler_executor=handler_executor)
+
+    # ACT
+    wrapper = router._get_wrapper(FakeAsyncCallable())
+    result = await wrapper(request="request")
+
+    # ASSERT
+    assert result == "request"
+    assert handler_executor.calls == []
+
+
+def test__router_get__when_process_executor__returns_original_function():
+    # ARRANGE
+    router = Router()
+
+    def test_func():
+        pass
+
+    # ACT
+    result = router.get("/path", executor="process")(test_func)
+
+    # ASSERT
+    assert result is test_func
+    assert router.routes["/path"]["GET"] is not test_func
+
+
+def test__router_get__when_executor_is_unknown__raises_value_error():
+    # ARRANGE
+    router = Router()
+
+    def test_func():
+        pass
+
+    # ACT/ASSERT
+    with pytest.raises(ValueError):
+        router.get("/path", executor="fiber")(test_func)
+
+
+def test__router_get__when_executor_set_on_async_handler__raises_value_error():
+    # ARRANGE
+    router = Router()
+
+    async def test_func():
+        pass
+
+    # ACT/ASSERT
+    with pytest.raises(ValueError):
+        router.get("/path", executor="thread")(test_func)
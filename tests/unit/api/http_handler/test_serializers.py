@@ -0,0 +1,284 @@
+import dataclasses
+import datetime
+
+import orjson
+import pytest
+
+from wibbley.api.http_handler.serializers import (
+    CBORSerializer,
+    MsgpackSerializer,
+    ORJSONSerializer,
+    RawSerializer,
+    SerializerRegistry,
+)
+
+
+class FakeMsgpack:
+    def packb(self, obj, default, use_bin_type):
+        return b"msgpack:" + repr(default(obj)).encode()
+
+
+class FakeEncoder:
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, obj):
+        self.encoded.append(obj)
+
+
+class FakeCBOR2:
+    def __init__(self):
+        self.encoder = FakeEncoder()
+
+    def dumps(self, obj, default):
+        default(self.encoder, obj)
+        return b"cbor:" + repr(self.encoder.encoded[0]).encode()
+
+
+class CSVSerializer(RawSerializer):
+    content_type = b"text/csv"
+
+
+class Money:
+    def __init__(self, cents):
+        self.cents = cents
+
+
+class Euro(Money):
+    pass
+
+
+@dataclasses.dataclass
+class Point:
+    x: int
+    y: int
+
+
+def test__orjson_serializer_dumps__serializes_with_options():
+    # ARRANGE
+    serializer = ORJSONSerializer(option=orjson.OPT_NON_STR_KEYS)
+
+    # ACT
+    body = serializer.dumps({1: "a"})
+
+    # ASSERT
+    assert body == b'{"1":"a"}'
+
+
+def test__orjson_serializer_dumps__when_default_hook_registered__uses_hook_for_subclasses():
+    # ARRANGE
+    serializer = ORJSONSerializer()
+    serializer.register_default(Money, lambda money: money.cents / 100)
+
+    # ACT
+    body = serializer.dumps({"price": Euro(250)})
+
+    # ASSERT
+    assert body == b'{"price":2.5}'
+
+
+def test__orjson_serializer_dumps__when_passthrough_dataclass__uses_default_hook():
+    # ARRANGE
+    serializer = ORJSONSerializer(option=orjson.OPT_PASSTHROUGH_DATACLASS)
+    serializer.register_default(Point, lambda point: [point.x, point.y])
+
+    # ACT
+    body = serializer.dumps(Point(1, 2))
+
+    # ASSERT
+    assert body == b"[1,2]"
+
+
+def test__orjson_serializer_dumps__when_no_hook_for_type__raises_type_error():
+    # ARRANGE
+    serializer = ORJSONSerializer()
+    serializer.register_default(Money, lambda money: money.cents)
+
+    # ACT / ASSERT
+    with pytest.raises(TypeError):
+        serializer.dumps({"value": object()})
+
+
+def test__msgpack_serializer_dumps__uses_msgpack_with_default_hooks():
+    # ARRANGE
+    serializer = MsgpackSerializer(msgpack=FakeMsgpack())
+    serializer.register_default(Money, lambda money: money.cents)
+
+    # ACT
+    body = serializer.dumps(Money(5))
+
+    # ASSERT
+    assert body == b"msgpack:5"
+
+
+def test__msgpack_serializer__when_msgpack_not_installed__raises_import_error():
+    # ACT / ASSERT
+    with pytest.raises(ImportError):
+        MsgpackSerializer(msgpack=None)
+
+
+def test__cbor_serializer_dumps__encodes_default_hook_result():
+    # ARRANGE
+    serializer = CBORSerializer(cbor2=FakeCBOR2())
+    serializer.register_default(datetime.date, lambda date: date.isoformat())
+
+    # ACT
+    body = serializer.dumps(datetime.date(2024, 1, 2))
+
+    # ASSERT
+    assert body == b"cbor:'2024-01-02'"
+
+
+def test__cbor_serializer__when_cbor2_not_installed__raises_import_error():
+    # ACT / ASSERT
+    with pytest.raises(ImportError):
+        CBORSerializer(cbor2=None)
+
+
+def test__raw_serializer_dumps__when_bytes_like__returns_bytes():
+    # ARRANGE
+    serializer = RawSerializer()
+
+    # ACT
+    body = serializer.dumps(bytearray(b"abc"))
+
+    # ASSERT
+    assert body == b"abc"
+
+
+def test__raw_serializer_dumps__when_default_hook_registered__uses_hook():
+    # ARRANGE
+    serializer = RawSerializer()
+    serializer.register_default(str, lambda value: value.encode("utf-8"))
+
+    # ACT
+    body = serializer.dumps("abc")
+
+    # ASSERT
+    assert body == b"abc"
+
+
+def test__raw_serializer_can_serialize__only_bytes_like_or_hooked_types():
+    # ARRANGE
+    serializer = RawSerializer()
+    serializer.register_default(str, lambda value: value.encode("utf-8"))
+
+    # ACT
+    results = [
+        serializer.can_serialize(value)
+        for value in (b"abc", memoryview(b"abc"), "abc", {"key": "value"}, [1])
+    ]
+
+    # ASSERT
+    assert results == [True, True, True, False, False]
+    assert ORJSONSerializer().can_serialize({"key": "value"})
+
+
+def test__serializer_registry_negotiate__when_no_accept__returns_default():
+    # ARRANGE
+    registry = SerializerRegistry()
+
+    # ACT
+    serializer = registry.negotiate(None)
+
+    # ASSERT
+    assert serializer is registry.default_serializer
+
+
+def test__serializer_registry_negotiate__when_accept_matches_registered_type__returns_serializer():
+    # ARRANGE
+    msgpack_serializer = MsgpackSerializer(msgpack=FakeMsgpack())
+    registry = SerializerRegistry(serializers=[msgpack_serializer])
+
+    # ACT
+    serializers = [
+        registry.negotiate(b"application/msgpack"),
+        registry.negotiate(b"application/x-msgpack"),
+    ]
+
+    # ASSERT
+    assert serializers == [msgpack_serializer, msgpack_serializer]
+
+
+def test__serializer_registry_negotiate__orders_by_quality():
+    # ARRANGE
+    msgpack_serializer = MsgpackSerializer(msgpack=FakeMsgpack())
+    registry = SerializerRegistry(serializers=[msgpack_serializer])
+
+    # ACT
+    serializer = registry.negotiate(
+        b"application/json;q=0.5, application/msgpack;q=0.9, text/html;q=bad, ,"
+    )
+
+    # ASSERT
+    assert serializer is msgpack_serializer
+
+
+def test__serializer_registry_negotiate__when_wildcards__matches_default_or_type():
+    # ARRANGE
+    raw_serializer = RawSerializer()
+    registry = SerializerRegistry(serializers=[raw_serializer])
+
+    # ACT
+    serializers = [
+        registry.negotiate(b"*/*"),
+        registry.negotiate(b"application/*"),
+        registry.negotiate(b"text/*"),
+    ]
+
+    # ASSERT
+    assert serializers == [
+        registry.default_serializer,
+        registry.default_serializer,
+        registry.default_serializer,
+    ]
+
+
+def test__serializer_registry_negotiate__when_wildcard_type_matches_non_default__returns_serializer():
+    # ARRANGE
+    csv_serializer = CSVSerializer()
+    registry = SerializerRegistry(serializers=[csv_serializer])
+
+    # ACT
+    serializer = registry.negotiate(b"text/*")
+
+    # ASSERT
+    assert serializer is csv_serializer
+
+
+def test__serializer_registry_negotiate__caches_negotiation_results():
+    # ARRANGE
+    registry = SerializerRegistry()
+
+    # ACT
+    registry.negotiate(b"text/html")
+    registry.negotiate(b"text/html")
+
+    # ASSERT
+    assert registry.negotiation_cache == {b"text/html": registry.default_serializer}
+
+
+def test__serializer_registry_negotiate__when_cache_full__clears_cache(mocker):
+    # ARRANGE
+    mocker.patch("wibbley.api.http_handler.serializers.NEGOTIATION_CACHE_SIZE", 1)
+    registry = SerializerRegistry()
+    registry.negotiate(b"text/html")
+
+    # ACT
+    registry.negotiate(b"text/plain")
+
+    # ASSERT
+    assert list(registry.negotiation_cache.keys()) == [b"text/plain"]
+
+
+def test__serializer_registry_register__clears_negotiation_cache():
+    # ARRANGE
+    registry = SerializerRegistry()
+    registry.negotiate(b"application/cbor")
+    cbor_serializer = CBORSerializer(cbor2=FakeCBOR2())
+
+    # ACT
+    registry.register(cbor_serializer)
+
+    # ASSERT
+    assert registry.negotiate(b"application/cbor") is cbor_serializer
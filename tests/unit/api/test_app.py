@@ -1,42 +1,126 @@
 import pytest
 
 from wibbley.api.app import App
+from wibbley.api.http_handler.admission import AdmissionSettings
+from wibbley.api.http_handler.exceptions import ExceptionMapper, HTTPException
+from wibbley.api.http_handler.executors import ExecutorSettings
+from wibbley.api.http_handler.instrumentation import InstrumentedResponseSender
+from wibbley.api.http_handler.profiling import ProfileEndpoint, ProfilerSettings
+from wibbley.api.http_handler.request import HTTPRequest
+from wibbley.api.http_handler.rate_limiting import InMemoryRateLimitBackend
+from wibbley.api.http_handler.compression import (
+    CompressionSettings,
+    ResponseCompressor,
+)
+from wibbley.api.http_handler.response import StreamingHTTPResponse
+from wibbley.api.http_handler.response_cache import ResponseCacheSettings
+from wibbley.api.http_handler.serializers import (
+    ORJSONSerializer,
+    RawSerializer,
+    SerializerRegistry,
+)
+from wibbley.utilities.metrics import HistogramSink, PrometheusSink
 
 
 class FakeOptionsRequestHandler:
     def __init__(self, *args, **kwargs):
         self.cors_settings = None
+        self.response_sender = FakeResponseSender()
+
+
+class FakeHandlerExecutor:
+    def __init__(self):
+        self.is_shutdown_called = False
+
+    def shutdown(self):
+        self.is_shutdown_called = True
 
 
 class FakeRouter:
     def __init__(self, *args, **kwargs):
+        self.handler_executor = FakeHandlerExecutor()
         self.is_get_called = False
         self.is_post_called = False
         self.is_put_called = False
         self.is_delete_called = False
         self.is_patch_called = False
+        self.is_head_called = False
+        self.get_route_funcs = {}
+        self.get_route_options = {}
 
-    def get(self, path):
+    def get(self, path, **route_options):
         self.is_get_called = True
 
-    def post(self, path):
+        def decorator(func):
+            self.get_route_funcs[path] = func
+            self.get_route_options[path] = route_options
+            return func
+
+        return decorator
+
+    def post(self, path, **route_options):
         self.is_post_called = True
 
-    def put(self, path):
+    def put(self, path, **route_options):
         self.is_put_called = True
 
-    def delete(self, path):
+    def delete(self, path, **route_options):
         self.is_delete_called = True
 
-    def patch(self, path):
+    def patch(self, path, **route_options):
         self.is_patch_called = True
 
+    def head(self, path, **route_options):
+        self.is_head_called = True
+
+
+class FakeDefaultRequestHandler:
+    def __init__(self, *args, **kwargs):
+        self.etags_enabled = False
+        self.response_sender = FakeResponseSender()
+
+
+class FakeResponseSender:
+    def __init__(self):
+        self.json_serializer = None
+        self.serializer_registry = None
+
+
+class FakeHeadRequestHandler:
+    def __init__(self, *args, **kwargs):
+        self.response_sender = FakeResponseSender()
+
+
+class FakeBackgroundTaskRunner:
+    def __init__(self):
+        self.is_shutdown_called = False
+
+    async def shutdown(self):
+        self.is_shutdown_called = True
+
 
 class FakeHTTPHandler:
     def __init__(self, *args, **kwargs):
         self.router = FakeRouter()
+        self.response_sender = FakeResponseSender()
+        self.head_request_handler = FakeHeadRequestHandler()
+        self.default_request_handler = FakeDefaultRequestHandler()
         self.is_handle_called = False
+        self.middlewares = []
+        self.exception_mapper = ExceptionMapper()
+        self.background_task_runner = FakeBackgroundTaskRunner()
+        self.is_get_routes_called = False
         self.options_request_handler = FakeOptionsRequestHandler()
+        self.route_extractor = None
+        self.http_request_constructor = None
+        self.instrumentation = None
+        self.compiled_routes = None
+
+    def add_middleware(self, middleware):
+        self.middlewares.append(middleware)
+
+    def get_routes(self):
+        self.is_get_routes_called = True
 
     async def handle(self, scope, receive, send):
         self.is_handle_called = True
@@ -97,6 +181,17 @@ def test__app_patch__calls_http_handler_router_patch():
     assert app.http_handler.router.is_patch_called
 
 
+def test__app_head__calls_http_handler_router_head():
+    # ARRANGE
+    app = App(FakeHTTPHandler())
+
+    # ACT
+    app.head("/path")
+
+    # ASSERT
+    assert app.http_handler.router.is_head_called
+
+
 @pytest.mark.asyncio
 async def test__app_call__when_scope_is_http__calls_http_handler():
     # ARRANGE
@@ -121,6 +216,42 @@ async def test__app_call__when_scope_is_not_http__raises_exception():
         await app(scope, None, None)
 
 
+@pytest.mark.asyncio
+async def test__app_call__when_scope_is_lifespan__compiles_routes_and_runs_hooks():
+    # ARRANGE
+    app = App(FakeHTTPHandler())
+    calls = []
+    messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+    sent_messages = []
+
+    @app.on_startup
+    async def startup():
+        calls.append("startup")
+
+    @app.on_shutdown
+    async def shutdown():
+        calls.append("shutdown")
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent_messages.append(message)
+
+    # ACT
+    await app({"type": "lifespan"}, receive, send)
+
+    # ASSERT
+    assert app.http_handler.is_get_routes_called
+    assert app.http_handler.background_task_runner.is_shutdown_called
+    assert app.http_handler.router.handler_executor.is_shutdown_called
+    assert calls == ["startup", "shutdown"]
+    assert sent_messages == [
+        {"type": "lifespan.startup.complete"},
+        {"type": "lifespan.shutdown.complete"},
+    ]
+
+
 def test__app_add_router__sets_http_handler_router():
     # ARRANGE
     app = App(FakeHTTPHandler())
@@ -133,6 +264,217 @@ def test__app_add_router__sets_http_handler_router():
     assert app.http_handler.router == router
 
 
+def test__app_add_middleware__adds_middleware_to_http_handler():
+    # ARRANGE
+    app = App(FakeHTTPHandler())
+
+    async def middleware(request, call_next):
+        return await call_next(request)
+
+    # ACT
+    app.add_middleware(middleware, include_paths=["/admin"], methods=["GET"])
+
+    # ASSERT
+    assert app.http_handler.middlewares[0].func == middleware
+    assert app.http_handler.middlewares[0].include_paths == ("/admin",)
+    assert app.http_handler.middlewares[0].methods == frozenset(["GET"])
+
+
+def test__app_enable_admission_control__sets_controller_and_lag_monitor_hooks():
+    # ARRANGE
+    app = App(FakeHTTPHandler())
+    admission_settings = AdmissionSettings(lag_threshold=0.5)
+
+    # ACT
+    app.enable_admission_control(admission_settings)
+
+    # ASSERT
+    admission_controller = app.http_handler.admission_controller
+    assert admission_controller.settings == admission_settings
+    assert admission_controller.lag_monitor.start in (
+        app.lifespan_handler.startup_hooks
+    )
+    assert admission_controller.lag_monitor.stop in app.lifespan_handler.shutdown_hooks
+
+
+@pytest.mark.asyncio
+async def test__app_enable_instrumentation__installs_instrumentation_and_metrics_route():
+    # ARRANGE
+    app = App(FakeHTTPHandler())
+    sink = PrometheusSink()
+    sink.observe("handler", 0.01)
+
+    # ACT
+    app.enable_instrumentation(sink, metrics_path="/metrics")
+    response = await app.http_handler.router.get_route_funcs["/metrics"]()
+
+    # ASSERT
+    assert app.http_handler.instrumentation.sink is sink
+    assert isinstance(app.http_handler.response_sender, InstrumentedResponseSender)
+    assert response.headers == [(b"content-type", b"text/plain; version=0.0.4")]
+    assert response.body == sink.render()
+
+
+def test__app_enable_instrumentation__when_metrics_path_without_prometheus_sink__raises_value_error():
+    # ARRANGE
+    app = App(FakeHTTPHandler())
+
+    # ACT/ASSERT
+    with pytest.raises(ValueError):
+        app.enable_instrumentation(HistogramSink(), metrics_path="/metrics")
+    assert app.http_handler.instrumentation is None
+
+
+@pytest.mark.asyncio
+async def test__app_enable_loop_monitor__creates_monitor_and_debug_route():
+    # ARRANGE
+    app = App(FakeHTTPHandler())
+    sink = HistogramSink()
+    request = HTTPRequest(
+        "/debug/loop", "GET", {}, {}, {"authorization": "Bearer secret"}, b""
+    )
+
+    # ACT
+    app.enable_loop_monitor(sink, debug_path="/debug/loop", admin_token="secret")
+    report = await app.http_handler.router.get_route_funcs["/debug/loop"](
+        request=request
+    )
+
+    # ASSERT
+    assert app.loop_monitor.sink is sink
+    assert report == {"lag_seconds": 0.0, "max_lag_seconds": 0.0, "slow_callbacks": []}
+
+
+@pytest.mark.parametrize("headers", [{}, {"authorization": "Bearer wrong"}])
+@pytest.mark.asyncio
+async def test__app_enable_loop_monitor__when_token_missing_or_wrong__debug_route_raises_403(
+    headers,
+):
+    # ARRANGE
+    app = App(FakeHTTPHandler())
+    app.enable_loop_monitor(debug_path="/debug/loop", admin_token="secret")
+    request = HTTPRequest("/debug/loop", "GET", {}, {}, headers, b"")
+
+    # ACT
+    with pytest.raises(HTTPException) as exc_info:
+        await app.http_handler.router.get_route_funcs["/debug/loop"](request=request)
+
+    # ASSERT
+    assert exc_info.value.status_code == 403
+
+
+def test__app_enable_loop_monitor__when_debug_path_without_admin_token__raises_value_error():
+    # ARRANGE
+    app = App(FakeHTTPHandler())
+
+    # ACT
+    with pytest.raises(ValueError):
+        app.enable_loop_monitor(debug_path="/debug/loop")
+
+    # ASSERT
+    assert app.loop_monitor is None
+    assert app.http_handler.router.get_route_funcs == {}
+
+
+def test__app_enable_loop_monitor__when_no_debug_path__registers_no_route():
+    # ARRANGE
+    app = App(FakeHTTPHandler())
+
+    # ACT
+    app.enable_loop_monitor()
+
+    # ASSERT
+    assert app.loop_monitor.sink is None
+    assert app.http_handler.router.get_route_funcs == {}
+
+
+def test__app_enable_profiler__registers_profile_route_with_its_own_timeout():
+    # ARRANGE
+    app = App(FakeHTTPHandler())
+    profiler_settings = ProfilerSettings(
+        path="/admin/profile", admin_token="secret", max_seconds=30.0
+    )
+
+    # ACT
+    app.enable_profiler(profiler_settings)
+
+    # ASSERT
+    router = app.http_handler.router
+    endpoint = router.get_route_funcs["/admin/profile"]
+    assert isinstance(endpoint, ProfileEndpoint)
+    assert endpoint.settings is profiler_settings
+    assert router.get_route_options["/admin/profile"]["timeout"] == 35.0
+
+
+def test__app_enable_profiler__when_no_admin_token__raises_value_error():
+    # ARRANGE
+    app = App(FakeHTTPHandler())
+
+    # ACT
+    with pytest.raises(ValueError):
+        app.enable_profiler(ProfilerSettings())
+
+    # ASSERT
+    assert app.http_handler.router.get_route_funcs == {}
+
+
+def test__app_configure_rate_limiting__sets_backend_and_invalidates_compiled_routes():
+    # ARRANGE
+    app = App(FakeHTTPHandler())
+    app.http_handler.compiled_routes = {}
+    rate_limit_backend = InMemoryRateLimitBackend()
+
+    # ACT
+    app.configure_rate_limiting(rate_limit_backend)
+
+    # ASSERT
+    assert app.http_handler.rate_limit_backend == rate_limit_backend
+    assert app.http_handler.compiled_routes is None
+
+
+def test__app_configure_executors__replaces_router_handler_executor():
+    # ARRANGE
+    app = App(FakeHTTPHandler())
+    previous_handler_executor = app.http_handler.router.handler_executor
+    executor_settings = ExecutorSettings(max_threads=4)
+
+    # ACT
+    app.configure_executors(executor_settings)
+
+    # ASSERT
+    assert previous_handler_executor.is_shutdown_called
+    assert app.http_handler.router.handler_executor.settings == executor_settings
+
+
+def test__app_add_exception_mapping__registers_mapping_on_exception_mapper():
+    # ARRANGE
+    app = App(FakeHTTPHandler())
+
+    # ACT
+    app.add_exception_mapping(KeyError, 404, detail="Missing", log=True)
+
+    # ASSERT
+    mapping = app.http_handler.exception_mapper.mappings[KeyError]
+    assert mapping.status_code == 404
+    assert mapping.body == b'{"detail":"Missing"}'
+    assert mapping.log is True
+
+
+def test__app_exception_handler__registers_handler_on_exception_mapper():
+    # ARRANGE
+    app = App(FakeHTTPHandler())
+
+    # ACT
+    @app.exception_handler(KeyError)
+    def handle_key_error(request, exception):
+        pass
+
+    # ASSERT
+    assert app.http_handler.exception_mapper.mappings[KeyError].handler == (
+        handle_key_error
+    )
+
+
 def test__enable_cors__sets_http_handler_options_request_handler_cors_settings():
     # ARRANGE
     app = App(FakeHTTPHandler())
@@ -145,6 +487,230 @@ def test__enable_cors__sets_http_handler_options_request_handler_cors_settings()
     assert app.http_handler.options_request_handler.cors_settings == cors_settings
 
 
+def test__enable_compression__sets_http_handler_response_compressor():
+    # ARRANGE
+    app = App(FakeHTTPHandler())
+    compression_settings = CompressionSettings(minimum_size=10)
+
+    # ACT
+    app.enable_compression(compression_settings)
+
+    # ASSERT
+    assert isinstance(app.http_handler.response_compressor, ResponseCompressor)
+    assert app.http_handler.response_compressor.settings == compression_settings
+
+
+@pytest.mark.asyncio
+async def test__app__when_compression_and_serializers__varies_on_both():
+    # ARRANGE
+    app = App()
+    app.enable_compression(CompressionSettings(minimum_size=10))
+    app.configure_serializers(SerializerRegistry(default_serializer=ORJSONSerializer()))
+    messages = []
+
+    @app.get("/items")
+    async def items():
+        return {"items": ["a" * 100]}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    # ACT
+    await app(
+        {
+            "type": "http",
+            "path": "/items",
+            "method": "GET",
+            "query_string": b"",
+            "headers": [
+                (b"accept", b"application/json"),
+                (b"accept-encoding", b"gzip"),
+            ],
+        },
+        receive,
+        send,
+    )
+
+    # ASSERT
+    headers = messages[0]["headers"]
+    assert (b"content-encoding", b"gzip") in headers
+    assert [value for key, value in headers if key == b"vary"] == [
+        b"accept, accept-encoding"
+    ]
+
+
+@pytest.mark.parametrize("path", ["/items", "/stream"])
+@pytest.mark.asyncio
+async def test__app__when_compression__head_headers_match_get(path):
+    # ARRANGE
+    app = App()
+    app.enable_compression(CompressionSettings(minimum_size=10))
+
+    @app.get("/items")
+    async def items():
+        return {"items": ["a" * 100]}
+
+    @app.get("/stream")
+    async def stream():
+        async def body_iterator():
+            yield b"a" * 100
+
+        return StreamingHTTPResponse(
+            200, [(b"content-type", b"text/plain")], body_iterator()
+        )
+
+    async def request(method):
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        await app(
+            {
+                "type": "http",
+                "path": path,
+                "method": method,
+                "query_string": b"",
+                "headers": [(b"accept-encoding", b"gzip")],
+            },
+            receive,
+            send,
+        )
+        return messages
+
+    # ACT
+    get_messages = await request("GET")
+    head_messages = await request("HEAD")
+
+    # ASSERT
+    def without_content_length(headers):
+        return [(key, value) for key, value in headers if key != b"content-length"]
+
+    assert (b"content-encoding", b"gzip") in head_messages[0]["headers"]
+    assert all(key != b"content-length" for key, _ in head_messages[0]["headers"])
+    assert without_content_length(
+        head_messages[0]["headers"]
+    ) == without_content_length(get_messages[0]["headers"])
+    assert [message.get("body") for message in head_messages[1:]] == [b""]
+
+
+def test__app_cache__returns_response_cache_decorator():
+    # ARRANGE
+    app = App(FakeHTTPHandler())
+
+    async def handler():
+        return "value"
+
+    # ACT
+    wrapper = app.cache(ttl=10, query_params=["page"])(handler)
+
+    # ASSERT
+    assert wrapper.__name__ == "handler"
+
+
+@pytest.mark.asyncio
+async def test__app_coalesce__returns_request_coalescer_decorator():
+    # ARRANGE
+    app = App(FakeHTTPHandler())
+
+    @app.coalesce(headers=["Authorization"])
+    async def handler():
+        return "value"
+
+    # ACT
+    result = await handler(request=HTTPRequest("/", "GET", {}, {}, {}, b""))
+
+    # ASSERT
+    assert result == "value"
+
+
+def test__app_configure_response_cache__sets_response_cache_settings():
+    # ARRANGE
+    app = App(FakeHTTPHandler())
+    response_cache_settings = ResponseCacheSettings(max_bytes=10)
+
+    # ACT
+    app.configure_response_cache(response_cache_settings)
+
+    # ASSERT
+    assert app.response_cache.settings == response_cache_settings
+
+
+def test__enable_etags__sets_http_handler_default_request_handler_etags_enabled():
+    # ARRANGE
+    app = App(FakeHTTPHandler())
+
+    # ACT
+    app.enable_etags()
+
+    # ASSERT
+    assert app.http_handler.default_request_handler.etags_enabled is True
+
+
+def test__app_configure_serializers__sets_registry_on_all_response_senders():
+    # ARRANGE
+    app = App(FakeHTTPHandler())
+    app.http_handler.options_request_handler.response_sender = FakeResponseSender()
+    json_serializer = ORJSONSerializer()
+    serializer_registry = SerializerRegistry(default_serializer=json_serializer)
+
+    # ACT
+    app.configure_serializers(serializer_registry)
+
+    # ASSERT
+    response_senders = [
+        app.http_handler.response_sender,
+        app.http_handler.options_request_handler.response_sender,
+        app.http_handler.head_request_handler.response_sender,
+        app.http_handler.default_request_handler.response_sender,
+    ]
+    for response_sender in response_senders:
+        assert response_sender.serializer_registry == serializer_registry
+        assert response_sender.json_serializer == json_serializer
+
+
+def test__app_configure_serializers__when_no_json_serializer__keeps_json_serializer():
+    # ARRANGE
+    app = App(FakeHTTPHandler())
+    app.http_handler.options_request_handler.response_sender = FakeResponseSender()
+    serializer_registry = SerializerRegistry(default_serializer=RawSerializer())
+
+    # ACT
+    app.configure_serializers(serializer_registry)
+
+    # ASSERT
+    assert app.http_handler.response_sender.json_serializer is None
+    assert app.http_handler.response_sender.serializer_registry == serializer_registry
+
+
+def test__app_configure_drain_timeout__sets_background_task_runner_drain_timeout():
+    # ARRANGE
+    app = App(FakeHTTPHandler())
+
+    # ACT
+    app.configure_drain_timeout(5.0)
+
+    # ASSERT
+    assert app.http_handler.background_task_runner.drain_timeout == 5.0
+
+
+def test__app_configure_request_timeout__sets_http_handler_request_timeout():
+    # ARRANGE
+    app = App(FakeHTTPHandler())
+
+    # ACT
+    app.configure_request_timeout(5.0)
+
+    # ASSERT
+    assert app.http_handler.request_timeout == 5.0
+
+
 def test__enable_event_handling__sets_http_handler_event_handling_settings():
     # ARRANGE
     app = App(FakeHTTPHandler())
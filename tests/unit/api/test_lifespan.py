@@ -0,0 +1,132 @@
+import pytest
+
+from wibbley.api.lifespan import LifespanHandler
+
+
+class FakeReceive:
+    def __init__(self, messages):
+        self.messages = list(messages)
+
+    async def receive(self):
+        return self.messages.pop(0)
+
+
+class FakeSend:
+    def __init__(self):
+        self.messages = []
+
+    async def send(self, message):
+        self.messages.append(message)
+
+
+class FakeHookFactory:
+    def __init__(self, name, calls):
+        self.name = name
+        self.calls = calls
+
+    async def hook(self):
+        self.calls.append(self.name)
+
+    def sync_hook(self):
+        self.calls.append(self.name)
+
+    async def failing_hook(self):
+        self.calls.append(self.name)
+        raise RuntimeError(self.name)
+
+
+LIFESPAN_MESSAGES = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+
+
+@pytest.mark.asyncio
+async def test__lifespan_handler_handle__runs_startup_then_shutdown_hooks_in_reverse():
+    # ARRANGE
+    calls = []
+    lifespan_handler = LifespanHandler(
+        startup_hooks=[
+            FakeHookFactory("startup_1", calls).hook,
+            FakeHookFactory("startup_2", calls).sync_hook,
+        ],
+        shutdown_hooks=[
+            FakeHookFactory("shutdown_1", calls).hook,
+            FakeHookFactory("shutdown_2", calls).sync_hook,
+        ],
+    )
+    send = FakeSend()
+
+    # ACT
+    await lifespan_handler.handle(FakeReceive(LIFESPAN_MESSAGES).receive, send.send)
+
+    # ASSERT
+    assert calls == ["startup_1", "startup_2", "shutdown_2", "shutdown_1"]
+    assert send.messages == [
+        {"type": "lifespan.startup.complete"},
+        {"type": "lifespan.shutdown.complete"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test__lifespan_handler_handle__when_startup_hook_fails__sends_startup_failed():
+    # ARRANGE
+    calls = []
+    lifespan_handler = LifespanHandler(
+        startup_hooks=[
+            FakeHookFactory("startup_1", calls).failing_hook,
+            FakeHookFactory("startup_2", calls).hook,
+        ],
+    )
+    send = FakeSend()
+
+    # ACT
+    await lifespan_handler.handle(FakeReceive(LIFESPAN_MESSAGES).receive, send.send)
+
+    # ASSERT
+    assert calls == ["startup_1"]
+    assert send.messages == [
+        {"type": "lifespan.startup.failed", "message": "startup_1"}
+    ]
+
+
+@pytest.mark.asyncio
+async def test__lifespan_handler_handle__when_shutdown_hook_fails__runs_remaining_hooks_and_sends_shutdown_failed():
+    # ARRANGE
+    calls = []
+    lifespan_handler = LifespanHandler(
+        shutdown_hooks=[
+            FakeHookFactory("shutdown_1", calls).hook,
+            FakeHookFactory("shutdown_2", calls).failing_hook,
+        ],
+    )
+    send = FakeSend()
+
+    # ACT
+    await lifespan_handler.handle(FakeReceive(LIFESPAN_MESSAGES).receive, send.send)
+
+    # ASSERT
+    assert calls == ["shutdown_2", "shutdown_1"]
+    assert send.messages == [
+        {"type": "lifespan.startup.complete"},
+        {"type": "lifespan.shutdown.failed", "message": "shutdown_2"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test__lifespan_handler_shutdown__runs_drain_hooks_before_shutdown_hooks():
+    # ARRANGE
+    calls = []
+    lifespan_handler = LifespanHandler(
+        shutdown_hooks=[
+            FakeHookFactory("shutdown_1", calls).hook,
+            FakeHookFactory("shutdown_2", calls).hook,
+        ],
+        drain_hooks=[
+            FakeHookFactory("drain_1", calls).hook,
+            FakeHookFactory("drain_2", calls).sync_hook,
+        ],
+    )
+
+    # ACT
+    await lifespan_handler.shutdown()
+
+    # ASSERT
+    assert calls == ["drain_1", "drain_2", "shutdown_2", "shutdown_1"]
@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+
+from wibbley.event_driven.message_broker.message_broker import (
+    MessageBroker,
+    MessageBrokerSettings,
+)
+
+
+class FakeAdapter:
+    def __init__(self, connection_factory):
+        self.statements = []
+
+    def get_table_creation_statements(self):
+        return ["CREATE TABLE outbox"]
+
+    async def get_connection(self):
+        return "connection"
+
+    async def execute_stmt_on_connection(self, stmt, connection):
+        self.statements.append(stmt)
+
+    async def commit_connection(self, connection):
+        pass
+
+    async def close_connection(self, connection):
+        pass
+
+
+class FakeEventQueuePoller:
+    def __init__(self, queue):
+        self.queue = queue
+        self.handled = []
+
+    async def poll(self):
+        while True:
+            event = await self.queue.get()
+            await asyncio.sleep(0)
+            self.handled.append(event)
+            self.queue.task_done()
+
+
+class FakeDurablePoller:
+    def __init__(self):
+        self.scans = 0
+        self.finished = False
+
+    async def poll(self, stop_event):
+        while not stop_event.is_set():
+            self.scans += 1
+            await stop_event.wait()
+        self.finished = True
+
+
+class FakeMessageClient:
+    def __init__(self):
+        self.flushed = False
+
+    async def flush(self):
+        self.flushed = True
+
+
+def build_message_broker(queue, drain_timeout=1.0, message_clients=None):
+    message_broker = MessageBroker(
+        messagebus=None,
+        adapter_name="fake",
+        connection_factory=None,
+        message_broker_settings=MessageBrokerSettings(
+            event_handler_count=1,
+            outbox_poller_count=1,
+            fanout_poller_count=1,
+            drain_timeout=drain_timeout,
+        ),
+        queue=queue,
+        adapters={"fake": FakeAdapter},
+        message_clients=message_clients,
+    )
+    message_broker.event_queue_poller = FakeEventQueuePoller(queue)
+    message_broker.outbox_poller = FakeDurablePoller()
+    message_broker.fanout_poller = FakeDurablePoller()
+    return message_broker
+
+
+@pytest.mark.asyncio
+async def test__message_broker_start__when_durable_polling_disabled__only_polls_event_queue():
+    # ARRANGE
+    message_broker = build_message_broker(asyncio.Queue())
+    message_broker.durable_polling = False
+
+    # ACT
+    await message_broker.start()
+
+    # ASSERT
+    assert len(message_broker.tasks) == 1
+    assert message_broker.durable_tasks == []
+    assert message_broker.adapter.statements == []
+    await message_broker.stop()
+
+
+@pytest.mark.asyncio
+async def test__message_broker_stop__drains_queued_events_before_cancelling():
+    # ARRANGE
+    queue = asyncio.Queue()
+    message_client = FakeMessageClient()
+    message_broker = build_message_broker(queue, message_clients=[message_client])
+    await message_broker.start()
+    await asyncio.sleep(0)
+    for event in ["first", "second", "third"]:
+        queue.put_nowait(event)
+
+    # ACT
+    await message_broker.stop()
+
+    # ASSERT
+    assert message_broker.adapter.statements == ["CREATE TABLE outbox"]
+    assert message_broker.event_queue_poller.handled == ["first", "second", "third"]
+    assert message_broker.outbox_poller.finished
+    assert message_broker.fanout_poller.finished
+    assert message_client.flushed
+    assert message_broker.tasks == []
+    assert message_broker.durable_tasks == []
+
+
+@pytest.mark.asyncio
+async def test__message_broker_stop__when_drain_times_out__cancels_remaining_work():
+    # ARRANGE
+    queue = asyncio.Queue()
+    message_broker = build_message_broker(queue, drain_timeout=0.01)
+    message_broker.event_handler_count = 0
+    await message_broker.start()
+    queue.put_nowait("stuck")
+
+    # ACT
+    await message_broker.stop()
+
+    # ASSERT
+    assert queue.qsize() == 1
+    assert message_broker.tasks == []
@@ -0,0 +1,68 @@
+import asyncio
+import os
+
+import pytest
+
+from wibbley.event_driven.message_broker.queue import WibbleyQueue
+
+
+def test__wibbley_queue__creates_queue_on_first_use():
+    # ARRANGE
+    wibbley_queue = WibbleyQueue()
+
+    # ACT
+    before = wibbley_queue.queue
+    wibbley_queue.put_nowait("event")
+
+    # ASSERT
+    assert before is None
+    assert wibbley_queue.qsize() == 1
+
+
+def test__wibbley_queue_reset__drops_queue():
+    # ARRANGE
+    wibbley_queue = WibbleyQueue()
+    wibbley_queue.put_nowait("event")
+
+    # ACT
+    wibbley_queue.reset()
+
+    # ASSERT
+    assert wibbley_queue.queue is None
+    assert wibbley_queue.empty()
+
+
+@pytest.mark.asyncio
+async def test__wibbley_queue__delegates_coroutines_to_queue():
+    # ARRANGE
+    wibbley_queue = WibbleyQueue()
+
+    # ACT
+    await wibbley_queue.put("event")
+    result = await wibbley_queue.get()
+
+    # ASSERT
+    assert result == "event"
+    assert isinstance(wibbley_queue.get_queue(), asyncio.Queue)
+
+
+def test__wibbley_queue__when_forked__child_starts_with_new_queue():
+    # ARRANGE
+    from wibbley.event_driven.message_broker.queue import wibbley_queue
+
+    wibbley_queue.put_nowait("event")
+    read_fd, write_fd = os.pipe()
+
+    # ACT
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover
+        os.write(write_fd, str(wibbley_queue.queue is None).encode())
+        os._exit(0)
+    os.waitpid(pid, 0)
+    result = os.read(read_fd, 5)
+    os.close(read_fd)
+    os.close(write_fd)
+    wibbley_queue.reset()
+
+    # ASSERT
+    assert result == b"True"
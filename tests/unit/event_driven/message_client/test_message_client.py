@@ -6,6 +6,7 @@ import pytest
 
 from wibbley.event_driven.message_client.message_client import MessageClient
 from wibbley.event_driven.messagebus.messages import Event
+from wibbley.utilities.deadline import get_remaining_time, run_with_timeout
 
 
 class FakeConnectionFactory:
@@ -310,6 +311,56 @@ async def test__publish__creates_asyncio_task():
     assert fake_publish_task.called == True
 
 
+@pytest.mark.asyncio
+async def test__publish__when_called_under_request_deadline__publishes_without_it():
+    # ARRANGE
+    message_client = MessageClient(
+        adapter_name="fake",
+        connection_factory=FakeConnectionFactory(),
+        adapters={"fake": FakeAdapter},
+    )
+    remaining_times = []
+
+    async def publish_task(event, queue):
+        await asyncio.sleep(0.02)
+        remaining_times.append(get_remaining_time())
+
+    message_client._publish_task = publish_task
+
+    # ACT
+    await run_with_timeout(message_client.publish(Event()), 0.01)
+    await message_client.flush()
+
+    # ASSERT
+    assert remaining_times == [None]
+
+
+@pytest.mark.asyncio
+async def test__flush__waits_for_pending_publish_tasks():
+    # ARRANGE
+    allowed_adapters = {"fake": FakeAdapter}
+    message_client = MessageClient(
+        adapter_name="fake",
+        connection_factory=FakeConnectionFactory(),
+        adapters=allowed_adapters,
+    )
+    published = []
+
+    async def publish_task(event, queue):
+        await asyncio.sleep(0.01)
+        published.append(event)
+
+    message_client._publish_task = publish_task
+    await message_client.publish("event")
+
+    # ACT
+    await message_client.flush()
+
+    # ASSERT
+    assert published == ["event"]
+    assert message_client.publish_tasks == set()
+
+
 @pytest.mark.asyncio
 async def test__is_duplicate__when_is_duplicate__returns_true():
     # Arrange
@@ -5,6 +5,7 @@ import pytest
 from wibbley.event_driven.messagebus.messagebus import Messagebus, send
 from wibbley.event_driven.messagebus.messages import Command, Event, Query
 from wibbley.utilities.async_retry import AsyncRetry
+from wibbley.utilities.deadline import run_with_timeout
 
 
 class FakeClass:
@@ -263,6 +264,20 @@ async def test__messagebus_handle__when_command_handler_raises_exception__rerais
     assert str(e.value) == "Fake error"
 
 
+@pytest.mark.asyncio
+async def test__messagebus_handle__when_command_handler_exceeds_deadline__raises_timeout_error():
+    # Arrange
+    messagebus = Messagebus()
+
+    @messagebus.listen(Command)
+    async def fake_function(message):
+        await asyncio.sleep(10)
+
+    # Act/Assert
+    with pytest.raises(asyncio.TimeoutError):
+        await run_with_timeout(messagebus.handle(Command()), 0.01)
+
+
 @pytest.mark.asyncio
 async def test__messagebus_handle__when_message_is_query__returns_query_result():
     # Arrange
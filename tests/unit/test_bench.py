@@ -0,0 +1,676 @@
+import asyncio
+
+import pytest
+
+from wibbley.api import App
+from wibbley.bench import (
+    BenchResult,
+    BenchSettings,
+    LoadGenerator,
+    LoadRun,
+    find_baseline,
+    find_free_port,
+    find_regressions,
+    get_error_rate,
+    is_expected_status,
+    percentile,
+    read_response,
+    run_in_process,
+    select_stacks,
+    serve_subprocess,
+    wait_for_port,
+)
+
+RESPONSE = b"HTTP/1.1 200 OK\r\ncontent-length: 2\r\n\r\nok"
+
+
+def build_reader(data: bytes) -> asyncio.StreamReader:
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    reader.feed_eof()
+    return reader
+
+
+async def start_server(response: bytes = RESPONSE, port: int = 0):
+    requests = []
+
+    async def handle(reader, writer):
+        while True:
+            try:
+                requests.append(await reader.readuntil(b"\r\n\r\n"))
+            except asyncio.IncompleteReadError:
+                break
+            writer.write(response)
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", port)
+    return server, server.sockets[0].getsockname()[1], requests
+
+
+class FakeConnection:
+    def __init__(self):
+        self.is_close_called = False
+
+    def close(self):
+        self.is_close_called = True
+
+
+class FakeConnector:
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.addresses = []
+
+    def create_connection(self, address, timeout):
+        self.addresses.append(address)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionRefusedError()
+        return FakeConnection()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeProcess:
+    def __init__(self, args):
+        self.args = args
+        self.is_terminate_called = False
+        self.is_wait_called = False
+
+    def terminate(self):
+        self.is_terminate_called = True
+
+    def wait(self):
+        self.is_wait_called = True
+
+
+class FakeInProcessServer:
+    def __init__(self, config_kwargs, start=True):
+        self.config_kwargs = config_kwargs
+        self.start = start
+        self.started = False
+        self.should_exit = False
+
+    async def serve(self):
+        if not self.start:
+            return
+        server, _, _ = await start_server(port=self.config_kwargs["port"])
+        self.started = True
+        while not self.should_exit:
+            await asyncio.sleep(0.01)
+        server.close()
+
+
+def test__percentile__when_values_empty__returns_zero():
+    # ACT
+    result = percentile([], 99)
+
+    # ASSERT
+    assert result == 0.0
+
+
+def test__percentile__returns_nearest_rank():
+    # ARRANGE
+    values = [float(value) for value in range(1, 1001)]
+
+    # ACT
+    results = [percentile(values, pct) for pct in (0, 50, 90, 99.9, 100)]
+
+    # ASSERT
+    assert results == [1.0, 500.0, 900.0, 999.0, 1000.0]
+
+
+def test__bench_result_to_dict__reports_throughput_and_latency():
+    # ARRANGE
+    bench_result = BenchResult([0.003, 0.001, 0.002, 0.004], 2.0, 1, {200: 4}, 8)
+
+    # ACT
+    result = bench_result.to_dict()
+
+    # ASSERT
+    assert result == {
+        "requests": 4,
+        "errors": 1,
+        "error_rate": 0.2,
+        "concurrency": 8,
+        "duration_seconds": 2.0,
+        "requests_per_second": 2.0,
+        "latency_ms": {
+            "p50": 2.0,
+            "p90": 4.0,
+            "p99": 4.0,
+            "p99.9": 4.0,
+            "mean": 2.5,
+            "max": 4.0,
+        },
+        "status_codes": {"200": 4},
+    }
+
+
+def test__bench_result_to_dict__when_no_requests__reports_zeroes():
+    # ARRANGE
+    bench_result = BenchResult([], 0.0, 3, {}, 8)
+
+    # ACT
+    result = bench_result.to_dict()
+
+    # ASSERT
+    assert result["requests_per_second"] == 0.0
+    assert result["latency_ms"] == {"p50": 0.0, "p90": 0.0, "p99": 0.0, "p99.9": 0.0}
+
+
+@pytest.mark.parametrize(
+    "status_code, expected_status_codes, expected",
+    [
+        (200, None, True),
+        (204, None, True),
+        (301, None, False),
+        (404, None, False),
+        (302, (302,), True),
+        (200, (302,), False),
+    ],
+)
+def test__is_expected_status__defaults_to_2xx(
+    status_code, expected_status_codes, expected
+):
+    # ACT
+    result = is_expected_status(status_code, expected_status_codes)
+
+    # ASSERT
+    assert result is expected
+
+
+def test__bench_result_to_dict__when_unexpected_status__counts_it_as_error():
+    # ARRANGE
+    bench_result = BenchResult([0.001] * 4, 1.0, 0, {200: 1, 404: 3}, 8)
+
+    # ACT
+    result = bench_result.to_dict()
+
+    # ASSERT
+    assert result["requests"] == 4
+    assert result["errors"] == 3
+    assert result["error_rate"] == 0.75
+
+
+def test__bench_result_to_dict__when_status_expected__does_not_count_error():
+    # ARRANGE
+    bench_result = BenchResult([0.001] * 2, 1.0, 0, {302: 2}, 8, (302,))
+
+    # ACT
+    result = bench_result.to_dict()
+
+    # ASSERT
+    assert result["errors"] == 0
+    assert result["error_rate"] == 0.0
+
+
+@pytest.mark.parametrize(
+    "report, expected",
+    [
+        ({"error_rate": 0.5}, 0.5),
+        ({"requests": 3, "errors": 1}, 0.25),
+        ({"requests": 0, "errors": 0}, 0.0),
+    ],
+)
+def test__get_error_rate__reads_or_derives_rate(report, expected):
+    # ACT
+    result = get_error_rate(report)
+
+    # ASSERT
+    assert result == expected
+
+
+def test__find_regressions__when_within_tolerance__returns_empty_list():
+    # ARRANGE
+    baseline = {"requests_per_second": 1000.0, "latency_ms": {"p99": 10.0}}
+    result = {"requests_per_second": 910.0, "latency_ms": {"p99": 10.9}}
+
+    # ACT
+    regressions = find_regressions(result, baseline, 0.1)
+
+    # ASSERT
+    assert regressions == []
+
+
+def test__find_regressions__when_slower__returns_regressions():
+    # ARRANGE
+    baseline = {
+        "requests_per_second": 1000.0,
+        "latency_ms": {"p50": 1.0, "p99": 10.0, "max": 20.0, "p99.9": 30.0},
+    }
+    result = {
+        "requests_per_second": 800.0,
+        "latency_ms": {"p50": 1.0, "p99": 12.0, "max": 90.0},
+    }
+
+    # ACT
+    regressions = find_regressions(result, baseline, 0.1)
+
+    # ASSERT
+    assert regressions == [
+        "requests_per_second 800.0 is below 900.0 (baseline 1000.0)",
+        "p99 latency 12.0 ms is above 11.000 ms (baseline 10.0 ms)",
+    ]
+
+
+def test__find_regressions__when_errors_rise_or_status_mix_changes__returns_regressions():
+    # ARRANGE
+    baseline = {
+        "requests_per_second": 1000.0,
+        "errors": 0,
+        "requests": 100,
+        "latency_ms": {},
+        "status_codes": {"200": 100},
+    }
+    result = {
+        "requests_per_second": 1000.0,
+        "errors": 100,
+        "error_rate": 1.0,
+        "latency_ms": {},
+        "status_codes": {"404": 100},
+    }
+
+    # ACT
+    regressions = find_regressions(result, baseline, 0.1)
+
+    # ASSERT
+    assert regressions == [
+        "error_rate 1.0 is above 0.0000 (baseline 0.0)",
+        "status codes 404 differ from baseline 200",
+    ]
+
+
+def test__find_regressions__when_error_rate_within_tolerance__returns_empty_list():
+    # ARRANGE
+    baseline = {
+        "requests_per_second": 1000.0,
+        "error_rate": 0.1,
+        "latency_ms": {},
+        "status_codes": {"200": 90, "503": 10},
+    }
+    result = {
+        "requests_per_second": 1000.0,
+        "error_rate": 0.105,
+        "latency_ms": {},
+        "status_codes": {"503": 12, "200": 88},
+    }
+
+    # ACT
+    regressions = find_regressions(result, baseline, 0.1)
+
+    # ASSERT
+    assert regressions == []
+
+
+def test__select_stacks__pairs_uvicorn_with_each_parser_and_others_with_auto():
+    # ACT
+    result = select_stacks(["uvicorn", "hypercorn"], ["h11", "httptools"])
+
+    # ASSERT
+    assert result == [
+        ("uvicorn", "h11"),
+        ("uvicorn", "httptools"),
+        ("hypercorn", "auto"),
+    ]
+
+
+def test__find_baseline__returns_report_for_same_stack():
+    # ARRANGE
+    baselines = [
+        {"requests_per_second": 1.0},
+        {"server": "uvicorn", "http": "h11", "requests_per_second": 2.0},
+    ]
+
+    # ACT
+    results = [
+        find_baseline({"server": server, "http": http}, baselines)
+        for server, http in [
+            ("uvicorn", "auto"),
+            ("uvicorn", "h11"),
+            ("hypercorn", "auto"),
+        ]
+    ]
+
+    # ASSERT
+    assert results == [baselines[0], baselines[1], None]
+
+
+@pytest.mark.asyncio
+async def test__read_response__when_content_length__reads_body():
+    # ARRANGE
+    reader = build_reader(RESPONSE + b"next")
+
+    # ACT
+    result = await read_response(reader)
+
+    # ASSERT
+    assert result == (200, True)
+    assert await reader.read() == b"next"
+
+
+@pytest.mark.asyncio
+async def test__read_response__when_chunked__reads_chunks_and_trailers():
+    # ARRANGE
+    reader = build_reader(
+        b"HTTP/1.1 201 Created\r\nTransfer-Encoding: chunked\r\n\r\n"
+        b"3;ext=1\r\nabc\r\n2\r\nde\r\n0\r\nx-trailer: 1\r\n\r\nnext"
+    )
+
+    # ACT
+    result = await read_response(reader)
+
+    # ASSERT
+    assert result == (201, True)
+    assert await reader.read() == b"next"
+
+
+@pytest.mark.asyncio
+async def test__read_response__when_no_length__reads_until_close():
+    # ARRANGE
+    reader = build_reader(b"HTTP/1.1 200 OK\r\n\r\nbody")
+
+    # ACT
+    result = await read_response(reader)
+
+    # ASSERT
+    assert result == (200, False)
+    assert reader.at_eof()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "head, has_body, expected",
+    [
+        (b"HTTP/1.1 200 OK\r\ncontent-length: 5\r\n\r\n", False, (200, True)),
+        (b"HTTP/1.1 204 No Content\r\n\r\n", True, (204, True)),
+        (b"HTTP/1.1 304 Not Modified\r\nConnection: close\r\n\r\n", True, (304, False)),
+    ],
+)
+async def test__read_response__when_bodyless__does_not_read_body(
+    head, has_body, expected
+):
+    # ARRANGE
+    reader = build_reader(head + b"next")
+
+    # ACT
+    result = await read_response(reader, has_body)
+
+    # ASSERT
+    assert result == expected
+    assert await reader.read() == b"next"
+
+
+def test__load_run_acquire__when_deadline_passed__returns_false():
+    # ARRANGE
+    clock = FakeClock()
+    load_run = LoadRun(1.0, None, clock)
+
+    # ACT
+    before_deadline = load_run.acquire()
+    clock.now = 1.0
+    after_deadline = load_run.acquire()
+
+    # ASSERT
+    assert before_deadline is True
+    assert after_deadline is False
+
+
+def test__load_run_acquire__when_requests_used__returns_false():
+    # ARRANGE
+    load_run = LoadRun(1.0, 2, FakeClock())
+
+    # ACT
+    results = [load_run.acquire() for _ in range(3)]
+
+    # ASSERT
+    assert results == [True, True, False]
+
+
+def test__load_generator_build_request__includes_headers_and_body():
+    # ARRANGE
+    settings = BenchSettings(
+        port=9000,
+        path="/items",
+        method="post",
+        headers=[("accept", "application/json")],
+        body=b"{}",
+    )
+
+    # ACT
+    result = LoadGenerator(settings).request
+
+    # ASSERT
+    assert result == (
+        b"POST /items HTTP/1.1\r\nhost: 127.0.0.1:9000\r\n"
+        b"accept: application/json\r\ncontent-length: 2\r\n\r\n{}"
+    )
+
+
+@pytest.mark.asyncio
+async def test__load_generator_run__sends_requests_over_keep_alive_connections():
+    # ARRANGE
+    server, port, requests = await start_server()
+    settings = BenchSettings(
+        port=port, concurrency=2, duration=0, requests=10, warmup=0.01
+    )
+
+    # ACT
+    result = await LoadGenerator(settings).run()
+    server.close()
+    await server.wait_closed()
+
+    # ASSERT
+    assert len(result.latencies) == 10
+    assert result.status_codes == {200: 10}
+    assert result.errors == 0
+    assert len(requests) >= 10
+
+
+@pytest.mark.asyncio
+async def test__load_generator_run__when_server_closes__reconnects():
+    # ARRANGE
+    server, port, requests = await start_server(
+        b"HTTP/1.1 200 OK\r\nconnection: close\r\ncontent-length: 0\r\n\r\n"
+    )
+    settings = BenchSettings(port=port, concurrency=1, duration=5, warmup=0, requests=3)
+
+    # ACT
+    result = await LoadGenerator(settings).run()
+    server.close()
+    await server.wait_closed()
+
+    # ASSERT
+    assert result.status_codes == {200: 3}
+    assert len(requests) == 3
+
+
+@pytest.mark.asyncio
+async def test__load_generator_run__when_connection_refused__counts_errors():
+    # ARRANGE
+    settings = BenchSettings(
+        port=find_free_port("127.0.0.1"),
+        concurrency=1,
+        duration=5,
+        requests=3,
+        warmup=0,
+    )
+
+    # ACT
+    result = await LoadGenerator(settings).run()
+
+    # ASSERT
+    assert result.errors == 3
+    assert result.latencies == []
+
+
+def test__find_free_port__returns_bindable_port():
+    # ACT
+    result = find_free_port("127.0.0.1")
+
+    # ASSERT
+    assert 0 < result < 65536
+
+
+def test__wait_for_port__when_port_opens__returns_true():
+    # ARRANGE
+    connector = FakeConnector(failures=2)
+    clock = FakeClock()
+
+    # ACT
+    result = wait_for_port(
+        "127.0.0.1",
+        8000,
+        create_connection=connector.create_connection,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+
+    # ASSERT
+    assert result is True
+    assert connector.addresses == [("127.0.0.1", 8000)] * 3
+
+
+def test__wait_for_port__when_timeout_passes__returns_false():
+    # ARRANGE
+    connector = FakeConnector(failures=1000)
+    clock = FakeClock()
+
+    # ACT
+    result = wait_for_port(
+        "127.0.0.1",
+        8000,
+        timeout=1.0,
+        poll_interval=0.5,
+        create_connection=connector.create_connection,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+
+    # ASSERT
+    assert result is False
+    assert len(connector.addresses) == 2
+
+
+def test__serve_subprocess__starts_and_stops_server():
+    # ARRANGE
+    processes = []
+
+    def popen(args):
+        processes.append(FakeProcess(args))
+        return processes[-1]
+
+    # ACT
+    with serve_subprocess(
+        "src.app:app",
+        "127.0.0.1",
+        9000,
+        ["--workers", "2"],
+        popen=popen,
+        wait_for_port=lambda host, port, timeout: True,
+    ):
+        running = not processes[0].is_terminate_called
+
+    # ASSERT
+    assert running is True
+    assert processes[0].args[3:] == [
+        "--app",
+        "src.app:app",
+        "--host",
+        "127.0.0.1",
+        "--port",
+        "9000",
+        "--log-level",
+        "warning",
+        "--workers",
+        "2",
+    ]
+    assert processes[0].is_terminate_called is True
+    assert processes[0].is_wait_called is True
+
+
+def test__serve_subprocess__when_server_does_not_start__raises_and_stops_server():
+    # ARRANGE
+    processes = []
+
+    def popen(args):
+        processes.append(FakeProcess(args))
+        return processes[-1]
+
+    # ACT
+    with pytest.raises(RuntimeError):
+        with serve_subprocess(
+            "src.app:app",
+            "127.0.0.1",
+            9000,
+            popen=popen,
+            wait_for_port=lambda host, port, timeout: False,
+        ):
+            pass  # pragma: no cover
+
+    # ASSERT
+    assert processes[0].is_terminate_called is True
+
+
+@pytest.mark.asyncio
+async def test__run_in_process__serves_app_from_same_loop():
+    # ARRANGE
+    app = App()
+
+    @app.get("/")
+    async def index():
+        return "ok"
+
+    settings = BenchSettings(
+        port=find_free_port("127.0.0.1"), concurrency=2, duration=0, requests=5
+    )
+    settings.warmup = 0
+
+    # ACT
+    result = await run_in_process(app, settings)
+
+    # ASSERT
+    assert result.status_codes == {200: 5}
+
+
+@pytest.mark.asyncio
+async def test__run_in_process__when_server_starts__stops_it_after_run():
+    # ARRANGE
+    servers = []
+
+    def server_factory(config_kwargs):
+        servers.append(FakeInProcessServer(config_kwargs))
+        return servers[-1]
+
+    settings = BenchSettings(
+        port=find_free_port("127.0.0.1"), concurrency=1, duration=0, requests=2
+    )
+
+    # ACT
+    result = await run_in_process("app", settings, server_factory, http="h11")
+
+    # ASSERT
+    assert result.status_codes == {200: 2}
+    assert servers[0].config_kwargs["app"] == "app"
+    assert servers[0].config_kwargs["http"] == "h11"
+    assert servers[0].should_exit is True
+
+
+@pytest.mark.asyncio
+async def test__run_in_process__when_server_fails_to_start__raises_runtime_error():
+    # ARRANGE
+    settings = BenchSettings(port=9000)
+
+    # ACT
+    with pytest.raises(RuntimeError):
+        await run_in_process(
+            "app", settings, lambda config_kwargs: FakeInProcessServer({}, start=False)
+        )
@@ -1,19 +1,28 @@
 import asyncio
+import contextlib
 
+import orjson
 import pytest
 from click.testing import CliRunner
 
 from wibbley.api.app import App
+from wibbley.api.http_handler.profiling import ProfilerSettings
+from wibbley.bench import BenchResult
 from wibbley.event_driven.messagebus.messages import Event
 from wibbley.main import (
-    SignalHandlerInstaller,
-    install_signal_handlers,
+    build_loop_monitor,
+    load_app,
     load_module,
     main,
+    preload_app,
     print_version,
+    register_message_broker,
+    run_monitored,
+    run_worker,
     serve_app,
-    shutdown_handler,
 )
+from wibbley.supervisor import WORKER_BOOT_ERROR
+from wibbley.utilities.loop_monitor import LoopMonitor
 
 
 async def fake_handler(message):
@@ -22,57 +31,71 @@ async def fake_handler(message):
 
 class FakeMessageBroker:
     def __init__(self):
-        self.start_called = False
-        self.tasks = []
+        self.durable_polling = True
 
     async def start(self):
-        self.start_called = True
+        pass
 
+    async def stop(self):
+        pass
 
-class FakeTask:
-    def __init__(self):
-        self.done = False
-
-    def cancel(self):
-        self.done = True
 
-
-class FakeUvicornServer:
+class FakeApp:
     def __init__(self):
-        self.handle_exit_called = False
+        self.startup_hooks = []
+        self.shutdown_hooks = []
+        self.profiler_settings = None
+        self.drain_timeout = None
+
+    def enable_profiler(self, profiler_settings):
+        self.profiler_settings = profiler_settings
 
-    def handle_exit(self, sig, frame):
-        self.handle_exit_called = True
+    def configure_drain_timeout(self, drain_timeout):
+        self.drain_timeout = drain_timeout
 
+    def on_startup(self, func):
+        self.startup_hooks.append(func)
 
-class FakeInstaller:
-    def install(self, loop, signal, handler, server, tasks):
-        raise NotImplementedError("test")
+    def on_shutdown(self, func):
+        self.shutdown_hooks.append(func)
 
 
 class FakeServer:
     def __init__(self, config):
         self.config = config
         self.serve_called = False
+        self.sockets = None
 
-    async def serve(self):
+    async def serve(self, sockets=None):
         self.serve_called = True
+        self.sockets = sockets
 
 
-class FakeBackgroundTask:
+class FakeConfig:
     def __init__(self):
-        self.background_task_called = False
+        self.app = None
+        self.host = "127.0.0.1"
+        self.port = 8000
+        self.backlog = 2048
+
+
+class FakeGC:
+    def __init__(self):
+        self.calls = []
+
+    def collect(self):
+        self.calls.append("collect")
 
-    async def run(self, *args):
-        self.background_task_called = True
+    def freeze(self):
+        self.calls.append("freeze")
 
 
-class FakeSignalHandlerInstaller:
+class FakePreloadedApp:
     def __init__(self):
-        self.install_called = False
+        self.is_compile_routes_called = False
 
-    def install(self, *args, **kwargs):
-        self.install_called = True
+    def compile_routes(self):
+        self.is_compile_routes_called = True
 
 
 class FakeCTX:
@@ -133,102 +156,197 @@ def test__load_module__when_parameter_does_not_contain_colon__returns_none():
     assert module == None
 
 
-def test__shutdown_handler__cancels_tasks_and_calls_server_handle_exit():
+@pytest.mark.asyncio
+async def test__serve_app__runs_server():
     # ARRANGE
-    fake_task_1 = FakeTask()
-    fake_task_2 = FakeTask()
-    tasks = [fake_task_1, fake_task_2]
-    fake_server = FakeUvicornServer()
+    config = {}
+    server = FakeServer(config)
 
     # ACT
-    shutdown_handler(fake_server, tasks, "test")
+    await serve_app(server)
 
     # ASSERT
-    assert fake_task_1.done == True
-    assert fake_task_2.done == True
-    assert fake_server.handle_exit_called == True
+    assert server.serve_called == True
 
 
-def test__install_signal_handlers__registers_signal_handlers_on_asyncio_loop():
+def test__run_worker__when_not_first_worker__disables_durable_polling(mocker):
     # ARRANGE
-    loop = asyncio.get_event_loop()
-    fake_server = FakeUvicornServer()
-    task_1 = FakeTask()
-    tasks = [task_1]
+    message_broker = FakeMessageBroker()
+    mocker.patch("uvicorn.Server", FakeServer)
+    uvloop_run = mocker.patch("uvloop.run", side_effect=asyncio.run)
+    sockets = ["socket"]
 
     # ACT
-    install_signal_handlers(fake_server, tasks, loop)
+    run_worker(FakeConfig(), sockets, message_broker, 1)
 
     # ASSERT
-    assert loop._signal_handlers[2] != None
-    assert loop._signal_handlers[15] != None
+    assert message_broker.durable_polling is False
+    assert uvloop_run.called
 
 
-def test__signal_handler_installer_install__registers_signal_handlers_on_asyncio_loop():
+def test__run_worker__when_reuse_port__binds_own_listener(mocker):
     # ARRANGE
-    loop = asyncio.get_event_loop()
-    fake_server = FakeUvicornServer()
-    task_1 = FakeTask()
-    tasks = [task_1]
-    installer = SignalHandlerInstaller()
+    config = FakeConfig()
+    servers = []
+    mocker.patch(
+        "uvicorn.Server",
+        lambda config: servers.append(FakeServer(config)) or servers[-1],
+    )
+    mocker.patch("uvloop.run", side_effect=asyncio.run)
+    bind_reuseport_socket = mocker.patch(
+        "wibbley.main.bind_reuseport_socket", return_value="reuseport_socket"
+    )
 
     # ACT
-    installer.install(loop, 1, lambda: None, fake_server, tasks)
+    run_worker(config, None, None, 0, reuse_port=True)
 
     # ASSERT
-    assert loop._signal_handlers[1] != None
+    bind_reuseport_socket.assert_called_once_with("127.0.0.1", 8000, 2048)
+    assert servers[0].sockets == ["reuseport_socket"]
 
 
-def test__install_signal_handlers__when_installer_raises_exception__adds_signal_with_signal():
+def test__run_worker__when_app_path__loads_app_after_fork(mocker):
     # ARRANGE
-    loop = asyncio.get_event_loop()
-    fake_server = FakeUvicornServer()
-    task_1 = FakeTask()
-    tasks = [task_1]
-    installer = FakeInstaller()
+    app = FakeApp()
+    message_broker = FakeMessageBroker()
+    modules = {
+        "src.app:app": app,
+        "src.messagebus:message_broker": message_broker,
+    }
+    mocker.patch("wibbley.main.load_module", modules.get)
+    mocker.patch("uvicorn.Server", FakeServer)
+    mocker.patch("uvloop.run", side_effect=asyncio.run)
+    config = FakeConfig()
 
     # ACT
-    install_signal_handlers(fake_server, tasks, loop, installer)
+    run_worker(
+        config,
+        ["socket"],
+        None,
+        1,
+        app_path="src.app:app",
+        message_broker_path="src.messagebus:message_broker",
+        drain_timeout=5,
+    )
 
     # ASSERT
-    assert loop._signal_handlers[1] != None
+    assert config.app is app
+    assert app.shutdown_hooks == [message_broker.stop]
+    assert message_broker.drain_timeout == 5
+    assert message_broker.durable_polling is False
 
 
-@pytest.mark.asyncio
-async def test__serve_app__no_message_broker__runs_serve_app_task():
+def test__run_worker__when_app_cannot_be_loaded__exits_with_boot_error(mocker):
     # ARRANGE
-    config = {}
-    server = FakeServer(config)
+    mocker.patch("wibbley.main.load_module", {}.get)
 
     # ACT
-    await serve_app(
-        message_broker=None,
-        server=server,
-    )
+    with pytest.raises(SystemExit) as exc_info:
+        run_worker(FakeConfig(), ["socket"], None, 0, app_path="src.app:app")
 
     # ASSERT
-    assert server.serve_called == True
+    assert exc_info.value.code == WORKER_BOOT_ERROR
 
 
-def test__serve_app__when_message_broker__calls_start_and_installs_event_handlers():
+def test__run_worker__when_first_worker__keeps_durable_polling(mocker):
     # ARRANGE
-    signal_handler_installer = FakeSignalHandlerInstaller()
-    config = {}
-    server = FakeServer(config)
-    fake_message_broker = FakeMessageBroker()
+    message_broker = FakeMessageBroker()
+    mocker.patch("uvicorn.Server", FakeServer)
+    mocker.patch("uvloop.run", side_effect=asyncio.run)
 
     # ACT
-    asyncio.run(
-        serve_app(
-            fake_message_broker,
-            server,
-            signal_handler_installer.install,
-        )
+    run_worker(FakeConfig(), ["socket"], message_broker, 0)
+
+    # ASSERT
+    assert message_broker.durable_polling is True
+
+
+def test__load_app__when_message_broker_cannot_be_loaded__returns_none(mocker):
+    # ARRANGE
+    mocker.patch("wibbley.main.load_module", {"src.app:app": FakeApp()}.get)
+
+    # ACT
+    result = load_app("src.app:app", "src.messagebus:message_broker")
+
+    # ASSERT
+    assert result == (None, None)
+
+
+def test__load_app__when_profiler_settings__enables_profiler(mocker):
+    # ARRANGE
+    app = FakeApp()
+    profiler_settings = ProfilerSettings()
+    mocker.patch("wibbley.main.load_module", {"src.app:app": app}.get)
+
+    # ACT
+    result = load_app("src.app:app", None, profiler_settings=profiler_settings)
+
+    # ASSERT
+    assert result == (app, None)
+    assert app.profiler_settings is profiler_settings
+
+
+def test__preload_app__compiles_routes_then_freezes_gc():
+    # ARRANGE
+    app = FakePreloadedApp()
+    gc = FakeGC()
+
+    # ACT
+    preload_app(app, gc=gc)
+
+    # ASSERT
+    assert app.is_compile_routes_called
+    assert gc.calls == ["collect", "freeze"]
+
+
+def test__preload_app__when_app_has_no_routes__only_freezes_gc():
+    # ARRANGE
+    gc = FakeGC()
+
+    # ACT
+    preload_app(object(), gc=gc)
+
+    # ASSERT
+    assert gc.calls == ["collect", "freeze"]
+
+
+def test__register_message_broker__adds_start_and_stop_as_lifespan_hooks():
+    # ARRANGE
+    app = FakeApp()
+    message_broker = FakeMessageBroker()
+
+    # ACT
+    register_message_broker(app, message_broker)
+
+    # ASSERT
+    assert app.startup_hooks == [message_broker.start]
+    assert app.shutdown_hooks == [message_broker.stop]
+
+
+@pytest.mark.asyncio
+async def test__register_message_broker__drains_background_tasks_before_stopping_broker():
+    # ARRANGE
+    app = App()
+    calls = []
+
+    class RecordingMessageBroker(FakeMessageBroker):
+        async def stop(self):
+            calls.append("message_broker.stop")
+
+    async def publish_from_background():
+        await asyncio.sleep(0.01)
+        calls.append("background_task")
+
+    register_message_broker(app, RecordingMessageBroker())
+    app.http_handler.background_task_runner.schedule(
+        [(publish_from_background, (), {})]
     )
 
+    # ACT
+    await app.lifespan_handler.shutdown()
+
     # ASSERT
-    assert fake_message_broker.start_called == True
-    assert signal_handler_installer.install_called == True
+    assert calls == ["background_task", "message_broker.stop"]
 
 
 def test__print_version__when_value_and_no_resilient_parsing__calls_click_echo():
@@ -302,3 +420,811 @@ def test__main__when_successfully_loads_app__calls_serve_app(mocker):
     # ASSERT
     assert serve_app.called == True
     assert result.exit_code == 0
+
+
+def test__main__when_message_broker__registers_it_on_app(mocker):
+    # ARRANGE
+    app = FakeApp()
+    message_broker = FakeMessageBroker()
+    modules = {
+        "src.app:app": app,
+        "src.messagebus:message_broker": message_broker,
+    }
+    mocker.patch("wibbley.main.serve_app")
+    mocker.patch("wibbley.main.load_module", modules.get)
+    runner = CliRunner()
+
+    # ACT
+    result = runner.invoke(
+        main,
+        [
+            "--app",
+            "src.app:app",
+            "--message-broker",
+            "src.messagebus:message_broker",
+        ],
+    )
+
+    # ASSERT
+    assert result.exit_code == 0
+    assert app.startup_hooks == [message_broker.start]
+    assert app.shutdown_hooks == [message_broker.stop]
+
+
+def test__main__when_workers_and_reload__calls_sys_exit_1():
+    # ARRANGE
+    runner = CliRunner()
+
+    # ACT
+    result = runner.invoke(
+        main, ["--app", "wibbley.api.app:App", "--workers", "2", "--reload"]
+    )
+
+    # ASSERT
+    assert result.exit_code == 1
+
+
+def test__main__when_workers__runs_supervisor_with_shared_socket(mocker):
+    # ARRANGE
+    load_module = FakeLoadModuleSuccess()
+    mocker.patch("wibbley.main.load_module", load_module.load)
+    mocker.patch("uvicorn.Config.bind_socket", return_value="socket")
+    supervisor = mocker.patch("wibbley.main.Supervisor")
+    supervisor.return_value.boot_failed = False
+    serve_app = mocker.patch("wibbley.main.serve_app")
+    runner = CliRunner()
+
+    # ACT
+    result = runner.invoke(main, ["--app", "wibbley.api.app:App", "--workers", "3"])
+
+    # ASSERT
+    assert result.exit_code == 0
+    worker_count, target = supervisor.call_args.args
+    assert worker_count == 3
+    assert target.args[1] == ["socket"]
+    assert supervisor.return_value.install_signal_handlers.called
+    assert supervisor.return_value.run.called
+    assert serve_app.called is False
+
+
+def test__main__when_reuse_port_and_uds__calls_sys_exit_1():
+    # ARRANGE
+    runner = CliRunner()
+
+    # ACT
+    result = runner.invoke(
+        main,
+        ["--app", "wibbley.api.app:App", "--reuse-port", "--uds", "/tmp/app.sock"],
+    )
+
+    # ASSERT
+    assert result.exit_code == 1
+
+
+def test__main__when_reuse_port__runs_supervisor_without_shared_socket(mocker):
+    # ARRANGE
+    load_module = FakeLoadModuleSuccess()
+    mocker.patch("wibbley.main.load_module", load_module.load)
+    bind_socket = mocker.patch("uvicorn.Config.bind_socket")
+    supervisor = mocker.patch("wibbley.main.Supervisor")
+    supervisor.return_value.boot_failed = False
+    runner = CliRunner()
+
+    # ACT
+    result = runner.invoke(
+        main, ["--app", "wibbley.api.app:App", "--workers", "2", "--reuse-port"]
+    )
+
+    # ASSERT
+    assert result.exit_code == 0
+    _, target = supervisor.call_args.args
+    assert target.args[1] is None
+    assert target.keywords == {
+        "reuse_port": True,
+        "monitor_loop": False,
+        "app_path": "wibbley.api.app:App",
+        "message_broker_path": None,
+        "drain_timeout": None,
+        "profiler_settings": None,
+    }
+    assert bind_socket.called is False
+
+
+def test__main__when_preload__loads_app_in_supervisor_before_forking(mocker):
+    # ARRANGE
+    app = FakeApp()
+    message_broker = FakeMessageBroker()
+    modules = {
+        "src.app:app": app,
+        "src.messagebus:message_broker": message_broker,
+    }
+    mocker.patch("wibbley.main.load_module", modules.get)
+    mocker.patch("uvicorn.Config.bind_socket", return_value="socket")
+    preload_app = mocker.patch("wibbley.main.preload_app")
+    supervisor = mocker.patch("wibbley.main.Supervisor")
+    supervisor.return_value.boot_failed = False
+    runner = CliRunner()
+
+    # ACT
+    result = runner.invoke(
+        main,
+        [
+            "--app",
+            "src.app:app",
+            "--message-broker",
+            "src.messagebus:message_broker",
+            "--workers",
+            "2",
+            "--preload",
+        ],
+    )
+
+    # ASSERT
+    assert result.exit_code == 0
+    preload_app.assert_called_once_with(app)
+    _, target = supervisor.call_args.args
+    assert target.args[0].app is app
+    assert target.args[2] is message_broker
+    assert target.keywords == {"reuse_port": False, "monitor_loop": False}
+    assert app.startup_hooks == [message_broker.start]
+
+
+def test__main__when_preload_cannot_load_app__calls_sys_exit_1(mocker):
+    # ARRANGE
+    load_module = FakeLoadModuleFailure()
+    mocker.patch("wibbley.main.load_module", load_module.load)
+    supervisor = mocker.patch("wibbley.main.Supervisor")
+    runner = CliRunner()
+
+    # ACT
+    result = runner.invoke(
+        main, ["--app", "src.app:app", "--workers", "2", "--preload"]
+    )
+
+    # ASSERT
+    assert result.exit_code == 1
+    assert supervisor.called is False
+
+
+def test__main__when_worker_fails_to_boot__calls_sys_exit_1(mocker):
+    # ARRANGE
+    mocker.patch("uvicorn.Config.bind_socket", return_value="socket")
+    supervisor = mocker.patch("wibbley.main.Supervisor")
+    supervisor.return_value.boot_failed = True
+    runner = CliRunner()
+
+    # ACT
+    result = runner.invoke(main, ["--app", "src.app:app", "--workers", "2"])
+
+    # ASSERT
+    assert result.exit_code == 1
+
+
+def test__main__passes_loaded_app_to_uvicorn_config(mocker):
+    # ARRANGE
+    app = FakeApp()
+    mocker.patch("wibbley.main.load_module", {"src.app:app": app}.get)
+    config = mocker.patch("uvicorn.Config")
+    mocker.patch("uvicorn.Server", FakeServer)
+    mocker.patch("uvloop.run", side_effect=asyncio.run)
+    runner = CliRunner()
+
+    # ACT
+    result = runner.invoke(main, ["--app", "src.app:app"])
+
+    # ASSERT
+    assert result.exit_code == 0
+    assert config.call_args.kwargs["app"] is app
+
+
+def test__main__when_profiler__enables_profiler_with_admin_token(mocker):
+    # ARRANGE
+    app = FakeApp()
+    mocker.patch("wibbley.main.load_module", {"src.app:app": app}.get)
+    mocker.patch("uvicorn.Config")
+    mocker.patch("uvicorn.Server", FakeServer)
+    mocker.patch("uvloop.run", side_effect=asyncio.run)
+    runner = CliRunner()
+
+    # ACT
+    result = runner.invoke(
+        main,
+        ["--app", "src.app:app", "--profiler"],
+        env={"WIBBLEY_ADMIN_TOKEN": "secret"},
+    )
+
+    # ASSERT
+    assert result.exit_code == 0
+    assert app.profiler_settings.path == "/_wibbley/profile"
+    assert app.profiler_settings.admin_token == "secret"
+
+
+def test__main__when_profiler_without_admin_token__calls_sys_exit_1(mocker):
+    # ARRANGE
+    app = FakeApp()
+    mocker.patch("wibbley.main.load_module", {"src.app:app": app}.get)
+    runner = CliRunner()
+
+    # ACT
+    result = runner.invoke(
+        main, ["--app", "src.app:app", "--profiler"], env={"WIBBLEY_ADMIN_TOKEN": ""}
+    )
+
+    # ASSERT
+    assert result.exit_code == 1
+    assert app.profiler_settings is None
+
+
+def test__main__when_profiler_not_set__leaves_profiler_disabled(mocker):
+    # ARRANGE
+    app = FakeApp()
+    mocker.patch("wibbley.main.load_module", {"src.app:app": app}.get)
+    mocker.patch("uvicorn.Config")
+    mocker.patch("uvicorn.Server", FakeServer)
+    mocker.patch("uvloop.run", side_effect=asyncio.run)
+    runner = CliRunner()
+
+    # ACT
+    result = runner.invoke(main, ["--app", "src.app:app"])
+
+    # ASSERT
+    assert result.exit_code == 0
+    assert app.profiler_settings is None
+
+
+def test__main__when_reload__passes_import_string_to_uvicorn_config(mocker):
+    # ARRANGE
+    mocker.patch("wibbley.main.load_module", {"src.app:app": FakeApp()}.get)
+    config = mocker.patch("uvicorn.Config")
+    mocker.patch("uvicorn.Server", FakeServer)
+    mocker.patch("uvloop.run", side_effect=asyncio.run)
+    runner = CliRunner()
+
+    # ACT
+    result = runner.invoke(main, ["--app", "src.app:app", "--reload"])
+
+    # ASSERT
+    assert result.exit_code == 0
+    assert config.call_args.kwargs["app"] == "src.app:app"
+
+
+def test__main__when_drain_timeout__sets_app_and_message_broker_drain_timeout(mocker):
+    # ARRANGE
+    app = FakeApp()
+    message_broker = FakeMessageBroker()
+    modules = {
+        "src.app:app": app,
+        "src.messagebus:message_broker": message_broker,
+    }
+    mocker.patch("wibbley.main.load_module", modules.get)
+    mocker.patch("uvicorn.Server", FakeServer)
+    mocker.patch("uvloop.run", side_effect=asyncio.run)
+    runner = CliRunner()
+
+    # ACT
+    result = runner.invoke(
+        main,
+        [
+            "--app",
+            "src.app:app",
+            "--message-broker",
+            "src.messagebus:message_broker",
+            "--drain-timeout",
+            "2.5",
+        ],
+    )
+
+    # ASSERT
+    assert result.exit_code == 0
+    assert message_broker.drain_timeout == 2.5
+    assert app.drain_timeout == 2.5
+
+
+class FakeLoadGenerator:
+    def __init__(self, settings):
+        self.settings = settings
+
+    async def run(self):
+        return BenchResult(
+            [0.001, 0.002],
+            1.0,
+            0,
+            {200: 2},
+            self.settings.concurrency,
+            self.settings.expected_status_codes,
+        )
+
+
+class FakeServeSubprocess:
+    def __init__(self, error: Exception = None):
+        self.error = error
+        self.calls = []
+
+    @contextlib.contextmanager
+    def serve(self, app_path, host, port, server_args):
+        self.calls.append((app_path, host, port, server_args))
+        if self.error is not None:
+            raise self.error
+        yield
+
+
+def patch_bench(mocker, serve_subprocess: FakeServeSubprocess = None):
+    serve_subprocess = serve_subprocess or FakeServeSubprocess()
+    mocker.patch("wibbley.bench.serve_subprocess", serve_subprocess.serve)
+    mocker.patch("wibbley.bench.LoadGenerator", FakeLoadGenerator)
+    mocker.patch("uvloop.run", side_effect=asyncio.run)
+    return serve_subprocess
+
+
+def test__bench__runs_load_against_subprocess_and_prints_report(mocker, tmp_path):
+    # ARRANGE
+    serve_subprocess = patch_bench(mocker)
+    output = tmp_path / "report.json"
+    runner = CliRunner()
+
+    # ACT
+    result = runner.invoke(
+        main,
+        [
+            "bench",
+            "--app",
+            "src.app:app",
+            "--message-broker",
+            "src.messagebus:message_broker",
+            "--port",
+            "9000",
+            "--workers",
+            "2",
+            "--concurrency",
+            "4",
+            "--output",
+            str(output),
+        ],
+    )
+
+    # ASSERT
+    assert result.exit_code == 0
+    assert serve_subprocess.calls == [
+        (
+            "src.app:app",
+            "127.0.0.1",
+            9000,
+            [
+                "--server",
+                "uvicorn",
+                "--http",
+                "auto",
+                "--workers",
+                "2",
+                "--message-broker",
+                "src.messagebus:message_broker",
+            ],
+        )
+    ]
+    report = orjson.loads(result.output)
+    assert report["requests"] == 2
+    assert report["concurrency"] == 4
+    assert report["mode"] == "subprocess"
+    assert report["server"] == "uvicorn"
+    assert report["http"] == "auto"
+    assert orjson.loads(output.read_bytes()) == report
+
+
+def test__bench__when_expect_status__counts_other_statuses_as_errors(mocker, tmp_path):
+    # ARRANGE
+    patch_bench(mocker)
+    output = tmp_path / "report.json"
+    runner = CliRunner()
+
+    # ACT
+    result = runner.invoke(
+        main,
+        [
+            "bench",
+            "--app",
+            "src.app:app",
+            "--port",
+            "9000",
+            "--expect-status",
+            "201",
+            "--expect-status",
+            "202",
+            "--output",
+            str(output),
+        ],
+    )
+
+    # ASSERT
+    report = orjson.loads(output.read_bytes())
+    assert result.exit_code == 0
+    assert report["errors"] == 2
+    assert report["error_rate"] == 1.0
+
+
+def test__bench__when_port_not_given__uses_free_port(mocker):
+    # ARRANGE
+    serve_subprocess = patch_bench(mocker)
+    mocker.patch("wibbley.bench.find_free_port", return_value=9100)
+    runner = CliRunner()
+
+    # ACT
+    result = runner.invoke(main, ["bench", "--app", "src.app:app"])
+
+    # ASSERT
+    assert result.exit_code == 0
+    assert serve_subprocess.calls[0][2] == 9100
+
+
+def test__bench__when_server_fails_to_start__calls_sys_exit_1(mocker):
+    # ARRANGE
+    patch_bench(mocker, FakeServeSubprocess(RuntimeError("Server did not start")))
+    runner = CliRunner()
+
+    # ACT
+    result = runner.invoke(main, ["bench", "--app", "src.app:app", "--port", "9000"])
+
+    # ASSERT
+    assert result.exit_code == 1
+
+
+def test__bench__when_in_process__serves_loaded_app(mocker):
+    # ARRANGE
+    app = FakeApp()
+    calls = []
+
+    async def run_in_process(loaded_app, settings, http):
+        calls.append((loaded_app, settings, http))
+        return BenchResult([0.001], 1.0, 0, {200: 1}, settings.concurrency)
+
+    patch_bench(mocker)
+    mocker.patch("wibbley.bench.run_in_process", run_in_process)
+    mocker.patch("wibbley.main.load_module", {"src.app:app": app}.get)
+    runner = CliRunner()
+
+    # ACT
+    result = runner.invoke(
+        main,
+        [
+            "bench",
+            "--app",
+            "src.app:app",
+            "--mode",
+            "in-process",
+            "--port",
+            "9000",
+            "--header",
+            "accept: application/json",
+        ],
+    )
+
+    # ASSERT
+    assert result.exit_code == 0
+    assert calls[0][0] is app
+    assert calls[0][1].headers == [("accept", "application/json")]
+    assert calls[0][2] == "auto"
+    assert orjson.loads(result.output)["mode"] == "in-process"
+
+
+def test__bench__when_in_process_and_cannot_load_app__calls_sys_exit_1(mocker):
+    # ARRANGE
+    patch_bench(mocker)
+    mocker.patch("wibbley.main.load_module", {}.get)
+    runner = CliRunner()
+
+    # ACT
+    result = runner.invoke(
+        main, ["bench", "--app", "src.app:app", "--mode", "in-process", "--port", "1"]
+    )
+
+    # ASSERT
+    assert result.exit_code == 1
+
+
+@pytest.mark.parametrize(
+    "baseline_rps, expected_exit_code",
+    [(2.0, 0), (100.0, 1)],
+)
+def test__bench__when_baseline__exits_1_on_regression(
+    mocker, tmp_path, baseline_rps, expected_exit_code
+):
+    # ARRANGE
+    patch_bench(mocker)
+    baseline = tmp_path / "baseline.json"
+    baseline.write_bytes(
+        orjson.dumps({"requests_per_second": baseline_rps, "latency_ms": {"p99": 2.0}})
+    )
+    runner = CliRunner()
+
+    # ACT
+    result = runner.invoke(
+        main,
+        [
+            "bench",
+            "--app",
+            "src.app:app",
+            "--port",
+            "9000",
+            "--baseline",
+            str(baseline),
+        ],
+    )
+
+    # ASSERT
+    assert result.exit_code == expected_exit_code
+
+
+def test__bench__when_several_stacks__reports_each_and_compares_matching_baseline(
+    mocker, tmp_path
+):
+    # ARRANGE
+    serve_subprocess = patch_bench(mocker)
+    output = tmp_path / "report.json"
+    baseline = tmp_path / "baseline.json"
+    baseline.write_bytes(
+        orjson.dumps(
+            [
+                {
+                    "server": "hypercorn",
+                    "http": "auto",
+                    "requests_per_second": 100.0,
+                    "latency_ms": {},
+                }
+            ]
+        )
+    )
+    runner = CliRunner()
+
+    # ACT
+    result = runner.invoke(
+        main,
+        [
+            "bench",
+            "--app",
+            "src.app:app",
+            "--port",
+            "9000",
+            "--server",
+            "uvicorn",
+            "--server",
+            "hypercorn",
+            "--http",
+            "h11",
+            "--output",
+            str(output),
+            "--baseline",
+            str(baseline),
+        ],
+    )
+
+    # ASSERT
+    assert result.exit_code == 1
+    assert [call[3][:4] for call in serve_subprocess.calls] == [
+        ["--server", "uvicorn", "--http", "h11"],
+        ["--server", "hypercorn", "--http", "auto"],
+    ]
+    reports = orjson.loads(output.read_bytes())
+    assert [(report["server"], report["http"]) for report in reports] == [
+        ("uvicorn", "h11"),
+        ("hypercorn", "auto"),
+    ]
+
+
+def test__bench__when_in_process_with_hypercorn__calls_sys_exit_1(mocker):
+    # ARRANGE
+    patch_bench(mocker)
+    runner = CliRunner()
+
+    # ACT
+    result = runner.invoke(
+        main,
+        [
+            "bench",
+            "--app",
+            "src.app:app",
+            "--mode",
+            "in-process",
+            "--server",
+            "hypercorn",
+        ],
+    )
+
+    # ASSERT
+    assert result.exit_code == 1
+
+
+def test__main__when_http__passes_parser_to_uvicorn(mocker):
+    # ARRANGE
+    servers = []
+
+    def server_factory(config):
+        servers.append(FakeServer(config))
+        return servers[-1]
+
+    mocker.patch("wibbley.main.load_module", {"src.app:app": FakeApp()}.get)
+    mocker.patch("uvicorn.Server", server_factory)
+    mocker.patch("uvloop.run", side_effect=asyncio.run)
+    runner = CliRunner()
+
+    # ACT
+    result = runner.invoke(main, ["--app", "src.app:app", "--http", "h11"])
+
+    # ASSERT
+    assert result.exit_code == 0
+    assert servers[0].config.http == "h11"
+
+
+@pytest.mark.parametrize(
+    "args, installed",
+    [
+        (["--http", "httptools"], False),
+        (["--server", "hypercorn"], False),
+        (["--server", "hypercorn", "--workers", "2"], True),
+        (["--server", "hypercorn", "--reuse-port"], True),
+        (["--server", "hypercorn", "--http", "h11"], True),
+    ],
+)
+def test__main__when_server_options_unsupported__calls_sys_exit_1(
+    mocker, args, installed
+):
+    # ARRANGE
+    mocker.patch("wibbley.main.is_installed", return_value=installed)
+    serve_app = mocker.patch("wibbley.main.serve_app")
+    runner = CliRunner()
+
+    # ACT
+    result = runner.invoke(main, ["--app", "src.app:app", *args])
+
+    # ASSERT
+    assert result.exit_code == 1
+    assert serve_app.called is False
+
+
+def test__main__when_hypercorn__serves_app_with_hypercorn(mocker):
+    # ARRANGE
+    app = FakeApp()
+    calls = []
+
+    async def serve_hypercorn(loaded_app, config):
+        calls.append((loaded_app, config))
+
+    mocker.patch("wibbley.main.is_installed", return_value=True)
+    build_hypercorn_config = mocker.patch(
+        "wibbley.main.build_hypercorn_config", return_value="hypercorn_config"
+    )
+    mocker.patch("wibbley.main.serve_hypercorn", serve_hypercorn)
+    mocker.patch("wibbley.main.load_module", {"src.app:app": app}.get)
+    mocker.patch("uvloop.run", side_effect=asyncio.run)
+    runner = CliRunner()
+
+    # ACT
+    result = runner.invoke(
+        main, ["--app", "src.app:app", "--server", "hypercorn", "--port", "8443"]
+    )
+
+    # ASSERT
+    assert result.exit_code == 0
+    assert calls == [(app, "hypercorn_config")]
+    assert build_hypercorn_config.call_args.kwargs["port"] == 8443
+
+
+class FakeLoopMonitor:
+    def __init__(self):
+        self.calls = []
+
+    def start(self):
+        self.calls.append("start")
+
+    async def stop(self):
+        self.calls.append("stop")
+
+
+class FakeMonitoredApp(FakeApp):
+    def __init__(self):
+        super().__init__()
+        self.loop_monitor = FakeLoopMonitor()
+
+
+def test__build_loop_monitor__when_app_has_monitor__returns_it():
+    # ARRANGE
+    app = FakeMonitoredApp()
+
+    # ACT
+    result = build_loop_monitor(app, monitor_loop=False)
+
+    # ASSERT
+    assert result is app.loop_monitor
+
+
+@pytest.mark.parametrize(
+    "monitor_loop, expected_type", [(True, LoopMonitor), (False, type(None))]
+)
+def test__build_loop_monitor__when_app_has_no_monitor__creates_one_if_enabled(
+    monitor_loop, expected_type
+):
+    # ACT
+    result = build_loop_monitor(FakeApp(), monitor_loop)
+
+    # ASSERT
+    assert type(result) is expected_type
+
+
+@pytest.mark.asyncio
+async def test__serve_app__when_loop_monitor__runs_it_around_server():
+    # ARRANGE
+    server = FakeServer(FakeConfig())
+    loop_monitor = FakeLoopMonitor()
+
+    # ACT
+    await serve_app(server, loop_monitor=loop_monitor)
+
+    # ASSERT
+    assert server.serve_called is True
+    assert loop_monitor.calls == ["start", "stop"]
+
+
+@pytest.mark.asyncio
+async def test__run_monitored__when_coroutine_raises__stops_loop_monitor():
+    # ARRANGE
+    loop_monitor = FakeLoopMonitor()
+
+    async def fail():
+        raise RuntimeError()
+
+    # ACT
+    with pytest.raises(RuntimeError):
+        await run_monitored(fail(), loop_monitor)
+
+    # ASSERT
+    assert loop_monitor.calls == ["start", "stop"]
+
+
+def test__run_worker__when_monitor_loop__starts_monitor_in_worker(mocker):
+    # ARRANGE
+    config = FakeConfig()
+    config.app = FakeMonitoredApp()
+    mocker.patch("uvicorn.Server", FakeServer)
+    mocker.patch("uvloop.run", side_effect=asyncio.run)
+
+    # ACT
+    run_worker(config, ["socket"], None, 0, monitor_loop=True)
+
+    # ASSERT
+    assert config.app.loop_monitor.calls == ["start", "stop"]
+
+
+def test__main__when_loop_monitor__serves_app_with_monitor(mocker):
+    # ARRANGE
+    app = FakeMonitoredApp()
+    mocker.patch("wibbley.main.load_module", {"src.app:app": app}.get)
+    mocker.patch("uvicorn.Server", FakeServer)
+    mocker.patch("uvloop.run", side_effect=asyncio.run)
+    runner = CliRunner()
+
+    # ACT
+    result = runner.invoke(main, ["--app", "src.app:app", "--loop-monitor"])
+
+    # ASSERT
+    assert result.exit_code == 0
+    assert app.loop_monitor.calls == ["start", "stop"]
+
+
+def test__main__when_hypercorn__monitors_loop(mocker):
+    # ARRANGE
+    app = FakeMonitoredApp()
+
+    async def serve_hypercorn(loaded_app, config):
+        pass
+
+    mocker.patch("wibbley.main.is_installed", return_value=True)
+    mocker.patch("wibbley.main.build_hypercorn_config")
+    mocker.patch("wibbley.main.serve_hypercorn", serve_hypercorn)
+    mocker.patch("wibbley.main.load_module", {"src.app:app": app}.get)
+    mocker.patch("uvloop.run", side_effect=asyncio.run)
+    runner = CliRunner()
+
+    # ACT
+    result = runner.invoke(main, ["--app", "src.app:app", "--server", "hypercorn"])
+
+    # ASSERT
+    assert result.exit_code == 0
+    assert app.loop_monitor.calls == ["start", "stop"]
@@ -0,0 +1,133 @@
+import os
+import signal
+
+import pytest
+
+from wibbley.servers import (
+    build_hypercorn_bind,
+    build_hypercorn_config,
+    is_installed,
+    serve_hypercorn,
+)
+
+
+class FakeHypercornConfig:
+    def __init__(self):
+        self.graceful_timeout = 3.0
+        self.certfile = None
+        self.loglevel = "INFO"
+
+
+class FakeHypercornServe:
+    def __init__(self):
+        self.calls = []
+
+    async def serve(self, app, config, shutdown_trigger):
+        self.calls.append((app, config))
+        os.kill(os.getpid(), signal.SIGUSR1)
+        await shutdown_trigger()
+
+
+def test__is_installed__when_module_found__returns_true():
+    # ACT
+    result = is_installed("h11", find_spec=lambda name: object())
+
+    # ASSERT
+    assert result is True
+
+
+def test__is_installed__when_module_missing__returns_false():
+    # ACT
+    result = is_installed("hypercorn", find_spec=lambda name: None)
+
+    # ASSERT
+    assert result is False
+
+
+@pytest.mark.parametrize(
+    "host, port, uds, fd, expected",
+    [
+        ("127.0.0.1", 8000, None, None, "127.0.0.1:8000"),
+        ("::1", 8000, None, None, "[::1]:8000"),
+        ("127.0.0.1", 8000, "/tmp/wibbley.sock", None, "unix:/tmp/wibbley.sock"),
+        ("127.0.0.1", 8000, None, 3, "fd://3"),
+    ],
+)
+def test__build_hypercorn_bind__returns_bind_string(host, port, uds, fd, expected):
+    # ACT
+    result = build_hypercorn_bind(host, port, uds, fd)
+
+    # ASSERT
+    assert result == expected
+
+
+def test__build_hypercorn_config__when_defaults__keeps_hypercorn_defaults():
+    # ACT
+    config = build_hypercorn_config(
+        "127.0.0.1", 8000, config_factory=FakeHypercornConfig
+    )
+
+    # ASSERT
+    assert config.bind == ["127.0.0.1:8000"]
+    assert config.backlog == 2048
+    assert config.root_path == ""
+    assert config.keep_alive_timeout == 5
+    assert config.graceful_timeout == 3.0
+    assert config.certfile is None
+    assert config.loglevel == "INFO"
+
+
+def test__build_hypercorn_config__when_options_set__applies_them():
+    # ACT
+    config = build_hypercorn_config(
+        "0.0.0.0",
+        8443,
+        backlog=128,
+        root_path="/api",
+        timeout_keep_alive=10,
+        timeout_graceful_shutdown=20,
+        ssl_keyfile="key.pem",
+        ssl_certfile="cert.pem",
+        ssl_keyfile_password="secret",
+        ssl_ca_certs="ca.pem",
+        ssl_ciphers="ECDHE+AESGCM",
+        log_level="warning",
+        config_factory=FakeHypercornConfig,
+    )
+
+    # ASSERT
+    assert config.bind == ["0.0.0.0:8443"]
+    assert config.backlog == 128
+    assert config.root_path == "/api"
+    assert config.keep_alive_timeout == 10
+    assert config.graceful_timeout == 20
+    assert config.certfile == "cert.pem"
+    assert config.keyfile == "key.pem"
+    assert config.keyfile_password == "secret"
+    assert config.ca_certs == "ca.pem"
+    assert config.ciphers == "ECDHE+AESGCM"
+    assert config.loglevel == "WARNING"
+
+
+def test__build_hypercorn_config__when_trace_log_level__uses_debug():
+    # ACT
+    config = build_hypercorn_config(
+        "127.0.0.1", 8000, log_level="trace", config_factory=FakeHypercornConfig
+    )
+
+    # ASSERT
+    assert config.loglevel == "DEBUG"
+
+
+@pytest.mark.asyncio
+async def test__serve_hypercorn__when_signal_received__shuts_down():
+    # ARRANGE
+    hypercorn = FakeHypercornServe()
+
+    # ACT
+    await serve_hypercorn(
+        "app", "config", serve=hypercorn.serve, signals=(signal.SIGUSR1,)
+    )
+
+    # ASSERT
+    assert hypercorn.calls == [("app", "config")]
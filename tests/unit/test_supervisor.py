@@ -0,0 +1,344 @@
+import os
+import signal
+import socket
+
+from wibbley.supervisor import WORKER_BOOT_ERROR, Supervisor, bind_reuseport_socket
+
+
+class FakeProcesses:
+    def __init__(self, pids=None, exited=None):
+        self.pids = list(pids or [])
+        self.exited = list(exited or [])
+        self.killed = []
+        self.waited = []
+        self.exit_statuses = []
+
+    def fork(self):
+        return self.pids.pop(0)
+
+    def kill(self, pid, signum):
+        self.killed.append((pid, signum))
+
+    def waitpid(self, pid, options):
+        if pid != -1:
+            self.waited.append(pid)
+            return pid, 0
+        if not self.exited:
+            return 0, 0
+        result = self.exited.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def exit(self, status):
+        self.exit_statuses.append(status)
+
+
+class FakeSignal:
+    def __init__(self):
+        self.handlers = {}
+
+    def signal(self, signum, handler):
+        self.handlers[signum] = handler
+
+
+class FakeTarget:
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = []
+
+    def __call__(self, worker_index):
+        self.calls.append(worker_index)
+        if self.error is not None:
+            raise self.error
+
+
+class FakeSocket:
+    def __init__(self, family, type_):
+        self.family = family
+        self.type = type_
+        self.options = []
+        self.address = None
+        self.backlog = None
+
+    def setsockopt(self, level, option, value):
+        self.options.append((level, option, value))
+
+    def bind(self, address):
+        self.address = address
+
+    def listen(self, backlog):
+        self.backlog = backlog
+
+
+def build_supervisor(processes, target=None, worker_count=2, sleep=None):
+    return Supervisor(
+        worker_count,
+        target or FakeTarget(),
+        fork=processes.fork,
+        kill=processes.kill,
+        waitpid=processes.waitpid,
+        exit=processes.exit,
+        sleep=sleep or (lambda seconds: None),
+        signal=FakeSignal(),
+    )
+
+
+def test__bind_reuseport_socket__binds_listener_with_reuseport():
+    # ACT
+    sock = bind_reuseport_socket("127.0.0.1", 8000, 64, socket_factory=FakeSocket)
+
+    # ASSERT
+    assert sock.family == socket.AF_INET
+    assert (socket.SOL_SOCKET, socket.SO_REUSEPORT, 1) in sock.options
+    assert sock.address == ("127.0.0.1", 8000)
+    assert sock.backlog == 64
+
+
+def test__bind_reuseport_socket__when_ipv6_host__uses_ipv6_family():
+    # ACT
+    sock = bind_reuseport_socket("::1", 8000, socket_factory=FakeSocket)
+
+    # ASSERT
+    assert sock.family == socket.AF_INET6
+
+
+def test__bind_reuseport_socket__allows_several_listeners_on_one_port():
+    # ARRANGE
+    first = bind_reuseport_socket("127.0.0.1", 0)
+    port = first.getsockname()[1]
+
+    # ACT
+    second = bind_reuseport_socket("127.0.0.1", port)
+
+    # ASSERT
+    assert second.getsockname()[1] == port
+    first.close()
+    second.close()
+
+
+def test__supervisor_install_signal_handlers__handles_exit_and_reload_signals():
+    # ARRANGE
+    supervisor = build_supervisor(FakeProcesses())
+
+    # ACT
+    supervisor.install_signal_handlers()
+    supervisor.signal.handlers[signal.SIGHUP](signal.SIGHUP, None)
+    supervisor.signal.handlers[signal.SIGTERM](signal.SIGTERM, None)
+
+    # ASSERT
+    assert supervisor.should_reload
+    assert supervisor.should_exit
+    assert supervisor.signal.handlers[signal.SIGINT] == supervisor.handle_exit
+
+
+def test__supervisor_spawn__when_parent__records_worker_pid():
+    # ARRANGE
+    processes = FakeProcesses(pids=[101])
+    target = FakeTarget()
+    supervisor = build_supervisor(processes, target)
+
+    # ACT
+    supervisor.spawn(3)
+
+    # ASSERT
+    assert supervisor.workers == {101: 3}
+    assert target.calls == []
+
+
+def test__supervisor_spawn__when_child__runs_target_with_default_signals_and_exits():
+    # ARRANGE
+    processes = FakeProcesses(pids=[0])
+    target = FakeTarget()
+    supervisor = build_supervisor(processes, target)
+
+    # ACT
+    supervisor.spawn(1)
+
+    # ASSERT
+    assert target.calls == [1]
+    assert processes.exit_statuses == [0]
+    assert supervisor.workers == {}
+    assert supervisor.signal.handlers == {
+        signal.SIGHUP: signal.SIG_DFL,
+        signal.SIGINT: signal.SIG_DFL,
+        signal.SIGTERM: signal.SIG_DFL,
+    }
+
+
+def test__supervisor_spawn__when_child_target_raises__exits_with_status_1():
+    # ARRANGE
+    processes = FakeProcesses(pids=[0])
+    supervisor = build_supervisor(processes, FakeTarget(error=RuntimeError()))
+
+    # ACT
+    supervisor.spawn(0)
+
+    # ASSERT
+    assert processes.exit_statuses == [1]
+
+
+def test__supervisor_reap__when_worker_exits__restarts_it_with_same_index():
+    # ARRANGE
+    processes = FakeProcesses(pids=[201], exited=[(101, 9), (999, 0)])
+    supervisor = build_supervisor(processes)
+    supervisor.workers = {101: 0, 102: 1}
+
+    # ACT
+    supervisor.reap()
+
+    # ASSERT
+    assert supervisor.workers == {102: 1, 201: 0}
+
+
+def test__supervisor_spawn__when_child_target_exits__uses_exit_code():
+    # ARRANGE
+    processes = FakeProcesses(pids=[0, 0])
+    supervisor = build_supervisor(processes, FakeTarget(error=SystemExit(3)))
+
+    # ACT
+    supervisor.spawn(0)
+    supervisor.target.error = SystemExit("message")
+    supervisor.spawn(0)
+
+    # ASSERT
+    assert processes.exit_statuses == [3, 1]
+
+
+def test__supervisor_reap__when_worker_fails_to_boot__stops_supervisor():
+    # ARRANGE
+    boot_error_status = WORKER_BOOT_ERROR << 8
+    processes = FakeProcesses(exited=[(101, boot_error_status)])
+    supervisor = build_supervisor(processes)
+    supervisor.workers = {101: 0, 102: 1}
+
+    # ACT
+    supervisor.reap()
+
+    # ASSERT
+    assert os.WEXITSTATUS(boot_error_status) == WORKER_BOOT_ERROR
+    assert supervisor.boot_failed
+    assert supervisor.should_exit
+    assert supervisor.workers == {102: 1}
+
+
+def test__supervisor_reap__when_exiting__does_not_restart_workers():
+    # ARRANGE
+    processes = FakeProcesses(exited=[(101, 0), ChildProcessError()])
+    supervisor = build_supervisor(processes)
+    supervisor.workers = {101: 0, 102: 1}
+    supervisor.should_exit = True
+
+    # ACT
+    supervisor.reap()
+
+    # ASSERT
+    assert supervisor.workers == {102: 1}
+
+
+def test__supervisor_rolling_restart__replaces_workers_one_at_a_time():
+    # ARRANGE
+    processes = FakeProcesses(pids=[201, 202])
+    supervisor = build_supervisor(processes)
+    supervisor.workers = {101: 0, 102: 1}
+    supervisor.should_reload = True
+
+    # ACT
+    supervisor.rolling_restart()
+
+    # ASSERT
+    assert supervisor.should_reload is False
+    assert processes.killed == [(101, signal.SIGTERM), (102, signal.SIGTERM)]
+    assert processes.waited == [101, 102]
+    assert supervisor.workers == {201: 0, 202: 1}
+
+
+def test__supervisor_rolling_restart__when_exiting__stops_restarting():
+    # ARRANGE
+    processes = FakeProcesses()
+    supervisor = build_supervisor(processes)
+    supervisor.workers = {101: 0}
+    supervisor.should_exit = True
+
+    # ACT
+    supervisor.rolling_restart()
+
+    # ASSERT
+    assert supervisor.workers == {101: 0}
+    assert processes.killed == []
+
+
+def test__supervisor_stop_worker__when_worker_already_gone__returns_index():
+    # ARRANGE
+    processes = FakeProcesses()
+
+    def kill(pid, signum):
+        raise ProcessLookupError()
+
+    processes.kill = kill
+    supervisor = build_supervisor(processes)
+    supervisor.workers = {101: 4}
+
+    # ACT
+    result = supervisor.stop_worker(101)
+
+    # ASSERT
+    assert result == 4
+    assert supervisor.workers == {}
+
+
+def test__supervisor_shutdown__terminates_and_waits_for_all_workers():
+    # ARRANGE
+    processes = FakeProcesses()
+    supervisor = build_supervisor(processes)
+    supervisor.workers = {101: 0, 102: 1}
+
+    def kill(pid, signum):
+        if pid == 102:
+            raise ProcessLookupError()
+        processes.killed.append((pid, signum))
+
+    def waitpid(pid, options):
+        if pid == 102:
+            raise ChildProcessError()
+        processes.waited.append(pid)
+
+    processes.kill = kill
+    supervisor.kill = kill
+    supervisor.waitpid = waitpid
+
+    # ACT
+    supervisor.shutdown()
+
+    # ASSERT
+    assert processes.killed == [(101, signal.SIGTERM)]
+    assert processes.waited == [101]
+    assert supervisor.workers == {}
+
+
+def test__supervisor_run__spawns_workers_and_handles_reload_until_exit():
+    # ARRANGE
+    processes = FakeProcesses(pids=[101, 102, 201, 202])
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) == 1:
+            supervisor.should_reload = True
+        else:
+            supervisor.should_exit = True
+
+    supervisor = build_supervisor(processes, sleep=sleep)
+
+    # ACT
+    supervisor.run()
+
+    # ASSERT
+    assert sleeps == [0.5, 0.5]
+    assert processes.killed == [
+        (101, signal.SIGTERM),
+        (102, signal.SIGTERM),
+        (201, signal.SIGTERM),
+        (202, signal.SIGTERM),
+    ]
+    assert supervisor.workers == {}
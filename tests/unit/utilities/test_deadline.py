@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+from wibbley.utilities.deadline import (
+    DEADLINE,
+    create_detached_task,
+    get_remaining_time,
+    run_with_timeout,
+    wait_for_deadline,
+)
+
+
+@pytest.mark.asyncio
+async def test__get_remaining_time__when_no_deadline__returns_none():
+    # ACT
+    remaining_time = get_remaining_time()
+
+    # ASSERT
+    assert remaining_time is None
+
+
+@pytest.mark.asyncio
+async def test__run_with_timeout__sets_deadline_for_awaitable_and_resets_it():
+    # ARRANGE
+    async def fake_function():
+        return get_remaining_time()
+
+    # ACT
+    remaining_time = await run_with_timeout(fake_function(), 10)
+
+    # ASSERT
+    assert 0 < remaining_time <= 10
+    assert DEADLINE.get() is None
+
+
+@pytest.mark.asyncio
+async def test__run_with_timeout__when_outer_deadline_is_sooner__keeps_outer_deadline():
+    # ARRANGE
+    async def fake_function():
+        return get_remaining_time()
+
+    async def outer_function():
+        return await run_with_timeout(fake_function(), 10)
+
+    # ACT
+    remaining_time = await run_with_timeout(outer_function(), 1)
+
+    # ASSERT
+    assert remaining_time <= 1
+
+
+@pytest.mark.asyncio
+async def test__run_with_timeout__when_awaitable_is_too_slow__cancels_it_and_raises_timeout_error():
+    # ARRANGE
+    cancelled = False
+
+    async def fake_function():
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+
+    # ACT
+    with pytest.raises(asyncio.TimeoutError):
+        await run_with_timeout(fake_function(), 0.01)
+
+    # ASSERT
+    assert cancelled
+
+
+@pytest.mark.asyncio
+async def test__wait_for_deadline__when_no_deadline__awaits_awaitable():
+    # ARRANGE
+    async def fake_function():
+        return "result"
+
+    # ACT
+    result = await wait_for_deadline(fake_function())
+
+    # ASSERT
+    assert result == "result"
+
+
+@pytest.mark.asyncio
+async def test__wait_for_deadline__when_deadline_passes__raises_timeout_error():
+    # ARRANGE
+    async def fake_function():
+        await wait_for_deadline(asyncio.sleep(10))
+
+    # ACT/ASSERT
+    with pytest.raises(asyncio.TimeoutError):
+        await run_with_timeout(fake_function(), 0.01)
+
+
+@pytest.mark.asyncio
+async def test__create_detached_task__runs_without_request_deadline():
+    # ARRANGE
+    async def fake_function():
+        return get_remaining_time()
+
+    async def start_task():
+        return create_detached_task(fake_function())
+
+    # ACT
+    task = await run_with_timeout(start_task(), 10)
+    remaining_time = await task
+
+    # ASSERT
+    assert remaining_time is None
@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+from wibbley.utilities.loop_lag import LoopLagMonitor
+
+
+@pytest.mark.asyncio
+async def test__loop_lag_monitor_sample__records_non_negative_lag():
+    # ARRANGE
+    loop_lag_monitor = LoopLagMonitor(interval=0)
+
+    # ACT
+    await loop_lag_monitor.sample()
+
+    # ASSERT
+    assert loop_lag_monitor.lag >= 0
+
+
+@pytest.mark.asyncio
+async def test__loop_lag_monitor_start__runs_until_stopped():
+    # ARRANGE
+    loop_lag_monitor = LoopLagMonitor(interval=0)
+
+    # ACT
+    loop_lag_monitor.start()
+    task = loop_lag_monitor.task
+    loop_lag_monitor.start()
+    await asyncio.sleep(0.01)
+    await loop_lag_monitor.stop()
+
+    # ASSERT
+    assert task.cancelled()
+    assert loop_lag_monitor.task is None
+
+
+@pytest.mark.asyncio
+async def test__loop_lag_monitor_stop__when_not_started__does_nothing():
+    # ARRANGE
+    loop_lag_monitor = LoopLagMonitor()
+
+    # ACT
+    await loop_lag_monitor.stop()
+
+    # ASSERT
+    assert loop_lag_monitor.task is None
@@ -0,0 +1,264 @@
+import asyncio
+import inspect
+import threading
+import time
+
+import pytest
+
+from wibbley.utilities.loop_monitor import (
+    LOOP_LAG,
+    UNKNOWN,
+    LoopMonitor,
+    LoopMonitorSettings,
+    SlowCallbackDetector,
+    find_blocking_name,
+)
+from wibbley.utilities.metrics import HistogramSink
+
+
+class FakeCode:
+    def __init__(self, co_name, co_flags=0, co_qualname=None):
+        self.co_name = co_name
+        self.co_flags = co_flags
+        if co_qualname is not None:
+            self.co_qualname = co_qualname
+
+
+class FakeFrame:
+    def __init__(self, f_code, f_back=None, module="app"):
+        self.f_code = f_code
+        self.f_back = f_back
+        self.f_globals = {"__name__": module}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeLogger:
+    def __init__(self):
+        self.warnings = []
+
+    def warning(self, message):
+        self.warnings.append(message)
+
+
+class FakeLagMonitor:
+    def __init__(self, lags):
+        self.lags = list(lags)
+        self.lag = 0.0
+
+    async def sample(self):
+        if not self.lags:
+            await asyncio.Event().wait()
+        self.lag = self.lags.pop(0)
+
+
+class FakeDetector:
+    def __init__(self):
+        self.heartbeats = 0
+        self.thread_id = None
+        self.is_stop_called = False
+
+    def heartbeat(self):
+        self.heartbeats += 1
+
+    def start(self, thread_id):
+        self.thread_id = thread_id
+
+    def stop(self):
+        self.is_stop_called = True
+
+    def top(self, count):
+        return [{"name": "app.slow", "samples": count}]
+
+
+def build_detector(frames, clock=None, logger=None):
+    return SlowCallbackDetector(
+        LoopMonitorSettings(interval=0.1, slow_callback_duration=0.1),
+        clock=clock or FakeClock(),
+        current_frames=lambda: frames,
+        logger=logger or FakeLogger(),
+    )
+
+
+def test__find_blocking_name__returns_innermost_coroutine():
+    # ARRANGE
+    outer = FakeFrame(FakeCode("run_asgi", inspect.CO_COROUTINE), module="uvicorn")
+    handler = FakeFrame(
+        FakeCode("slow", inspect.CO_COROUTINE, "routes.slow"), f_back=outer
+    )
+    helper = FakeFrame(FakeCode("compute"), f_back=handler)
+
+    # ACT
+    result = find_blocking_name(helper)
+
+    # ASSERT
+    assert result == "app.routes.slow"
+
+
+def test__find_blocking_name__when_no_coroutine__returns_innermost_frame():
+    # ARRANGE
+    frame = FakeFrame(FakeCode("callback"), f_back=FakeFrame(FakeCode("run")))
+
+    # ACT
+    result = find_blocking_name(frame)
+
+    # ASSERT
+    assert result == "app.callback"
+
+
+def test__slow_callback_detector_check__when_no_heartbeat__does_nothing():
+    # ARRANGE
+    detector = build_detector({})
+
+    # ACT
+    detector.check()
+
+    # ASSERT
+    assert detector.top(10) == []
+
+
+def test__slow_callback_detector_check__when_loop_responsive__records_nothing():
+    # ARRANGE
+    clock = FakeClock()
+    detector = build_detector({}, clock)
+    detector.heartbeat()
+    clock.now = 0.2
+
+    # ACT
+    detector.check()
+
+    # ASSERT
+    assert detector.top(10) == []
+    assert detector.stalled is False
+
+
+def test__slow_callback_detector_check__when_loop_stalled__samples_blocking_coroutine():
+    # ARRANGE
+    clock = FakeClock()
+    logger = FakeLogger()
+    frame = FakeFrame(FakeCode("slow", inspect.CO_COROUTINE))
+    detector = build_detector({1: frame}, clock, logger)
+    detector.thread_id = 1
+    detector.heartbeat()
+    clock.now = 0.3
+
+    # ACT
+    detector.check()
+    detector.check()
+    detector.heartbeat()
+    detector.check()
+
+    # ASSERT
+    assert detector.top(10) == [
+        {"name": "app.slow", "samples": 2, "blocked_seconds": 0.04}
+    ]
+    assert logger.warnings == ["Event loop blocked for more than 0.1s in app.slow"]
+    assert detector.stalled is False
+
+
+def test__slow_callback_detector_check__when_thread_not_found__records_unknown():
+    # ARRANGE
+    clock = FakeClock()
+    detector = build_detector({}, clock)
+    detector.heartbeat()
+    clock.now = 1.0
+
+    # ACT
+    detector.check()
+
+    # ASSERT
+    assert detector.top(1)[0]["name"] == UNKNOWN
+
+
+def test__slow_callback_detector_start__runs_watchdog_until_stopped():
+    # ARRANGE
+    detector = SlowCallbackDetector(LoopMonitorSettings(sample_interval=0.001))
+
+    # ACT
+    detector.start(threading.get_ident())
+    thread = detector.thread
+    detector.start(threading.get_ident())
+    time.sleep(0.01)
+    detector.stop()
+    detector.stop()
+
+    # ASSERT
+    assert not thread.is_alive()
+    assert detector.thread is None
+    assert detector.last_heartbeat is None
+
+
+@pytest.mark.asyncio
+async def test__loop_monitor_run__reports_lag_to_sink_and_heartbeats():
+    # ARRANGE
+    sink = HistogramSink()
+    detector = FakeDetector()
+    loop_monitor = LoopMonitor(
+        sink, lag_monitor=FakeLagMonitor([0.01, 0.3, 0.02]), detector=detector
+    )
+
+    # ACT
+    loop_monitor.start()
+    await asyncio.sleep(0.01)
+    report = loop_monitor.report()
+    await loop_monitor.stop()
+
+    # ASSERT
+    assert sink.histograms[LOOP_LAG].count == 3
+    assert detector.heartbeats == 3
+    assert detector.thread_id == threading.get_ident()
+    assert detector.is_stop_called is True
+    assert report == {
+        "lag_seconds": 0.02,
+        "max_lag_seconds": 0.3,
+        "slow_callbacks": [{"name": "app.slow", "samples": 10}],
+    }
+
+
+@pytest.mark.asyncio
+async def test__loop_monitor_start__when_already_started__keeps_task():
+    # ARRANGE
+    loop_monitor = LoopMonitor(lag_monitor=FakeLagMonitor([]), detector=FakeDetector())
+
+    # ACT
+    loop_monitor.start()
+    task = loop_monitor.task
+    loop_monitor.start()
+    await loop_monitor.stop()
+    await loop_monitor.stop()
+
+    # ASSERT
+    assert task.cancelled()
+    assert loop_monitor.task is None
+
+
+@pytest.mark.asyncio
+async def test__loop_monitor__when_handler_blocks_loop__reports_handler_by_name():
+    # ARRANGE
+    loop_monitor = LoopMonitor(
+        loop_monitor_settings=LoopMonitorSettings(
+            interval=0.01, slow_callback_duration=0.01, sample_interval=0.005
+        )
+    )
+    loop_monitor.detector.logger = FakeLogger()
+
+    async def blocking_handler():
+        time.sleep(0.2)
+
+    # ACT
+    loop_monitor.start()
+    await asyncio.sleep(0.02)
+    await blocking_handler()
+    await asyncio.sleep(0.02)
+    await loop_monitor.stop()
+
+    # ASSERT
+    report = loop_monitor.report()
+    assert report["slow_callbacks"][0]["name"].endswith("blocking_handler")
+    assert report["max_lag_seconds"] >= 0.1
@@ -0,0 +1,111 @@
+from wibbley.utilities.metrics import (
+    Histogram,
+    HistogramSink,
+    PrometheusSink,
+    StatsDSink,
+)
+
+
+class FakeSocket:
+    def __init__(self, family, type_, error=None):
+        self.family = family
+        self.type = type_
+        self.error = error
+        self.blocking = True
+        self.sent = []
+        self.is_closed = False
+
+    def setblocking(self, flag):
+        self.blocking = flag
+
+    def sendto(self, payload, address):
+        if self.error is not None:
+            raise self.error
+        self.sent.append((payload, address))
+
+    def close(self):
+        self.is_closed = True
+
+
+def test__histogram_observe__counts_value_in_first_matching_bucket():
+    # ARRANGE
+    histogram = Histogram(buckets=(0.1, 0.01))
+
+    # ACT
+    histogram.observe(0.01)
+    histogram.observe(0.05)
+    histogram.observe(2)
+
+    # ASSERT
+    assert histogram.buckets == (0.01, 0.1)
+    assert histogram.bucket_counts == [1, 1, 1]
+    assert histogram.count == 3
+    assert histogram.sum == 2.06
+    assert histogram.cumulative_counts() == [(0.01, 1), (0.1, 2), (float("inf"), 3)]
+
+
+def test__histogram_sink_observe__keeps_one_histogram_per_name():
+    # ARRANGE
+    sink = HistogramSink(buckets=(0.1,))
+
+    # ACT
+    sink.observe("handler", 0.05)
+    sink.observe("handler", 0.5)
+    sink.observe("send", 0.05)
+
+    # ASSERT
+    assert sink.histograms["handler"].count == 2
+    assert sink.histograms["send"].count == 1
+
+
+def test__prometheus_sink_render__returns_text_exposition_format():
+    # ARRANGE
+    sink = PrometheusSink(buckets=(0.1,))
+    sink.observe("send", 0.25)
+    sink.observe("handler", 0.05)
+
+    # ACT
+    result = sink.render()
+
+    # ASSERT
+    assert result == (
+        b"# TYPE wibbley_handler_seconds histogram\n"
+        b'wibbley_handler_seconds_bucket{le="0.1"} 1\n'
+        b'wibbley_handler_seconds_bucket{le="+Inf"} 1\n'
+        b"wibbley_handler_seconds_sum 0.05\n"
+        b"wibbley_handler_seconds_count 1\n"
+        b"# TYPE wibbley_send_seconds histogram\n"
+        b'wibbley_send_seconds_bucket{le="0.1"} 0\n'
+        b'wibbley_send_seconds_bucket{le="+Inf"} 1\n'
+        b"wibbley_send_seconds_sum 0.25\n"
+        b"wibbley_send_seconds_count 1\n"
+    )
+
+
+def test__statsd_sink_observe__sends_timing_in_milliseconds():
+    # ARRANGE
+    sink = StatsDSink(port=9125, socket_factory=FakeSocket)
+
+    # ACT
+    sink.observe("handler", 0.0125)
+
+    # ASSERT
+    assert sink.socket.blocking is False
+    assert sink.socket.sent == [(b"wibbley.handler:12.500|ms", ("127.0.0.1", 9125))]
+
+
+def test__statsd_sink_observe__when_send_fails__drops_metric():
+    # ARRANGE
+    sink = StatsDSink(
+        socket_factory=lambda family, type_: FakeSocket(
+            family, type_, error=BlockingIOError()
+        )
+    )
+
+    # ACT
+    sink.observe("handler", 0.01)
+    sink.close()
+
+    # ASSERT
+    assert sink.socket.sent == []
+    assert sink.socket.is_closed
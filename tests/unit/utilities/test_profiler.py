@@ -0,0 +1,141 @@
+import inspect
+import threading
+import time
+
+from wibbley.utilities.profiler import (
+    IDLE,
+    SamplingProfiler,
+    collapse_stack,
+    is_idle,
+)
+
+
+class FakeCode:
+    def __init__(self, co_name, co_flags=0):
+        self.co_name = co_name
+        self.co_flags = co_flags
+
+
+class FakeFrame:
+    def __init__(self, f_code, f_back=None, module="app"):
+        self.f_code = f_code
+        self.f_back = f_back
+        self.f_globals = {"__name__": module}
+
+
+def build_handler_stack(handler_name="list_users"):
+    run = FakeFrame(FakeCode("run"), module="asyncio.runners")
+    task_step = FakeFrame(FakeCode("_step"), f_back=run, module="asyncio.tasks")
+    asgi = FakeFrame(
+        FakeCode("run_asgi", inspect.CO_COROUTINE), f_back=task_step, module="uvicorn"
+    )
+    handler = FakeFrame(FakeCode(handler_name, inspect.CO_COROUTINE), f_back=asgi)
+    return FakeFrame(FakeCode("serialize"), f_back=handler)
+
+
+def test__is_idle__when_frame_in_selector__returns_true():
+    # ACT
+    result = is_idle(FakeFrame(FakeCode("select"), module="selectors"))
+
+    # ASSERT
+    assert result is True
+
+
+def test__is_idle__when_frame_in_app__returns_false():
+    # ACT
+    result = is_idle(FakeFrame(FakeCode("handler")))
+
+    # ASSERT
+    assert result is False
+
+
+def test__collapse_stack__trims_frames_above_outermost_coroutine():
+    # ACT
+    result = collapse_stack(build_handler_stack())
+
+    # ASSERT
+    assert result == "uvicorn.run_asgi;app.list_users;app.serialize"
+
+
+def test__collapse_stack__when_no_coroutine__keeps_whole_stack():
+    # ARRANGE
+    frame = FakeFrame(FakeCode("callback"), f_back=FakeFrame(FakeCode("run")))
+
+    # ACT
+    result = collapse_stack(frame)
+
+    # ASSERT
+    assert result == "app.run;app.callback"
+
+
+def test__collapse_stack__when_idle__returns_none():
+    # ACT
+    result = collapse_stack(FakeFrame(FakeCode("select"), module="selectors"))
+
+    # ASSERT
+    assert result is None
+
+
+def test__collapse_stack__when_idle_included__returns_idle_marker():
+    # ACT
+    result = collapse_stack(
+        FakeFrame(FakeCode("select"), module="selectors"), include_idle=True
+    )
+
+    # ASSERT
+    assert result == IDLE
+
+
+def test__sampling_profiler_sample__aggregates_stacks_across_samples():
+    # ARRANGE
+    frames = [
+        build_handler_stack("list_users"),
+        build_handler_stack("list_users"),
+        build_handler_stack("get_user"),
+        FakeFrame(FakeCode("select"), module="selectors"),
+    ]
+    profiler = SamplingProfiler(1, current_frames=lambda: {1: frames.pop(0)})
+
+    # ACT
+    for _ in range(4):
+        profiler.sample()
+
+    # ASSERT
+    assert profiler.sample_count == 4
+    assert profiler.render() == (
+        b"uvicorn.run_asgi;app.list_users;app.serialize 2\n"
+        b"uvicorn.run_asgi;app.get_user;app.serialize 1\n"
+    )
+
+
+def test__sampling_profiler_sample__when_thread_not_found__skips_sample():
+    # ARRANGE
+    profiler = SamplingProfiler(1, current_frames=lambda: {})
+
+    # ACT
+    profiler.sample()
+
+    # ASSERT
+    assert profiler.sample_count == 0
+    assert profiler.render() == b""
+
+
+def test__sampling_profiler_start__samples_thread_until_stopped():
+    # ARRANGE
+    profiler = SamplingProfiler(threading.get_ident(), interval=0.001)
+
+    # ACT
+    profiler.start()
+    thread = profiler.thread
+    profiler.start()
+    time.sleep(0.02)
+    profiler.stop()
+    profiler.stop()
+
+    # ASSERT
+    assert not thread.is_alive()
+    assert profiler.thread is None
+    assert profiler.sample_count > 0
+    assert b"test__sampling_profiler_start__samples_thread_until_stopped" in (
+        profiler.render()
+    )
@@ -0,0 +1,169 @@
+import asyncio
+
+import pytest
+
+from wibbley.utilities.singleflight import SingleFlight
+
+
+class FakeWorkFactory:
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.cancelled = False
+
+    async def work(self):
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return "result"
+
+    async def failing_work(self):
+        self.calls += 1
+        await self.release.wait()
+        raise ValueError("Fake error")
+
+
+@pytest.mark.asyncio
+async def test__single_flight_do__when_concurrent_calls__runs_func_once_and_shares_result():
+    # ARRANGE
+    single_flight = SingleFlight()
+    work_factory = FakeWorkFactory()
+
+    # ACT
+    tasks = [
+        asyncio.create_task(single_flight.do("key", work_factory.work))
+        for _ in range(5)
+    ]
+    await asyncio.sleep(0)
+    work_factory.release.set()
+    results = await asyncio.gather(*tasks)
+
+    # ASSERT
+    assert work_factory.calls == 1
+    assert results == ["result"] * 5
+    assert single_flight.calls == {}
+
+
+@pytest.mark.asyncio
+async def test__single_flight_do__when_result_not_shareable__runs_func_for_each_follower():
+    # ARRANGE
+    single_flight = SingleFlight()
+    work_factory = FakeWorkFactory()
+    shared_results = []
+
+    def shareable(result):
+        shared_results.append(result)
+        return False
+
+    # ACT
+    tasks = [
+        asyncio.create_task(single_flight.do("key", work_factory.work, shareable))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    work_factory.release.set()
+    results = await asyncio.gather(*tasks)
+
+    # ASSERT
+    assert work_factory.calls == 3
+    assert results == ["result"] * 3
+    assert shared_results == ["result"] * 2
+
+
+@pytest.mark.asyncio
+async def test__single_flight_do__when_func_raises__raises_for_every_waiter():
+    # ARRANGE
+    single_flight = SingleFlight()
+    work_factory = FakeWorkFactory()
+
+    # ACT
+    tasks = [
+        asyncio.create_task(single_flight.do("key", work_factory.failing_work))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    work_factory.release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    # ASSERT
+    assert work_factory.calls == 1
+    assert all(isinstance(result, ValueError) for result in results)
+    assert single_flight.calls == {}
+
+
+@pytest.mark.asyncio
+async def test__single_flight_do__when_one_waiter_cancelled__others_still_get_result():
+    # ARRANGE
+    single_flight = SingleFlight()
+    work_factory = FakeWorkFactory()
+    first = asyncio.create_task(single_flight.do("key", work_factory.work))
+    second = asyncio.create_task(single_flight.do("key", work_factory.work))
+    await asyncio.sleep(0)
+
+    # ACT
+    first.cancel()
+    await asyncio.sleep(0)
+    work_factory.release.set()
+    result = await second
+
+    # ASSERT
+    assert first.cancelled()
+    assert result == "result"
+    assert not work_factory.cancelled
+
+
+@pytest.mark.asyncio
+async def test__single_flight_do__when_last_waiter_cancelled__cancels_func():
+    # ARRANGE
+    single_flight = SingleFlight()
+    work_factory = FakeWorkFactory()
+    task = asyncio.create_task(single_flight.do("key", work_factory.work))
+    await asyncio.sleep(0)
+
+    # ACT
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    # ASSERT
+    assert work_factory.cancelled
+    assert single_flight.calls == {}
+
+
+@pytest.mark.asyncio
+async def test__single_flight_do__when_call_arrives_after_last_waiter_cancelled__runs_func_again():
+    # ARRANGE
+    single_flight = SingleFlight()
+    work_factory = FakeWorkFactory()
+    task = asyncio.create_task(single_flight.do("key", work_factory.work))
+    await asyncio.sleep(0)
+    task.cancel()
+    await asyncio.sleep(0)
+    work_factory.release.set()
+
+    # ACT
+    result = await single_flight.do("key", work_factory.work)
+
+    # ASSERT
+    assert task.cancelled()
+    assert work_factory.cancelled
+    assert result == "result"
+    assert work_factory.calls == 2
+
+
+@pytest.mark.asyncio
+async def test__single_flight_do__after_completion__runs_func_again():
+    # ARRANGE
+    single_flight = SingleFlight()
+    work_factory = FakeWorkFactory()
+    work_factory.release.set()
+
+    # ACT
+    await single_flight.do("key", work_factory.work)
+    await single_flight.do("key", work_factory.work)
+
+    # ASSERT
+    assert work_factory.calls == 2
@@ -0,0 +1,27 @@
+import asyncio
+
+import pytest
+
+from wibbley.utilities.sleep import sleep_until_set
+
+
+@pytest.mark.asyncio
+async def test__sleep_until_set__when_event_set__returns_true():
+    # ARRANGE
+    event = asyncio.Event()
+    event.set()
+
+    # ACT
+    result = await sleep_until_set(event, 10)
+
+    # ASSERT
+    assert result is True
+
+
+@pytest.mark.asyncio
+async def test__sleep_until_set__when_timeout_elapses__returns_false():
+    # ACT
+    result = await sleep_until_set(asyncio.Event(), 0)
+
+    # ASSERT
+    assert result is False
@@ -1,4 +1,32 @@
 from wibbley.api.app import App
+from wibbley.api.http_handler.admission import AdmissionSettings
+from wibbley.api.http_handler.compression import CompressionSettings
+from wibbley.api.http_handler.exceptions import HTTPException
+from wibbley.api.http_handler.executors import ExecutorSettings
+from wibbley.api.http_handler.profiling import ProfilerSettings
+from wibbley.api.http_handler.rate_limiting import (
+    FileRateLimitBackend,
+    InMemoryRateLimitBackend,
+    RateLimit,
+    RateLimitBackend,
+    api_key,
+    client_ip,
+)
 from wibbley.api.http_handler.request import HTTPRequest
-from wibbley.api.http_handler.response import HTTPResponse
+from wibbley.api.http_handler.response import HTTPResponse, StreamingHTTPResponse
+from wibbley.api.http_handler.response_cache import ResponseCacheSettings
 from wibbley.api.http_handler.router import Router
+from wibbley.api.http_handler.serializers import (
+    CBORSerializer,
+    MsgpackSerializer,
+    ORJSONSerializer,
+    RawSerializer,
+    SerializerRegistry,
+)
+from wibbley.utilities.loop_monitor import LoopMonitor, LoopMonitorSettings
+from wibbley.utilities.metrics import (
+    HistogramSink,
+    MetricsSink,
+    PrometheusSink,
+    StatsDSink,
+)
@@ -1,9 +1,29 @@
+from typing import Callable, List
+
 import orjson
 
+from wibbley.api.http_handler.admission import (
+    AdmissionController,
+    AdmissionSettings,
+)
+from wibbley.api.http_handler.coalescing import RequestCoalescer
+from wibbley.api.http_handler.compression import (
+    CompressionSettings,
+    ResponseCompressor,
+)
 from wibbley.api.http_handler.cors import CORSSettings
 from wibbley.api.http_handler.event_handling import EventHandlingSettings
+from wibbley.api.http_handler.executors import ExecutorSettings, HandlerExecutor
 from wibbley.api.http_handler.handler import HTTPHandler
-from wibbley.api.http_handler.request import HTTPRequestConstructor
+from wibbley.api.http_handler.instrumentation import Instrumentation
+from wibbley.api.http_handler.middleware import Middleware
+from wibbley.api.http_handler.profiling import (
+    ProfileEndpoint,
+    ProfilerSettings,
+    require_admin_token,
+)
+from wibbley.api.http_handler.rate_limiting import RateLimit, RateLimitBackend
+from wibbley.api.http_handler.request import HTTPRequest, HTTPRequestConstructor
 from wibbley.api.http_handler.request_handlers.default_request_handler import (
     DefaultRequestHandler,
 )
@@ -14,8 +34,17 @@ from wibbley.api.http_handler.request_handlers.options_request_handler import (
     OptionsRequestHandler,
 )
 from wibbley.api.http_handler.request_handlers.response_sender import ResponseSender
+from wibbley.api.http_handler.response_cache import (
+    ResponseCache,
+    ResponseCacheSettings,
+)
 from wibbley.api.http_handler.route_extractor import RouteExtractor
 from wibbley.api.http_handler.router import Router
+from wibbley.api.http_handler.serializers import SerializerRegistry
+from wibbley.api.http_handler.response import HTTPResponse
+from wibbley.api.lifespan import LifespanHandler
+from wibbley.utilities.loop_monitor import LoopMonitor, LoopMonitorSettings
+from wibbley.utilities.metrics import MetricsSink, PrometheusSink
 
 
 class App:
@@ -37,33 +66,271 @@ class App:
         ),
     ):
         self.http_handler = http_handler
+        self.response_cache = ResponseCache(http_handler)
+        self.request_coalescer = RequestCoalescer()
+        self.loop_monitor = None
+        self.lifespan_handler = LifespanHandler(
+            startup_hooks=[self.compile_routes],
+            shutdown_hooks=[self.shutdown_handler_executor],
+            drain_hooks=[self.drain_background_tasks],
+        )
+
+    def compile_routes(self):
+        self.http_handler.get_routes()
+
+    def shutdown_handler_executor(self):
+        self.http_handler.router.handler_executor.shutdown()
+
+    async def drain_background_tasks(self):
+        await self.http_handler.background_task_runner.shutdown()
+
+    def configure_drain_timeout(self, drain_timeout: float):
+        self.http_handler.background_task_runner.drain_timeout = drain_timeout
 
     def add_router(self, router: Router):
         self.http_handler.router = router
 
+    def add_middleware(
+        self,
+        middleware: Callable,
+        include_paths: List[str] = None,
+        exclude_paths: List[str] = None,
+        methods: List[str] = None,
+    ):
+        self.http_handler.add_middleware(
+            Middleware(
+                middleware,
+                include_paths=include_paths,
+                exclude_paths=exclude_paths,
+                methods=methods,
+            )
+        )
+
+    def enable_admission_control(self, admission_settings: AdmissionSettings):
+        admission_controller = AdmissionController(admission_settings)
+        self.http_handler.admission_controller = admission_controller
+        self.on_startup(admission_controller.lag_monitor.start)
+        self.on_shutdown(admission_controller.lag_monitor.stop)
+
+    def enable_instrumentation(self, sink: MetricsSink, metrics_path: str = None):
+        if metrics_path is not None and not isinstance(sink, PrometheusSink):
+            raise ValueError("A metrics path can only be served by a PrometheusSink")
+        Instrumentation(sink).install(self.http_handler)
+        if metrics_path is not None:
+
+            @self.get(metrics_path)
+            async def metrics():
+                return HTTPResponse(
+                    status_code=200,
+                    headers=[(b"content-type", b"text/plain; version=0.0.4")],
+                    body=sink.render(),
+                )
+
+    def enable_loop_monitor(
+        self,
+        sink: MetricsSink = None,
+        loop_monitor_settings: LoopMonitorSettings = None,
+        debug_path: str = None,
+        admin_token: str = None,
+    ):
+        if debug_path is not None and admin_token is None:
+            raise ValueError("The loop monitor debug route requires an admin token")
+        self.loop_monitor = LoopMonitor(sink, loop_monitor_settings)
+        if debug_path is not None:
+
+            @self.get(debug_path)
+            async def loop_monitor_report(request: HTTPRequest):
+                require_admin_token(request, admin_token)
+                return self.loop_monitor.report()
+
+    def enable_profiler(self, profiler_settings: ProfilerSettings):
+        if profiler_settings.admin_token is None:
+            raise ValueError("The profiler requires an admin token")
+        self.get(profiler_settings.path, timeout=profiler_settings.max_seconds + 5)(
+            ProfileEndpoint(profiler_settings)
+        )
+
+    def configure_rate_limiting(self, rate_limit_backend: RateLimitBackend):
+        self.http_handler.rate_limit_backend = rate_limit_backend
+        self.http_handler.compiled_routes = None
+
+    def configure_executors(self, executor_settings: ExecutorSettings):
+        self.http_handler.router.handler_executor.shutdown()
+        self.http_handler.router.handler_executor = HandlerExecutor(executor_settings)
+
     def enable_cors(self, cors_settings: CORSSettings):
         self.http_handler.options_request_handler.cors_settings = cors_settings
 
+    def enable_compression(self, compression_settings: CompressionSettings):
+        self.http_handler.response_compressor = ResponseCompressor(compression_settings)
+
+    def enable_etags(self):
+        self.http_handler.default_request_handler.etags_enabled = True
+
+    def configure_request_timeout(self, request_timeout: float):
+        self.http_handler.request_timeout = request_timeout
+
     def enable_event_handling(self, event_handling_settings: EventHandlingSettings):
         self.http_handler.event_handling_settings = event_handling_settings
 
-    def get(self, path: str):
-        return self.http_handler.router.get(path)
+    def configure_response_cache(self, response_cache_settings: ResponseCacheSettings):
+        self.response_cache.settings = response_cache_settings
+        self.response_cache.evict()
 
-    def post(self, path):
-        return self.http_handler.router.post(path)
+    def cache(
+        self,
+        ttl: float,
+        query_params: List[str] = None,
+        headers: List[str] = None,
+    ):
+        return self.response_cache.cached(
+            ttl=ttl, query_params=query_params, headers=headers
+        )
+
+    def coalesce(self, headers: List[str] = None):
+        return self.request_coalescer.coalesced(headers=headers)
+
+    def add_exception_mapping(
+        self,
+        exception_type: type,
+        status_code: int,
+        detail: str = None,
+        log: bool = False,
+    ):
+        self.http_handler.exception_mapper.register(
+            exception_type, status_code=status_code, detail=detail, log=log
+        )
+
+    def exception_handler(self, exception_type: type, log: bool = False):
+        def decorator(func: Callable):
+            self.http_handler.exception_mapper.register(
+                exception_type, handler=func, log=log
+            )
+            return func
+
+        return decorator
 
-    def put(self, path):
-        return self.http_handler.router.put(path)
+    def configure_serializers(self, serializer_registry: SerializerRegistry):
+        response_senders = [
+            self.http_handler.response_sender,
+            self.http_handler.options_request_handler.response_sender,
+            self.http_handler.head_request_handler.response_sender,
+            self.http_handler.default_request_handler.response_sender,
+        ]
+        json_serializer = serializer_registry.serializers.get(b"application/json")
+        for response_sender in response_senders:
+            if json_serializer is not None:
+                response_sender.json_serializer = json_serializer
+            response_sender.serializer_registry = serializer_registry
 
-    def delete(self, path):
-        return self.http_handler.router.delete(path)
+    def on_startup(self, func: Callable):
+        self.lifespan_handler.startup_hooks.append(func)
+        return func
 
-    def patch(self, path):
-        return self.http_handler.router.patch(path)
+    def on_shutdown(self, func: Callable):
+        self.lifespan_handler.shutdown_hooks.append(func)
+        return func
+
+    def get(
+        self,
+        path: str,
+        timeout: float = None,
+        priority: str = "normal",
+        rate_limit: RateLimit = None,
+        executor: str = None,
+    ):
+        return self.http_handler.router.get(
+            path,
+            timeout=timeout,
+            priority=priority,
+            rate_limit=rate_limit,
+            executor=executor,
+        )
+
+    def head(
+        self,
+        path,
+        timeout: float = None,
+        priority: str = "normal",
+        rate_limit: RateLimit = None,
+        executor: str = None,
+    ):
+        return self.http_handler.router.head(
+            path,
+            timeout=timeout,
+            priority=priority,
+            rate_limit=rate_limit,
+            executor=executor,
+        )
+
+    def post(
+        self,
+        path,
+        timeout: float = None,
+        priority: str = "normal",
+        rate_limit: RateLimit = None,
+        executor: str = None,
+    ):
+        return self.http_handler.router.post(
+            path,
+            timeout=timeout,
+            priority=priority,
+            rate_limit=rate_limit,
+            executor=executor,
+        )
+
+    def put(
+        self,
+        path,
+        timeout: float = None,
+        priority: str = "normal",
+        rate_limit: RateLimit = None,
+        executor: str = None,
+    ):
+        return self.http_handler.router.put(
+            path,
+            timeout=timeout,
+            priority=priority,
+            rate_limit=rate_limit,
+            executor=executor,
+        )
+
+    def delete(
+        self,
+        path,
+        timeout: float = None,
+        priority: str = "normal",
+        rate_limit: RateLimit = None,
+        executor: str = None,
+    ):
+        return self.http_handler.router.delete(
+            path,
+            timeout=timeout,
+            priority=priority,
+            rate_limit=rate_limit,
+            executor=executor,
+        )
+
+    def patch(
+        self,
+        path,
+        timeout: float = None,
+        priority: str = "normal",
+        rate_limit: RateLimit = None,
+        executor: str = None,
+    ):
+        return self.http_handler.router.patch(
+            path,
+            timeout=timeout,
+            priority=priority,
+            rate_limit=rate_limit,
+            executor=executor,
+        )
 
     async def __call__(self, scope, receive, send):
-        assert scope["type"] == "http"
+        assert scope["type"] in ("http", "lifespan")
 
         if scope["type"] == "http":
             await self.http_handler.handle(scope, receive, send)
+        elif scope["type"] == "lifespan":
+            await self.lifespan_handler.handle(receive, send)
@@ -0,0 +1,58 @@
+from typing import Optional
+
+from wibbley.utilities.loop_lag import LoopLagMonitor
+
+PRIORITIES = {"low": 1, "normal": 2, "high": 3, "critical": None}
+
+
+class AdmissionSettings:
+    def __init__(
+        self,
+        lag_threshold: float = 0.1,
+        max_in_flight: Optional[int] = None,
+        sample_interval: float = 0.05,
+        retry_after: int = 1,
+    ):
+        self.lag_threshold = lag_threshold
+        self.max_in_flight = max_in_flight
+        self.sample_interval = sample_interval
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        admission_settings: AdmissionSettings,
+        lag_monitor: LoopLagMonitor = None,
+    ):
+        self.settings = admission_settings
+        self.lag_monitor = lag_monitor or LoopLagMonitor(
+            admission_settings.sample_interval
+        )
+        self.in_flight = 0
+        self.shed_count = 0
+
+    def overload_level(self) -> int:
+        level = 0
+        lag = self.lag_monitor.lag
+        threshold = self.settings.lag_threshold
+        if lag >= 4 * threshold:
+            level = 3
+        elif lag >= 2 * threshold:
+            level = 2
+        elif lag >= threshold:
+            level = 1
+        max_in_flight = self.settings.max_in_flight
+        if max_in_flight is not None:
+            if self.in_flight >= 2 * max_in_flight:
+                level = max(level, 2)
+            elif self.in_flight >= max_in_flight:
+                level = max(level, 1)
+        return level
+
+    def admit(self, priority: str) -> bool:
+        rank = PRIORITIES[priority]
+        if rank is None or rank > self.overload_level():
+            return True
+        self.shed_count += 1
+        return False
@@ -0,0 +1,45 @@
+import asyncio
+import inspect
+import logging
+from typing import Callable, List, Optional, Tuple
+
+from wibbley.utilities.deadline import create_detached_task
+
+LOGGER = logging.getLogger(__name__)
+
+BackgroundTask = Tuple[Callable, tuple, dict]
+
+
+class BackgroundTaskRunner:
+    def __init__(self, max_concurrency: int = 100, drain_timeout: float = 30.0):
+        self.max_concurrency = max_concurrency
+        self.drain_timeout = drain_timeout
+        self.semaphore = None
+        self.tasks = set()
+
+    async def _run(self, func: Callable, args: tuple, kwargs: dict):
+        async with self.semaphore:
+            try:
+                result = func(*args, **kwargs)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                LOGGER.exception(e)
+
+    def schedule(self, background_tasks: List[BackgroundTask]):
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        for func, args, kwargs in background_tasks:
+            task = create_detached_task(self._run(func, args, kwargs))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def shutdown(self, timeout: Optional[float] = None):
+        if not self.tasks:
+            return
+        if timeout is None:
+            timeout = self.drain_timeout
+        _, pending = await asyncio.wait(set(self.tasks), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,57 @@
+import functools
+import inspect
+from typing import AsyncIterator, Iterator, List, Tuple
+
+from wibbley.api.http_handler.request import HTTPRequest
+from wibbley.api.http_handler.response import HTTPResponse, StreamingHTTPResponse
+from wibbley.api.http_handler.response_cache import REQUEST_SIGNATURE
+from wibbley.utilities.singleflight import SingleFlight
+
+COALESCED_METHODS = ("GET", "HEAD")
+
+
+def is_replayable(result) -> bool:
+    if isinstance(result, StreamingHTTPResponse):
+        return False
+    if isinstance(result, HTTPResponse):
+        result = result.body
+    return not isinstance(result, (Iterator, AsyncIterator))
+
+
+class RequestCoalescer:
+    def __init__(self, single_flight: SingleFlight = None):
+        self.single_flight = single_flight or SingleFlight()
+
+    def build_key(self, request: HTTPRequest, headers: Tuple[str, ...]):
+        return (
+            request.method,
+            request.path,
+            tuple(sorted(request.query_params.items())),
+            tuple(request.headers.get(name) for name in headers),
+        )
+
+    def coalesced(self, headers: List[str] = None):
+        headers = tuple(header.lower() for header in headers or ())
+
+        def decorator(func):
+            accepts_request = "request" in inspect.signature(func).parameters
+
+            @functools.wraps(func)
+            async def wrapper(request: HTTPRequest):
+                call = (
+                    functools.partial(func, request=request)
+                    if accepts_request
+                    else func
+                )
+                if request.method not in COALESCED_METHODS:
+                    return await call()
+                return await self.single_flight.do(
+                    self.build_key(request, headers),
+                    call,
+                    shareable=is_replayable,
+                )
+
+            wrapper.__signature__ = REQUEST_SIGNATURE
+            return wrapper
+
+        return decorator
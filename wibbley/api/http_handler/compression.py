@@ -0,0 +1,272 @@
+import asyncio
+import zlib
+from typing import List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+COMPRESSIBLE_CONTENT_TYPES = (
+    b"application/json",
+    b"application/javascript",
+    b"application/xml",
+    b"image/svg+xml",
+    b"text/",
+)
+GZIP_WBITS = 31
+
+
+def add_vary(
+    headers: List[Tuple[bytes, bytes]], field: bytes
+) -> List[Tuple[bytes, bytes]]:
+    fields = []
+    other_headers = []
+    for key, value in headers:
+        if key.lower() == b"vary":
+            fields.extend(item.strip() for item in value.split(b",") if item.strip())
+        else:
+            other_headers.append((key, value))
+    merged_fields = []
+    for item in fields + [field]:
+        if item.lower() not in (merged.lower() for merged in merged_fields):
+            merged_fields.append(item)
+    return other_headers + [(b"vary", b", ".join(merged_fields))]
+
+
+def weaken_etag(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    weakened_headers = []
+    for key, value in headers:
+        if key.lower() == b"etag" and not value.strip().startswith(b"W/"):
+            value = b"W/" + value.strip()
+        weakened_headers.append((key, value))
+    return weakened_headers
+
+
+class CompressionSettings:
+    def __init__(
+        self,
+        minimum_size: int = 500,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        offload_size: int = 256 * 1024,
+        executor=None,
+    ):
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.offload_size = offload_size
+        self.executor = executor
+
+
+class GzipStream:
+    def __init__(self, level: int):
+        self.compressobj = zlib.compressobj(level, zlib.DEFLATED, GZIP_WBITS)
+
+    def compress(self, chunk: bytes, more_body: bool) -> bytes:
+        data = self.compressobj.compress(chunk)
+        if more_body:
+            return data + self.compressobj.flush(zlib.Z_SYNC_FLUSH)
+        return data + self.compressobj.flush(zlib.Z_FINISH)
+
+
+class BrotliStream:
+    def __init__(self, brotli, quality: int):
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, chunk: bytes, more_body: bool) -> bytes:
+        data = self.compressor.process(chunk)
+        if more_body:
+            return data + self.compressor.flush()
+        return data + self.compressor.finish()
+
+
+class ResponseCompressor:
+    def __init__(self, compression_settings: CompressionSettings, brotli=brotli):
+        self.settings = compression_settings
+        self.brotli = brotli
+        self.available_encodings = ["br", "gzip"] if brotli else ["gzip"]
+
+    def _parse_accept_encoding(self, accept_encoding: bytes):
+        accepted = {}
+        for item in accept_encoding.decode("latin-1").split(","):
+            parts = item.strip().split(";")
+            coding = parts[0].strip().lower()
+            if not coding:
+                continue
+            quality = 1.0
+            for param in parts[1:]:
+                key, _, value = param.strip().partition("=")
+                if key.strip() == "q":
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+            accepted[coding] = quality
+        return accepted
+
+    def select_encoding(self, accept_encoding: Optional[bytes]) -> Optional[str]:
+        if not accept_encoding:
+            return None
+        accepted = self._parse_accept_encoding(accept_encoding)
+        wildcard_quality = accepted.get("*", 0.0)
+        best_encoding = None
+        best_quality = 0.0
+        for encoding in self.available_encodings:
+            quality = accepted.get(encoding, wildcard_quality)
+            if quality > best_quality:
+                best_encoding = encoding
+                best_quality = quality
+        return best_encoding
+
+    def is_compressible(self, content_type: Optional[bytes]) -> bool:
+        if content_type is None:
+            return False
+        return content_type.lower().startswith(COMPRESSIBLE_CONTENT_TYPES)
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return self.brotli.compress(body, quality=self.settings.brotli_quality)
+        compressobj = zlib.compressobj(
+            self.settings.gzip_level, zlib.DEFLATED, GZIP_WBITS
+        )
+        return compressobj.compress(body) + compressobj.flush()
+
+    async def compress_async(self, body: bytes, encoding: str) -> bytes:
+        if len(body) < self.settings.offload_size:
+            return self.compress(body, encoding)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.settings.executor, self.compress, body, encoding
+        )
+
+    def get_stream(self, encoding: str):
+        if encoding == "br":
+            return BrotliStream(self.brotli, self.settings.brotli_quality)
+        return GzipStream(self.settings.gzip_level)
+
+    def _select_request_encoding(
+        self, request_headers: List[Tuple[bytes, bytes]]
+    ) -> Optional[str]:
+        accept_encoding = None
+        for key, value in request_headers:
+            if key.lower() == b"accept-encoding":
+                accept_encoding = value
+                break
+        return self.select_encoding(accept_encoding)
+
+    def wrap_send(self, send, request_headers: List[Tuple[bytes, bytes]]):
+        encoding = self._select_request_encoding(request_headers)
+        if encoding is None:
+            return send
+        return CompressingSend(send, self, encoding)
+
+    def wrap_head_send(self, send, request_headers: List[Tuple[bytes, bytes]]):
+        encoding = self._select_request_encoding(request_headers)
+        if encoding is None:
+            return send
+        return HeadCompressingSend(send, self, encoding)
+
+
+class CompressingSend:
+    def __init__(self, send, compressor: ResponseCompressor, encoding: str):
+        self.send = send
+        self.compressor = compressor
+        self.encoding = encoding
+        self.start_message = None
+        self.stream = None
+        self.passthrough = False
+
+    def _get_header(self, headers, name: bytes):
+        for key, value in headers:
+            if key.lower() == name:
+                return value
+        return None
+
+    def _should_compress(self, body: bytes, more_body: bool) -> bool:
+        headers = self.start_message["headers"]
+        if self._get_header(headers, b"content-encoding") is not None:
+            return False
+        if not self.compressor.is_compressible(
+            self._get_header(headers, b"content-type")
+        ):
+            return False
+        if more_body:
+            return True
+        return len(body) >= self.compressor.settings.minimum_size
+
+    def _build_headers(self, content_length: Optional[int]):
+        headers = add_vary(
+            weaken_etag(
+                [
+                    (key, value)
+                    for key, value in self.start_message["headers"]
+                    if key.lower() != b"content-length"
+                ]
+            ),
+            b"accept-encoding",
+        )
+        headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode("latin-1")))
+        return headers
+
+    async def _send_start(self, headers):
+        await self.send({**self.start_message, "headers": headers})
+
+    async def __call__(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            return
+        if message_type != "http.response.body" or self.passthrough:
+            return await self.send(message)
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.stream is not None:
+            chunk = self.stream.compress(body, more_body)
+            return await self.send({**message, "body": chunk})
+
+        if not self._should_compress(body, more_body):
+            self.passthrough = True
+            await self.send(self.start_message)
+            return await self.send(message)
+
+        if more_body:
+            self.stream = self.compressor.get_stream(self.encoding)
+            await self._send_start(self._build_headers(content_length=None))
+            chunk = self.stream.compress(body, more_body)
+            return await self.send({**message, "body": chunk})
+
+        compressed_body = await self.compressor.compress_async(body, self.encoding)
+        await self._send_start(self._build_headers(len(compressed_body)))
+        await self.send({**message, "body": compressed_body})
+
+
+class HeadCompressingSend(CompressingSend):
+    def __init__(self, send, compressor: ResponseCompressor, encoding: str):
+        super().__init__(send, compressor, encoding)
+        self.headers_sent = False
+
+    async def __call__(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            return
+        if message_type != "http.response.body" or self.passthrough:
+            return await self.send(message)
+
+        if self.headers_sent:
+            return await self.send({**message, "body": b""})
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not self._should_compress(body, more_body):
+            self.passthrough = True
+            await self.send(self.start_message)
+            return await self.send(message)
+
+        await self._send_start(self._build_headers(content_length=None))
+        self.headers_sent = True
+        await self.send({**message, "body": b""})
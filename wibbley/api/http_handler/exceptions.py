@@ -0,0 +1,133 @@
+import inspect
+import logging
+import time
+from http import HTTPStatus
+from typing import Callable, Dict, List, Optional, Tuple
+
+import orjson
+
+from wibbley.api.http_handler.request import HTTPRequest
+from wibbley.api.http_handler.response import HTTPResponse
+
+LOGGER = logging.getLogger(__name__)
+JSON_HEADERS = [(b"content-type", b"application/json")]
+
+
+class HTTPException(Exception):
+    def __init__(
+        self,
+        status_code: int,
+        detail: str = None,
+        headers: List[Tuple[bytes, bytes]] = None,
+    ):
+        self.status_code = status_code
+        self.detail = detail if detail is not None else HTTPStatus(status_code).phrase
+        self.headers = headers or []
+        super().__init__(self.detail)
+
+
+def build_error_body(status_code: int, detail: str = None) -> bytes:
+    if detail is None:
+        detail = HTTPStatus(status_code).phrase
+    return orjson.dumps({"detail": detail})
+
+
+def http_exception_handler(request: HTTPRequest, exception: HTTPException):
+    return HTTPResponse(
+        status_code=exception.status_code,
+        headers=JSON_HEADERS + exception.headers,
+        body=build_error_body(exception.status_code, exception.detail),
+    )
+
+
+class ExceptionMapping:
+    def __init__(
+        self,
+        status_code: int = None,
+        detail: str = None,
+        handler: Callable = None,
+        log: bool = False,
+    ):
+        if handler is None and status_code is None:
+            raise ValueError("An exception mapping needs a status code or a handler")
+        self.status_code = status_code
+        self.handler = handler
+        self.log = log
+        self.body = None if handler else build_error_body(status_code, detail)
+
+
+INTERNAL_SERVER_ERROR = ExceptionMapping(500, log=True)
+
+
+class ExceptionMapper:
+    def __init__(
+        self,
+        traceback_limit: int = 5,
+        traceback_interval: float = 60.0,
+        clock=time.monotonic,
+        logger: logging.Logger = LOGGER,
+    ):
+        self.traceback_limit = traceback_limit
+        self.traceback_interval = traceback_interval
+        self.clock = clock
+        self.logger = logger
+        self.mappings: Dict[type, ExceptionMapping] = {}
+        self.resolved: Dict[type, ExceptionMapping] = {}
+        self.traceback_windows: Dict[type, List] = {}
+        self.register(HTTPException, handler=http_exception_handler)
+
+    def register(
+        self,
+        exception_type: type,
+        status_code: int = None,
+        detail: str = None,
+        handler: Callable = None,
+        log: bool = False,
+    ):
+        self.mappings[exception_type] = ExceptionMapping(
+            status_code=status_code, detail=detail, handler=handler, log=log
+        )
+        self.resolved.clear()
+
+    def resolve(self, exception_type: type) -> ExceptionMapping:
+        mapping = self.resolved.get(exception_type)
+        if mapping is None:
+            mapping = INTERNAL_SERVER_ERROR
+            for cls in exception_type.__mro__:
+                if cls in self.mappings:
+                    mapping = self.mappings[cls]
+                    break
+            self.resolved[exception_type] = mapping
+        return mapping
+
+    def log_exception(self, exception: Exception):
+        exception_type = type(exception)
+        now = self.clock()
+        window = self.traceback_windows.get(exception_type)
+        if window is None or now - window[0] >= self.traceback_interval:
+            if window is not None and window[2]:
+                self.logger.error(
+                    f"Suppressed {window[2]} tracebacks for {exception_type.__name__}"
+                )
+            window = [now, 0, 0]
+            self.traceback_windows[exception_type] = window
+        if window[1] < self.traceback_limit:
+            window[1] += 1
+            self.logger.error(exception, exc_info=exception)
+        else:
+            window[2] += 1
+
+    async def handle(
+        self, request: Optional[HTTPRequest], exception: Exception
+    ) -> HTTPResponse:
+        mapping = self.resolve(type(exception))
+        if mapping.log:
+            self.log_exception(exception)
+        if mapping.handler is None:
+            return HTTPResponse(
+                status_code=mapping.status_code, headers=JSON_HEADERS, body=mapping.body
+            )
+        response = mapping.handler(request, exception)
+        if inspect.isawaitable(response):
+            response = await response
+        return response
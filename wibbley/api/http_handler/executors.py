@@ -0,0 +1,98 @@
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict
+
+from wibbley.api.http_handler.request import HTTPRequest
+
+EXECUTOR_MODES = ("thread", "process")
+
+
+class ExecutorSettings:
+    def __init__(self, max_threads: int = None, max_processes: int = None):
+        self.max_threads = max_threads or min(32, (os.cpu_count() or 1) + 4)
+        self.max_processes = max_processes or os.cpu_count() or 1
+
+
+def marshal_request(request: HTTPRequest) -> HTTPRequest:
+    return HTTPRequest(
+        path=request.path,
+        method=request.method,
+        query_params=dict(request.query_params),
+        path_params=dict(request.path_params),
+        headers=dict(request.headers),
+        body=bytes(request.body),
+        client=None if request.client is None else tuple(request.client),
+    )
+
+
+def marshal_kwargs(kwargs: Dict) -> Dict:
+    return {
+        key: marshal_request(value) if isinstance(value, HTTPRequest) else value
+        for key, value in kwargs.items()
+    }
+
+
+class HandlerExecutor:
+    def __init__(
+        self,
+        executor_settings: ExecutorSettings = None,
+        thread_pool_factory=ThreadPoolExecutor,
+        process_pool_factory=ProcessPoolExecutor,
+    ):
+        self.settings = executor_settings or ExecutorSettings()
+        self.thread_pool_factory = thread_pool_factory
+        self.process_pool_factory = process_pool_factory
+        self.pools: Dict[str, Executor] = {}
+        self.in_flight = {mode: 0 for mode in EXECUTOR_MODES}
+
+    def get_max_workers(self, mode: str) -> int:
+        if mode == "process":
+            return self.settings.max_processes
+        return self.settings.max_threads
+
+    def get_pool(self, mode: str) -> Executor:
+        pool = self.pools.get(mode)
+        if pool is None:
+            if mode == "process":
+                pool = self.process_pool_factory(
+                    max_workers=self.settings.max_processes
+                )
+            else:
+                pool = self.thread_pool_factory(
+                    max_workers=self.settings.max_threads,
+                    thread_name_prefix="wibbley-handler",
+                )
+            self.pools[mode] = pool
+        return pool
+
+    async def run(self, func: Callable, kwargs: Dict, mode: str = "thread"):
+        pool = self.get_pool(mode)
+        if mode == "process":
+            call = functools.partial(func, **marshal_kwargs(kwargs))
+        else:
+            call = functools.partial(contextvars.copy_context().run, func, **kwargs)
+        self.in_flight[mode] += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, call)
+        finally:
+            self.in_flight[mode] -= 1
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        stats = {}
+        for mode in EXECUTOR_MODES:
+            max_workers = self.get_max_workers(mode)
+            in_flight = self.in_flight[mode]
+            stats[mode] = {
+                "max_workers": max_workers,
+                "in_flight": in_flight,
+                "queue_depth": max(in_flight - max_workers, 0),
+            }
+        return stats
+
+    def shutdown(self):
+        for pool in self.pools.values():
+            pool.shutdown(wait=False)
+        self.pools = {}
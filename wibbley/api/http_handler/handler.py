@@ -1,11 +1,24 @@
+import asyncio
 import logging
+from typing import List
 
+from wibbley.api.http_handler.admission import AdmissionController
+from wibbley.api.http_handler.background import BackgroundTaskRunner
+from wibbley.api.http_handler.compression import ResponseCompressor
 from wibbley.api.http_handler.event_handling import EventHandlingSettings
+from wibbley.api.http_handler.exceptions import ExceptionMapper
+from wibbley.api.http_handler.instrumentation import Instrumentation
+from wibbley.api.http_handler.middleware import Middleware, compile_routes
+from wibbley.api.http_handler.rate_limiting import (
+    InMemoryRateLimitBackend,
+    RateLimitBackend,
+)
 from wibbley.api.http_handler.request import HTTPRequestConstructor
 from wibbley.api.http_handler.request_handlers.default_request_handler import (
     DefaultRequestHandler,
 )
 from wibbley.api.http_handler.request_handlers.head_request_handler import (
+    BodylessSend,
     HeadRequestHandler,
 )
 from wibbley.api.http_handler.request_handlers.options_request_handler import (
@@ -14,6 +27,7 @@ from wibbley.api.http_handler.request_handlers.options_request_handler import (
 from wibbley.api.http_handler.request_handlers.response_sender import ResponseSender
 from wibbley.api.http_handler.route_extractor import RouteExtractor
 from wibbley.api.http_handler.router import Router
+from wibbley.utilities.deadline import run_with_timeout
 
 LOGGER = logging.getLogger(__name__)
 
@@ -29,6 +43,14 @@ class HTTPHandler:
         default_request_handler: DefaultRequestHandler,
         event_handling_settings: EventHandlingSettings,
         route_extractor: RouteExtractor,
+        response_compressor: ResponseCompressor = None,
+        middlewares: List[Middleware] = None,
+        request_timeout: float = None,
+        admission_controller: AdmissionController = None,
+        rate_limit_backend: RateLimitBackend = None,
+        background_task_runner: BackgroundTaskRunner = None,
+        exception_mapper: ExceptionMapper = None,
+        instrumentation: Instrumentation = None,
     ):
         self.router = router
         self.response_sender = response_sender
@@ -38,6 +60,40 @@ class HTTPHandler:
         self.default_request_handler = default_request_handler
         self.event_handling_settings = event_handling_settings
         self.route_extractor = route_extractor
+        self.response_compressor = response_compressor
+        self.middlewares = middlewares or []
+        self.request_timeout = request_timeout
+        self.admission_controller = admission_controller
+        self.rate_limit_backend = rate_limit_backend or InMemoryRateLimitBackend()
+        self.background_task_runner = background_task_runner or BackgroundTaskRunner()
+        self.exception_mapper = exception_mapper or ExceptionMapper()
+        self.instrumentation = instrumentation
+        self.compiled_routes = None
+        self.compiled_router = None
+        self.compiled_router_version = None
+
+    def add_middleware(self, middleware: Middleware):
+        self.middlewares.append(middleware)
+        self.compiled_routes = None
+
+    def compile_routes(self):
+        compiled_routes = compile_routes(
+            self.router.routes, self.middlewares, self.rate_limit_backend
+        )
+        if self.instrumentation is not None:
+            compiled_routes = self.instrumentation.instrument_routes(compiled_routes)
+        self.compiled_routes = compiled_routes
+        self.compiled_router = self.router
+        self.compiled_router_version = self.router.version
+
+    def get_routes(self):
+        if (
+            self.compiled_routes is None
+            or self.compiled_router is not self.router
+            or self.compiled_router_version != self.router.version
+        ):
+            self.compile_routes()
+        return self.compiled_routes
 
     async def handle(self, scope, receive, send):
         path = scope["path"]
@@ -45,7 +101,7 @@ class HTTPHandler:
         headers = scope["headers"]
         query_string = scope["query_string"]
         route_info = self.route_extractor.extract(
-            routes=self.router.routes, request_path=path, request_method=method
+            routes=self.get_routes(), request_path=path, request_method=method
         )
         available_methods = route_info.available_methods
         route_func = route_info.route_func
@@ -81,6 +137,26 @@ class HTTPHandler:
                 response_body={"detail": "Method Not Allowed"},
             )
 
+        admission_controller = self.admission_controller
+        if admission_controller is not None:
+            if not admission_controller.admit(
+                getattr(route_func, "priority", "normal")
+            ):
+                return await self.response_sender.send_response(
+                    send,
+                    status_code=503,
+                    headers=[
+                        (b"content-type", b"application/json"),
+                        (
+                            b"retry-after",
+                            str(admission_controller.settings.retry_after).encode(
+                                "utf-8"
+                            ),
+                        ),
+                    ],
+                    response_body={"detail": "Service Unavailable"},
+                )
+
         http_request = await self.http_request_constructor.construct(
             path=path,
             method=method,
@@ -88,22 +164,57 @@ class HTTPHandler:
             query_string=query_string,
             headers=headers,
             receive=receive,
+            client=scope.get("client"),
         )
+        timeout = getattr(route_func, "timeout", None) or self.request_timeout
+        if admission_controller is not None:
+            admission_controller.in_flight += 1
         try:
-            result = await route_func(request=http_request)
-        except Exception as e:
-            LOGGER.exception(e)
+            if timeout is None:
+                result = await route_func(request=http_request)
+            else:
+                result = await run_with_timeout(
+                    route_func(request=http_request), timeout
+                )
+        except asyncio.TimeoutError:
+            LOGGER.warning(f"Request to {method} {path} exceeded its deadline")
             return await self.response_sender.send_response(
                 send,
-                status_code=500,
+                status_code=504,
                 headers=[
                     (b"content-type", b"application/json"),
                 ],
-                response_body={"detail": "Internal Server Error"},
+                response_body={"detail": "Gateway Timeout"},
             )
+        except Exception as e:
+            error_response = await self.exception_mapper.handle(http_request, e)
+            return await self.response_sender.send_response(
+                send,
+                status_code=error_response.status_code,
+                headers=error_response.headers,
+                response_body=error_response.body,
+            )
+        finally:
+            if admission_controller is not None:
+                admission_controller.in_flight -= 1
 
         if method == "HEAD":
-            await self.head_request_handler.handle(send, result)
+            head_send = BodylessSend(send)
+            if self.response_compressor is not None:
+                head_send = self.response_compressor.wrap_head_send(head_send, headers)
+            await self.head_request_handler.handle(
+                head_send, result, request_headers=headers
+            )
 
         if method in ["GET", "POST", "PUT", "PATCH", "DELETE"]:
-            await self.default_request_handler.handle(send, result)
+            if self.response_compressor is not None:
+                send = self.response_compressor.wrap_send(send, headers)
+            await self.default_request_handler.handle(
+                send,
+                result,
+                request_headers=headers,
+                conditional=method == "GET",
+            )
+
+        if http_request.background_tasks:
+            self.background_task_runner.schedule(http_request.background_tasks)
@@ -0,0 +1,130 @@
+import functools
+import time
+from typing import Callable, Dict
+
+from wibbley.api.http_handler.request import HTTPRequestConstructor
+from wibbley.api.http_handler.request_handlers.response_sender import ResponseSender
+from wibbley.api.http_handler.route_extractor import RouteExtractor
+from wibbley.api.http_handler.serializers import Serializer
+from wibbley.utilities.metrics import MetricsSink
+
+ROUTE_EXTRACTION = "route_extraction"
+REQUEST_CONSTRUCTION = "request_construction"
+HANDLER = "handler"
+SERIALIZATION = "serialization"
+SEND = "send"
+PHASES = (ROUTE_EXTRACTION, REQUEST_CONSTRUCTION, HANDLER, SERIALIZATION, SEND)
+RESPONSE_SENDER_OWNERS = (
+    "options_request_handler",
+    "head_request_handler",
+    "default_request_handler",
+)
+
+
+class InstrumentedRouteExtractor:
+    def __init__(self, route_extractor: RouteExtractor, sink: MetricsSink, clock):
+        self.route_extractor = route_extractor
+        self.sink = sink
+        self.clock = clock
+
+    def extract(self, routes, request_path, request_method):
+        start = self.clock()
+        route_info = self.route_extractor.extract(
+            routes=routes, request_path=request_path, request_method=request_method
+        )
+        self.sink.observe(ROUTE_EXTRACTION, self.clock() - start)
+        return route_info
+
+
+class InstrumentedRequestConstructor:
+    def __init__(
+        self,
+        http_request_constructor: HTTPRequestConstructor,
+        sink: MetricsSink,
+        clock,
+    ):
+        self.http_request_constructor = http_request_constructor
+        self.sink = sink
+        self.clock = clock
+
+    async def construct(self, **kwargs):
+        start = self.clock()
+        http_request = await self.http_request_constructor.construct(**kwargs)
+        self.sink.observe(REQUEST_CONSTRUCTION, self.clock() - start)
+        return http_request
+
+
+class InstrumentedResponseSender(ResponseSender):
+    def __init__(self, response_sender: ResponseSender, sink: MetricsSink, clock):
+        super().__init__(
+            response_sender.json_serializer, response_sender.serializer_registry
+        )
+        self.sink = sink
+        self.clock = clock
+
+    def serialize_body(self, response_body, serializer: Serializer = None) -> bytes:
+        if isinstance(response_body, bytes):
+            return response_body
+        start = self.clock()
+        body = super().serialize_body(response_body, serializer)
+        self.sink.observe(SERIALIZATION, self.clock() - start)
+        return body
+
+    async def send_response(self, send, headers, response_body, status_code):
+        response_body = self.serialize_body(response_body)
+        start = self.clock()
+        await super().send_response(send, headers, response_body, status_code)
+        self.sink.observe(SEND, self.clock() - start)
+
+    async def send_streaming_response(self, send, headers, body_iterator, status_code):
+        start = self.clock()
+        await super().send_streaming_response(send, headers, body_iterator, status_code)
+        self.sink.observe(SEND, self.clock() - start)
+
+
+class Instrumentation:
+    def __init__(self, sink: MetricsSink, clock=time.perf_counter):
+        self.sink = sink
+        self.clock = clock
+
+    def instrument_route(self, route_func: Callable):
+        sink = self.sink
+        clock = self.clock
+
+        async def timed_route(request):
+            start = clock()
+            try:
+                return await route_func(request=request)
+            finally:
+                sink.observe(HANDLER, clock() - start)
+
+        return functools.update_wrapper(timed_route, route_func)
+
+    def instrument_routes(
+        self, routes: Dict[str, Dict[str, Callable]]
+    ) -> Dict[str, Dict[str, Callable]]:
+        return {
+            path: {
+                method: self.instrument_route(route_func)
+                for method, route_func in methods.items()
+            }
+            for path, methods in routes.items()
+        }
+
+    def install(self, http_handler):
+        http_handler.route_extractor = InstrumentedRouteExtractor(
+            http_handler.route_extractor, self.sink, self.clock
+        )
+        http_handler.http_request_constructor = InstrumentedRequestConstructor(
+            http_handler.http_request_constructor, self.sink, self.clock
+        )
+        http_handler.response_sender = InstrumentedResponseSender(
+            http_handler.response_sender, self.sink, self.clock
+        )
+        for owner in RESPONSE_SENDER_OWNERS:
+            request_handler = getattr(http_handler, owner)
+            request_handler.response_sender = InstrumentedResponseSender(
+                request_handler.response_sender, self.sink, self.clock
+            )
+        http_handler.instrumentation = self
+        http_handler.compiled_routes = None
@@ -0,0 +1,87 @@
+import functools
+from typing import Callable, Dict, List
+
+from wibbley.api.http_handler.rate_limiting import RateLimitBackend, RateLimitMiddleware
+
+
+class Middleware:
+    def __init__(
+        self,
+        func: Callable,
+        include_paths: List[str] = None,
+        exclude_paths: List[str] = None,
+        methods: List[str] = None,
+    ):
+        self.func = func
+        self.include_paths = tuple(include_paths) if include_paths else None
+        self.exclude_paths = tuple(exclude_paths) if exclude_paths else None
+        self.methods = frozenset(methods) if methods else None
+
+    def applies_to(self, path: str, method: str) -> bool:
+        if self.methods is not None and method not in self.methods:
+            return False
+        if self.include_paths is not None and not path.startswith(self.include_paths):
+            return False
+        if self.exclude_paths is not None and path.startswith(self.exclude_paths):
+            return False
+        return True
+
+
+def _build_endpoint(route_func):
+    async def endpoint(request):
+        return await route_func(request=request)
+
+    return endpoint
+
+
+def _build_link(middleware_func, call_next):
+    async def link(request):
+        return await middleware_func(request, call_next)
+
+    return link
+
+
+def build_chain(route_func, middlewares: List[Middleware]):
+    if not middlewares:
+        return route_func
+    call_next = _build_endpoint(route_func)
+    for middleware in reversed(middlewares):
+        call_next = _build_link(middleware.func, call_next)
+    return functools.update_wrapper(call_next, route_func)
+
+
+def _get_route_middlewares(
+    path: str,
+    method: str,
+    route_func,
+    middlewares: List[Middleware],
+    rate_limit_backend: RateLimitBackend,
+) -> List[Middleware]:
+    route_middlewares = [
+        middleware for middleware in middlewares if middleware.applies_to(path, method)
+    ]
+    rate_limit = getattr(route_func, "rate_limit", None)
+    if rate_limit is not None:
+        route_middlewares.append(
+            Middleware(RateLimitMiddleware(rate_limit, rate_limit_backend, path))
+        )
+    return route_middlewares
+
+
+def compile_routes(
+    routes: Dict[str, Dict[str, Callable]],
+    middlewares: List[Middleware],
+    rate_limit_backend: RateLimitBackend = None,
+):
+    compiled_routes = {}
+    for path, methods in routes.items():
+        compiled_routes[path] = {
+            method: build_chain(
+                route_func,
+                _get_route_middlewares(
+                    path, method, route_func, middlewares, rate_limit_backend
+                ),
+            )
+            for method, route_func in methods.items()
+        }
+    return compiled_routes
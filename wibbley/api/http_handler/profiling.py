@@ -0,0 +1,87 @@
+import asyncio
+import hmac
+import threading
+from typing import Optional
+
+from wibbley.api.http_handler.exceptions import HTTPException
+from wibbley.api.http_handler.request import HTTPRequest
+from wibbley.api.http_handler.response import HTTPResponse
+from wibbley.utilities.profiler import SamplingProfiler
+
+COLLAPSED_STACK_HEADERS = [(b"content-type", b"text/plain; charset=utf-8")]
+
+
+def require_admin_token(request: HTTPRequest, admin_token: Optional[str]):
+    if admin_token is None:
+        raise HTTPException(403)
+    expected = f"Bearer {admin_token}"
+    provided = request.headers.get("authorization", "")
+    if not hmac.compare_digest(provided.encode("utf-8"), expected.encode("utf-8")):
+        raise HTTPException(403)
+
+
+class ProfilerSettings:
+    def __init__(
+        self,
+        path: str = "/_wibbley/profile",
+        admin_token: str = None,
+        default_seconds: float = 10.0,
+        max_seconds: float = 60.0,
+        interval: float = 0.005,
+    ):
+        self.path = path
+        self.admin_token = admin_token
+        self.default_seconds = default_seconds
+        self.max_seconds = max_seconds
+        self.interval = interval
+
+
+class ProfileEndpoint:
+    def __init__(
+        self, profiler_settings: ProfilerSettings, profiler_factory=SamplingProfiler
+    ):
+        self.settings = profiler_settings
+        self.profiler_factory = profiler_factory
+        self.is_profiling = False
+
+    def authorize(self, request: HTTPRequest):
+        require_admin_token(request, self.settings.admin_token)
+
+    def parse_seconds(self, request: HTTPRequest) -> float:
+        seconds = request.query_params.get("seconds")
+        if seconds is None:
+            return self.settings.default_seconds
+        try:
+            seconds = float(seconds)
+        except ValueError:
+            raise HTTPException(400, "seconds must be a number")
+        if not 0 < seconds <= self.settings.max_seconds:
+            raise HTTPException(
+                400, f"seconds must be between 0 and {self.settings.max_seconds}"
+            )
+        return seconds
+
+    async def __call__(self, request: HTTPRequest):
+        self.authorize(request)
+        seconds = self.parse_seconds(request)
+        if self.is_profiling:
+            raise HTTPException(409, "A profile is already running")
+
+        profiler = self.profiler_factory(
+            threading.get_ident(),
+            self.settings.interval,
+            request.query_params.get("idle") == "1",
+        )
+        self.is_profiling = True
+        profiler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.stop()
+            self.is_profiling = False
+        return HTTPResponse(
+            status_code=200,
+            headers=COLLAPSED_STACK_HEADERS
+            + [(b"x-wibbley-samples", str(profiler.sample_count).encode("latin-1"))],
+            body=profiler.render(),
+        )
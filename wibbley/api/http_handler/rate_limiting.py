@@ -0,0 +1,176 @@
+import asyncio
+import math
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Optional, Tuple
+
+import orjson
+
+from wibbley.api.http_handler.request import HTTPRequest
+from wibbley.api.http_handler.response import HTTPResponse
+
+TOO_MANY_REQUESTS_BODY = orjson.dumps({"detail": "Too Many Requests"})
+
+
+def client_ip(request: HTTPRequest) -> str:
+    if request.client is None:
+        return "unknown"
+    return request.client[0]
+
+
+def api_key(header_name: str = "x-api-key") -> Callable[[HTTPRequest], str]:
+    header_name = header_name.lower()
+
+    def get_api_key(request: HTTPRequest) -> str:
+        return request.headers.get(header_name, "")
+
+    return get_api_key
+
+
+def consume_token(
+    bucket: Optional[Tuple[float, float, float]], rate: float, burst: int, now: float
+) -> Tuple[Tuple[float, float, float], float]:
+    if bucket is None:
+        tokens = float(burst)
+    else:
+        tokens = min(float(burst), bucket[0] + (now - bucket[1]) * rate)
+    retry_after = 0.0
+    if tokens >= 1:
+        tokens -= 1
+    else:
+        retry_after = (1 - tokens) / rate
+    full_at = now + (burst - tokens) / rate
+    return (tokens, now, full_at), retry_after
+
+
+class RateLimit:
+    def __init__(
+        self,
+        rate: float,
+        burst: int = None,
+        key: Callable[[HTTPRequest], str] = client_ip,
+        name: str = None,
+    ):
+        self.rate = rate
+        self.burst = burst or max(int(math.ceil(rate)), 1)
+        self.key = key
+        self.name = name
+
+
+class RateLimitBackend(ABC):
+    @abstractmethod
+    async def acquire(self, key: str, rate: float, burst: int) -> float:
+        """
+        Take a token from the bucket for key. Return 0 when a token was available,
+        otherwise the number of seconds until one will be.
+        """
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    def __init__(self, sweep_interval: float = 60.0, clock=time.monotonic):
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+        self.buckets: Dict[str, Tuple[float, float, float]] = {}
+        self.next_sweep = clock() + sweep_interval
+
+    def sweep(self, now: float):
+        self.buckets = {
+            key: bucket for key, bucket in self.buckets.items() if bucket[2] > now
+        }
+        self.next_sweep = now + self.sweep_interval
+
+    async def acquire(self, key: str, rate: float, burst: int) -> float:
+        now = self.clock()
+        if now >= self.next_sweep:
+            self.sweep(now)
+        bucket, retry_after = consume_token(self.buckets.get(key), rate, burst, now)
+        self.buckets[key] = bucket
+        return retry_after
+
+
+class FileRateLimitBackend(RateLimitBackend):
+    def __init__(
+        self,
+        path: str,
+        sweep_interval: float = 60.0,
+        clock=time.time,
+        executor=None,
+    ):
+        self.path = path
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+        self.executor = executor
+        self.lock = threading.Lock()
+        self.connection = None
+        self.next_sweep = clock() + sweep_interval
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if self.connection is None:
+            self.connection = sqlite3.connect(
+                self.path, timeout=5.0, isolation_level=None, check_same_thread=False
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS buckets "
+                "(key TEXT PRIMARY KEY, tokens REAL, updated_at REAL, full_at REAL)"
+            )
+        return self.connection
+
+    def _acquire(self, key: str, rate: float, burst: int) -> float:
+        with self.lock:
+            connection = self._get_connection()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                now = self.clock()
+                if now >= self.next_sweep:
+                    connection.execute("DELETE FROM buckets WHERE full_at <= ?", (now,))
+                    self.next_sweep = now + self.sweep_interval
+                row = connection.execute(
+                    "SELECT tokens, updated_at, full_at FROM buckets WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                bucket, retry_after = consume_token(row, rate, burst, now)
+                connection.execute(
+                    "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?)",
+                    (key,) + bucket,
+                )
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+        return retry_after
+
+    async def acquire(self, key: str, rate: float, burst: int) -> float:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, self._acquire, key, rate, burst
+        )
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+class RateLimitMiddleware:
+    def __init__(self, rate_limit: RateLimit, backend: RateLimitBackend, name: str):
+        self.rate_limit = rate_limit
+        self.backend = backend
+        self.prefix = f"{rate_limit.name or name}:"
+
+    async def __call__(self, request: HTTPRequest, call_next):
+        rate_limit = self.rate_limit
+        retry_after = await self.backend.acquire(
+            self.prefix + rate_limit.key(request), rate_limit.rate, rate_limit.burst
+        )
+        if not retry_after:
+            return await call_next(request)
+        return HTTPResponse(
+            status_code=429,
+            headers=[
+                (b"content-type", b"application/json"),
+                (b"retry-after", str(math.ceil(retry_after)).encode("utf-8")),
+            ],
+            body=TOO_MANY_REQUESTS_BODY,
+        )
@@ -1,4 +1,4 @@
-from typing import Coroutine, Dict, List, Tuple
+from typing import Callable, Coroutine, Dict, List, Optional, Tuple
 
 import orjson
 
@@ -12,6 +12,7 @@ class HTTPRequest:
         path_params: Dict[str, str],
         headers: Dict[str, str],
         body: bytes,
+        client: Optional[Tuple[str, int]] = None,
     ):
         self.method = method
         self.path = path
@@ -19,6 +20,13 @@ class HTTPRequest:
         self.headers = headers
         self.body = body
         self.path_params = path_params
+        self.client = client
+        self.background_tasks = None
+
+    def add_background_task(self, func: Callable, *args, **kwargs):
+        if self.background_tasks is None:
+            self.background_tasks = []
+        self.background_tasks.append((func, args, kwargs))
 
     @property
     def body_as_dict(self):
@@ -46,6 +54,7 @@ class HTTPRequestConstructor:
         query_string: bytes,
         headers: List[Tuple[bytes, bytes]],
         receive: Coroutine,
+        client: Optional[Tuple[str, int]] = None,
     ) -> HTTPRequest:
         query_params = self._format_query_params(query_string)
         headers = self._format_headers(headers)
@@ -57,6 +66,7 @@ class HTTPRequestConstructor:
             headers=headers,
             body=request_body,
             path_params=path_params,
+            client=client,
         )
 
     def _format_query_params(self, query_string):
@@ -1,15 +1,29 @@
-from typing import Union
+import zlib
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import List, Optional, Tuple, Union
 
 from wibbley.api.http_handler.request_handlers.response_sender import ResponseSender
-from wibbley.api.http_handler.response import HTTPResponse
+from wibbley.api.http_handler.response import HTTPResponse, StreamingHTTPResponse
+
+NOT_MODIFIED_HEADERS = (
+    b"cache-control",
+    b"content-location",
+    b"etag",
+    b"expires",
+    b"last-modified",
+    b"vary",
+)
 
 
 class DefaultRequestHandler:
     def __init__(
         self,
         response_sender: ResponseSender,
+        etags_enabled: bool = False,
     ):
         self.response_sender = response_sender
+        self.etags_enabled = etags_enabled
 
     def _determine_content_type_header(self, result):
         response_types = {
@@ -21,23 +35,137 @@ class DefaultRequestHandler:
         response_header = response_types.get(type(result))
         return response_header
 
+    def _get_header(self, headers, name: bytes) -> Optional[bytes]:
+        for key, value in headers:
+            if key.lower() == name:
+                return value
+        return None
+
+    def _compute_etag(self, body: bytes) -> bytes:
+        checksum = zlib.crc32(body)
+        return f'W/"{len(body):x}-{checksum:08x}"'.encode("latin-1")
+
+    def _strip_weak_prefix(self, etag: bytes) -> bytes:
+        etag = etag.strip()
+        if etag.startswith(b"W/"):
+            return etag[2:]
+        return etag
+
+    def _etag_matches(self, if_none_match: bytes, etag: bytes) -> bool:
+        if if_none_match.strip() == b"*":
+            return True
+        opaque_tag = self._strip_weak_prefix(etag)
+        for candidate in if_none_match.split(b","):
+            if self._strip_weak_prefix(candidate) == opaque_tag:
+                return True
+        return False
+
+    def _parse_http_date(self, value: bytes) -> datetime:
+        parsed = parsedate_to_datetime(value.decode("latin-1"))
+        if parsed.tzinfo is None:
+            return parsed.replace(tzinfo=timezone.utc)
+        return parsed
+
+    def _not_modified_since(
+        self, if_modified_since: bytes, last_modified: Optional[bytes]
+    ) -> bool:
+        if last_modified is None:
+            return False
+        try:
+            since = self._parse_http_date(if_modified_since)
+            modified = self._parse_http_date(last_modified)
+        except (TypeError, ValueError):
+            return False
+        return modified <= since
+
+    def _is_not_modified(
+        self,
+        request_headers: List[Tuple[bytes, bytes]],
+        headers: List[Tuple[bytes, bytes]],
+    ) -> bool:
+        if_none_match = self._get_header(request_headers, b"if-none-match")
+        if if_none_match is not None:
+            etag = self._get_header(headers, b"etag")
+            return etag is not None and self._etag_matches(if_none_match, etag)
+        if_modified_since = self._get_header(request_headers, b"if-modified-since")
+        if if_modified_since is not None:
+            return self._not_modified_since(
+                if_modified_since, self._get_header(headers, b"last-modified")
+            )
+        return False
+
+    async def _send_not_modified(self, send, headers: List[Tuple[bytes, bytes]]):
+        return await self.response_sender.send_response(
+            send,
+            status_code=304,
+            headers=[
+                (key, value)
+                for key, value in headers
+                if key.lower() in NOT_MODIFIED_HEADERS
+            ],
+            response_body=b"",
+        )
+
     async def handle(
-        self, send, route_func_result: Union[str, bytes, dict, list, HTTPResponse]
+        self,
+        send,
+        route_func_result: Union[
+            str, bytes, dict, list, HTTPResponse, StreamingHTTPResponse
+        ],
+        request_headers: List[Tuple[bytes, bytes]] = None,
+        conditional: bool = False,
     ):
-        if isinstance(route_func_result, HTTPResponse):
-            return await self.response_sender.send_response(
+        if isinstance(route_func_result, StreamingHTTPResponse):
+            return await self.response_sender.send_streaming_response(
                 send,
                 status_code=route_func_result.status_code,
                 headers=route_func_result.headers,
-                response_body=route_func_result.body,
+                body_iterator=route_func_result.body_iterator,
+            )
+
+        serializer = None
+        if isinstance(route_func_result, HTTPResponse):
+            status_code = route_func_result.status_code
+            headers = route_func_result.headers
+            response_body = route_func_result.body
+        else:
+            status_code = 200
+            headers = [
+                (
+                    b"content-type",
+                    self._determine_content_type_header(route_func_result),
+                ),
+            ]
+            if isinstance(route_func_result, (dict, list)) and request_headers:
+                serializer = self.response_sender.select_serializer(
+                    self._get_header(request_headers, b"accept"), route_func_result
+                )
+                if serializer is not None:
+                    headers = [
+                        (b"content-type", serializer.content_type),
+                        (b"vary", b"accept"),
+                    ]
+            response_body = route_func_result
+
+        if conditional and status_code == 200:
+            if self._is_not_modified(request_headers, headers):
+                return await self._send_not_modified(send, headers)
+            if self.etags_enabled and self._get_header(headers, b"etag") is None:
+                response_body = self.response_sender.serialize_body(
+                    response_body, serializer
+                )
+                headers = headers + [(b"etag", self._compute_etag(response_body))]
+                if self._is_not_modified(request_headers, headers):
+                    return await self._send_not_modified(send, headers)
+
+        if serializer is not None:
+            response_body = self.response_sender.serialize_body(
+                response_body, serializer
             )
 
-        content_type_header = self._determine_content_type_header(route_func_result)
         return await self.response_sender.send_response(
             send,
-            status_code=200,
-            headers=[
-                (b"content-type", content_type_header),
-            ],
-            response_body=route_func_result,
+            status_code=status_code,
+            headers=headers,
+            response_body=response_body,
         )
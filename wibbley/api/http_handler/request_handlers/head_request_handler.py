@@ -1,6 +1,23 @@
-from typing import Union
+from typing import List, Optional, Tuple, Union
 
 from wibbley.api.http_handler.request_handlers.response_sender import ResponseSender
+from wibbley.api.http_handler.response import HTTPResponse, StreamingHTTPResponse
+
+
+async def empty_body():
+    yield b""
+
+
+class BodylessSend:
+    def __init__(self, send):
+        self.send = send
+
+    async def __call__(self, message):
+        if message["type"] != "http.response.body":
+            return await self.send(message)
+        if message.get("more_body", False):
+            return
+        await self.send({**message, "body": b""})
 
 
 class HeadRequestHandler:
@@ -17,18 +34,73 @@ class HeadRequestHandler:
         response_header = response_types.get(type(result))
         return response_header
 
-    async def handle(self, send, route_func_result: Union[str, bytes, dict, list]):
-        content_type_header = self._determine_content_type_header(route_func_result)
+    def _has_content_length(self, headers) -> bool:
+        return any(key.lower() == b"content-length" for key, _ in headers)
+
+    def _get_accept_header(self, request_headers) -> Optional[bytes]:
+        for key, value in request_headers:
+            if key.lower() == b"accept":
+                return value
+        return None
+
+    async def handle(
+        self,
+        send,
+        route_func_result: Union[
+            str, bytes, dict, list, HTTPResponse, StreamingHTTPResponse
+        ],
+        request_headers: List[Tuple[bytes, bytes]] = None,
+    ):
+        if isinstance(route_func_result, StreamingHTTPResponse):
+            try:
+                return await self.response_sender.send_streaming_response(
+                    send,
+                    status_code=route_func_result.status_code,
+                    headers=route_func_result.headers,
+                    body_iterator=empty_body(),
+                )
+            finally:
+                aclose = getattr(route_func_result.body_iterator, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+
+        if isinstance(route_func_result, HTTPResponse):
+            status_code = route_func_result.status_code
+            headers = route_func_result.headers
+            response_body = route_func_result.body
+        else:
+            status_code = 200
+            headers = [
+                (
+                    b"content-type",
+                    self._determine_content_type_header(route_func_result),
+                )
+            ]
+            response_body = route_func_result
+
+        serializer = None
+        if isinstance(route_func_result, (dict, list)) and request_headers:
+            serializer = self.response_sender.select_serializer(
+                self._get_accept_header(request_headers), route_func_result
+            )
+            if serializer is not None:
+                headers = [
+                    (b"content-type", serializer.content_type),
+                    (b"vary", b"accept"),
+                ]
+
+        serialized_body = b""
+        if not self._has_content_length(headers):
+            serialized_body = self.response_sender.serialize_body(
+                response_body, serializer
+            )
+            headers = headers + [
+                (b"content-length", str(len(serialized_body)).encode("utf-8"))
+            ]
 
         await self.response_sender.send_response(
             send,
-            status_code=200,
-            headers=[
-                (b"content-type", content_type_header),
-                (
-                    b"content-length",
-                    str(len(route_func_result)).encode("utf-8"),
-                ),
-            ],
-            response_body=b"",
+            status_code=status_code,
+            headers=headers,
+            response_body=serialized_body,
         )
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Coroutine, List, Tuple, Union
+from typing import AsyncIterator, Coroutine, List, Optional, Tuple, Union
+
+from wibbley.api.http_handler.serializers import Serializer, SerializerRegistry
 
 
 class JSONSerializer(ABC):
@@ -9,8 +11,34 @@ class JSONSerializer(ABC):
 
 
 class ResponseSender:
-    def __init__(self, json_serializer: JSONSerializer):
+    def __init__(
+        self,
+        json_serializer: JSONSerializer,
+        serializer_registry: SerializerRegistry = None,
+    ):
         self.json_serializer = json_serializer
+        self.serializer_registry = serializer_registry
+
+    def select_serializer(
+        self, accept: Optional[bytes], response_body=None
+    ) -> Optional[Serializer]:
+        if self.serializer_registry is None:
+            return None
+        return self.fallback_serializer(
+            self.serializer_registry.negotiate(accept), response_body
+        )
+
+    def fallback_serializer(
+        self, serializer: Optional[Serializer], response_body
+    ) -> Optional[Serializer]:
+        if serializer is None or response_body is None:
+            return serializer
+        if serializer.can_serialize(response_body):
+            return serializer
+        default_serializer = self.serializer_registry.default_serializer
+        if default_serializer.can_serialize(response_body):
+            return default_serializer
+        return None
 
     async def send_response_start(
         self, send: Coroutine, headers: List[Tuple[bytes, bytes]], status_code: int
@@ -19,25 +47,61 @@ class ResponseSender:
             {"type": "http.response.start", "status": status_code, "headers": headers}
         )
 
+    def serialize_body(
+        self,
+        response_body: Union[bytes, str, dict, list],
+        serializer: Serializer = None,
+    ) -> bytes:
+        if isinstance(response_body, dict) or isinstance(response_body, list):
+            if serializer is not None:
+                return serializer.dumps(response_body)
+            return self.json_serializer.dumps(response_body)
+        elif isinstance(response_body, str):
+            return response_body.encode("utf-8")
+        return response_body
+
     async def send_response_body(
         self,
         send: Coroutine,
         response_body: Union[bytes, str, dict, list],
         status_code: int,
     ):
-        if isinstance(response_body, dict) or isinstance(response_body, list):
-            response_body = self.json_serializer.dumps(response_body)
-        elif isinstance(response_body, str):
-            response_body = response_body.encode("utf-8")
-
         await send(
             {
                 "type": "http.response.body",
                 "status": status_code,
-                "body": response_body,
+                "body": self.serialize_body(response_body),
             }
         )
 
     async def send_response(self, send, headers, response_body, status_code):
         await self.send_response_start(send, headers, status_code)
         await self.send_response_body(send, response_body, status_code)
+
+    async def send_streaming_response(
+        self,
+        send: Coroutine,
+        headers: List[Tuple[bytes, bytes]],
+        body_iterator: AsyncIterator[Union[bytes, str]],
+        status_code: int,
+    ):
+        await self.send_response_start(send, headers, status_code)
+        async for chunk in body_iterator:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            await send(
+                {
+                    "type": "http.response.body",
+                    "status": status_code,
+                    "body": chunk,
+                    "more_body": True,
+                }
+            )
+        await send(
+            {
+                "type": "http.response.body",
+                "status": status_code,
+                "body": b"",
+                "more_body": False,
+            }
+        )
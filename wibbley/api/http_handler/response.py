@@ -1,4 +1,4 @@
-from typing import List, Tuple
+from typing import AsyncIterator, List, Tuple
 
 
 class HTTPResponse:
@@ -18,3 +18,15 @@ class HTTPResponse:
             "headers": self.headers,
             "body": self.body,
         }
+
+
+class StreamingHTTPResponse:
+    def __init__(
+        self,
+        status_code: int,
+        headers: List[Tuple[bytes, bytes]],
+        body_iterator: AsyncIterator[bytes],
+    ):
+        self.status_code = status_code
+        self.headers = headers
+        self.body_iterator = body_iterator
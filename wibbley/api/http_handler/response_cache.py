@@ -0,0 +1,218 @@
+import functools
+import inspect
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from wibbley.api.http_handler.compression import add_vary, weaken_etag
+from wibbley.api.http_handler.request import HTTPRequest
+from wibbley.api.http_handler.response import HTTPResponse
+from wibbley.api.http_handler.serializers import Serializer
+from wibbley.utilities.singleflight import SingleFlight
+
+REQUEST_SIGNATURE = inspect.Signature(
+    [inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY)]
+)
+CACHEABLE_STATUS_CODES = (200, 203, 204, 300, 301, 404, 405, 410, 414, 501)
+
+
+def is_cached_response(result) -> bool:
+    return isinstance(result, CachedResponse)
+
+
+class ResponseCacheSettings:
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+
+
+class CachedResponse:
+    def __init__(
+        self,
+        status_code: int,
+        variants: Dict[Optional[str], Tuple[List[Tuple[bytes, bytes]], bytes]],
+        expires_at: float,
+    ):
+        self.status_code = status_code
+        self.variants = variants
+        self.expires_at = expires_at
+        self.size = sum(len(body) for _, body in variants.values())
+
+    def to_http_response(self, encoding: Optional[str]) -> HTTPResponse:
+        headers, body = self.variants.get(encoding) or self.variants[None]
+        return HTTPResponse(status_code=self.status_code, headers=headers, body=body)
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        http_handler,
+        response_cache_settings: ResponseCacheSettings = None,
+        clock=time.monotonic,
+    ):
+        self.http_handler = http_handler
+        self.settings = response_cache_settings or ResponseCacheSettings()
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.current_bytes = 0
+        self.single_flight = SingleFlight()
+
+    def _determine_content_type_header(self, result):
+        response_types = {
+            str: b"text/plain",
+            bytes: b"application/octet-stream",
+            dict: b"application/json",
+            list: b"application/json",
+        }
+        response_header = response_types.get(type(result))
+        return response_header
+
+    def build_key(
+        self,
+        request: HTTPRequest,
+        query_params: Tuple[str, ...],
+        headers: Tuple[str, ...],
+        serializer: Serializer = None,
+    ):
+        return (
+            request.path,
+            tuple(request.query_params.get(name) for name in query_params),
+            tuple(request.headers.get(name) for name in headers),
+            None if serializer is None else serializer.content_type,
+        )
+
+    def get(self, key) -> Optional[CachedResponse]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= self.clock():
+            self.remove(key)
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def set(self, key, entry: CachedResponse):
+        self.remove(key)
+        if entry.size > self.settings.max_bytes:
+            return
+        self.entries[key] = entry
+        self.current_bytes += entry.size
+        self.evict()
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry.size
+
+    def evict(self):
+        while self.current_bytes > self.settings.max_bytes:
+            _, entry = self.entries.popitem(last=False)
+            self.current_bytes -= entry.size
+
+    def clear(self):
+        self.entries.clear()
+        self.current_bytes = 0
+
+    async def _build_entry(
+        self, result, ttl: float, serializer: Serializer = None
+    ) -> Optional[CachedResponse]:
+        if isinstance(result, HTTPResponse):
+            if result.status_code not in CACHEABLE_STATUS_CODES:
+                return None
+            status_code = result.status_code
+            headers = list(result.headers)
+            body = result.body
+        else:
+            content_type_header = self._determine_content_type_header(result)
+            if content_type_header is None:
+                return None
+            status_code = 200
+            headers = [(b"content-type", content_type_header)]
+            if isinstance(result, (dict, list)):
+                serializer = self.http_handler.response_sender.fallback_serializer(
+                    serializer, result
+                )
+                if serializer is not None:
+                    headers = [
+                        (b"content-type", serializer.content_type),
+                        (b"vary", b"accept"),
+                    ]
+            body = result
+
+        body = self.http_handler.response_sender.serialize_body(body, serializer)
+        variants = {None: (headers, body)}
+        compressor = self.http_handler.response_compressor
+        if compressor is not None and len(body) >= compressor.settings.minimum_size:
+            headers = add_vary(headers, b"accept-encoding")
+            variants[None] = (headers, body)
+            for encoding in compressor.available_encodings:
+                encoded_headers = weaken_etag(headers) + [
+                    (b"content-encoding", encoding.encode("latin-1"))
+                ]
+                variants[encoding] = (
+                    encoded_headers,
+                    await compressor.compress_async(body, encoding),
+                )
+        return CachedResponse(status_code, variants, self.clock() + ttl)
+
+    def _select_encoding(self, request: HTTPRequest) -> Optional[str]:
+        compressor = self.http_handler.response_compressor
+        if compressor is None:
+            return None
+        accept_encoding = request.headers.get("accept-encoding")
+        if accept_encoding is None:
+            return None
+        return compressor.select_encoding(accept_encoding.encode("latin-1"))
+
+    def _select_serializer(self, request: HTTPRequest) -> Optional[Serializer]:
+        accept = request.headers.get("accept")
+        return self.http_handler.response_sender.select_serializer(
+            None if accept is None else accept.encode("latin-1")
+        )
+
+    async def _fill(self, key, func, accepts_request, request, ttl, serializer):
+        result = await (func(request=request) if accepts_request else func())
+        entry = await self._build_entry(result, ttl, serializer)
+        if entry is None:
+            return result
+        self.set(key, entry)
+        return entry
+
+    def cached(
+        self,
+        ttl: float,
+        query_params: List[str] = None,
+        headers: List[str] = None,
+    ):
+        query_params = tuple(query_params or ())
+        headers = tuple(header.lower() for header in headers or ())
+
+        def decorator(func):
+            accepts_request = "request" in inspect.signature(func).parameters
+
+            @functools.wraps(func)
+            async def wrapper(request: HTTPRequest):
+                serializer = self._select_serializer(request)
+                key = self.build_key(request, query_params, headers, serializer)
+                entry = self.get(key)
+                if entry is None:
+                    entry = await self.single_flight.do(
+                        key,
+                        functools.partial(
+                            self._fill,
+                            key,
+                            func,
+                            accepts_request,
+                            request,
+                            ttl,
+                            serializer,
+                        ),
+                        shareable=is_cached_response,
+                    )
+                    if not isinstance(entry, CachedResponse):
+                        return entry
+                return entry.to_http_response(self._select_encoding(request))
+
+            wrapper.__signature__ = REQUEST_SIGNATURE
+            return wrapper
+
+        return decorator
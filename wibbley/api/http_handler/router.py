@@ -1,77 +1,223 @@
 import functools
 import inspect
-from typing import Coroutine
+from typing import Callable
+
+from wibbley.api.http_handler.admission import PRIORITIES
+from wibbley.api.http_handler.executors import EXECUTOR_MODES, HandlerExecutor
+from wibbley.api.http_handler.rate_limiting import RateLimit
 
 
 class Router(object):
-    def __init__(self):
+    def __init__(self, handler_executor: HandlerExecutor = None):
         self.routes = {}
+        self.handler_executor = handler_executor or HandlerExecutor()
+        self.head_paths = set()
+        self.version = 0
+
+    def _is_async(self, func) -> bool:
+        return inspect.iscoroutinefunction(func) or inspect.iscoroutinefunction(
+            getattr(func, "__call__", None)
+        )
+
+    def _get_wrapper(
+        self,
+        func: Callable,
+        timeout: float = None,
+        priority: str = "normal",
+        rate_limit: RateLimit = None,
+        executor: str = None,
+    ):
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown route priority: {priority}")
+        is_async = self._is_async(func)
+        if executor is not None:
+            if executor not in EXECUTOR_MODES:
+                raise ValueError(f"Unknown route executor: {executor}")
+            if is_async:
+                raise ValueError("Only synchronous handlers can run in an executor")
+        param_names = tuple(inspect.signature(func).parameters)
+
+        if is_async:
+
+            @functools.wraps(func)
+            async def wrapper(**kwargs):
+                new_kwargs = {}
+                for param_name in param_names:
+                    if param_name in kwargs:
+                        new_kwargs[param_name] = kwargs[param_name]
 
-    def _get_wrapper(self, func: Coroutine):
-        @functools.wraps(func)
-        async def wrapper(**kwargs):
-            signature = inspect.signature(func)
-            parameters = signature.parameters
-            param_names = [param.name for param in parameters.values()]
-            new_kwargs = {}
-            for param_name in param_names:
-                if param_name in kwargs:
-                    new_kwargs[param_name] = kwargs[param_name]
+                result = await func(**new_kwargs)
+                return result
 
-            result = await func(**new_kwargs)
-            return result
+        else:
+            mode = executor or "thread"
+
+            @functools.wraps(func)
+            async def wrapper(**kwargs):
+                new_kwargs = {}
+                for param_name in param_names:
+                    if param_name in kwargs:
+                        new_kwargs[param_name] = kwargs[param_name]
+
+                return await self.handler_executor.run(func, new_kwargs, mode)
+
+        wrapper.timeout = timeout
+        wrapper.priority = priority
+        wrapper.rate_limit = rate_limit
+        return wrapper
 
+    def _get_decorated(self, func: Callable, wrapper: Callable, executor: str):
+        # Process pools pickle handlers by qualified name, so the module attribute
+        # must keep pointing at the original function rather than the wrapper.
+        if executor == "process":
+            return func
         return wrapper
 
-    def get(self, path):
-        def decorator(func: Coroutine):
-            wrapper = self._get_wrapper(func)
+    def get(
+        self,
+        path,
+        timeout: float = None,
+        priority: str = "normal",
+        rate_limit: RateLimit = None,
+        executor: str = None,
+    ):
+        def decorator(func: Callable):
+            wrapper = self._get_wrapper(
+                func,
+                timeout=timeout,
+                priority=priority,
+                rate_limit=rate_limit,
+                executor=executor,
+            )
+            self.version += 1
             if self.routes.get(path):
                 self.routes[path]["GET"] = wrapper
-                self.routes[path]["HEAD"] = wrapper
             else:
                 self.routes[path] = {"GET": wrapper}
+            if path not in self.head_paths:
                 self.routes[path]["HEAD"] = wrapper
-            return wrapper
+            return self._get_decorated(func, wrapper, executor)
+
+        return decorator
+
+    def head(
+        self,
+        path,
+        timeout: float = None,
+        priority: str = "normal",
+        rate_limit: RateLimit = None,
+        executor: str = None,
+    ):
+        def decorator(func):
+            wrapper = self._get_wrapper(
+                func,
+                timeout=timeout,
+                priority=priority,
+                rate_limit=rate_limit,
+                executor=executor,
+            )
+            self.version += 1
+            self.head_paths.add(path)
+            if self.routes.get(path):
+                self.routes[path]["HEAD"] = wrapper
+            else:
+                self.routes[path] = {"HEAD": wrapper}
+            return self._get_decorated(func, wrapper, executor)
 
         return decorator
 
-    def post(self, path):
+    def post(
+        self,
+        path,
+        timeout: float = None,
+        priority: str = "normal",
+        rate_limit: RateLimit = None,
+        executor: str = None,
+    ):
         def decorator(func):
-            wrapper = self._get_wrapper(func)
+            wrapper = self._get_wrapper(
+                func,
+                timeout=timeout,
+                priority=priority,
+                rate_limit=rate_limit,
+                executor=executor,
+            )
+            self.version += 1
             if self.routes.get(path):
                 self.routes[path]["POST"] = wrapper
             else:
                 self.routes[path] = {"POST": wrapper}
-            return wrapper
+            return self._get_decorated(func, wrapper, executor)
 
         return decorator
 
-    def put(self, path):
+    def put(
+        self,
+        path,
+        timeout: float = None,
+        priority: str = "normal",
+        rate_limit: RateLimit = None,
+        executor: str = None,
+    ):
         def decorator(func):
-            wrapper = self._get_wrapper(func)
+            wrapper = self._get_wrapper(
+                func,
+                timeout=timeout,
+                priority=priority,
+                rate_limit=rate_limit,
+                executor=executor,
+            )
+            self.version += 1
             if self.routes.get(path):
                 self.routes[path]["PUT"] = wrapper
             else:
                 self.routes[path] = {"PUT": wrapper}
-            return wrapper
+            return self._get_decorated(func, wrapper, executor)
 
         return decorator
 
-    def delete(self, path):
+    def delete(
+        self,
+        path,
+        timeout: float = None,
+        priority: str = "normal",
+        rate_limit: RateLimit = None,
+        executor: str = None,
+    ):
         def decorator(func):
-            wrapper = self._get_wrapper(func)
+            wrapper = self._get_wrapper(
+                func,
+                timeout=timeout,
+                priority=priority,
+                rate_limit=rate_limit,
+                executor=executor,
+            )
+            self.version += 1
             if self.routes.get(path):
                 self.routes[path]["DELETE"] = wrapper
             else:
                 self.routes[path] = {"DELETE": wrapper}
-            return wrapper
+            return self._get_decorated(func, wrapper, executor)
 
         return decorator
 
-    def patch(self, path):
+    def patch(
+        self,
+        path,
+        timeout: float = None,
+        priority: str = "normal",
+        rate_limit: RateLimit = None,
+        executor: str = None,
+    ):
         def decorator(func):
-            wrapper = self._get_wrapper(func)
+            wrapper = self._get_wrapper(
+                func,
+                timeout=timeout,
+                priority=priority,
+                rate_limit=rate_limit,
+                executor=executor,
+            )
+            self.version += 1
             if self.routes.get(path):
                 self.routes[path]["PATCH"] = wrapper
             else:
@@ -0,0 +1,166 @@
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Tuple
+
+import orjson
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # pragma: no cover
+    cbor2 = None
+
+NEGOTIATION_CACHE_SIZE = 256
+
+
+class Serializer(ABC):
+    content_type: bytes = b"application/octet-stream"
+    aliases: Tuple[bytes, ...] = ()
+
+    def __init__(self):
+        self.default_hooks: Dict[type, Callable] = {}
+
+    def register_default(self, type_: type, hook: Callable):
+        self.default_hooks[type_] = hook
+
+    def _default(self, obj):
+        for cls in type(obj).__mro__:
+            hook = self.default_hooks.get(cls)
+            if hook is not None:
+                return hook(obj)
+        raise TypeError(f"Type is not serializable: {type(obj).__name__}")
+
+    def can_serialize(self, obj) -> bool:
+        return True
+
+    @abstractmethod
+    def dumps(self, obj) -> bytes:
+        """Serialize an object to a byte string."""
+
+
+class ORJSONSerializer(Serializer):
+    content_type = b"application/json"
+
+    def __init__(self, option: int = 0, orjson=orjson):
+        super().__init__()
+        self.option = option
+        self.orjson = orjson
+
+    def dumps(self, obj) -> bytes:
+        if self.default_hooks:
+            return self.orjson.dumps(obj, default=self._default, option=self.option)
+        return self.orjson.dumps(obj, option=self.option)
+
+
+class MsgpackSerializer(Serializer):
+    content_type = b"application/msgpack"
+    aliases = (b"application/x-msgpack",)
+
+    def __init__(self, msgpack=msgpack):
+        if msgpack is None:
+            raise ImportError("msgpack must be installed to use MsgpackSerializer")
+        super().__init__()
+        self.msgpack = msgpack
+
+    def dumps(self, obj) -> bytes:
+        return self.msgpack.packb(obj, default=self._default, use_bin_type=True)
+
+
+class CBORSerializer(Serializer):
+    content_type = b"application/cbor"
+
+    def __init__(self, cbor2=cbor2):
+        if cbor2 is None:
+            raise ImportError("cbor2 must be installed to use CBORSerializer")
+        super().__init__()
+        self.cbor2 = cbor2
+
+    def _encode_default(self, encoder, obj):
+        encoder.encode(self._default(obj))
+
+    def dumps(self, obj) -> bytes:
+        return self.cbor2.dumps(obj, default=self._encode_default)
+
+
+class RawSerializer(Serializer):
+    content_type = b"application/octet-stream"
+
+    def can_serialize(self, obj) -> bool:
+        if isinstance(obj, (bytes, bytearray, memoryview)):
+            return True
+        return any(cls in self.default_hooks for cls in type(obj).__mro__)
+
+    def dumps(self, obj) -> bytes:
+        if isinstance(obj, (bytes, bytearray, memoryview)):
+            return bytes(obj)
+        return bytes(self._default(obj))
+
+
+class SerializerRegistry:
+    def __init__(
+        self,
+        default_serializer: Serializer = None,
+        serializers: List[Serializer] = None,
+    ):
+        self.default_serializer = default_serializer or ORJSONSerializer()
+        self.serializers: Dict[bytes, Serializer] = {}
+        self.negotiation_cache: Dict[bytes, Serializer] = {}
+        self.register(self.default_serializer)
+        for serializer in serializers or []:
+            self.register(serializer)
+
+    def register(self, serializer: Serializer):
+        for content_type in (serializer.content_type,) + serializer.aliases:
+            self.serializers[content_type] = serializer
+        self.negotiation_cache.clear()
+
+    def _parse_accept(self, accept: bytes) -> List[bytes]:
+        media_ranges = []
+        for index, item in enumerate(accept.split(b",")):
+            parts = item.split(b";")
+            media_range = parts[0].strip().lower()
+            if not media_range:
+                continue
+            quality = 1.0
+            for param in parts[1:]:
+                key, _, value = param.strip().partition(b"=")
+                if key.strip() == b"q":
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+            if quality > 0:
+                media_ranges.append((-quality, index, media_range))
+        return [media_range for _, _, media_range in sorted(media_ranges)]
+
+    def _match(self, media_range: bytes) -> Optional[Serializer]:
+        if media_range == b"*/*":
+            return self.default_serializer
+        if media_range.endswith(b"/*"):
+            if self.default_serializer.content_type.startswith(media_range[:-1]):
+                return self.default_serializer
+            for content_type, serializer in self.serializers.items():
+                if content_type.startswith(media_range[:-1]):
+                    return serializer
+            return None
+        return self.serializers.get(media_range)
+
+    def negotiate(self, accept: Optional[bytes]) -> Serializer:
+        if not accept:
+            return self.default_serializer
+        serializer = self.negotiation_cache.get(accept)
+        if serializer is not None:
+            return serializer
+        serializer = self.default_serializer
+        for media_range in self._parse_accept(accept):
+            matched_serializer = self._match(media_range)
+            if matched_serializer is not None:
+                serializer = matched_serializer
+                break
+        if len(self.negotiation_cache) >= NEGOTIATION_CACHE_SIZE:
+            self.negotiation_cache.clear()
+        self.negotiation_cache[accept] = serializer
+        return serializer
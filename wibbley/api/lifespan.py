@@ -0,0 +1,57 @@
+import inspect
+import logging
+from typing import Callable, List
+
+LOGGER = logging.getLogger(__name__)
+
+
+class LifespanHandler:
+    def __init__(
+        self,
+        startup_hooks: List[Callable] = None,
+        shutdown_hooks: List[Callable] = None,
+        drain_hooks: List[Callable] = None,
+    ):
+        self.startup_hooks = startup_hooks or []
+        self.shutdown_hooks = shutdown_hooks or []
+        self.drain_hooks = drain_hooks or []
+
+    async def _run_hook(self, hook: Callable):
+        result = hook()
+        if inspect.isawaitable(result):
+            await result
+
+    async def startup(self):
+        for hook in self.startup_hooks:
+            await self._run_hook(hook)
+
+    async def shutdown(self):
+        errors = []
+        for hook in self.drain_hooks + list(reversed(self.shutdown_hooks)):
+            try:
+                await self._run_hook(hook)
+            except Exception as e:
+                LOGGER.exception(e)
+                errors.append(e)
+        if errors:
+            raise errors[0]
+
+    async def handle(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await self.startup()
+                except Exception as e:
+                    LOGGER.exception(e)
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                try:
+                    await self.shutdown()
+                except Exception as e:
+                    await send({"type": "lifespan.shutdown.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.shutdown.complete"})
+                return
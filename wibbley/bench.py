@@ -0,0 +1,395 @@
+import asyncio
+import contextlib
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+BODYLESS_STATUS_CODES = (204, 304)
+TRANSPORT_ERRORS = (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError)
+
+
+class BenchSettings:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        path: str = "/",
+        method: str = "GET",
+        headers: List[Tuple[str, str]] = None,
+        body: bytes = b"",
+        concurrency: int = 64,
+        duration: float = 10.0,
+        requests: Optional[int] = None,
+        warmup: float = 1.0,
+        expected_status_codes: Tuple[int, ...] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.method = method.upper()
+        self.headers = headers or []
+        self.body = body
+        self.concurrency = concurrency
+        self.duration = duration
+        self.requests = requests
+        self.warmup = warmup
+        self.expected_status_codes = expected_status_codes
+
+
+def is_expected_status(
+    status_code: int, expected_status_codes: Tuple[int, ...] = None
+) -> bool:
+    if expected_status_codes:
+        return status_code in expected_status_codes
+    return 200 <= status_code < 300
+
+
+def get_error_rate(report: dict) -> float:
+    if "error_rate" in report:
+        return report["error_rate"]
+    attempts = report.get("requests", 0) + report.get("errors", 0)
+    return report.get("errors", 0) / attempts if attempts else 0.0
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = -(-len(sorted_values) * pct // 100)
+    return sorted_values[max(int(rank), 1) - 1]
+
+
+class BenchResult:
+    def __init__(
+        self,
+        latencies: List[float],
+        elapsed: float,
+        errors: int,
+        status_codes: Dict[int, int],
+        concurrency: int,
+        expected_status_codes: Tuple[int, ...] = None,
+    ):
+        self.latencies = sorted(latencies)
+        self.elapsed = elapsed
+        self.errors = errors
+        self.status_codes = status_codes
+        self.concurrency = concurrency
+        self.expected_status_codes = expected_status_codes
+
+    @property
+    def unexpected_responses(self) -> int:
+        return sum(
+            count
+            for status_code, count in self.status_codes.items()
+            if not is_expected_status(status_code, self.expected_status_codes)
+        )
+
+    @property
+    def requests_per_second(self) -> float:
+        if self.elapsed <= 0:
+            return 0.0
+        return len(self.latencies) / self.elapsed
+
+    def to_dict(self) -> dict:
+        latency_ms = {
+            f"p{pct:g}": round(percentile(self.latencies, pct) * 1000, 3)
+            for pct in PERCENTILES
+        }
+        if self.latencies:
+            latency_ms["mean"] = round(
+                sum(self.latencies) / len(self.latencies) * 1000, 3
+            )
+            latency_ms["max"] = round(self.latencies[-1] * 1000, 3)
+        attempts = len(self.latencies) + self.errors
+        errors = self.errors + self.unexpected_responses
+        return {
+            "requests": len(self.latencies),
+            "errors": errors,
+            "error_rate": round(errors / attempts, 4) if attempts else 0.0,
+            "concurrency": self.concurrency,
+            "duration_seconds": round(self.elapsed, 3),
+            "requests_per_second": round(self.requests_per_second, 1),
+            "latency_ms": latency_ms,
+            "status_codes": {
+                str(status_code): count
+                for status_code, count in sorted(self.status_codes.items())
+            },
+        }
+
+
+def find_regressions(result: dict, baseline: dict, tolerance: float) -> List[str]:
+    regressions = []
+    minimum_rps = baseline["requests_per_second"] * (1 - tolerance)
+    if result["requests_per_second"] < minimum_rps:
+        regressions.append(
+            f"requests_per_second {result['requests_per_second']} is below"
+            f" {minimum_rps:.1f} (baseline {baseline['requests_per_second']})"
+        )
+    if "errors" in result or "error_rate" in result:
+        error_rate = get_error_rate(result)
+        maximum_error_rate = get_error_rate(baseline) * (1 + tolerance)
+        if error_rate > maximum_error_rate:
+            regressions.append(
+                f"error_rate {error_rate} is above {maximum_error_rate:.4f}"
+                f" (baseline {get_error_rate(baseline)})"
+            )
+    if "status_codes" in result and "status_codes" in baseline:
+        status_codes = sorted(result["status_codes"])
+        baseline_status_codes = sorted(baseline["status_codes"])
+        if status_codes != baseline_status_codes:
+            regressions.append(
+                f"status codes {', '.join(status_codes)} differ from baseline"
+                f" {', '.join(baseline_status_codes)}"
+            )
+    for name, baseline_ms in baseline["latency_ms"].items():
+        if not name.startswith("p") or name not in result["latency_ms"]:
+            continue
+        maximum_ms = baseline_ms * (1 + tolerance)
+        if result["latency_ms"][name] > maximum_ms:
+            regressions.append(
+                f"{name} latency {result['latency_ms'][name]} ms is above"
+                f" {maximum_ms:.3f} ms (baseline {baseline_ms} ms)"
+            )
+    return regressions
+
+
+def select_stacks(
+    servers: List[str], http_protocols: List[str]
+) -> List[Tuple[str, str]]:
+    stacks = []
+    for server in servers:
+        for http in http_protocols:
+            stack = (server, http if server == "uvicorn" else "auto")
+            if stack not in stacks:
+                stacks.append(stack)
+    return stacks
+
+
+def find_baseline(report: dict, baselines: List[dict]) -> Optional[dict]:
+    for baseline in baselines:
+        if (
+            baseline.get("server", "uvicorn") == report["server"]
+            and baseline.get("http", "auto") == report["http"]
+        ):
+            return baseline
+    return None
+
+
+async def read_chunked_body(reader: asyncio.StreamReader):
+    while True:
+        size_line = await reader.readuntil(b"\r\n")
+        size = int(size_line.split(b";", 1)[0], 16)
+        if size == 0:
+            while await reader.readuntil(b"\r\n") != b"\r\n":
+                pass
+            return
+        await reader.readexactly(size + 2)
+
+
+async def read_response(
+    reader: asyncio.StreamReader, has_body: bool = True
+) -> Tuple[int, bool]:
+    head = await reader.readuntil(b"\r\n\r\n")
+    status_line, *header_lines = head[:-4].split(b"\r\n")
+    status_code = int(status_line.split(b" ", 2)[1])
+    headers = {}
+    for header_line in header_lines:
+        name, _, value = header_line.partition(b":")
+        headers[name.strip().lower()] = value.strip().lower()
+    keep_alive = headers.get(b"connection") != b"close"
+
+    if not has_body or status_code in BODYLESS_STATUS_CODES or status_code < 200:
+        return status_code, keep_alive
+    if headers.get(b"transfer-encoding") == b"chunked":
+        await read_chunked_body(reader)
+    elif b"content-length" in headers:
+        await reader.readexactly(int(headers[b"content-length"]))
+    else:
+        await reader.read()
+        keep_alive = False
+    return status_code, keep_alive
+
+
+class LoadRun:
+    def __init__(self, deadline: float, requests: Optional[int], clock):
+        self.deadline = deadline
+        self.remaining = requests
+        self.clock = clock
+        self.latencies: List[float] = []
+        self.status_codes: Dict[int, int] = {}
+        self.errors = 0
+
+    def acquire(self) -> bool:
+        if self.clock() >= self.deadline:
+            return False
+        if self.remaining is None:
+            return True
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+    def record(self, latency: float, status_code: int):
+        self.latencies.append(latency)
+        self.status_codes[status_code] = self.status_codes.get(status_code, 0) + 1
+
+
+class LoadGenerator:
+    def __init__(self, settings: BenchSettings, clock=time.perf_counter):
+        self.settings = settings
+        self.clock = clock
+        self.request = self.build_request()
+
+    def build_request(self) -> bytes:
+        settings = self.settings
+        lines = [
+            f"{settings.method} {settings.path} HTTP/1.1",
+            f"host: {settings.host}:{settings.port}",
+        ]
+        lines.extend(f"{name}: {value}" for name, value in settings.headers)
+        if settings.body:
+            lines.append(f"content-length: {len(settings.body)}")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + settings.body
+
+    async def run_connection(self, load_run: LoadRun):
+        has_body = self.settings.method != "HEAD"
+        writer = None
+        while load_run.acquire():
+            try:
+                if writer is None:
+                    reader, writer = await asyncio.open_connection(
+                        self.settings.host, self.settings.port
+                    )
+                start = self.clock()
+                writer.write(self.request)
+                status_code, keep_alive = await read_response(reader, has_body)
+                load_run.record(self.clock() - start, status_code)
+            except TRANSPORT_ERRORS:
+                load_run.errors += 1
+                keep_alive = False
+            if not keep_alive and writer is not None:
+                writer.close()
+                writer = None
+        if writer is not None:
+            writer.close()
+
+    async def drive(self, duration: float, requests: Optional[int] = None):
+        start = self.clock()
+        load_run = LoadRun(start + duration, requests, self.clock)
+        await asyncio.gather(
+            *(self.run_connection(load_run) for _ in range(self.settings.concurrency))
+        )
+        return load_run, self.clock() - start
+
+    async def run(self) -> BenchResult:
+        if self.settings.warmup > 0:
+            await self.drive(self.settings.warmup)
+        duration = (
+            self.settings.duration if self.settings.duration > 0 else float("inf")
+        )
+        load_run, elapsed = await self.drive(duration, self.settings.requests)
+        return BenchResult(
+            load_run.latencies,
+            elapsed,
+            load_run.errors,
+            load_run.status_codes,
+            self.settings.concurrency,
+            self.settings.expected_status_codes,
+        )
+
+
+def find_free_port(host: str, socket_factory=socket.socket) -> int:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    with socket_factory(family, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(
+    host: str,
+    port: int,
+    timeout: float = 10.0,
+    poll_interval: float = 0.05,
+    create_connection=socket.create_connection,
+    clock=time.monotonic,
+    sleep=time.sleep,
+) -> bool:
+    deadline = clock() + timeout
+    while clock() < deadline:
+        try:
+            create_connection((host, port), timeout=poll_interval).close()
+            return True
+        except OSError:
+            sleep(poll_interval)
+    return False
+
+
+@contextlib.contextmanager
+def serve_subprocess(
+    app_path: str,
+    host: str,
+    port: int,
+    server_args: List[str] = None,
+    startup_timeout: float = 10.0,
+    popen=subprocess.Popen,
+    wait_for_port=wait_for_port,
+):
+    process = popen(
+        [
+            sys.executable,
+            "-c",
+            "from wibbley.main import main; main()",
+            "--app",
+            app_path,
+            "--host",
+            host,
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+            *(server_args or []),
+        ]
+    )
+    try:
+        if not wait_for_port(host, port, startup_timeout):
+            raise RuntimeError(f"Server did not start on {host}:{port}")
+        yield process
+    finally:
+        process.terminate()
+        process.wait()
+
+
+async def run_in_process(
+    loaded_app, settings: BenchSettings, server_factory=None, http: str = "auto"
+) -> BenchResult:
+    if server_factory is None:
+        import uvicorn
+
+        def server_factory(config_kwargs):
+            return uvicorn.Server(uvicorn.Config(**config_kwargs))
+
+    server = server_factory(
+        dict(
+            app=loaded_app,
+            http=http,
+            host=settings.host,
+            port=settings.port,
+            lifespan="on",
+            log_level="warning",
+        )
+    )
+    serve_task = asyncio.ensure_future(server.serve())
+    while not server.started:
+        if serve_task.done():
+            await serve_task
+            raise RuntimeError(
+                f"Server did not start on {settings.host}:{settings.port}"
+            )
+        await asyncio.sleep(0.01)
+    try:
+        return await LoadGenerator(settings).run()
+    finally:
+        server.should_exit = True
+        await serve_task
@@ -13,10 +13,17 @@ LOGGER = getLogger(__name__)
 
 
 class MessageBrokerSettings:
-    def __init__(self, event_handler_count, outbox_poller_count, fanout_poller_count):
+    def __init__(
+        self,
+        event_handler_count,
+        outbox_poller_count,
+        fanout_poller_count,
+        drain_timeout: float = 30.0,
+    ):
         self.event_handler_count = event_handler_count
         self.outbox_poller_count = outbox_poller_count
         self.fanout_poller_count = fanout_poller_count
+        self.drain_timeout = drain_timeout
 
 
 class MessageBroker:
@@ -28,6 +35,7 @@ class MessageBroker:
         message_broker_settings,
         queue=wibbley_queue,
         adapters=ADAPTERS,
+        message_clients=None,
     ):
         if adapter_name not in adapters:
             raise ValueError("Unavailable adapter selected")
@@ -36,9 +44,14 @@ class MessageBroker:
         self.event_handler_count = message_broker_settings.event_handler_count
         self.outbox_poller_count = message_broker_settings.outbox_poller_count
         self.fanout_poller_count = message_broker_settings.fanout_poller_count
+        self.drain_timeout = message_broker_settings.drain_timeout
+        self.message_clients = message_clients or []
         self.max_fanout_delivery_attempts = 3
         self.queue = queue
+        self.durable_polling = True
+        self.stop_event = None
         self.tasks = []
+        self.durable_tasks = []
         self.fanout_poller = FanoutPoller(
             self.adapter, self.messagebus, self.max_fanout_delivery_attempts
         )
@@ -53,16 +66,45 @@ class MessageBroker:
         await self.adapter.close_connection(connection)
 
     async def start(self):
-        await self.create_durable_tables()
+        self.stop_event = asyncio.Event()
+        if self.durable_polling:
+            await self.create_durable_tables()
 
         for _ in range(self.event_handler_count):
             task = asyncio.create_task(self.event_queue_poller.poll())
             self.tasks.append(task)
 
+        if not self.durable_polling:
+            return
+
         for _ in range(self.outbox_poller_count):
-            task = asyncio.create_task(self.outbox_poller.poll())
-            self.tasks.append(task)
+            task = asyncio.create_task(self.outbox_poller.poll(self.stop_event))
+            self.durable_tasks.append(task)
 
         for _ in range(self.fanout_poller_count):
-            task = asyncio.create_task(self.fanout_poller.poll())
-            self.tasks.append(task)
+            task = asyncio.create_task(self.fanout_poller.poll(self.stop_event))
+            self.durable_tasks.append(task)
+
+    async def drain(self):
+        if self.durable_tasks:
+            await asyncio.wait(self.durable_tasks)
+        for message_client in self.message_clients:
+            await message_client.flush()
+        await self.queue.join()
+
+    async def stop(self):
+        if self.stop_event is not None:
+            self.stop_event.set()
+        try:
+            await asyncio.wait_for(self.drain(), timeout=self.drain_timeout)
+        except asyncio.TimeoutError:
+            LOGGER.warning(
+                f"Message broker drain timed out after {self.drain_timeout}s with"
+                f" {self.queue.qsize()} queued events"
+            )
+        tasks = self.durable_tasks + self.tasks
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.tasks = []
+        self.durable_tasks = []
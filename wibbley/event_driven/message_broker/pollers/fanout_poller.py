@@ -3,6 +3,8 @@ from logging import getLogger
 
 import orjson
 
+from wibbley.utilities.sleep import sleep_until_set
+
 LOGGER = getLogger(__name__)
 
 
@@ -55,11 +57,11 @@ class FanoutPoller:
                         )
         await self.adapter.commit_connection(connection)
 
-    async def poll(self):
-        while True:
+    async def poll(self, stop_event: asyncio.Event):
+        while not stop_event.is_set():
             try:
                 LOGGER.info("Polling fanout")
                 await self._handle_fanout()
-                await asyncio.sleep(300)
+                await sleep_until_set(stop_event, 300)
             except asyncio.CancelledError:
                 break
@@ -1,5 +1,7 @@
 import asyncio
 
+from wibbley.utilities.sleep import sleep_until_set
+
 
 class OutboxPoller:
     def __init__(self, adapter, messagebus):
@@ -40,10 +42,10 @@ class OutboxPoller:
         await self.adapter.commit_connection(connection)
         await self.adapter.close_connection(connection)
 
-    async def poll(self):
-        while True:
+    async def poll(self, stop_event: asyncio.Event):
+        while not stop_event.is_set():
             try:
                 await self._handle_outbox()
-                await asyncio.sleep(300)
+                await sleep_until_set(stop_event, 300)
             except asyncio.CancelledError:
                 break
@@ -1,3 +1,23 @@
 import asyncio
+import os
 
-wibbley_queue = asyncio.Queue()
+
+class WibbleyQueue:
+    def __init__(self, queue_factory=asyncio.Queue):
+        self.queue_factory = queue_factory
+        self.queue = None
+
+    def get_queue(self) -> asyncio.Queue:
+        if self.queue is None:
+            self.queue = self.queue_factory()
+        return self.queue
+
+    def reset(self):
+        self.queue = None
+
+    def __getattr__(self, name):
+        return getattr(self.get_queue(), name)
+
+
+wibbley_queue = WibbleyQueue()
+os.register_at_fork(after_in_child=wibbley_queue.reset)
@@ -11,6 +11,7 @@ from wibbley.event_driven.message_client.adapters.abstract_adapter import (
     AbstractAdapter,
 )
 from wibbley.utilities.async_retry import AsyncRetry
+from wibbley.utilities.deadline import wait_for_deadline
 
 LOGGER = getLogger("wibbley")
 
@@ -33,7 +34,7 @@ class SQLAlchemyAsyncpgAdapter:
         ]
 
     async def get_connection(self):
-        return await self.connection_factory.connect()
+        return await wait_for_deadline(self.connection_factory.connect())
 
     async def close_connection(self, connection):
         await connection.close()
@@ -97,7 +98,7 @@ class SQLAlchemyAsyncpgAdapter:
         return f"DELETE FROM wibbley.fanout WHERE id = '{event_id}' AND fanout_key = '{fanout_key}';"
 
     async def execute_stmt_on_connection(self, stmt, connection):
-        return await connection.exec_driver_sql(stmt)
+        return await wait_for_deadline(connection.exec_driver_sql(stmt))
 
     async def execute_stmt_on_transaction(self, stmt, transaction_connection):
         connection = await transaction_connection.connection()
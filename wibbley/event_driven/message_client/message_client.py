@@ -15,6 +15,7 @@ from wibbley.event_driven.message_client.adapters.sqlalchemy_asyncpg import (
 )
 from wibbley.event_driven.messagebus.messages import Event
 from wibbley.utilities.async_retry import AsyncRetry
+from wibbley.utilities.deadline import create_detached_task
 
 LOGGER = logging.getLogger("wibbley")
 
@@ -81,6 +82,7 @@ class MessageClient:
         self.adapter = adapters[adapter_name](connection_factory)
         self.async_retry = AsyncRetry()
         self.ack_timeout = 5
+        self.publish_tasks = set()
 
     async def stage(
         self,
@@ -123,7 +125,13 @@ class MessageClient:
         await self.adapter.close_connection(connection)
 
     async def publish(self, event: Event, queue=wibbley_queue):
-        asyncio.create_task(self._publish_task(event, queue))
+        task = create_detached_task(self._publish_task(event, queue))
+        self.publish_tasks.add(task)
+        task.add_done_callback(self.publish_tasks.discard)
+
+    async def flush(self):
+        while self.publish_tasks:
+            await asyncio.gather(*self.publish_tasks, return_exceptions=True)
 
     async def is_duplicate(
         self,
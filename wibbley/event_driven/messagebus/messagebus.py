@@ -9,6 +9,7 @@ from wibbley.event_driven.message_client.message_client import (
 )
 from wibbley.event_driven.messagebus.messages import Command, Event, Query
 from wibbley.utilities.async_retry import AsyncRetry
+from wibbley.utilities.deadline import wait_for_deadline
 
 LOGGER = logging.getLogger(__name__)
 
@@ -132,7 +133,7 @@ class Messagebus:
                 return False
             command_handler = self.command_handlers[type(message)]["handler"]
             try:
-                await command_handler(message)
+                await wait_for_deadline(command_handler(message))
             except Exception as e:
                 LOGGER.exception(
                     f"Command could not be handled by handler: {command_handler} for command: {message}"
@@ -158,7 +159,7 @@ class Messagebus:
                 return None
             query_handler = self.query_handlers[type(message)]["handler"]
             try:
-                result = await query_handler(message)
+                result = await wait_for_deadline(query_handler(message))
             except Exception as e:
                 LOGGER.exception(
                     f"Query could not be handled by handler: {query_handler} for query: {message}"
@@ -1,22 +1,36 @@
-import asyncio
+import functools
+import gc
 import importlib.util
 import logging
+import logging.config
 import os
-import signal
 import ssl
 import sys
-from dataclasses import dataclass
-from signal import SIGINT, SIGTERM
-from typing import Dict, List, Union
+from typing import TYPE_CHECKING, Dict, List, Tuple, Union
 
 import click
-import uvicorn
-import uvloop
 
 import wibbley
-from wibbley.event_driven.message_broker.message_broker import MessageBroker
+from wibbley.servers import (
+    HTTP_PROTOCOLS,
+    HYPERCORN,
+    SERVERS,
+    UVICORN,
+    build_hypercorn_config,
+    is_installed,
+    serve_hypercorn,
+)
+from wibbley.supervisor import WORKER_BOOT_ERROR, Supervisor, bind_reuseport_socket
+
+if TYPE_CHECKING:  # pragma: no cover
+    import socket
+
+    import uvicorn
+
+    from wibbley.api.http_handler.profiling import ProfilerSettings
+    from wibbley.event_driven.message_broker.message_broker import MessageBroker
+    from wibbley.utilities.loop_monitor import LoopMonitor
 
-SIGNAL_HANDLERS = [SIGINT, SIGTERM]
 TRACE_LOG_LEVEL = 5
 LOG_LEVELS: Dict[str, int] = {
     "critical": logging.CRITICAL,
@@ -64,10 +78,13 @@ LOGGING_CONFIG = {
         "": {"handlers": ["default"], "level": "INFO", "propagate": False},
     },
 }
-logging.config.dictConfig(LOGGING_CONFIG)
 LOGGER = logging.getLogger("wibbley")
 
 
+def configure_logging():
+    logging.config.dictConfig(LOGGING_CONFIG)
+
+
 def load_module(module_path: str):
     components = module_path.split(":")
     if len(components) != 2:
@@ -96,46 +113,98 @@ def load_module(module_path: str):
         return None
 
 
-def shutdown_handler(server: uvicorn.Server, tasks, sig):
-    for task in tasks:
-        task.cancel()
-    server.handle_exit(sig, None)
+def register_message_broker(app, message_broker):
+    app.on_startup(message_broker.start)
+    app.on_shutdown(message_broker.stop)
 
 
-class SignalHandlerInstaller:
-    def install(self, loop, sig, shutdown_handler, server, tasks):
-        loop.add_signal_handler(sig, shutdown_handler, server, tasks, sig)
+def load_app(
+    app_path: str,
+    message_broker_path: str,
+    drain_timeout: float = None,
+    profiler_settings: "ProfilerSettings" = None,
+):
+    loaded_app = load_module(app_path)
+    if not loaded_app:
+        return None, None
+    if profiler_settings is not None:
+        loaded_app.enable_profiler(profiler_settings)
+    if drain_timeout is not None:
+        loaded_app.configure_drain_timeout(drain_timeout)
 
+    loaded_message_broker = None
+    if message_broker_path:
+        loaded_message_broker = load_module(message_broker_path)
+        if not loaded_message_broker:
+            return None, None
+        if drain_timeout is not None:
+            loaded_message_broker.drain_timeout = drain_timeout
+        register_message_broker(loaded_app, loaded_message_broker)
+    return loaded_app, loaded_message_broker
 
-def install_signal_handlers(
-    server: uvicorn.Server,
-    tasks,
-    loop: asyncio.AbstractEventLoop,
-    signal_handler_installer=SignalHandlerInstaller(),
-):
-    server.install_signal_handlers = lambda: None
+
+def preload_app(loaded_app, gc=gc):
+    compile_routes = getattr(loaded_app, "compile_routes", None)
+    if compile_routes is not None:
+        compile_routes()
+    gc.collect()
+    gc.freeze()
+
+
+def build_loop_monitor(loaded_app, monitor_loop: bool = False):
+    loop_monitor = getattr(loaded_app, "loop_monitor", None)
+    if loop_monitor is None and monitor_loop:
+        from wibbley.utilities.loop_monitor import LoopMonitor
+
+        loop_monitor = LoopMonitor()
+    return loop_monitor
+
+
+async def run_monitored(coroutine, loop_monitor: "LoopMonitor" = None):
+    if loop_monitor is not None:
+        loop_monitor.start()
     try:
-        for sig in [SIGINT, SIGTERM]:
-            signal_handler_installer.install(loop, sig, shutdown_handler, server, tasks)
-    except NotImplementedError:  # pragma: no cover
-        # Windows
-        for sig in [SIGINT, SIGTERM]:
-            signal.signal(
-                sig,
-                lambda sig, frame: shutdown_handler(server, tasks, sig),
-            )
+        await coroutine
+    finally:
+        if loop_monitor is not None:
+            await loop_monitor.stop()
 
 
 async def serve_app(
-    message_broker,
-    server: uvicorn.Server,
-    install_signal_handlers: install_signal_handlers = install_signal_handlers,
+    server: "uvicorn.Server",
+    sockets: List["socket.socket"] = None,
+    loop_monitor: "LoopMonitor" = None,
 ):
-    loop = asyncio.get_event_loop()
-    if message_broker:
-        await message_broker.start()
-        install_signal_handlers(server, message_broker.tasks, loop)
-    await server.serve()
+    await run_monitored(server.serve(sockets=sockets), loop_monitor)
+
+
+def run_worker(
+    config: "uvicorn.Config",
+    sockets: List["socket.socket"],
+    message_broker: "MessageBroker",
+    worker_index: int,
+    reuse_port: bool = False,
+    app_path: str = None,
+    message_broker_path: str = None,
+    drain_timeout: float = None,
+    monitor_loop: bool = False,
+    profiler_settings: "ProfilerSettings" = None,
+):
+    import uvicorn
+    import uvloop
+
+    if app_path is not None:
+        config.app, message_broker = load_app(
+            app_path, message_broker_path, drain_timeout, profiler_settings
+        )
+        if not config.app:
+            sys.exit(WORKER_BOOT_ERROR)
+    if reuse_port:
+        sockets = [bind_reuseport_socket(config.host, config.port, config.backlog)]
+    if message_broker is not None and worker_index != 0:
+        message_broker.durable_polling = False
+    server = uvicorn.Server(config)
+    uvloop.run(serve_app(server, sockets, build_loop_monitor(config.app, monitor_loop)))
 
 
 def print_version(
@@ -147,7 +216,8 @@ def print_version(
     ctx.exit()
 
 
-@click.command()
+@click.group(invoke_without_command=True)
+@click.pass_context
 @click.option(
     "--app",
     type=str,
@@ -159,6 +229,14 @@ def print_version(
     default=None,
     help="Name of the module containing the message_broker. Format: module_path.module_name:message_broker_name",
 )
+@click.option(
+    "--drain-timeout",
+    type=float,
+    default=None,
+    help="Maximum number of seconds to wait on shutdown for background tasks, and for"
+    " the message broker's queued events and pending publishes, to finish."
+    " [default: 30]",
+)
 @click.option("--host", type=str, help="Bind socket to this host.", default="127.0.0.1")
 @click.option("--port", type=int, help="Bind socket to this port.", default=8000)
 @click.option("--uds", type=str, default=None, help="Bind to a UNIX domain socket.")
@@ -339,6 +417,66 @@ def print_version(
     is_eager=True,
     help="Display toutput == Nonehe uvicorn version and exit.",
 )
+@click.option(
+    "--workers",
+    type=int,
+    default=1,
+    help="Number of worker processes. Workers share one listening socket and are"
+    " restarted if they exit; send SIGHUP for a rolling restart.",
+    show_default=True,
+)
+@click.option(
+    "--reuse-port",
+    is_flag=True,
+    default=False,
+    help="Give each worker its own SO_REUSEPORT listener so the kernel balances"
+    " connections across workers instead of sharing one socket.",
+)
+@click.option(
+    "--preload",
+    is_flag=True,
+    default=False,
+    help="Import the app and compile its routes once in the supervisor before forking"
+    " workers, then freeze those objects so workers share their memory.",
+)
+@click.option(
+    "--loop-monitor",
+    "monitor_loop",
+    is_flag=True,
+    default=False,
+    help="Monitor event loop lag and log the coroutines that block the loop. Apps that"
+    " call enable_loop_monitor are always monitored.",
+)
+@click.option(
+    "--profiler",
+    is_flag=True,
+    default=False,
+    help="Mount an admin route at /_wibbley/profile that samples the worker's stack"
+    " for ?seconds=N and returns collapsed stacks for flame graph tools. Requires"
+    " --admin-token.",
+)
+@click.option(
+    "--admin-token",
+    type=str,
+    default=None,
+    envvar="WIBBLEY_ADMIN_TOKEN",
+    help="Bearer token required by admin routes. [env: WIBBLEY_ADMIN_TOKEN]",
+)
+@click.option(
+    "--server",
+    type=click.Choice(SERVERS),
+    default=UVICORN,
+    show_default=True,
+    help="ASGI server to run the app with. hypercorn must be installed separately and"
+    " adds HTTP/2.",
+)
+@click.option(
+    "--http",
+    type=click.Choice(HTTP_PROTOCOLS),
+    default="auto",
+    show_default=True,
+    help="HTTP/1.1 parser used by uvicorn. auto picks httptools when it is installed.",
+)
 @click.option(
     "--h11-max-incomplete-event-size",
     "h11_max_incomplete_event_size",
@@ -347,8 +485,10 @@ def print_version(
     help="For h11, the maximum number of bytes to buffer of an incomplete event.",
 )
 def main(
+    ctx: click.Context,
     app,
     message_broker,
+    drain_timeout: Union[float, None],
     host: str,
     port: int,
     uds: str,
@@ -378,24 +518,66 @@ def main(
     ssl_ca_certs: str,
     ssl_ciphers: str,
     headers: List[str],
+    workers: int,
+    reuse_port: bool,
+    preload: bool,
+    monitor_loop: bool,
+    profiler: bool,
+    admin_token: Union[str, None],
+    server: str,
+    http: str,
     h11_max_incomplete_event_size: Union[int, None],
 ):
+    if ctx.invoked_subcommand is not None:
+        return
+
+    configure_logging()
     current_dir = os.getcwd()
     sys.path.insert(0, current_dir)
 
-    loaded_app = load_module(app)
-    if not loaded_app:
+    if workers > 1 and reload:
+        LOGGER.error("--reload cannot be combined with --workers")
         sys.exit(1)
 
-    loaded_message_broker = None
-    if message_broker:
-        loaded_message_broker = load_module(message_broker)
-        if not loaded_message_broker:
+    if reuse_port and (uds or fd is not None):
+        LOGGER.error("--reuse-port cannot be combined with --uds or --fd")
+        sys.exit(1)
+
+    if http == "httptools" and not is_installed("httptools"):
+        LOGGER.error("--http httptools requires httptools to be installed")
+        sys.exit(1)
+
+    if profiler and not admin_token:
+        LOGGER.error("--profiler requires --admin-token or WIBBLEY_ADMIN_TOKEN")
+        sys.exit(1)
+
+    if server == HYPERCORN:
+        if not is_installed("hypercorn"):
+            LOGGER.error("--server hypercorn requires hypercorn to be installed")
+            sys.exit(1)
+        if workers > 1 or reuse_port or reload:
+            LOGGER.error(
+                "--server hypercorn cannot be combined with --workers, --reuse-port"
+                " or --reload"
+            )
             sys.exit(1)
+        if http != "auto":
+            LOGGER.error("--http only applies to --server uvicorn")
+            sys.exit(1)
+
+    import uvicorn
+    import uvloop
+
+    profiler_settings = None
+    if profiler:
+        from wibbley.api.http_handler.profiling import ProfilerSettings
 
-    config = uvicorn.Config(
-        app=app,
+        profiler_settings = ProfilerSettings(admin_token=admin_token)
+
+    config_kwargs = dict(
         loop="uvloop",
+        http=http,
+        lifespan="on",
         host=host,
         port=port,
         uds=uds,
@@ -427,12 +609,301 @@ def main(
         headers=[header.split(":", 1) for header in headers],
         h11_max_incomplete_event_size=h11_max_incomplete_event_size,
     )
+
+    if workers > 1 or reuse_port:
+        worker_options = {"reuse_port": reuse_port, "monitor_loop": monitor_loop}
+        if preload:
+            loaded_app, loaded_message_broker = load_app(
+                app, message_broker, drain_timeout, profiler_settings
+            )
+            if not loaded_app:
+                sys.exit(1)
+            preload_app(loaded_app)
+        else:
+            loaded_app, loaded_message_broker = app, None
+            worker_options.update(
+                app_path=app,
+                message_broker_path=message_broker,
+                drain_timeout=drain_timeout,
+                profiler_settings=profiler_settings,
+            )
+        config = uvicorn.Config(app=loaded_app, **config_kwargs)
+        sockets = None if reuse_port else [config.bind_socket()]
+        supervisor = Supervisor(
+            workers,
+            functools.partial(
+                run_worker, config, sockets, loaded_message_broker, **worker_options
+            ),
+        )
+        supervisor.install_signal_handlers()
+        supervisor.run()
+        if supervisor.boot_failed:
+            sys.exit(1)
+        return
+
+    loaded_app, _ = load_app(app, message_broker, drain_timeout, profiler_settings)
+    if not loaded_app:
+        sys.exit(1)
+    if server == HYPERCORN:
+        hypercorn_config = build_hypercorn_config(
+            host=host,
+            port=port,
+            uds=uds,
+            fd=fd,
+            backlog=backlog,
+            root_path=root_path,
+            timeout_keep_alive=timeout_keep_alive,
+            timeout_graceful_shutdown=timeout_graceful_shutdown,
+            ssl_keyfile=ssl_keyfile,
+            ssl_certfile=ssl_certfile,
+            ssl_keyfile_password=ssl_keyfile_password,
+            ssl_ca_certs=ssl_ca_certs,
+            ssl_ciphers=ssl_ciphers,
+            log_level=log_level,
+        )
+        uvloop.run(
+            run_monitored(
+                serve_hypercorn(loaded_app, hypercorn_config),
+                build_loop_monitor(loaded_app, monitor_loop),
+            )
+        )
+        return
+    config = uvicorn.Config(app=app if reload else loaded_app, **config_kwargs)
     server = uvicorn.Server(config)
 
     uvloop.install()
     uvloop.run(
-        serve_app(
-            message_broker=loaded_message_broker,
-            server=server,
-        )
+        serve_app(server, loop_monitor=build_loop_monitor(loaded_app, monitor_loop))
     )
+
+
+@main.command("bench")
+@click.option(
+    "--app",
+    type=str,
+    required=True,
+    help="Name of the module containing the ASGI application to benchmark. Format:"
+    " module_path.module_name:app_name",
+)
+@click.option(
+    "--message-broker",
+    type=str,
+    default=None,
+    help="Name of the module containing the message_broker. Format: module_path.module_name:message_broker_name",
+)
+@click.option(
+    "--mode",
+    type=click.Choice(["subprocess", "in-process"]),
+    default="subprocess",
+    show_default=True,
+    help="Serve the app from a separate wibbley process, or from the load generator's"
+    " own event loop.",
+)
+@click.option(
+    "--host", type=str, help="Loopback host to serve on.", default="127.0.0.1"
+)
+@click.option(
+    "--port", type=int, default=0, help="Port to serve on. [default: a free port]"
+)
+@click.option("--path", type=str, default="/", show_default=True, help="Request path.")
+@click.option(
+    "--method", type=str, default="GET", show_default=True, help="Request method."
+)
+@click.option(
+    "--header",
+    "headers",
+    multiple=True,
+    help="Request header as a Name:Value pair.",
+)
+@click.option(
+    "--expect-status",
+    "expected_status_codes",
+    type=int,
+    multiple=True,
+    help="Status code that counts as a successful response. Repeat to allow several."
+    " [default: any 2xx]",
+)
+@click.option(
+    "--concurrency",
+    type=int,
+    default=64,
+    show_default=True,
+    help="Number of keep-alive connections sending requests concurrently.",
+)
+@click.option(
+    "--duration",
+    type=float,
+    default=10.0,
+    show_default=True,
+    help="Seconds to measure for. 0 runs until --requests have been sent.",
+)
+@click.option(
+    "--requests",
+    "request_count",
+    type=int,
+    default=None,
+    help="Stop after this many requests.",
+)
+@click.option(
+    "--warmup",
+    type=float,
+    default=1.0,
+    show_default=True,
+    help="Seconds of unmeasured load to send before measuring.",
+)
+@click.option(
+    "--workers",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Number of worker processes in subprocess mode.",
+)
+@click.option(
+    "--server",
+    "servers",
+    type=click.Choice(SERVERS),
+    multiple=True,
+    default=[UVICORN],
+    show_default=True,
+    help="Server to benchmark. Repeat to compare servers.",
+)
+@click.option(
+    "--http",
+    "http_protocols",
+    type=click.Choice(HTTP_PROTOCOLS),
+    multiple=True,
+    default=["auto"],
+    show_default=True,
+    help="uvicorn HTTP parser to benchmark. Repeat to compare parsers.",
+)
+@click.option(
+    "--output", type=click.Path(), default=None, help="Also write the report here."
+)
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True),
+    default=None,
+    help="Report from a previous run. Exit with status 1 if this run regresses on it.",
+)
+@click.option(
+    "--tolerance",
+    type=float,
+    default=0.1,
+    show_default=True,
+    help="Fraction by which throughput may drop or latency may grow against --baseline.",
+)
+def bench(
+    app: str,
+    message_broker: Union[str, None],
+    mode: str,
+    host: str,
+    port: int,
+    path: str,
+    method: str,
+    headers: List[str],
+    expected_status_codes: Tuple[int, ...],
+    concurrency: int,
+    duration: float,
+    request_count: Union[int, None],
+    warmup: float,
+    workers: int,
+    servers: List[str],
+    http_protocols: List[str],
+    output: Union[str, None],
+    baseline: Union[str, None],
+    tolerance: float,
+):
+    """Load-test an app over loopback and report RPS and latency as JSON."""
+    import orjson
+    import uvloop
+
+    from wibbley.bench import (
+        BenchSettings,
+        LoadGenerator,
+        find_baseline,
+        find_free_port,
+        find_regressions,
+        run_in_process,
+        select_stacks,
+        serve_subprocess,
+    )
+
+    configure_logging()
+    sys.path.insert(0, os.getcwd())
+
+    stacks = select_stacks(servers, http_protocols)
+    loaded_app = None
+    if mode == "in-process":
+        if any(server != UVICORN for server, _ in stacks):
+            LOGGER.error("--mode in-process only supports --server uvicorn")
+            sys.exit(1)
+        loaded_app, _ = load_app(app, message_broker)
+        if not loaded_app:
+            sys.exit(1)
+
+    reports = []
+    for server, http in stacks:
+        settings = BenchSettings(
+            host=host,
+            port=port or find_free_port(host),
+            path=path,
+            method=method,
+            headers=[
+                tuple(part.strip() for part in header.split(":", 1))
+                for header in headers
+            ],
+            concurrency=concurrency,
+            duration=duration,
+            requests=request_count,
+            warmup=warmup,
+            expected_status_codes=expected_status_codes or None,
+        )
+        try:
+            if mode == "in-process":
+                result = uvloop.run(run_in_process(loaded_app, settings, http=http))
+            else:
+                server_args = ["--server", server, "--http", http]
+                if workers > 1:
+                    server_args.extend(["--workers", str(workers)])
+                if message_broker:
+                    server_args.extend(["--message-broker", message_broker])
+                with serve_subprocess(app, settings.host, settings.port, server_args):
+                    result = uvloop.run(LoadGenerator(settings).run())
+        except RuntimeError as e:
+            LOGGER.error(str(e))
+            sys.exit(1)
+        stack_report = dict(result.to_dict(), mode=mode, server=server, http=http)
+        if stack_report["errors"]:
+            LOGGER.warning(
+                f"{server}/{http}: {stack_report['errors']} requests failed or returned"
+                f" an unexpected status: {stack_report['status_codes']}"
+            )
+        reports.append(stack_report)
+
+    report = reports[0] if len(reports) == 1 else reports
+    rendered = orjson.dumps(report, option=orjson.OPT_INDENT_2)
+    click.echo(rendered.decode("utf-8"))
+    if output:
+        with open(output, "wb") as output_file:
+            output_file.write(rendered + b"\n")
+
+    if baseline:
+        with open(baseline, "rb") as baseline_file:
+            baselines = orjson.loads(baseline_file.read())
+        if isinstance(baselines, dict):
+            baselines = [baselines]
+        regressions = []
+        for stack_report in reports:
+            stack_baseline = find_baseline(stack_report, baselines)
+            if stack_baseline is None:
+                continue
+            regressions.extend(
+                f"{stack_report['server']}/{stack_report['http']}: {regression}"
+                for regression in find_regressions(
+                    stack_report, stack_baseline, tolerance
+                )
+            )
+        for regression in regressions:
+            LOGGER.error(f"Performance regression: {regression}")
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,73 @@
+import importlib.util
+import signal
+
+UVICORN = "uvicorn"
+HYPERCORN = "hypercorn"
+SERVERS = (UVICORN, HYPERCORN)
+HTTP_PROTOCOLS = ("auto", "httptools", "h11")
+SHUTDOWN_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+
+def is_installed(module_name: str, find_spec=importlib.util.find_spec) -> bool:
+    return find_spec(module_name) is not None
+
+
+def build_hypercorn_bind(host: str, port: int, uds: str = None, fd: int = None):
+    if uds:
+        return f"unix:{uds}"
+    if fd is not None:
+        return f"fd://{fd}"
+    if ":" in host:
+        return f"[{host}]:{port}"
+    return f"{host}:{port}"
+
+
+def build_hypercorn_config(
+    host: str,
+    port: int,
+    uds: str = None,
+    fd: int = None,
+    backlog: int = 2048,
+    root_path: str = "",
+    timeout_keep_alive: int = 5,
+    timeout_graceful_shutdown: int = None,
+    ssl_keyfile: str = None,
+    ssl_certfile: str = None,
+    ssl_keyfile_password: str = None,
+    ssl_ca_certs: str = None,
+    ssl_ciphers: str = None,
+    log_level: str = None,
+    config_factory=None,
+):
+    if config_factory is None:  # pragma: no cover
+        from hypercorn.config import Config as config_factory
+
+    config = config_factory()
+    config.bind = [build_hypercorn_bind(host, port, uds, fd)]
+    config.backlog = backlog
+    config.root_path = root_path
+    config.keep_alive_timeout = timeout_keep_alive
+    if timeout_graceful_shutdown is not None:
+        config.graceful_timeout = timeout_graceful_shutdown
+    if ssl_certfile:
+        config.certfile = ssl_certfile
+        config.keyfile = ssl_keyfile
+        config.keyfile_password = ssl_keyfile_password
+        config.ca_certs = ssl_ca_certs
+        config.ciphers = ssl_ciphers
+    if log_level:
+        config.loglevel = "DEBUG" if log_level == "trace" else log_level.upper()
+    return config
+
+
+async def serve_hypercorn(app, config, serve=None, signals=SHUTDOWN_SIGNALS):
+    import asyncio
+
+    if serve is None:  # pragma: no cover
+        from hypercorn.asyncio import serve
+
+    shutdown_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in signals:
+        loop.add_signal_handler(signum, shutdown_event.set)
+    await serve(app, config, shutdown_trigger=shutdown_event.wait)
@@ -0,0 +1,149 @@
+import os
+import signal
+import socket
+import time
+from logging import getLogger
+from typing import Callable, Dict
+
+LOGGER = getLogger(__name__)
+
+WORKER_SIGNALS = (signal.SIGHUP, signal.SIGINT, signal.SIGTERM)
+WORKER_BOOT_ERROR = 3
+
+
+def bind_reuseport_socket(
+    host: str, port: int, backlog: int = 2048, socket_factory=socket.socket
+) -> socket.socket:
+    if not hasattr(socket, "SO_REUSEPORT"):  # pragma: no cover
+        raise RuntimeError("SO_REUSEPORT is not supported on this platform")
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket_factory(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    return sock
+
+
+class Supervisor:
+    def __init__(
+        self,
+        worker_count: int,
+        target: Callable[[int], None],
+        poll_interval: float = 0.5,
+        fork=os.fork,
+        kill=os.kill,
+        waitpid=os.waitpid,
+        exit=os._exit,
+        sleep=time.sleep,
+        signal=signal,
+    ):
+        self.worker_count = worker_count
+        self.target = target
+        self.poll_interval = poll_interval
+        self.fork = fork
+        self.kill = kill
+        self.waitpid = waitpid
+        self.exit = exit
+        self.sleep = sleep
+        self.signal = signal
+        self.workers: Dict[int, int] = {}
+        self.should_exit = False
+        self.should_reload = False
+        self.boot_failed = False
+
+    def handle_exit(self, signum, frame):
+        self.should_exit = True
+
+    def handle_reload(self, signum, frame):
+        self.should_reload = True
+
+    def install_signal_handlers(self):
+        self.signal.signal(signal.SIGINT, self.handle_exit)
+        self.signal.signal(signal.SIGTERM, self.handle_exit)
+        self.signal.signal(signal.SIGHUP, self.handle_reload)
+
+    def run_worker(self, worker_index: int):
+        for signum in WORKER_SIGNALS:
+            self.signal.signal(signum, signal.SIG_DFL)
+        status = 0
+        try:
+            self.target(worker_index)
+        except SystemExit as e:
+            status = e.code if isinstance(e.code, int) else 1
+        except BaseException:
+            LOGGER.exception(f"Worker {worker_index} failed")
+            status = 1
+        finally:
+            self.exit(status)
+
+    def spawn(self, worker_index: int):
+        pid = self.fork()
+        if pid == 0:
+            self.run_worker(worker_index)
+            return
+        self.workers[pid] = worker_index
+        LOGGER.info(f"Started worker {worker_index} [{pid}]")
+
+    def reap(self):
+        while self.workers:
+            try:
+                pid, status = self.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker_index = self.workers.pop(pid, None)
+            if worker_index is None or self.should_exit:
+                continue
+            if os.WIFEXITED(status) and os.WEXITSTATUS(status) == WORKER_BOOT_ERROR:
+                LOGGER.error(f"Worker {worker_index} [{pid}] failed to boot, exiting")
+                self.boot_failed = True
+                self.should_exit = True
+                continue
+            LOGGER.warning(
+                f"Worker {worker_index} [{pid}] exited with status {status}, restarting"
+            )
+            self.spawn(worker_index)
+
+    def stop_worker(self, pid: int) -> int:
+        worker_index = self.workers.pop(pid)
+        try:
+            self.kill(pid, signal.SIGTERM)
+            self.waitpid(pid, 0)
+        except (ChildProcessError, ProcessLookupError):
+            pass
+        return worker_index
+
+    def rolling_restart(self):
+        self.should_reload = False
+        LOGGER.info("Restarting workers")
+        for pid in list(self.workers):
+            if self.should_exit:
+                return
+            if pid in self.workers:
+                self.spawn(self.stop_worker(pid))
+
+    def shutdown(self):
+        pids = list(self.workers)
+        for pid in pids:
+            try:
+                self.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in pids:
+            try:
+                self.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        self.workers.clear()
+
+    def run(self):
+        for worker_index in range(self.worker_count):
+            self.spawn(worker_index)
+        while not self.should_exit:
+            self.reap()
+            if self.should_reload:
+                self.rolling_restart()
+            self.sleep(self.poll_interval)
+        self.shutdown()
@@ -0,0 +1,39 @@
+import asyncio
+import contextvars
+from contextvars import ContextVar
+from typing import Awaitable, Coroutine, Optional
+
+DEADLINE = ContextVar("wibbley_deadline", default=None)
+
+
+def get_remaining_time() -> Optional[float]:
+    deadline = DEADLINE.get()
+    if deadline is None:
+        return None
+    return max(deadline - asyncio.get_running_loop().time(), 0.0)
+
+
+async def run_with_timeout(awaitable: Awaitable, timeout: float):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    current_deadline = DEADLINE.get()
+    if current_deadline is not None and current_deadline < deadline:
+        deadline = current_deadline
+    token = DEADLINE.set(deadline)
+    try:
+        return await asyncio.wait_for(awaitable, max(deadline - loop.time(), 0.0))
+    finally:
+        DEADLINE.reset(token)
+
+
+async def wait_for_deadline(awaitable: Awaitable):
+    remaining_time = get_remaining_time()
+    if remaining_time is None:
+        return await awaitable
+    return await asyncio.wait_for(awaitable, remaining_time)
+
+
+def create_detached_task(coroutine: Coroutine) -> asyncio.Future:
+    context = contextvars.copy_context()
+    context.run(DEADLINE.set, None)
+    return context.run(asyncio.ensure_future, coroutine)
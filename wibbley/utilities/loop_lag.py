@@ -0,0 +1,29 @@
+import asyncio
+
+
+class LoopLagMonitor:
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.lag = 0.0
+        self.task = None
+
+    async def sample(self):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.sleep(self.interval)
+        self.lag = max(loop.time() - start - self.interval, 0.0)
+
+    async def run(self):
+        while True:
+            await self.sample()
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.ensure_future(self.run())
+
+    async def stop(self):
+        if self.task is None:
+            return
+        self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+        self.task = None
@@ -0,0 +1,172 @@
+import asyncio
+import inspect
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from typing import List
+
+from wibbley.utilities.loop_lag import LoopLagMonitor
+from wibbley.utilities.metrics import MetricsSink
+
+LOGGER = logging.getLogger(__name__)
+LOOP_LAG = "loop_lag"
+UNKNOWN = "unknown"
+COROUTINE_FLAGS = (
+    inspect.CO_COROUTINE | inspect.CO_ITERABLE_COROUTINE | inspect.CO_ASYNC_GENERATOR
+)
+
+
+def describe_frame(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", UNKNOWN)
+    return f"{module}.{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def find_blocking_name(frame) -> str:
+    innermost = frame
+    while frame is not None:
+        if frame.f_code.co_flags & COROUTINE_FLAGS:
+            return describe_frame(frame)
+        frame = frame.f_back
+    return describe_frame(innermost)
+
+
+class LoopMonitorSettings:
+    def __init__(
+        self,
+        interval: float = 0.1,
+        slow_callback_duration: float = 0.1,
+        sample_interval: float = 0.02,
+        top: int = 10,
+    ):
+        self.interval = interval
+        self.slow_callback_duration = slow_callback_duration
+        self.sample_interval = sample_interval
+        self.top = top
+
+
+class SlowCallbackDetector:
+    def __init__(
+        self,
+        loop_monitor_settings: LoopMonitorSettings,
+        clock=time.monotonic,
+        current_frames=sys._current_frames,
+        logger=LOGGER,
+    ):
+        self.settings = loop_monitor_settings
+        self.clock = clock
+        self.current_frames = current_frames
+        self.logger = logger
+        self.samples = Counter()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.thread_id = None
+        self.last_heartbeat = None
+        self.stalled = False
+
+    def heartbeat(self):
+        self.last_heartbeat = self.clock()
+
+    def check(self):
+        if self.last_heartbeat is None:
+            return
+        stall_threshold = self.settings.interval + self.settings.slow_callback_duration
+        if self.clock() - self.last_heartbeat <= stall_threshold:
+            self.stalled = False
+            return
+        frame = self.current_frames().get(self.thread_id)
+        name = UNKNOWN if frame is None else find_blocking_name(frame)
+        del frame
+        with self.lock:
+            self.samples[name] += 1
+        if not self.stalled:
+            self.stalled = True
+            self.logger.warning(
+                f"Event loop blocked for more than"
+                f" {self.settings.slow_callback_duration}s in {name}"
+            )
+
+    def watch(self):
+        while not self.stop_event.wait(self.settings.sample_interval):
+            self.check()
+
+    def start(self, thread_id: int):
+        if self.thread is not None:
+            return
+        self.thread_id = thread_id
+        self.heartbeat()
+        self.stop_event.clear()
+        self.thread = threading.Thread(
+            target=self.watch, name="wibbley-loop-watchdog", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self):
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+        self.last_heartbeat = None
+        self.stalled = False
+
+    def top(self, count: int) -> List[dict]:
+        with self.lock:
+            most_common = self.samples.most_common(count)
+        return [
+            {
+                "name": name,
+                "samples": samples,
+                "blocked_seconds": round(samples * self.settings.sample_interval, 3),
+            }
+            for name, samples in most_common
+        ]
+
+
+class LoopMonitor:
+    def __init__(
+        self,
+        sink: MetricsSink = None,
+        loop_monitor_settings: LoopMonitorSettings = None,
+        lag_monitor: LoopLagMonitor = None,
+        detector: SlowCallbackDetector = None,
+    ):
+        self.settings = loop_monitor_settings or LoopMonitorSettings()
+        self.sink = sink
+        self.lag_monitor = lag_monitor or LoopLagMonitor(self.settings.interval)
+        self.detector = detector or SlowCallbackDetector(self.settings)
+        self.max_lag = 0.0
+        self.task = None
+
+    async def run(self):
+        while True:
+            await self.lag_monitor.sample()
+            self.detector.heartbeat()
+            lag = self.lag_monitor.lag
+            self.max_lag = max(self.max_lag, lag)
+            if self.sink is not None:
+                self.sink.observe(LOOP_LAG, lag)
+
+    def start(self):
+        if self.task is not None:
+            return
+        self.detector.start(threading.get_ident())
+        self.task = asyncio.ensure_future(self.run())
+
+    async def stop(self):
+        if self.task is None:
+            return
+        self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+        self.task = None
+        self.detector.stop()
+
+    def report(self) -> dict:
+        return {
+            "lag_seconds": self.lag_monitor.lag,
+            "max_lag_seconds": self.max_lag,
+            "slow_callbacks": self.detector.top(self.settings.top),
+        }
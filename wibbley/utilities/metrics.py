@@ -0,0 +1,102 @@
+import bisect
+import socket
+from abc import ABC, abstractmethod
+from typing import Dict, List, Tuple
+
+DEFAULT_BUCKETS = (
+    0.00001,
+    0.00005,
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+)
+
+
+class MetricsSink(ABC):
+    @abstractmethod
+    def observe(self, name: str, seconds: float):
+        """Record a duration in seconds for the named metric."""
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative_counts(self) -> List[Tuple[float, int]]:
+        cumulative_counts = []
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.bucket_counts):
+            total += count
+            cumulative_counts.append((bound, total))
+        return cumulative_counts
+
+
+class HistogramSink(MetricsSink):
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.histograms: Dict[str, Histogram] = {}
+
+    def observe(self, name: str, seconds: float):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram(self.buckets)
+        histogram.observe(seconds)
+
+
+class PrometheusSink(HistogramSink):
+    def __init__(
+        self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, prefix: str = "wibbley"
+    ):
+        super().__init__(buckets)
+        self.prefix = prefix
+
+    def render(self) -> bytes:
+        lines = []
+        for name, histogram in sorted(self.histograms.items()):
+            metric = f"{self.prefix}_{name}_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            for bound, count in histogram.cumulative_counts():
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{metric}_bucket{{le="{le}"}} {count}')
+            lines.append(f"{metric}_sum {histogram.sum!r}")
+            lines.append(f"{metric}_count {histogram.count}")
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class StatsDSink(MetricsSink):
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8125,
+        prefix: str = "wibbley",
+        socket_factory=socket.socket,
+    ):
+        self.address = (host, port)
+        self.prefix = prefix
+        self.socket = socket_factory(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+
+    def observe(self, name: str, seconds: float):
+        payload = f"{self.prefix}.{name}:{seconds * 1000:.3f}|ms".encode("utf-8")
+        try:
+            self.socket.sendto(payload, self.address)
+        except OSError:
+            pass
+
+    def close(self):
+        self.socket.close()
@@ -0,0 +1,81 @@
+import sys
+import threading
+from collections import Counter
+from typing import Optional
+
+from wibbley.utilities.loop_monitor import COROUTINE_FLAGS, describe_frame
+
+IDLE = "(idle)"
+IDLE_MODULES = ("selectors", "asyncio.runners", "uvloop")
+
+
+def is_idle(frame) -> bool:
+    return frame.f_globals.get("__name__") in IDLE_MODULES
+
+
+def collapse_stack(frame, include_idle: bool = False) -> Optional[str]:
+    if is_idle(frame):
+        return IDLE if include_idle else None
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    for index, outer_frame in enumerate(frames):
+        if outer_frame.f_code.co_flags & COROUTINE_FLAGS:
+            frames = frames[index:]
+            break
+    return ";".join(describe_frame(stack_frame) for stack_frame in frames)
+
+
+class SamplingProfiler:
+    def __init__(
+        self,
+        thread_id: int,
+        interval: float = 0.005,
+        include_idle: bool = False,
+        current_frames=sys._current_frames,
+    ):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.include_idle = include_idle
+        self.current_frames = current_frames
+        self.stacks = Counter()
+        self.sample_count = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def sample(self):
+        frame = self.current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        stack = collapse_stack(frame, self.include_idle)
+        del frame
+        self.sample_count += 1
+        if stack is not None:
+            self.stacks[stack] += 1
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(
+            target=self.run, name="wibbley-profiler", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self):
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+
+    def render(self) -> bytes:
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        ).encode("utf-8")
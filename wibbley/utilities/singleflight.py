@@ -0,0 +1,44 @@
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class Call:
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self.calls: Dict[Hashable, Call] = {}
+
+    def _forget(self, key: Hashable, call: Call, _):
+        if self.calls.get(key) is call:
+            del self.calls[key]
+
+    async def do(
+        self,
+        key: Hashable,
+        func: Callable[[], Awaitable],
+        shareable: Callable[[Any], bool] = None,
+    ):
+        call = self.calls.get(key)
+        is_leader = call is None
+        if is_leader:
+            call = Call(asyncio.ensure_future(func()))
+            self.calls[key] = call
+            call.task.add_done_callback(functools.partial(self._forget, key, call))
+        call.waiters += 1
+        try:
+            result = await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                self._forget(key, call, call.task)
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+        if is_leader or shareable is None or shareable(result):
+            return result
+        return await func()
@@ -0,0 +1,9 @@
+import asyncio
+
+
+async def sleep_until_set(event: asyncio.Event, seconds: float) -> bool:
+    try:
+        await asyncio.wait_for(event.wait(), timeout=seconds)
+    except asyncio.TimeoutError:
+        return False
+    return True